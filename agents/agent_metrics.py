@@ -0,0 +1,236 @@
+"""
+Lightweight in-process metrics shared by the agents.
+
+Metrics are registered once at import time and updated from the agent loop
+(and from worker threads), so every update is guarded by a lock. `serve`
+exposes them in Prometheus text format on a local scrape endpoint.
+"""
+import bisect
+import logging
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+
+class Counter:
+    """A monotonically increasing value, optionally split by labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        """Value for the given labels, or the total over all labels if none are given."""
+        with self._lock:
+            if not labels:
+                return sum(self._values.values())
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> dict[tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Gauge(Counter):
+    """A value that goes up and down, optionally split by labels."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram:
+    """Bucketed distribution of observed values, optionally split by labels."""
+
+    kind = "histogram"
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            if not labels:
+                return sum(series[2] for series in self._series.values())
+            series = self._series.get(self._key(labels))
+            return series[2] if series else 0
+
+    def quantile(self, q: float, **labels) -> float | None:
+        """Upper bucket bound below which a fraction `q` of observations fall."""
+        with self._lock:
+            keys = [self._key(labels)] if labels else list(self._series)
+            counts = [0] * (len(self.buckets) + 1)
+            for key in keys:
+                for i, n in enumerate(self._series.get(key, [[0] * len(counts)])[0]):
+                    counts[i] += n
+        total = sum(counts)
+        if not total:
+            return None
+        seen = 0
+        for bound, n in zip(self.buckets + (float("inf"),), counts):
+            seen += n
+            if seen >= q * total:
+                return bound
+        return float("inf")
+
+    def samples(self) -> dict[tuple[str, ...], tuple[list[int], float, int]]:
+        with self._lock:
+            return {key: (list(s[0]), s[1], s[2]) for key, s in self._series.items()}
+
+
+REGISTRY: dict[str, Counter | Gauge | Histogram] = {}
+
+
+def counter(name: str, description: str, labelnames: tuple[str, ...] = ()) -> Counter:
+    """Return the counter registered under `name`, creating it on first use."""
+    if name not in REGISTRY:
+        REGISTRY[name] = Counter(name, description, labelnames)
+    return REGISTRY[name]
+
+
+def gauge(name: str, description: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+    """Return the gauge registered under `name`, creating it on first use."""
+    if name not in REGISTRY:
+        REGISTRY[name] = Gauge(name, description, labelnames)
+    return REGISTRY[name]
+
+
+def histogram(name: str, description: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = Histogram.DEFAULT_BUCKETS) -> Histogram:
+    """Return the histogram registered under `name`, creating it on first use."""
+    if name not in REGISTRY:
+        REGISTRY[name] = Histogram(name, description, labelnames, buckets)
+    return REGISTRY[name]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, (_escape(v) for v in values))]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render(registry: dict = REGISTRY) -> str:
+    """All metrics in `registry` in the Prometheus text exposition format."""
+    lines = []
+    for metric in list(registry.values()):
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if metric.kind == "histogram":
+            for key, (counts, total, count) in sorted(metric.samples().items()):
+                cumulative = 0
+                for bound, n in zip(metric.buckets + (float("inf"),), counts):
+                    cumulative += n
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{metric.name}_bucket{_format_labels(metric.labelnames, key, le)} {cumulative}")
+                lines.append(f"{metric.name}_sum{_format_labels(metric.labelnames, key)} {_format_value(total)}")
+                lines.append(f"{metric.name}_count{_format_labels(metric.labelnames, key)} {count}")
+        else:
+            for key, value in sorted(metric.samples().items()):
+                lines.append(f"{metric.name}{_format_labels(metric.labelnames, key)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would drown out the agent's own output
+        pass
+
+
+def serve(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve GET /metrics on a daemon thread and return the server."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+def serve_from_env(default_port: int) -> ThreadingHTTPServer | None:
+    """Serve metrics on `METRICS_PORT` (default `default_port`); 0 turns the endpoint off."""
+    port = int(os.getenv("METRICS_PORT", str(default_port)))
+    if not port:
+        return None
+    try:
+        server = serve(port, os.getenv("METRICS_HOST", "0.0.0.0"))
+    except OSError as e:
+        # Another agent on this host may hold the port; metrics are not worth failing over
+        logger.warning("Metrics endpoint not started on port %s: %s", port, e)
+        return None
+    print(f"📈 Serving metrics on http://{server.server_address[0]}:{server.server_address[1]}/metrics")
+    return server
+
+
+# Metrics shared by both agents' chat loops, labelled with the agent's chat user name
+agent_messages = counter("agent_messages_total", "Chat messages received by the agent, by outcome.", ("agent", "outcome"))
+agent_graph_duration = histogram("agent_graph_invoke_seconds", "Duration of graph.invoke per processed message.", ("agent",))
+agent_lag = histogram(
+    "agent_message_lag_seconds", "Time from a message's timestamp until the agent finished handling it.", ("agent",)
+)
+agent_parse_failures = counter("agent_parse_failures_total", "LLM responses the agent could not use.", ("agent",))
+
+
+def record_message(agent: str, outcome: str, timestamp=None):
+    """Count a chat message the agent handled, and its lag from the sender's `timestamp`."""
+    agent_messages.inc(agent=agent, outcome=outcome)
+    if isinstance(timestamp, (int, float)) and outcome == "processed":
+        agent_lag.observe(max(0.0, time.time() - timestamp), agent=agent)
@@ -0,0 +1,98 @@
+"""
+Deterministic stand-in for the chat model, for tests and offline runs.
+
+FakeChatModel implements the subset of the LangChain chat model interface the
+agents use (`invoke`, `ainvoke`, `astream`) without any network access.
+Responses come from a script and every call can be delayed or made to fail,
+so rate limiting, retries and agent throughput can be exercised reliably.
+"""
+import asyncio
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+
+@dataclass
+class FakeMessage:
+    """Mimics the parts of an AIMessage the agents read."""
+    content: str
+    usage_metadata: dict = field(default_factory=dict)
+
+
+class FakeProviderError(Exception):
+    """Raised by FakeChatModel for scripted failures; retryable by default."""
+
+    def __init__(self, message: str = "Fake provider error", retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def estimate_tokens(text: str) -> int:
+    # Rough rule of thumb for English text
+    return max(1, len(text) // 4)
+
+
+class FakeChatModel:
+    """Chat model returning scripted responses after a configurable latency.
+
+    `responses` is either an iterable of strings, cycled through in order, or
+    a callable taking the prompt and returning the response text. The first
+    `fail_first` calls raise FakeProviderError before succeeding.
+    """
+
+    def __init__(
+        self,
+        responses: Iterable[str] | Callable[[str], str] = ("",),
+        latency: float = 0.0,
+        fail_first: int = 0,
+        chunk_size: int = 16,
+    ):
+        if callable(responses):
+            self._respond = responses
+        else:
+            script = itertools.cycle(list(responses))
+            self._respond = lambda prompt: next(script)
+        self.latency = latency
+        self.fail_first = fail_first
+        self.chunk_size = chunk_size
+        self.calls = 0
+        self.prompts: list[str] = []
+        self._lock = threading.Lock()
+
+    def _next(self, prompt) -> FakeMessage:
+        prompt = str(prompt)
+        with self._lock:
+            self.calls += 1
+            self.prompts.append(prompt)
+            fail = self.calls <= self.fail_first
+            text = None if fail else self._respond(prompt)
+        if fail:
+            raise FakeProviderError()
+        return FakeMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": estimate_tokens(prompt),
+                "output_tokens": estimate_tokens(text),
+                "total_tokens": estimate_tokens(prompt) + estimate_tokens(text),
+            },
+        )
+
+    def invoke(self, prompt) -> FakeMessage:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._next(prompt)
+
+    async def ainvoke(self, prompt) -> FakeMessage:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._next(prompt)
+
+    async def astream(self, prompt):
+        message = await self.ainvoke(prompt)
+        for i in range(0, len(message.content), self.chunk_size):
+            yield FakeMessage(content=message.content[i:i + self.chunk_size])
+
+    def with_structured_output(self, schema, **kwargs):
+        raise NotImplementedError("FakeChatModel has no schema-constrained mode")
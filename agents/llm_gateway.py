@@ -0,0 +1,296 @@
+"""
+Shared gateway between the agents and their LLM provider.
+
+Every call goes through token buckets for requests and for tokens, a cap on
+concurrent requests, and a retry loop with jittered exponential backoff that
+is bounded by a retry budget. Bursts of chat traffic therefore slow down
+instead of tripping provider throttling and cascading into retry storms.
+Identical prompts issued while one is already in flight share its result.
+"""
+import asyncio
+import copy
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+from agent_metrics import counter, histogram
+from fake_llm import FakeChatModel, estimate_tokens
+
+TOKEN_BUCKETS = (16, 64, 256, 1024, 2048, 4096, 8192, 16384, 32768)
+
+llm_requests = counter("llm_requests_total", "LLM provider calls by model and outcome.", ("model", "outcome"))
+llm_retries = counter("llm_retries_total", "LLM provider calls retried after a retryable error.", ("model",))
+llm_coalesced = counter("llm_coalesced_total", "LLM calls answered by an identical in-flight call.", ("model",))
+llm_latency = histogram("llm_request_duration_seconds", "Latency of LLM provider calls.", ("model",))
+llm_throttle = histogram("llm_throttle_wait_seconds", "Time spent waiting on the rate limiter.", ("model",))
+llm_tokens = histogram("llm_tokens", "Tokens per LLM call.", ("model", "kind"), buckets=TOKEN_BUCKETS)
+
+RETRYABLE_ERRORS = {
+    "ResourceExhausted",
+    "TooManyRequests",
+    "ServiceUnavailable",
+    "InternalServerError",
+    "DeadlineExceeded",
+    "TimeoutError",
+    "ConnectionError",
+}
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Whether `exc` looks like throttling or a transient provider failure."""
+    retryable = getattr(exc, "retryable", None)
+    if retryable is not None:
+        return bool(retryable)
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    if isinstance(code, int) and (code == 429 or code >= 500):
+        return True
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(exc).__mro__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate` tokens per second.
+
+    Reservations may drive the balance negative; the caller then waits until
+    the deficit has been refilled, which keeps waiting callers in FIFO order.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` tokens and return how long to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def debit(self, amount: float):
+        """Charge tokens after the fact, e.g. once the real usage is known."""
+        with self._lock:
+            self.tokens -= amount
+
+
+class RetryBudget:
+    """Allows retries for at most `ratio` of requests, plus a small reserve."""
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 3):
+        self.ratio = ratio
+        self.capacity = max(float(min_retries), 10.0)
+        self.balance = float(min_retries)
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.balance = min(self.capacity, self.balance + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.balance >= 1:
+                self.balance -= 1
+                return True
+            return False
+
+
+class LLMGateway:
+    """Rate-limited, retrying, coalescing wrapper around a LangChain chat model.
+
+    Exposes the `invoke`, `ainvoke`, `astream` and `with_structured_output`
+    methods the agents use, so it can be dropped in wherever `llm` was a
+    bare chat model. Gateways derived with `with_structured_output` share the
+    limits, budget and in-flight table of their parent.
+    """
+
+    def __init__(
+        self,
+        model,
+        *,
+        name: str = "llm",
+        requests_per_minute: float = 60,
+        tokens_per_minute: float = 250_000,
+        max_in_flight: int = 4,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+        retry_budget: RetryBudget | None = None,
+    ):
+        self.model = model
+        self.name = name
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.request_bucket = TokenBucket(requests_per_minute / 60, max(1.0, requests_per_minute / 6))
+        self.token_bucket = TokenBucket(tokens_per_minute / 60, tokens_per_minute / 6)
+        self.retry_budget = retry_budget or RetryBudget()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._in_flight: dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+
+    def with_structured_output(self, schema, **kwargs) -> "LLMGateway":
+        derived = copy.copy(self)
+        derived.model = self.model.with_structured_output(schema, **kwargs)
+        return derived
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        return max(self.request_bucket.reserve(1), self.token_bucket.reserve(estimated_tokens))
+
+    def _admit(self, estimated_tokens: int):
+        # Blocks the calling thread; async callers use `_aadmit` or run `invoke` in a worker thread
+        wait = self._reserve(estimated_tokens)
+        if wait:
+            time.sleep(wait)
+        llm_throttle.observe(wait, model=self.name)
+
+    async def _aadmit(self, estimated_tokens: int):
+        wait = self._reserve(estimated_tokens)
+        if wait:
+            await asyncio.sleep(wait)
+        llm_throttle.observe(wait, model=self.name)
+
+    async def _acquire_slot(self):
+        """Take a concurrency slot without blocking the event loop.
+
+        The slots are shared with threads calling `invoke`, so the wait runs
+        in a worker thread. That thread cannot be interrupted: if the caller
+        is cancelled meanwhile, the slot it eventually takes is released.
+        """
+        def release(future):
+            if not future.cancelled() and future.exception() is None:
+                self._slots.release()
+
+        acquired = asyncio.ensure_future(asyncio.to_thread(self._slots.acquire))
+        try:
+            await asyncio.shield(acquired)
+        except asyncio.CancelledError:
+            acquired.add_done_callback(release)
+            raise
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps retrying callers from synchronising
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _record_usage(self, result, estimated_tokens: int):
+        message = result.get("raw") if isinstance(result, dict) else result
+        usage = getattr(message, "usage_metadata", None) or {}
+        if not usage:
+            return
+        llm_tokens.observe(usage.get("input_tokens", 0), model=self.name, kind="input")
+        llm_tokens.observe(usage.get("output_tokens", 0), model=self.name, kind="output")
+        extra = usage.get("total_tokens", 0) - estimated_tokens
+        if extra > 0:
+            self.token_bucket.debit(extra)
+
+    def _call(self, prompt):
+        estimated_tokens = estimate_tokens(str(prompt))
+        self.retry_budget.record_request()
+        attempt = 0
+        while True:
+            self._admit(estimated_tokens)
+            started = time.perf_counter()
+            try:
+                with self._slots:
+                    result = self.model.invoke(prompt)
+            except Exception as exc:
+                llm_latency.observe(time.perf_counter() - started, model=self.name)
+                llm_requests.inc(model=self.name, outcome="error")
+                if attempt >= self.max_retries or not is_retryable(exc) or not self.retry_budget.try_spend():
+                    raise
+                llm_retries.inc(model=self.name)
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+            llm_latency.observe(time.perf_counter() - started, model=self.name)
+            llm_requests.inc(model=self.name, outcome="ok")
+            self._record_usage(result, estimated_tokens)
+            return result
+
+    def invoke(self, prompt):
+        key = (id(self.model), str(prompt))
+        with self._lock:
+            pending = self._in_flight.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._in_flight[key] = Future()
+        if not leader:
+            llm_coalesced.inc(model=self.name)
+            return pending.result()
+        try:
+            result = self._call(prompt)
+            pending.set_result(result)
+            return result
+        except BaseException as exc:
+            pending.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    async def ainvoke(self, prompt):
+        return await asyncio.to_thread(self.invoke, prompt)
+
+    async def astream(self, prompt):
+        """Stream chunks from the model under the same limits.
+
+        Streams are neither retried nor coalesced: chunks already relayed to
+        the caller cannot be replayed.
+        """
+        estimated_tokens = estimate_tokens(str(prompt))
+        self.retry_budget.record_request()
+        await self._aadmit(estimated_tokens)
+        await self._acquire_slot()
+        started = time.perf_counter()
+        output_chars = 0
+        outcome = "error"
+        try:
+            async for chunk in self.model.astream(prompt):
+                output_chars += len(chunk.content or "")
+                yield chunk
+            outcome = "ok"
+        finally:
+            self._slots.release()
+            llm_latency.observe(time.perf_counter() - started, model=self.name)
+            llm_requests.inc(model=self.name, outcome=outcome)
+            llm_tokens.observe(estimated_tokens, model=self.name, kind="input")
+            llm_tokens.observe(output_chars // 4, model=self.name, kind="output")
+
+
+def build_gateway(model: str = "gemini-2.5-flash", max_tokens: int = 4096) -> LLMGateway:
+    """Create the gateway around the configured provider, with limits from the environment.
+
+    `LLM_PROVIDER=fake` swaps Gemini for a FakeChatModel so the agents can run
+    without network access or an API key (see benchmarks/agent_throughput.py).
+    """
+    if os.getenv("LLM_PROVIDER", "google") == "fake":
+        chat_model = FakeChatModel(latency=float(os.getenv("FAKE_LLM_LATENCY", "0")))
+        model = "fake"
+    else:
+        # Ensure the Google API key is set in your environment variables
+        # For example: os.environ["GOOGLE_API_KEY"] = "YOUR_API_KEY"
+        if "GOOGLE_API_KEY" not in os.environ:
+            raise ValueError(
+                "GOOGLE_API_KEY environment variable not set. Please set it to your API key."
+            )
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        chat_model = ChatGoogleGenerativeAI(
+            model=model,
+            max_tokens=max_tokens,
+            api_key=os.environ["GOOGLE_API_KEY"],
+            # Retries are owned by the gateway so they count against its budget
+            max_retries=1,
+        )
+    return LLMGateway(
+        chat_model,
+        name=model,
+        requests_per_minute=float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60")),
+        tokens_per_minute=float(os.getenv("LLM_TOKENS_PER_MINUTE", "250000")),
+        max_in_flight=int(os.getenv("LLM_MAX_IN_FLIGHT", "4")),
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+    )
@@ -1,51 +1,72 @@
+import difflib
+import hashlib
 import json
 import os
+import random
+import uuid
 from typing import Annotated, TypedDict
 import asyncio
 import websockets
 import time
+from datetime import date
+
+import httpx
 
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph.message import add_messages
 from langgraph.graph import START, StateGraph, END
+
+from agent_metrics import agent_graph_duration, agent_parse_failures, record_message, serve_from_env
+from llm_gateway import build_gateway
+from structured_output import NoteUpdatePipeline, parse_failure_rate
 import sys 
 import dotenv
 dotenv.load_dotenv(".env")
-# Ensure the Google API key is set in your environment variables
-# For example: os.environ["GOOGLE_API_KEY"] = "YOUR_API_KEY"
-if "GOOGLE_API_KEY" not in os.environ:
-    raise ValueError(
-        "GOOGLE_API_KEY environment variable not set. Please set it to your API key."
-    )
-
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    max_tokens=4096,
-    api_key=os.environ["GOOGLE_API_KEY"],
-)
+# Rate-limited, retrying client shared by the agent's graph and commands
+llm = build_gateway(model="gemini-2.5-flash", max_tokens=4096)
 
-class ActionItem(TypedDict):
-    content: str
-    assignee: str
-    due_date: str
-    priority: str
+note_pipeline = NoteUpdatePipeline(llm)
 
 class AgentState(TypedDict):
     notes: str
-    action_items: list[ActionItem]
+    # ActionItem.model_dump() dicts
+    action_items: list[dict]
     messages: Annotated[list[BaseMessage], add_messages]
 
 endpoint = os.getenv("CHAT_ENDPOINT", "ws://localhost:8000/chat")
+backend_url = os.getenv("BACKEND_URL", "http://localhost:8000")
+default_meeting_id = int(os.environ["MEETING_ID"]) if os.getenv("MEETING_ID") else None
 
-def remove_markdown_wrapper(text: str) -> str:
-    """Remove the markdown code block wrapper from the text."""
-    if text.startswith("```") and text.endswith("```"):
-        # might have a language specifier, so we split by newlines
-        lines = text.split("\n")
-        if len(lines) > 2:
-            return "\n".join(lines[1:-1]).strip()
-    return text.strip()
+def format_notes(state: AgentState) -> str:
+    """Render the current notes and action items as a chat message."""
+    notes_display = f"📝 **Current Notes:**\n{state['notes']}\n\n✅ **Action Items:**\n"
+    if state['action_items']:
+        for i, item in enumerate(state['action_items'], 1):
+            notes_display += f"{i}. {item['content']} (Assignee: {item['assignee']}, Due: {item['due_date']}, Priority: {item['priority']})\n"
+    else:
+        notes_display += "No action items yet.\n"
+    return notes_display
+
+async def iter_lines(text: str):
+    """Yield `text` line by line so prebuilt responses can be streamed too."""
+    for line in text.splitlines(keepends=True):
+        yield line
+
+async def summary_chunks(state: AgentState):
+    """Stream an LLM-written summary of the notes and action items token by token."""
+    prompt = f"""You are a note-taking agent. Summarize the meeting so far in a few sentences,
+    then list the open action items with their assignees.
+    Notes:
+    ```markdown
+    {state['notes']}
+    ```
+    Action items:
+    ```json
+    {json.dumps(state['action_items'], indent=2)}
+    ```
+    """
+    async for chunk in llm.astream(prompt):
+        yield chunk.content
 
 def note_taking_agent(state: AgentState) -> AgentState:
     # if last message contains "/show notes", return the notes
@@ -53,15 +74,8 @@ def note_taking_agent(state: AgentState) -> AgentState:
         last_message = state["messages"][-1]
         # Check if the message content contains "/show notes" (case insensitive)
         if "/show notes" in last_message.content.lower():
-            notes_display = f"📝 **Current Notes:**\n{state['notes']}\n\n✅ **Action Items:**\n"
-            if state['action_items']:
-                for i, item in enumerate(state['action_items'], 1):
-                    notes_display += f"{i}. {item['content']} (Assignee: {item['assignee']}, Due: {item['due_date']}, Priority: {item['priority']})\n"
-            else:
-                notes_display += "No action items yet.\n"
-            
             state["messages"].append(
-                AIMessage(content=notes_display)
+                AIMessage(content=format_notes(state))
             )
             return state
         
@@ -101,28 +115,147 @@ def note_taking_agent(state: AgentState) -> AgentState:
     }}
     Do not wrap the response in any other text or markdown.
     """
-    response = remove_markdown_wrapper(llm.invoke(prompt).content.strip())
+    update = note_pipeline.invoke(prompt, state["action_items"])
 
     # Update the state with the new notes and action items
-    if response:
-        try:
-            data = json.loads(response)
-            # Check if notes or action items changed
-            notes_changed = data["notes"] != state["notes"]
-            action_items_changed = data["action_items"] != state["action_items"]
-            
-            state["notes"] = data["notes"]
-            state["action_items"] = data["action_items"]
-            
-            # Don't add automatic update messages - agent is silent unless asked
-            
-        except json.JSONDecodeError:
-            # Don't add error messages to chat - just log them
-            print("⚠️ Error parsing response from note-taking agent.")
+    if update is not None:
+        state["notes"] = update.notes
+        state["action_items"] = [item.model_dump() for item in update.action_items]
+        # Don't add automatic update messages - agent is silent unless asked
+    else:
+        # Don't add error messages to chat - just log them
+        agent_parse_failures.inc(agent="NoteTaker")
+        print(f"⚠️ Error parsing response from note-taking agent (failure rate {parse_failure_rate():.1%}).")
     return state
 
+class BackendSync:
+    """Write-through of notes and action items to the backend API.
+
+    Every action item keeps the idempotency key, and so the backend row, it
+    was first persisted under. Since the LLM rewrites the whole list on each
+    turn, an item whose content changed is matched to the most similar
+    persisted item not claimed by another one, and updates that row. Only
+    items whose payload changed are sent, batched into one upsert; persisted
+    items missing from the new list are deleted from the backend.
+    Assignee names and priorities are not persisted: the backend expects a
+    participant ID for the assignee and has no priority column.
+    """
+
+    def __init__(self, meeting_id: int, base_url: str = backend_url, max_retries: int = 3, similarity: float = 0.6):
+        self.meeting_id = meeting_id
+        self.max_retries = max_retries
+        self.similarity = similarity
+        # Keep-alive pool shared by every sync. Retries are left to `post`, which backs off
+        # between attempts; retrying in the transport too would multiply the attempts
+        transport = httpx.AsyncHTTPTransport(
+            retries=0,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+        )
+        self.client = httpx.AsyncClient(base_url=base_url, transport=transport, timeout=10.0)
+        # idempotency key -> {"id": backend id, "content": normalized content, "row": payload last persisted}
+        self.persisted_items: dict[str, dict] = {}
+        self.persisted_notes: str | None = None
+
+    @staticmethod
+    def normalize(content: str) -> str:
+        return " ".join(content.lower().split())
+
+    def new_key(self, item: dict) -> str:
+        digest = hashlib.sha256(self.normalize(item["content"]).encode()).hexdigest()[:32]
+        return f"notetaker:{self.meeting_id}:{digest}"
+
+    def to_backend(self, item: dict, key: str) -> dict:
+        try:
+            due_date = date.fromisoformat(item.get("due_date") or "").isoformat()
+        except ValueError:
+            due_date = None
+        return {
+            "meeting_id": self.meeting_id,
+            "description": item["content"],
+            "due_date": due_date,
+            "idempotency_key": key,
+        }
+
+    def match_action_items(self, action_items: list[dict]) -> list[str]:
+        """The idempotency key of each item: that of the persisted item it continues, or a new one."""
+        unclaimed = dict(self.persisted_items)
+        by_content = {record["content"]: key for key, record in self.persisted_items.items()}
+        keys: list[str | None] = [None] * len(action_items)
+        for i, item in enumerate(action_items):
+            key = by_content.get(self.normalize(item["content"]))
+            if key in unclaimed:
+                keys[i] = key
+                del unclaimed[key]
+        # Reworded items take the most similar unclaimed item, best pairs first
+        pairs = sorted(
+            (
+                (difflib.SequenceMatcher(None, self.normalize(item["content"]), record["content"]).ratio(), i, key)
+                for i, item in enumerate(action_items) if keys[i] is None
+                for key, record in unclaimed.items()
+            ),
+            reverse=True,
+        )
+        for ratio, i, key in pairs:
+            if ratio >= self.similarity and keys[i] is None and key in unclaimed:
+                keys[i] = key
+                del unclaimed[key]
+        return [key or self.new_key(item) for key, item in zip(keys, action_items)]
+
+    def diff_action_items(self, action_items: list[dict]) -> tuple[list[tuple[str, dict]], list[str]]:
+        """Return (key, row) pairs for items that are new or changed since the last push, and the keys of removed items."""
+        changed = {}
+        current = set()
+        for item, key in zip(action_items, self.match_action_items(action_items)):
+            current.add(key)
+            row = self.to_backend(item, key)
+            if self.persisted_items.get(key, {}).get("row") != row:
+                changed[key] = row
+        removed = [key for key in self.persisted_items if key not in current]
+        return list(changed.items()), removed
+
+    async def post(self, path: str, body: list[dict] | dict) -> list[dict] | dict:
+        """POST with jittered exponential backoff on transport errors and 5xx responses."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.client.post(path, json=body)
+                if response.status_code < 500:
+                    response.raise_for_status()
+                    return response.json()
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+            if attempt < self.max_retries:
+                await asyncio.sleep(0.2 * 2 ** attempt * (0.5 + random.random()))
+        response.raise_for_status()
+
+    async def push(self, state: AgentState):
+        """Persist whatever changed in `state` since the previous push."""
+        changed, removed = self.diff_action_items(state["action_items"])
+        if changed:
+            saved = await self.post("/action_items/upsert", [row for _, row in changed])
+            for (key, row), item in zip(changed, saved):
+                self.persisted_items[key] = {"id": item["id"], "content": self.normalize(row["description"]), "row": row}
+            print(f"💾 Synced {len(changed)} action item(s) to the backend")
+        if removed:
+            await self.post("/action_items/batch_delete", {"ids": [self.persisted_items[key]["id"] for key in removed]})
+            for key in removed:
+                del self.persisted_items[key]
+            print(f"🗑️ Removed {len(removed)} action item(s) from the backend")
+
+        notes = state["notes"]
+        if notes and notes != self.persisted_notes:
+            await self.post(
+                "/meeting_summaries/upsert",
+                # Only the notes: the summary job owns summary_text
+                [{"meeting_id": self.meeting_id, "notes": notes}],
+            )
+            self.persisted_notes = notes
+
+    async def aclose(self):
+        await self.client.aclose()
+
 class NoteTakingAgent:
-    def __init__(self):
+    def __init__(self, meeting_id: int | None = default_meeting_id):
         self.state = {
             "notes": "",
             "action_items": [],
@@ -130,6 +263,8 @@ class NoteTakingAgent:
         }
         self.websocket = None
         self.username = "NoteTaker"
+        # Only write through to the backend when the agent knows its meeting
+        self.sync = BackendSync(meeting_id) if meeting_id is not None else None
 
     async def connect_to_chat(self, uri: str = endpoint):
         """Connect to the WebSocket chat endpoint"""
@@ -138,7 +273,7 @@ class NoteTakingAgent:
             print(f"✅ Connected to chat server at {uri}")
             
             # Send initial message
-            await self.send_message("📝 Note-taking agent active. I'll track notes and action items from the conversation. Type '/show notes' to see current notes.")
+            await self.send_message("📝 Note-taking agent active. I'll track notes and action items from the conversation. Type '/show notes' to see current notes or '/summary' for a summary.")
             
             return True
         except Exception as e:
@@ -155,29 +290,79 @@ class NoteTakingAgent:
                 "timestamp": time.time()
             }
             await self.websocket.send(json.dumps(message_data))
+
+    async def send_stream(self, chunks, started: float | None = None) -> float | None:
+        """Relay an async iterable of text chunks as incremental stream frames.
+
+        Every frame carries the same stream id so the dashboard can append the
+        deltas to a single message. Returns the time to first token in seconds,
+        measured from `started` (defaults to now).
+        """
+        if not self.websocket:
+            return None
+        started = started if started is not None else time.perf_counter()
+        stream_id = uuid.uuid4().hex
+        ttft = None
+        seq = 0
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            if ttft is None:
+                ttft = time.perf_counter() - started
+            await self.websocket.send(json.dumps({
+                "type": "stream",
+                "user": self.username,
+                "stream_id": stream_id,
+                "seq": seq,
+                "delta": chunk,
+                "done": False,
+                "timestamp": time.time()
+            }))
+            seq += 1
+        await self.websocket.send(json.dumps({
+            "type": "stream",
+            "user": self.username,
+            "stream_id": stream_id,
+            "seq": seq,
+            "delta": "",
+            "done": True,
+            "ttft_ms": round(ttft * 1000, 1) if ttft is not None else None,
+            "timestamp": time.time()
+        }))
+        if ttft is not None:
+            print(f"⏱️ Stream {stream_id[:8]}: first token after {ttft * 1000:.0f} ms, {seq} chunks")
+        return ttft
     
     async def process_message(self, message_content: str, sender: str):
         """Process incoming chat message through the agent"""
         if sender == self.username:
             return  # Don't process our own messages
         
-        # Handle /show notes command directly
+        # Handle /show notes and /summary commands directly, streaming the response
+        started = time.perf_counter()
         if "/show notes" in message_content.lower():
-            notes_summary = f"📝 **Current Notes:**\n{self.state['notes']}\n\n✅ **Action Items:**\n"
-            if self.state['action_items']:
-                for i, item in enumerate(self.state['action_items'], 1):
-                    notes_summary += f"{i}. {item['content']} (Assignee: {item['assignee']}, Due: {item['due_date']}, Priority: {item['priority']})\n"
-            else:
-                notes_summary += "No action items yet.\n"
-            await self.send_message(notes_summary)
+            await self.send_stream(iter_lines(format_notes(self.state)), started)
+            return
+        if "/summary" in message_content.lower():
+            await self.send_stream(summary_chunks(self.state), started)
             return
             
         # Add message to state for normal processing
         self.state["messages"].append(HumanMessage(content=f"{sender}: {message_content}"))
         
         # Process through the agent silently
-        result = graph.invoke(self.state)
+        invoke_started = time.perf_counter()
+        # The graph calls the LLM synchronously; keep its throttling and retries off the event loop
+        result = await asyncio.to_thread(graph.invoke, self.state)
+        agent_graph_duration.observe(time.perf_counter() - invoke_started, agent=self.username)
         self.state = result
+
+        if self.sync:
+            try:
+                await self.sync.push(self.state)
+            except httpx.HTTPError as e:
+                # Unsynced changes are retried on the next message
+                print(f"⚠️ Failed to sync notes to the backend: {e}")
         
         # Don't send automatic responses - agent only responds to /show notes
     
@@ -192,7 +377,12 @@ class NoteTakingAgent:
                         message_content = data.get("message", "")
                         print(f"📨 Received: {sender}: {message_content}")
                         await self.process_message(message_content, sender)
+                        outcome = "own" if sender == self.username else "processed"
+                        record_message(self.username, outcome, data.get("timestamp"))
+                    else:
+                        record_message(self.username, "skipped")
                 except json.JSONDecodeError:
+                    record_message(self.username, "invalid")
                     print(f"⚠️ Received invalid JSON: {message}")
         except websockets.exceptions.ConnectionClosed:
             print("🔌 WebSocket connection closed")
@@ -201,14 +391,19 @@ class NoteTakingAgent:
     
     async def run(self):
         """Main run loop for the agent"""
-        if await self.connect_to_chat():
-            await self.listen_to_chat()
-        else:
-            print("Failed to connect to chat server")
+        try:
+            if await self.connect_to_chat():
+                await self.listen_to_chat()
+            else:
+                print("Failed to connect to chat server")
+        finally:
+            if self.sync:
+                await self.sync.aclose()
 
 async def main():
     """Main async function to run the note-taking agent"""
     agent = NoteTakingAgent()
+    serve_from_env(default_port=9101)
     
     # Start the agent in the background
     agent_task = asyncio.create_task(agent.run())
@@ -254,6 +449,7 @@ if __name__ == "__main__":
     print(f"The agent will connect to {endpoint} and track notes and action items")
     print("Commands:")
     print("  /show notes - Display current notes and action items")
+    print("  /summary    - Stream an LLM summary of the meeting so far")
     
     try:
         asyncio.run(main())
@@ -0,0 +1,201 @@
+"""
+Structured-output parsing for the note-taking agent.
+
+The pipeline asks the model for schema-constrained JSON when it supports it
+and otherwise falls back to a tolerant parser that repairs the usual ways LLM
+output goes wrong (markdown fences, surrounding prose, trailing commas and
+responses cut off mid-object). Whatever can be recovered is validated against
+the Pydantic models below, so a single bad action item no longer throws away
+the whole LLM call.
+"""
+import json
+from typing import Any
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+from agent_metrics import counter
+
+
+class ActionItem(BaseModel):
+    content: str = Field(..., min_length=1, description="What needs to be done.")
+    assignee: str = Field(default="", description="Name of the person responsible.")
+    due_date: str = Field(default="", description="Due date in YYYY-MM-DD format.")
+    priority: str = Field(default="", description="Priority level.")
+
+    @field_validator("assignee", "due_date", "priority", mode="before")
+    @classmethod
+    def none_to_empty(cls, value):
+        return "" if value is None else value
+
+
+class NoteUpdate(BaseModel):
+    notes: str = Field(..., description="Markdown formatted meeting notes.")
+    action_items: list[ActionItem] = Field(default_factory=list)
+
+
+parse_results = counter(
+    "notetaker_parse_results_total",
+    "Note-taker LLM responses by parsing method and outcome.",
+    ("method", "outcome"),
+)
+
+
+def parse_failure_rate() -> float:
+    """Fraction of LLM responses that yielded no usable update."""
+    total = parse_results.value()
+    if not total:
+        return 0.0
+    failed = sum(v for (_, outcome), v in parse_results.samples().items() if outcome == "failed")
+    return failed / total
+
+
+def remove_markdown_wrapper(text: str) -> str:
+    """Remove the markdown code block wrapper from the text."""
+    if text.startswith("```") and text.endswith("```"):
+        # might have a language specifier, so we split by newlines
+        lines = text.split("\n")
+        if len(lines) > 2:
+            return "\n".join(lines[1:-1]).strip()
+    return text.strip()
+
+
+def _closers(stack: list[str]) -> str:
+    return "".join(reversed(stack))
+
+
+def repair_json(text: str) -> tuple[Any, bool]:
+    """Parse the first JSON value in `text`, repairing it if necessary.
+
+    Returns `(value, truncated)` where `truncated` tells whether the value was
+    cut off and had to be closed by the parser. Raises ValueError if nothing
+    usable can be recovered.
+    """
+    text = remove_markdown_wrapper(text.strip())
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        raise ValueError("No JSON value found")
+    start = min(starts)
+
+    try:
+        value, _ = json.JSONDecoder().raw_decode(text, start)
+        return value, False
+    except json.JSONDecodeError:
+        pass
+
+    # Single pass over the text, dropping trailing commas and remembering the
+    # points at which the output could be cut and still close cleanly.
+    out: list[str] = []
+    stack: list[str] = []
+    cut_points: list[tuple[int, list[str]]] = []
+    in_string = escaped = False
+    complete = False
+    for ch in text[start:]:
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            out.append(ch)
+        elif ch in "}]":
+            while out and out[-1] in " \t\r\n,":
+                out.pop()
+            if stack:
+                stack.pop()
+            out.append(ch)
+            cut_points.append((len(out), list(stack)))
+            if not stack:
+                complete = True
+                break
+        elif ch == ",":
+            cut_points.append((len(out), list(stack)))
+            out.append(ch)
+        else:
+            out.append(ch)
+
+    candidates = []
+    if complete:
+        candidates.append("".join(out))
+    else:
+        tail = out[:-1] if escaped else out
+        candidates.append("".join(tail) + ('"' if in_string else "") + _closers(stack))
+    for cut, open_stack in reversed(cut_points):
+        candidates.append("".join(out[:cut]).rstrip(" \t\r\n,") + _closers(open_stack))
+
+    for i, candidate in enumerate(candidates):
+        try:
+            return json.loads(candidate), not complete or i > 0
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("Could not repair JSON")
+
+
+def coerce_note_update(data: Any, current_items: list[dict], truncated: bool = False) -> NoteUpdate | None:
+    """Validate as much of `data` as possible into a NoteUpdate.
+
+    Invalid action items are dropped individually. When the response was
+    truncated the recovered items are merged over `current_items` instead of
+    replacing them, since the tail of the list may be missing.
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("notes"), str):
+        return None
+    items = []
+    raw_items = data.get("action_items")
+    if not isinstance(raw_items, list):
+        return NoteUpdate(notes=data["notes"], action_items=current_items)
+    for raw in raw_items:
+        try:
+            items.append(ActionItem.model_validate(raw))
+        except ValidationError:
+            continue
+    if truncated:
+        merged = {item["content"]: ActionItem.model_validate(item) for item in current_items}
+        merged.update({item.content: item for item in items})
+        items = list(merged.values())
+    return NoteUpdate(notes=data["notes"], action_items=items)
+
+
+class NoteUpdatePipeline:
+    """Turns a note-taking prompt into a validated NoteUpdate with as few wasted calls as possible."""
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.constrained = None
+        try:
+            self.constrained = llm.with_structured_output(NoteUpdate, method="json_mode", include_raw=True)
+        except (AttributeError, NotImplementedError, TypeError, ValueError):
+            # Provider has no schema-constrained mode; rely on the repair parser
+            pass
+
+    def invoke(self, prompt: str, current_items: list[dict]) -> NoteUpdate | None:
+        if self.constrained is not None:
+            result = self.constrained.invoke(prompt)
+            if result.get("parsed") is not None:
+                parse_results.inc(method="constrained", outcome="ok")
+                return result["parsed"]
+            return self.parse(result["raw"].content, current_items, method="constrained")
+        return self.parse(self.llm.invoke(prompt).content, current_items, method="repair")
+
+    def parse(self, text: str, current_items: list[dict], method: str = "repair") -> NoteUpdate | None:
+        try:
+            data, truncated = repair_json(text)
+        except ValueError:
+            parse_results.inc(method=method, outcome="failed")
+            return None
+        update = coerce_note_update(data, current_items, truncated)
+        if update is None:
+            outcome = "failed"
+        elif truncated or len(update.action_items) < len(data.get("action_items") or []):
+            outcome = "partial"
+        else:
+            outcome = "ok"
+        parse_results.inc(method=method, outcome=outcome)
+        return update
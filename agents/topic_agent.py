@@ -7,23 +7,15 @@ import sys
 import time
 
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph.message import add_messages
 from langgraph.graph import START, StateGraph, END
+
+from agent_metrics import agent_graph_duration, agent_parse_failures, record_message, serve_from_env
+from llm_gateway import build_gateway
 import dotenv
 dotenv.load_dotenv(".env")
-# Ensure the Google API key is set in your environment variables
-# For example: os.environ["GOOGLE_API_KEY"] = "YOUR_API_KEY"
-if "GOOGLE_API_KEY" not in os.environ:
-    raise ValueError(
-        "GOOGLE_API_KEY environment variable not set. Please set it to your API key."
-    )
-
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    max_tokens=4096,
-    api_key=os.environ["GOOGLE_API_KEY"],
-)
+# Rate-limited, retrying client shared by the agent's graph and commands
+llm = build_gateway(model="gemini-2.5-flash", max_tokens=4096)
 
 endpoint = os.getenv("CHAT_ENDPOINT", "ws://localhost:8000/chat")
 
@@ -59,6 +51,7 @@ Respond with just the score, no other text.
                     )
             except ValueError:
                 # Handle case where LLM doesn't return a valid number
+                agent_parse_failures.inc(agent="TopicAgent")
                 state["relevance"] = 0.0
     return state
 
@@ -109,7 +102,10 @@ class ChatAgent:
         self.state["messages"].append(HumanMessage(content=message_content))
         
         # Process through the agent
-        result = graph.invoke(self.state)
+        invoke_started = time.perf_counter()
+        # The graph calls the LLM synchronously; keep its throttling and retries off the event loop
+        result = await asyncio.to_thread(graph.invoke, self.state)
+        agent_graph_duration.observe(time.perf_counter() - invoke_started, agent=self.username)
         self.state = result
         
         # Check if agent generated any responses
@@ -128,7 +124,12 @@ class ChatAgent:
                         message_content = data.get("message", "")
                         print(f"📨 Received: {sender}: {message_content}")
                         await self.process_message(message_content, sender)
+                        outcome = "own" if sender == self.username else "processed"
+                        record_message(self.username, outcome, data.get("timestamp"))
+                    else:
+                        record_message(self.username, "skipped")
                 except json.JSONDecodeError:
+                    record_message(self.username, "invalid")
                     print(f"⚠️ Received invalid JSON: {message}")
         except websockets.exceptions.ConnectionClosed:
             print("🔌 WebSocket connection closed")
@@ -149,6 +150,7 @@ async def main():
         topic = sys.argv[1]
     
     agent = ChatAgent(topic)
+    serve_from_env(default_port=9102)
     
     # Start the agent in the background
     agent_task = asyncio.create_task(agent.run())
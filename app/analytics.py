@@ -0,0 +1,182 @@
+"""
+Participation analytics computed from a meeting's transcript.
+
+The transcript entries of a meeting are read with a single query and turned
+into column arrays, so speaking time, turn counts and the equity score are
+computed with vectorised NumPy operations instead of per-row Python loops.
+Entries of archived transcripts come from their archive chunk, which is
+already stored as columns.
+The results are written to `meeting_analytics` and `participant_analytics`
+in one transaction.
+"""
+from dataclasses import dataclass
+from itertools import chain
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import archive
+import validation_models.sql_models as sql_models
+
+# Agents take part in meetings but should not count towards participation equity
+AGENT_ROLES = {"note_taker_agent", "facilitator_agent"}
+
+
+@dataclass
+class TranscriptColumns:
+    """The columns of a meeting's transcript entries, ordered by start time."""
+    participant_id: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.participant_id)
+
+
+@dataclass
+class ParticipationStats:
+    participant_ids: np.ndarray
+    speaking_time: np.ndarray
+    turn_count: np.ndarray
+    equity_score: float | None
+
+
+def load_transcript_columns(db: Session, meeting_id: int) -> TranscriptColumns:
+    """Read the meeting's transcript entries as column arrays with a single query."""
+    rows = db.execute(
+        select(
+            sql_models.TranscriptEntry.id,
+            sql_models.TranscriptEntry.participant_id,
+            sql_models.TranscriptEntry.start_time_offset_seconds,
+            sql_models.TranscriptEntry.end_time_offset_seconds,
+        )
+        .join(sql_models.Transcript, sql_models.Transcript.id == sql_models.TranscriptEntry.transcript_id)
+        .where(sql_models.Transcript.meeting_id == meeting_id)
+        .order_by(sql_models.TranscriptEntry.start_time_offset_seconds, sql_models.TranscriptEntry.id)
+    ).tuples()
+    flat = np.fromiter(chain.from_iterable(rows), dtype=np.int64)
+    columns = flat.reshape(-1, 4)
+    archived = archive.meeting_entries(db, meeting_id)
+    if archived is not None:
+        # Entries still in the table are interleaved with the archived ones, by (start, id)
+        merged = np.concatenate((
+            np.column_stack((archived.id, archived.participant_id, archived.start, archived.end)),
+            columns,
+        ))
+        columns = merged[np.lexsort((merged[:, 0], merged[:, 2]))]
+    return TranscriptColumns(
+        participant_id=columns[:, 1],
+        start=columns[:, 2],
+        end=columns[:, 3],
+    )
+
+
+def gini(values: np.ndarray) -> float:
+    """Gini coefficient of non-negative `values`: 0 is perfectly even, 1 is one speaker."""
+    n = len(values)
+    total = values.sum()
+    if n == 0 or total == 0:
+        return 0.0
+    ranked = np.sort(values)
+    return float(2 * np.dot(np.arange(1, n + 1), ranked) / (n * total) - (n + 1) / n)
+
+
+def normalized_entropy(values: np.ndarray) -> float:
+    """Shannon entropy of the share of `values`, scaled to [0, 1] by its maximum log(n)."""
+    n = len(values)
+    total = values.sum()
+    if n < 2 or total == 0:
+        return 1.0
+    shares = values[values > 0] / total
+    return float(-np.sum(shares * np.log(shares)) / np.log(n))
+
+
+def equity_score(speaking_time: np.ndarray, method: str = "gini") -> float | None:
+    """Participation equity between 0 (one person talks) and 1 (everyone talks equally)."""
+    if len(speaking_time) == 0:
+        return None
+    if method == "gini":
+        return 1.0 - gini(speaking_time)
+    if method == "entropy":
+        return normalized_entropy(speaking_time)
+    raise ValueError(f"Unknown equity method: {method}")
+
+
+def compute_participation(
+    columns: TranscriptColumns,
+    participants: dict[int, str] | None = None,
+    method: str = "gini",
+) -> ParticipationStats:
+    """Per-participant speaking time and turn counts, plus the meeting's equity score.
+
+    `participants` maps participant ids to roles. Participants who never spoke
+    are included with zero speaking time, and agents are left out of the
+    equity score.
+    """
+    participants = participants or {}
+    known = np.fromiter(participants, dtype=np.int64, count=len(participants))
+    participant_ids, index = np.unique(np.concatenate([known, columns.participant_id]), return_inverse=True)
+    entry_index = index[len(known):]
+
+    durations = np.clip(columns.end - columns.start, 0, None)
+    speaking_time = np.bincount(entry_index, weights=durations, minlength=len(participant_ids)).astype(np.int64)
+
+    # A turn starts whenever the speaker changes from the previous entry
+    turn_starts = np.empty(len(columns), dtype=bool)
+    turn_starts[:1] = True
+    np.not_equal(columns.participant_id[1:], columns.participant_id[:-1], out=turn_starts[1:])
+    turn_count = np.bincount(entry_index[turn_starts], minlength=len(participant_ids))
+
+    humans = np.array([participants.get(int(pid)) not in AGENT_ROLES for pid in participant_ids], dtype=bool)
+    return ParticipationStats(
+        participant_ids=participant_ids,
+        speaking_time=speaking_time,
+        turn_count=turn_count,
+        equity_score=equity_score(speaking_time[humans], method),
+    )
+
+
+def load_participant_roles(db: Session, meeting_id: int) -> dict[int, str]:
+    """Map the meeting's participant ids to their roles."""
+    return dict(db.execute(
+        select(sql_models.MeetingParticipant.id, sql_models.MeetingParticipant.role)
+        .where(sql_models.MeetingParticipant.meeting_id == meeting_id)
+    ).tuples().all())
+
+
+def write_meeting_analytics(db: Session, meeting_id: int, stats: ParticipationStats) -> sql_models.MeetingAnalytics:
+    """Upsert the meeting's analytics rows from `stats` in a single transaction."""
+    try:
+        analytics = db.scalars(
+            select(sql_models.MeetingAnalytics).where(sql_models.MeetingAnalytics.meeting_id == meeting_id)
+        ).first()
+        if analytics is None:
+            analytics = sql_models.MeetingAnalytics(meeting_id=meeting_id)
+            db.add(analytics)
+            db.flush()
+        analytics.participation_equity_score = stats.equity_score
+
+        existing = {row.participant_id: row for row in analytics.participant_analytics}
+        for participant_id, speaking_time, turn_count in zip(
+            stats.participant_ids.tolist(), stats.speaking_time.tolist(), stats.turn_count.tolist()
+        ):
+            row = existing.get(participant_id)
+            if row is None:
+                row = sql_models.ParticipantAnalytics(meeting_analytics_id=analytics.id, participant_id=participant_id)
+                analytics.participant_analytics.append(row)
+            row.speaking_time_seconds = speaking_time
+            row.turn_count = turn_count
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    db.refresh(analytics)
+    return analytics
+
+
+def refresh_meeting_analytics(db: Session, meeting_id: int, method: str = "gini") -> sql_models.MeetingAnalytics:
+    """Recompute a meeting's analytics and upsert them in a single transaction."""
+    participants = load_participant_roles(db, meeting_id)
+    stats = compute_participation(load_transcript_columns(db, meeting_id), participants, method)
+    return write_meeting_analytics(db, meeting_id, stats)
@@ -0,0 +1,709 @@
+"""
+Archival of old transcript entries.
+
+`transcript_entries` is by far the largest table. Entries of a meeting that
+ended months ago are rarely read again, but while they stay in the
+operational database its indexes, the full-text index, its backups and the
+pages SQLite keeps hot keep growing. `archive_transcripts` moves the entries
+of meetings completed more than N days ago into one archive file per
+organization, `ARCHIVE_DIR/org_<id>.sqlite`.
+
+Each transcript becomes one chunk. A chunk holds the entries in spoken order,
+stored column by column and compressed with zstd. The columns are the
+delta-encoded ids and start times, then the participant ids, durations,
+text lengths, and the UTF-8 text. The integer columns compress to almost
+nothing, so a chunk costs little more than its compressed text. The
+archive files are SQLite databases with one row per chunk, which makes
+writing them transactional. A chunk is read with a primary key lookup and
+decompressed in one call.
+
+`transcript_archives` in the operational database records which transcripts
+were archived, and `archived_entries` which transcript each archived entry
+belongs to. Their text is indexed in `archived_entries_fts`, so `/search`
+keeps finding them (see app/search.py). The entry routes, transcript export, participation analytics,
+summarization, action item extraction, and the transcript and transcript
+entry read routes check it, then merge the archived entries with those still
+in the table. Entries that an action item or a decision points at stay in
+the table, and so do entries added after the transcript was archived, until
+the next run picks them up. `transcript_entries` is declared AUTOINCREMENT,
+so SQLite never hands out the id of an archived entry again. Archived
+entries are read-only.
+
+Chunks are committed before the entries they hold are deleted, and only
+those entries are deleted. An interrupted run loses nothing, and running it
+again finishes the job. Each run first sweeps the archives of transcripts
+deleted since, chunks included. `compact` archives, then VACUUMs the database to give
+the freed pages back to the file system. It reports the database size and
+the latency of the hot read and write paths before and after.
+
+    python archive.py ../artifacts/database.db --older-than-days 180
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import struct
+import sys
+import time
+from collections import defaultdict
+from contextlib import closing
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+import zstandard
+from pydantic import TypeAdapter
+from sqlalchemy import bindparam, create_engine, exists, func, insert, select, text, union
+from sqlalchemy.orm import Session, selectinload
+
+import search
+import transcripts
+import validation_models.pd_models as pd_models
+import validation_models.sql_models as sql_models
+
+TIMESTAMP = "%Y-%m-%d %H:%M:%S"
+CHUNK_HEADER = struct.Struct("<4sI")
+CHUNK_MAGIC = b"TXA1"
+# id, participant_id, start, duration and text length, as little-endian int64
+CHUNK_COLUMNS = 5
+COMPRESSION_LEVEL = int(os.getenv("ARCHIVE_COMPRESSION_LEVEL", "9"))
+
+
+# --- Chunks ---
+
+def encode_chunk(rows: list[tuple]) -> bytes:
+    """Compress (id, participant_id, text, start, end) rows, in spoken order, into a chunk."""
+    ids, participant_ids, texts, starts, ends = zip(*rows)
+    starts = np.array(starts, dtype=np.int64)
+    encoded = [text.encode() for text in texts]
+    columns = (
+        np.diff(np.array(ids, dtype=np.int64), prepend=0),
+        np.array(participant_ids, dtype=np.int64),
+        np.diff(starts, prepend=0),
+        np.array(ends, dtype=np.int64) - starts,
+        np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)),
+    )
+    body = b"".join(column.astype("<i8").tobytes() for column in columns) + b"".join(encoded)
+    compressed = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).compress(body)
+    return CHUNK_HEADER.pack(CHUNK_MAGIC, len(rows)) + compressed
+
+
+@dataclass
+class ArchivedEntries:
+    """The archived entries of one transcript as columns, in spoken order."""
+    transcript_id: int
+    meeting_id: int
+    id: np.ndarray
+    participant_id: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+    text_offsets: list[int]
+    text_data: bytes
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def _rows(self, indexes: list[int]) -> Iterator[dict]:
+        offsets, data = self.text_offsets, self.text_data
+        columns = zip(indexes, self.id[indexes].tolist(), self.participant_id[indexes].tolist(),
+                      self.start[indexes].tolist(), self.end[indexes].tolist())
+        for i, entry_id, participant_id, start, end in columns:
+            yield {
+                "id": entry_id,
+                "transcript_id": self.transcript_id,
+                "participant_id": participant_id,
+                "text": data[offsets[i]:offsets[i + 1]].decode(),
+                "start_time_offset_seconds": start,
+                "end_time_offset_seconds": end,
+            }
+
+    def rows(
+        self,
+        start: int | None = None,
+        end: int | None = None,
+        participant_ids=None,
+        limit: int | None = None,
+    ) -> Iterator[dict]:
+        """Entries starting within [start, end), in the shape `transcripts.entries_query` returns them."""
+        low = int(np.searchsorted(self.start, start)) if start is not None else 0
+        high = int(np.searchsorted(self.start, end)) if end is not None else len(self)
+        selected = np.arange(low, max(low, high))
+        if participant_ids:
+            selected = selected[np.isin(self.participant_id[selected], list(participant_ids))]
+        return self._rows(selected[:limit].tolist())
+
+    def row(self, entry_id: int) -> Optional[dict]:
+        matches = np.flatnonzero(self.id == entry_id)
+        return next(self._rows(matches[:1].tolist()), None)
+
+    def tuples(self) -> list[tuple]:
+        """The entries as the (id, participant_id, text, start, end) rows `encode_chunk` takes."""
+        return [
+            (row["id"], row["participant_id"], row["text"], row["start_time_offset_seconds"], row["end_time_offset_seconds"])
+            for row in self.rows()
+        ]
+
+
+def decode_chunk(data: bytes, transcript_id: int, meeting_id: int) -> ArchivedEntries:
+    magic, count = CHUNK_HEADER.unpack_from(data)
+    if magic != CHUNK_MAGIC:
+        raise ValueError(f"The archive chunk of transcript {transcript_id} is not in a known format")
+    body = zstandard.ZstdDecompressor().decompress(data[CHUNK_HEADER.size:])
+    columns = np.frombuffer(body, dtype="<i8", count=CHUNK_COLUMNS * count).reshape(CHUNK_COLUMNS, count)
+    start = np.cumsum(columns[2])
+    return ArchivedEntries(
+        transcript_id=transcript_id,
+        meeting_id=meeting_id,
+        id=np.cumsum(columns[0]),
+        participant_id=columns[1].astype(np.int64),
+        start=start,
+        end=start + columns[3],
+        text_offsets=[0, *np.cumsum(columns[4]).tolist()],
+        text_data=body[CHUNK_COLUMNS * 8 * count:],
+    )
+
+
+# --- Archive files ---
+
+class ArchiveStore:
+    """The archive files of every organization, kept in one directory."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def path(self, organization_id: int) -> Path:
+        return self.directory / f"org_{organization_id}.sqlite"
+
+    def write(self, organization_id: int, chunks: list[tuple[int, int, int, bytes]]):
+        """Store (transcript_id, meeting_id, entry_count, data) chunks in one transaction, replacing older ones."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(self.path(organization_id))) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                "transcript_id INTEGER PRIMARY KEY, meeting_id INTEGER NOT NULL, "
+                "entry_count INTEGER NOT NULL, data BLOB NOT NULL)"
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO chunks (transcript_id, meeting_id, entry_count, data) VALUES (?, ?, ?, ?)",
+                chunks,
+            )
+
+    def read(self, organization_id: int, transcript_id: int) -> bytes:
+        path = self.path(organization_id)
+        row = None
+        if path.exists():
+            with closing(sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)) as conn:
+                row = conn.execute("SELECT data FROM chunks WHERE transcript_id = ?", (transcript_id,)).fetchone()
+        if row is None:
+            raise FileNotFoundError(
+                f"Transcript {transcript_id} is archived, but {path} has no chunk for it; is ARCHIVE_DIR right?"
+            )
+        return row[0]
+
+    def organization_ids(self) -> list[int]:
+        """Organizations that have an archive file."""
+        return sorted(int(path.stem.removeprefix("org_")) for path in self.directory.glob("org_*.sqlite"))
+
+    def transcript_ids(self, organization_id: int) -> list[int]:
+        with closing(sqlite3.connect(self.path(organization_id))) as conn:
+            return [transcript_id for transcript_id, in conn.execute("SELECT transcript_id FROM chunks")]
+
+    def delete(self, organization_id: int, transcript_ids: list[int]):
+        with closing(sqlite3.connect(self.path(organization_id))) as conn, conn:
+            conn.executemany("DELETE FROM chunks WHERE transcript_id = ?", [(transcript_id,) for transcript_id in transcript_ids])
+
+    def size(self) -> int:
+        """Bytes used by all the archive files."""
+        return sum(path.stat().st_size for path in self.directory.glob("org_*.sqlite"))
+
+
+archive_store = ArchiveStore(os.getenv("ARCHIVE_DIR", "../artifacts/archive"))
+
+
+@lru_cache(maxsize=64)
+def load_chunk(store: ArchiveStore, organization_id: int, transcript_id: int, meeting_id: int, version: tuple) -> ArchivedEntries:
+    """A decoded chunk. `version` changes when a transcript is archived again, so stale chunks are not reused."""
+    return decode_chunk(store.read(organization_id, transcript_id), transcript_id, meeting_id)
+
+
+def load(record: sql_models.TranscriptArchive, store: Optional[ArchiveStore] = None) -> ArchivedEntries:
+    version = (record.entry_count, record.last_entry_id, record.compressed_bytes, record.archived_at)
+    return load_chunk(store or archive_store, record.organization_id, record.transcript_id, record.meeting_id, version)
+
+
+# --- Reading ---
+
+def archived_entries(session: Session, transcript_id: int, store: Optional[ArchiveStore] = None) -> Optional[ArchivedEntries]:
+    """The archived entries of a transcript, or None if it was never archived."""
+    record = session.get(sql_models.TranscriptArchive, transcript_id)
+    return load(record, store) if record is not None else None
+
+
+def meeting_entries(session: Session, meeting_id: int, store: Optional[ArchiveStore] = None) -> Optional[ArchivedEntries]:
+    """The archived entries of a meeting's transcript, or None if it was never archived."""
+    record = session.scalar(
+        select(sql_models.TranscriptArchive).where(sql_models.TranscriptArchive.meeting_id == meeting_id)
+    )
+    return load(record, store) if record is not None else None
+
+
+def find_entries(session: Session, entry_ids: list[int], store: Optional[ArchiveStore] = None) -> dict[int, dict]:
+    """Archived entries by id. Ids that no archive holds are left out."""
+    archived, archive = sql_models.ArchivedEntry, sql_models.TranscriptArchive
+    by_transcript = defaultdict(list)
+    # Archives of deleted transcripts are left for the next run to sweep
+    for entry_id, transcript_id in session.execute(
+        select(archived.id, archived.transcript_id)
+        .join(sql_models.Transcript, sql_models.Transcript.id == archived.transcript_id)
+        .where(archived.id.in_(entry_ids))
+    ).tuples():
+        by_transcript[transcript_id].append(entry_id)
+    found = {}
+    for record in session.scalars(select(archive).where(archive.transcript_id.in_(list(by_transcript)))):
+        chunk = load(record, store)
+        for entry_id in by_transcript[record.transcript_id]:
+            row = chunk.row(entry_id)
+            if row is not None:
+                found[entry_id] = row
+    return found
+
+
+def archived_ids():
+    """Ids of the archived entries of transcripts that still exist."""
+    archived = sql_models.ArchivedEntry
+    return select(archived.id).join(sql_models.Transcript, sql_models.Transcript.id == archived.transcript_id)
+
+
+def export_rows(session: Session, archived: ArchivedEntries) -> Iterator[dict]:
+    """Archived entries with their speaker's name, in the shape `transcripts.export_query` returns them."""
+    participant, user = sql_models.MeetingParticipant, sql_models.User
+    speakers = dict(session.execute(
+        select(participant.id, user.full_name)
+        .join(user, user.id == participant.user_id)
+        .where(participant.meeting_id == archived.meeting_id)
+    ).tuples().all())
+    # Like the export query's joins, entries of participants that no longer exist are left out
+    return (
+        {field: (speakers[row["participant_id"]] if field == "speaker" else row[field]) for field in transcripts.EXPORT_FIELDS}
+        for row in archived.rows()
+        if row["participant_id"] in speakers
+    )
+
+
+entries_adapter = TypeAdapter(list[pd_models.TranscriptEntryWithParticipant])
+
+
+def hydrate_transcripts(session: Session, items: list) -> list:
+    """Transcripts with their archived entries merged back in, as read models. Others are returned as they are."""
+    archive = sql_models.TranscriptArchive
+    records = {
+        record.transcript_id: record
+        for record in session.scalars(select(archive).where(archive.transcript_id.in_([item.id for item in items])))
+    }
+    if not records:
+        return items
+    hydrated = []
+    for item in items:
+        record = records.get(item.id)
+        if record is None:
+            hydrated.append(item)
+            continue
+        participants = {
+            participant.id: participant
+            for participant in session.scalars(
+                select(sql_models.MeetingParticipant)
+                .options(selectinload(sql_models.MeetingParticipant.user))
+                .where(sql_models.MeetingParticipant.meeting_id == item.meeting_id)
+            )
+        }
+        hot = sorted(
+            ({column.key: getattr(entry, column.key) for column in transcripts.ENTRY_COLUMNS} for entry in item.entries),
+            key=transcripts.spoken_order,
+        )
+        entries = [
+            {**row, "participant": participants[row["participant_id"]]}
+            for row in transcripts.merge_rows(load(record).rows(), hot)
+            if row["participant_id"] in participants
+        ]
+        transcript = pd_models.Transcript.model_validate(item, from_attributes=True)
+        hydrated.append(transcript.model_copy(update={"entries": entries_adapter.validate_python(entries, from_attributes=True)}))
+    return hydrated
+
+
+# --- Archiving ---
+
+@dataclass
+class ArchiveResult:
+    transcripts: int = 0
+    entries: int = 0
+    # Entries left in the table for action items and decisions
+    kept: int = 0
+    compressed_bytes: int = 0
+    # Archives of deleted transcripts that were removed
+    swept: int = 0
+
+
+def pinned_entries():
+    """Ids of the entries that action items and decisions point at."""
+    return union(
+        select(sql_models.ActionItem.source_transcript_entry_id).where(sql_models.ActionItem.source_transcript_entry_id.is_not(None)),
+        select(sql_models.Decision.source_transcript_entry_id).where(sql_models.Decision.source_transcript_entry_id.is_not(None)),
+    )
+
+
+def archivable(cutoff: str):
+    """(transcript_id, meeting_id, organization_id) of transcripts of meetings completed before `cutoff`
+    that still have entries to archive."""
+    entry, transcript, meeting = sql_models.TranscriptEntry, sql_models.Transcript, sql_models.Meeting
+    unpinned = exists().where(entry.transcript_id == transcript.id, entry.id.not_in(pinned_entries()))
+    return (
+        select(transcript.id, transcript.meeting_id, meeting.organization_id)
+        .join(meeting, meeting.id == transcript.meeting_id)
+        .where(
+            meeting.status == "completed",
+            func.datetime(func.coalesce(meeting.actual_end_time, meeting.scheduled_start_time)) < cutoff,
+            unpinned,
+        )
+        .order_by(meeting.organization_id, transcript.id)
+    )
+
+
+def index_entries(session: Session, transcript_id: int, rows: list[tuple]):
+    """Record archived (id, participant_id, text, start, end) rows as belonging to a transcript, and index their text."""
+    if not rows:
+        return
+    session.execute(
+        insert(sql_models.ArchivedEntry),
+        [{"id": row[0], "transcript_id": transcript_id} for row in rows],
+    )
+    session.execute(
+        text(f"INSERT INTO {search.ARCHIVE_INDEX}(rowid, text) VALUES (:id, :text)"),
+        [{"id": row[0], "text": row[2]} for row in rows],
+    )
+
+
+def index_archives(session: Session, store: ArchiveStore):
+    """Index the entries of archives written before `archived_entries` existed."""
+    archive, archived = sql_models.TranscriptArchive, sql_models.ArchivedEntry
+    records = session.scalars(
+        select(archive).where(~exists().where(archived.transcript_id == archive.transcript_id))
+    ).all()
+    for record in records:
+        index_entries(session, record.transcript_id, load(record, store).tuples())
+    session.commit()
+
+
+def sweep(session: Session, store: ArchiveStore) -> int:
+    """Remove the archives of deleted transcripts: their records, search index entries and chunks.
+
+    Chunks go last, once nothing refers to them, so chunks left behind by an
+    interrupted sweep or archiving run are removed as well.
+    """
+    archive, archived = sql_models.TranscriptArchive, sql_models.ArchivedEntry
+    orphans = session.scalars(
+        select(archive).where(~exists().where(sql_models.Transcript.id == archive.transcript_id))
+    ).all()
+    for record in orphans:
+        indexed = set(session.scalars(select(archived.id).where(archived.transcript_id == record.transcript_id)))
+        # The index is contentless: deleting from it takes the text that was indexed
+        rows = [{"id": row[0], "text": row[2]} for row in load(record, store).tuples() if row[0] in indexed]
+        if rows:
+            session.execute(
+                text(f"INSERT INTO {search.ARCHIVE_INDEX}({search.ARCHIVE_INDEX}, rowid, text) VALUES ('delete', :id, :text)"),
+                rows,
+            )
+        session.execute(archived.__table__.delete().where(archived.transcript_id == record.transcript_id))
+        session.delete(record)
+    session.commit()
+    recorded = set(session.scalars(select(archive.transcript_id)))
+    swept = 0
+    for organization_id in store.organization_ids():
+        unrecorded = [transcript_id for transcript_id in store.transcript_ids(organization_id) if transcript_id not in recorded]
+        store.delete(organization_id, unrecorded)
+        swept += len(unrecorded)
+    return swept
+
+
+def archive_batch(session: Session, store: ArchiveStore, batch: list[tuple], kept: set[int], result: ArchiveResult):
+    """Archive the entries of a few transcripts: write their chunks, then delete what the chunks hold."""
+    entry = sql_models.TranscriptEntry
+    chunks = defaultdict(list)
+    records = []
+    moved = []
+    indexed = []
+    for transcript_id, meeting_id, organization_id in batch:
+        rows = session.execute(
+            select(entry.id, entry.participant_id, entry.text, entry.start_time_offset_seconds, entry.end_time_offset_seconds)
+            .where(entry.transcript_id == transcript_id)
+            .order_by(entry.start_time_offset_seconds, entry.id)
+        ).tuples().all()
+        unpinned = [row for row in rows if row[0] not in kept]
+        result.kept += len(rows) - len(unpinned)
+        if not unpinned:
+            continue
+        record = session.get(sql_models.TranscriptArchive, transcript_id)
+        merged = unpinned
+        if record is not None:
+            # Archived before: the new chunk holds the old entries as well
+            merged = sorted(load(record, store).tuples() + unpinned, key=lambda row: (row[3], row[0]))
+        data = encode_chunk(merged)
+        chunks[organization_id].append((transcript_id, meeting_id, len(merged), data))
+        ids = [row[0] for row in merged]
+        records.append((record, dict(
+            transcript_id=transcript_id, organization_id=organization_id, meeting_id=meeting_id, entry_count=len(merged),
+            first_entry_id=min(ids), last_entry_id=max(ids), compressed_bytes=len(data),
+        )))
+        moved += [row[0] for row in unpinned]
+        indexed.append((transcript_id, unpinned))
+        result.transcripts += 1
+        result.compressed_bytes += len(data)
+    if not records:
+        return
+    # Committed first, so the entries are never only in a transaction that might yet fail
+    for organization_id, organization_chunks in chunks.items():
+        store.write(organization_id, organization_chunks)
+    table = entry.__table__
+    session.execute(table.delete().where(table.c.id == bindparam("entry_id")), [{"entry_id": i} for i in moved])
+    for transcript_id, rows in indexed:
+        index_entries(session, transcript_id, rows)
+    for record, values in records:
+        if record is None:
+            session.add(sql_models.TranscriptArchive(**values))
+        else:
+            for key, value in values.items():
+                setattr(record, key, value)
+    session.commit()
+    result.entries += len(moved)
+
+
+def archive_transcripts(
+    engine,
+    older_than_days: float,
+    *,
+    store: Optional[ArchiveStore] = None,
+    now: Optional[datetime] = None,
+    batch_size: int = 50,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> ArchiveResult:
+    """Move the entries of meetings completed more than `older_than_days` ago to the archive.
+
+    Each batch of `batch_size` transcripts is its own transaction, so the
+    write lock is only held briefly and the API keeps serving meanwhile.
+    """
+    store = store or archive_store
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    cutoff = (now - timedelta(days=older_than_days)).strftime(TIMESTAMP)
+    result = ArchiveResult()
+    with Session(engine) as session:
+        ddl = session.scalar(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'transcript_entries'"))
+        if "AUTOINCREMENT" not in ddl.upper():
+            raise RuntimeError(
+                "transcript_entries was created without AUTOINCREMENT, so SQLite could reuse the ids of archived "
+                "entries; recreate the table as declared in artifacts/schema.sql before archiving"
+            )
+        result.swept = sweep(session, store)
+        candidates = session.execute(archivable(cutoff)).tuples().all()
+        kept = set(session.scalars(pinned_entries()))
+        index_archives(session, store)
+    for done in range(0, len(candidates), batch_size):
+        with Session(engine) as session:
+            archive_batch(session, store, candidates[done:done + batch_size], kept, result)
+        if progress:
+            progress(min(done + batch_size, len(candidates)), len(candidates))
+    return result
+
+
+# --- Compaction ---
+
+def percentiles(latencies: list[float]) -> dict:
+    p50, p95 = np.percentile(latencies, [50, 95]) if latencies else (0.0, 0.0)
+    return {"p50_ms": round(float(p50) * 1000, 3), "p95_ms": round(float(p95) * 1000, 3), "samples": len(latencies)}
+
+
+@dataclass
+class Probes:
+    """The operations timed before and after archiving, chosen once so both runs do the same work."""
+    windows: list[tuple[int, int]]
+    terms: list[str]
+    inserts: list[tuple[int, int]]
+
+
+def choose_probes(engine, cutoff: str, samples: int, seed: int) -> Probes:
+    """Window reads, searches and inserts on transcripts that archiving leaves alone."""
+    rng = random.Random(seed)
+    archived = {transcript_id for transcript_id, _, _ in engine_rows(engine, archivable(cutoff))}
+    entry = sql_models.TranscriptEntry
+    hot = [
+        row for row in engine_rows(engine, (
+            select(entry.transcript_id, entry.participant_id, entry.start_time_offset_seconds, entry.text)
+            .where(entry.id.in_(select(func.min(entry.id)).group_by(entry.transcript_id)))
+        ))
+        if row[0] not in archived
+    ]
+    if not hot:
+        return Probes([], [], [])
+    picks = [rng.choice(hot) for _ in range(samples)]
+    words = [max(text.split() or ["meeting"], key=len).strip(".,;:!?\"'") or "meeting" for _, _, _, text in picks]
+    return Probes(
+        windows=[(transcript_id, start + rng.randrange(0, 3600, 60)) for transcript_id, _, start, _ in picks],
+        terms=words,
+        inserts=[(transcript_id, participant_id) for transcript_id, participant_id, _, _ in picks],
+    )
+
+
+def engine_rows(engine, stmt) -> list[tuple]:
+    with Session(engine) as session:
+        return session.execute(stmt).tuples().all()
+
+
+def measure_hot_path(engine, probes: Probes, store: ArchiveStore, window: int = 300) -> dict:
+    """Latency of reading a window of a transcript, searching, and inserting an entry.
+
+    Every probe runs once to warm the page cache before it is timed, so runs
+    before and after archiving are compared on equal terms.
+    """
+    entry = sql_models.TranscriptEntry
+    timings = {"entry_window": [], "search": [], "entry_insert": []}
+    with Session(engine) as session:
+        for timed in (False, True):
+            for transcript_id, start in probes.windows:
+                started = time.perf_counter()
+                session.execute(transcripts.entries_query(transcript_id, start=start, end=start + window)).all()
+                if timed:
+                    timings["entry_window"].append(time.perf_counter() - started)
+            for term in probes.terms:
+                started = time.perf_counter()
+                search.search(session, term, types=["transcript_entry"], store=store)
+                if timed:
+                    timings["search"].append(time.perf_counter() - started)
+            for transcript_id, participant_id in probes.inserts:
+                # Index and full-text maintenance, without keeping the row
+                started = time.perf_counter()
+                session.execute(insert(entry).values(
+                    transcript_id=transcript_id, participant_id=participant_id, text="latency probe",
+                    start_time_offset_seconds=0, end_time_offset_seconds=1,
+                ))
+                session.rollback()
+                if timed:
+                    timings["entry_insert"].append(time.perf_counter() - started)
+    return {name: percentiles(latencies) for name, latencies in timings.items()}
+
+
+def measure_archive_reads(engine, store: ArchiveStore, samples: int, seed: int, window: int = 300) -> dict:
+    """Latency of reading a window of an archived transcript, decompressing its chunk every time."""
+    rng = random.Random(seed)
+    with Session(engine) as session:
+        records = session.scalars(select(sql_models.TranscriptArchive)).all()
+        latencies = []
+        for record in (rng.choice(records) for _ in range(samples if records else 0)):
+            load_chunk.cache_clear()
+            started = time.perf_counter()
+            archived = archived_entries(session, record.transcript_id, store)
+            start = int(archived.start[0]) + rng.randrange(0, 3600, 60)
+            list(transcripts.merge_rows(
+                archived.rows(start=start, end=start + window),
+                session.execute(transcripts.entries_query(record.transcript_id, start=start, end=start + window)).mappings(),
+            ))
+            latencies.append(time.perf_counter() - started)
+    return {"archived_entry_window": percentiles(latencies)}
+
+
+def database_bytes(path) -> int:
+    return sum(Path(f"{path}{suffix}").stat().st_size for suffix in ("", "-wal") if Path(f"{path}{suffix}").exists())
+
+
+def compact(
+    path,
+    older_than_days: float,
+    *,
+    store: Optional[ArchiveStore] = None,
+    now: Optional[datetime] = None,
+    batch_size: int = 50,
+    vacuum: bool = True,
+    samples: int = 200,
+    seed: int = 0,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> dict:
+    """Archive old transcripts of the SQLite database at `path`, reclaim the space, and report what changed."""
+    store = store or archive_store
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    for table in (sql_models.TranscriptArchive.__table__, sql_models.ArchivedEntry.__table__):
+        table.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        search.create_archive_index(conn)
+    probes = choose_probes(engine, (now - timedelta(days=older_than_days)).strftime(TIMESTAMP), samples, seed)
+    before = {"database_bytes": database_bytes(path), "archive_bytes": store.size(), "latency": measure_hot_path(engine, probes, store)}
+
+    started = time.perf_counter()
+    result = archive_transcripts(engine, older_than_days, store=store, now=now, batch_size=batch_size, progress=progress)
+    archived_seconds = time.perf_counter() - started
+    if vacuum:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("VACUUM")
+            conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    engine.dispose()
+
+    engine = create_engine(url)
+    after = {"database_bytes": database_bytes(path), "archive_bytes": store.size(), "latency": measure_hot_path(engine, probes, store)}
+    after["latency"].update(measure_archive_reads(engine, store, samples, seed))
+    engine.dispose()
+    return {
+        "archived": asdict(result),
+        "seconds": round(archived_seconds, 2),
+        "vacuumed": vacuum,
+        "before": before,
+        "after": after,
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="SQLite database file to compact.")
+    parser.add_argument("--older-than-days", type=float, required=True, help="Archive meetings completed longer ago than this.")
+    parser.add_argument("--archive-dir", default=str(archive_store.directory), help="Where the per-organization archive files go; the API reads ARCHIVE_DIR.")
+    parser.add_argument("--now", type=datetime.fromisoformat, default=None, help="Count days back from this time instead of now (UTC), e.g. for generated data.")
+    parser.add_argument("--batch-size", type=int, default=50, help="Transcripts archived per transaction.")
+    parser.add_argument("--no-vacuum", dest="vacuum", action="store_false", help="Skip the VACUUM that shrinks the database file.")
+    parser.add_argument("--samples", type=int, default=200, help="Timed operations of each kind, before and after.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    if args.older_than_days < 0:
+        parser.error("--older-than-days cannot be negative")
+    if not Path(args.path).exists():
+        sys.exit(f"{args.path} does not exist")
+
+    def report(done: int, total: int):
+        print(f"\r[{done}/{total}] transcripts archived", end="", file=sys.stderr)
+
+    summary = compact(
+        args.path, args.older_than_days, store=ArchiveStore(args.archive_dir), now=args.now,
+        batch_size=args.batch_size, vacuum=args.vacuum, samples=args.samples, seed=args.seed, progress=report,
+    )
+    print(file=sys.stderr)
+    archived, before, after = summary["archived"], summary["before"], summary["after"]
+    print(
+        f"Archived {archived['entries']:,} entries of {archived['transcripts']:,} transcripts in {summary['seconds']:.1f}s "
+        f"({archived['kept']:,} kept in the table for action items and decisions, "
+        f"{archived['swept']:,} chunks of deleted transcripts removed)",
+        file=sys.stderr,
+    )
+    print(
+        f"Database {before['database_bytes'] / 2**20:,.1f} MiB -> {after['database_bytes'] / 2**20:,.1f} MiB, "
+        f"archive {after['archive_bytes'] / 2**20:,.1f} MiB",
+        file=sys.stderr,
+    )
+    for name, latency in after["latency"].items():
+        previous = before["latency"].get(name)
+        was = f"{previous['p50_ms']:.3f}/{previous['p95_ms']:.3f} ms -> " if previous else ""
+        print(f"{name:>22}: p50/p95 {was}{latency['p50_ms']:.3f}/{latency['p95_ms']:.3f} ms", file=sys.stderr)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+Change data capture for live dashboards.
+
+Every ORM flush is inspected for created, updated and deleted rows. When
+the transaction commits, a compact change is published for each one: the
+entity (its table), its id, the operation and, for updates, the names of
+the changed columns. Values are never included, so clients re-read what
+they need, and secrets like password hashes never leave the database.
+
+Changes are numbered and kept in a bounded in-memory buffer.
+`ChangeFeed.events` streams them as Server-Sent Events, filtered to one
+organization or meeting. Each SSE message carries the changes of a short
+coalescing window, so a burst such as a bulk insert arrives as one
+message. Repeated changes to the same row within that window are merged.
+Its `id` lets a reconnecting client resume with `Last-Event-ID`. If the
+changes it missed are no longer buffered, or the server restarted, it gets
+a `reset` event and should refetch.
+
+Writes made through an ORM session in this process are captured. Statements
+that bypass the unit of work report their rows themselves: the `ON CONFLICT`
+upserts and the bulk inserts of action item extraction with
+`ChangeFeed.track` and `ChangeFeed.track_rows`, and the transcript importer,
+which writes on a bare connection, with `ChangeFeed.rows` and `publish`.
+Raw SQL from other processes, such as `datagen.py` or the importer's CLI,
+and the FTS triggers are not captured.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+import validation_models.sql_models as sql_models
+
+logger = logging.getLogger(__name__)
+
+# Bookkeeping tables that dashboards have no use for
+IGNORED_TABLES = frozenset({
+    "import_checkpoints", "org_meeting_stats", "org_assignee_stats", "rollup_watermarks", "jobs", "summary_cache",
+    "transcript_archives",
+})
+
+# Entity names a subscriber can filter on
+ENTITIES = frozenset(mapper.class_.__tablename__ for mapper in sql_models.Base.registry.mappers) - IGNORED_TABLES
+
+# Rows scoped to a meeting through their parent: (foreign key, parent model)
+MEETING_PARENTS = {
+    sql_models.AgendaItem: ("agenda_id", sql_models.MeetingAgenda),
+    sql_models.TranscriptEntry: ("transcript_id", sql_models.Transcript),
+    sql_models.ParticipantAnalytics: ("meeting_analytics_id", sql_models.MeetingAnalytics),
+}
+
+
+@dataclass(frozen=True)
+class Change:
+    """One committed change to one row."""
+    seq: int
+    entity: str
+    id: int
+    op: str
+    fields: tuple[str, ...]
+    organization_id: Optional[int]
+    meeting_id: Optional[int]
+
+
+@dataclass(frozen=True)
+class ChangeFilter:
+    """The changes a subscriber asked for. `entities` of None means all of them."""
+    organization_id: Optional[int] = None
+    meeting_id: Optional[int] = None
+    entities: Optional[frozenset[str]] = None
+
+    def matches(self, change: Change) -> bool:
+        if self.organization_id is not None and change.organization_id != self.organization_id:
+            return False
+        if self.meeting_id is not None and change.meeting_id != self.meeting_id:
+            return False
+        return self.entities is None or change.entity in self.entities
+
+
+def coalesce(changes: list[Change]) -> list[dict]:
+    """Merge the changes to each row into one, in the order the rows first changed.
+
+    A row created and then updated is still a creation, updates (and
+    upserts, which may have been either) accumulate their fields, a deletion
+    wins over earlier changes, and a row created and deleted within the
+    window is left out.
+    """
+    merged: dict[tuple[str, int], dict] = {}
+    for change in changes:
+        key = (change.entity, change.id)
+        previous = merged.get(key)
+        if previous is None or previous["op"] == "delete":
+            merged.pop(key, None)
+            merged[key] = {"entity": change.entity, "id": change.id, "op": change.op, "fields": list(change.fields)}
+        elif change.op == "delete":
+            if previous["op"] == "create":
+                del merged[key]
+            else:
+                previous.update(op="delete", fields=[])
+        elif previous["op"] in ("update", "upsert"):
+            previous["fields"] += [name for name in change.fields if name not in previous["fields"]]
+    return [
+        {key: value for key, value in item.items() if key != "fields" or item["op"] in ("update", "upsert")}
+        for item in merged.values()
+    ]
+
+
+def sse(event_type: str, data, event_id: Optional[str] = None) -> str:
+    lines = [f"event: {event_type}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class ChangeFeed:
+    """Captures committed changes from SQLAlchemy session events and streams them to subscribers.
+
+    `buffer_size` changes are kept for resuming clients; `coalesce_window`
+    is how long a subscriber waits after a change for others to join it.
+    """
+
+    def __init__(self, buffer_size: int = 10000, coalesce_window: float = 0.25, heartbeat: float = 15.0):
+        self.coalesce_window = coalesce_window
+        self.heartbeat = heartbeat
+        # Event ids from before a restart are recognised as foreign and answered with a reset
+        self.stream = uuid.uuid4().hex[:8]
+        self.changes: deque[Change] = deque(maxlen=buffer_size)
+        self.seq = 0
+        self._lock = threading.Lock()
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        # (model, id) -> its meeting or organization id, dropped when the row changes
+        self._parents: dict[tuple[type, int], Optional[int]] = {}
+
+    # --- Session events ---
+
+    def install(self, session_class=Session):
+        event.listen(session_class, "after_flush", self._after_flush)
+        event.listen(session_class, "after_commit", self._after_commit)
+        event.listen(session_class, "after_rollback", self._after_rollback)
+
+    def uninstall(self, session_class=Session):
+        event.remove(session_class, "after_flush", self._after_flush)
+        event.remove(session_class, "after_commit", self._after_commit)
+        event.remove(session_class, "after_rollback", self._after_rollback)
+
+    def _after_flush(self, session, flush_context):
+        pending = []
+        for objects, op in ((session.new, "create"), (session.dirty, "update"), (session.deleted, "delete")):
+            for obj in objects:
+                table = getattr(obj, "__tablename__", None)
+                if table is None or table in IGNORED_TABLES:
+                    continue
+                fields = ()
+                if op != "create":
+                    # SQLite may reuse the id of a deleted row
+                    self._parents.pop((type(obj), obj.id), None)
+                if op == "update":
+                    state = inspect(obj)
+                    fields = tuple(attr.key for attr in state.mapper.column_attrs if state.attrs[attr.key].history.has_changes())
+                    if not fields:
+                        continue
+                organization_id, meeting_id = self._scope(session, obj)
+                pending.append((table, obj.id, op, fields, organization_id, meeting_id))
+        if pending:
+            session.info.setdefault("pending_changes", []).extend(pending)
+
+    def track(self, session, objects, op: str, fields: tuple[str, ...] = ()):
+        """Record rows written by a statement the flush does not see; published when `session` commits."""
+        pending = [
+            (obj.__tablename__, obj.id, op, fields, *self._scope(session, obj))
+            for obj in objects
+            if obj.__tablename__ not in IGNORED_TABLES
+        ]
+        session.info.setdefault("pending_changes", []).extend(pending)
+
+    def rows(self, connection, model, ids, op: str, meeting_id: int, fields: tuple[str, ...] = ()) -> list[tuple]:
+        """Pending changes for rows of one meeting known only by id, e.g. from `INSERT ... RETURNING`."""
+        if model.__tablename__ in IGNORED_TABLES:
+            return []
+        organization_id = self._parent(connection, sql_models.Meeting, meeting_id, "organization_id")
+        return [(model.__tablename__, item_id, op, fields, organization_id, meeting_id) for item_id in ids]
+
+    def track_rows(self, session, model, ids, op: str, meeting_id: int, fields: tuple[str, ...] = ()):
+        """Like `track`, for rows of one meeting known only by id; published when `session` commits."""
+        pending = self.rows(session.connection(), model, ids, op, meeting_id, fields)
+        session.info.setdefault("pending_changes", []).extend(pending)
+
+    def _after_rollback(self, session):
+        session.info.pop("pending_changes", None)
+
+    def _after_commit(self, session):
+        pending = session.info.pop("pending_changes", None)
+        if pending:
+            self.publish(pending)
+
+    def reset(self):
+        with self._lock:
+            self.changes.clear()
+            self._parents.clear()
+
+    # --- Scoping ---
+
+    def _parent(self, connection, model, item_id: Optional[int], column: str) -> Optional[int]:
+        if item_id is None:
+            return None
+        key = (model, item_id)
+        if key not in self._parents:
+            if len(self._parents) > 100_000:
+                self._parents.clear()
+            # The writer's own connection, so rows created in this transaction are visible
+            self._parents[key] = connection.scalar(select(getattr(model, column)).where(model.id == item_id))
+        return self._parents[key]
+
+    def _scope(self, session, obj) -> tuple[Optional[int], Optional[int]]:
+        """The (organization_id, meeting_id) a row belongs to, as far as it belongs to either."""
+        connection = session.connection()
+        if isinstance(obj, sql_models.Organization):
+            return obj.id, None
+        if isinstance(obj, sql_models.Meeting):
+            return obj.organization_id, obj.id
+        if isinstance(obj, sql_models.User):
+            return obj.organization_id, None
+        if isinstance(obj, sql_models.UserIntegration):
+            return self._parent(connection, sql_models.User, obj.user_id, "organization_id"), None
+        if type(obj) in MEETING_PARENTS:
+            foreign_key, parent = MEETING_PARENTS[type(obj)]
+            meeting_id = self._parent(connection, parent, getattr(obj, foreign_key), "meeting_id")
+        else:
+            meeting_id = getattr(obj, "meeting_id", None)
+        return self._parent(connection, sql_models.Meeting, meeting_id, "organization_id"), meeting_id
+
+    # --- Publishing ---
+
+    def publish(self, pending: list[tuple]):
+        with self._lock:
+            for entity, item_id, op, fields, organization_id, meeting_id in pending:
+                self.seq += 1
+                self.changes.append(Change(self.seq, entity, item_id, op, fields, organization_id, meeting_id))
+            waiters = list(self._waiters)
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(waiter.set)
+            except RuntimeError:
+                # The subscriber's event loop has closed
+                with self._lock:
+                    self._waiters.discard((loop, waiter))
+
+    def since(self, seq: int) -> tuple[list[Change], bool]:
+        """Changes after `seq`, and whether some of them are no longer buffered."""
+        with self._lock:
+            newer = []
+            for change in reversed(self.changes):
+                if change.seq <= seq:
+                    break
+                newer.append(change)
+            lost = bool(self.changes) and self.changes[0].seq > seq + 1
+            return newer[::-1], lost
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.stream}-{seq}"
+
+    def resume_point(self, last_event_id: Optional[str]) -> Optional[int]:
+        """The sequence number to resume after, or None if the id is not from this stream."""
+        stream, _, seq = (last_event_id or "").partition("-")
+        if stream != self.stream or not seq.isdigit() or int(seq) > self.seq:
+            return None
+        return int(seq)
+
+    # --- Streaming ---
+
+    async def events(self, change_filter: ChangeFilter, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        """Server-Sent Events with the changes matching `change_filter`, until the client goes away."""
+        waiter = asyncio.Event()
+        subscription = (asyncio.get_running_loop(), waiter)
+        with self._lock:
+            self._waiters.add(subscription)
+            current = self.seq
+        try:
+            seq = current
+            if last_event_id is not None:
+                resumed = self.resume_point(last_event_id)
+                if resumed is None:
+                    yield sse("reset", {"reason": "unknown event id"}, self.event_id(current))
+                else:
+                    seq = resumed
+            else:
+                yield sse("ready", {}, self.event_id(current))
+            while True:
+                waiter.clear()
+                changes, lost = self.since(seq)
+                if lost:
+                    seq = changes[-1].seq
+                    yield sse("reset", {"reason": "missed changes are no longer buffered"}, self.event_id(seq))
+                    continue
+                if not changes:
+                    try:
+                        await asyncio.wait_for(waiter.wait(), self.heartbeat)
+                    except asyncio.TimeoutError:
+                        yield ": keepalive\n\n"
+                    continue
+                # Let the rest of a burst arrive, then send it as one message
+                await asyncio.sleep(self.coalesce_window)
+                changes, lost = self.since(seq)
+                if lost:
+                    continue
+                seq = changes[-1].seq
+                matching = [change for change in changes if change_filter.matches(change)]
+                if matching:
+                    yield sse("changes", coalesce(matching), self.event_id(seq))
+        finally:
+            with self._lock:
+                self._waiters.discard(subscription)
+
+
+change_feed = ChangeFeed(
+    buffer_size=int(os.getenv("CHANGE_FEED_BUFFER", "10000")),
+    coalesce_window=float(os.getenv("CHANGE_FEED_COALESCE_SECONDS", "0.25")),
+    heartbeat=float(os.getenv("CHANGE_FEED_HEARTBEAT_SECONDS", "15")),
+)
@@ -1,7 +1,10 @@
+import contextvars
 import os
-from sqlalchemy import create_engine
+import threading
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import scoped_session, sessionmaker
 
 # --- Database Configuration ---
 # The DDL uses SQLite-specific syntax, so we'll configure for SQLite.
@@ -19,6 +22,42 @@ engine = create_engine(
 # Each instance of a SessionLocal class will be a new database session.
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# --- Request-Scoped Sessions ---
+# The API's handlers reach the database through one module-level object,
+# `main.db`. It is this proxy, which hands every HTTP request a session of its
+# own, so concurrent requests in the threadpool never share a transaction.
+# The key is a context variable, which follows the request into threadpool
+# handlers and streaming iterators. Outside a request, each thread gets its
+# own session.
+_request_scope: contextvars.ContextVar[object | None] = contextvars.ContextVar("request_scope", default=None)
+
+
+def session_scope():
+    scope = _request_scope.get()
+    return scope if scope is not None else threading.get_ident()
+
+
+ScopedSession = scoped_session(SessionLocal, scopefunc=session_scope)
+
+
+class RequestSession:
+    """ASGI middleware scoping `ScopedSession` to the HTTP request, and closing it afterwards."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _request_scope.set(object())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            ScopedSession.remove()
+            _request_scope.reset(token)
+
+
 # Create a Base class
 # All our ORM models will inherit from this class.
 Base = declarative_base()
@@ -36,4 +75,27 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# --- Schema Upgrades ---
+def upgrade_schema(engine, metadata):
+    """
+    Bring an existing database up to date with the ORM models.
+
+    `create_all` only creates tables that are missing entirely, so columns and
+    indexes added to existing models are applied here. New columns must be
+    nullable or have a server default for SQLite to accept them.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                    conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}")
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
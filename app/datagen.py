@@ -0,0 +1,543 @@
+"""
+Synthetic dataset generator for scale and load testing.
+
+Writes a fresh SQLite database with the app's schema. The database holds
+organizations, users and their integrations, meetings with participants and
+agendas, transcripts, action items, decisions, summaries and participation
+analytics. Every foreign key and CHECK constraint of artifacts/schema.sql
+holds. The shapes follow what real usage looks like:
+
+* organization sizes are log-normal, so most are small and a few are large;
+* meetings fall on weekdays in business hours, last 15 to 90 minutes, and
+  are scheduled, in progress, completed or cancelled depending on whether
+  they fall before or after the generator's notion of "now";
+* transcripts have a few turns per minute, from participants whose share of
+  the talking falls off with rank, so a few people do most of the talking;
+* action items and decisions are Poisson-distributed per meeting, point at
+  an entry of the meeting's transcript, and action items due in the past are
+  mostly completed.
+
+Generation is deterministic by `--seed`, whatever the number of workers, so
+benchmark runs against generated data are comparable. A quick sequential
+pass plans each organization's row counts, which fixes its id ranges. Worker
+processes then generate each organization's rows in parallel, and a single
+writer inserts them in organization order with `executemany`. Secondary
+indexes and the full-text search triggers are dropped during the load, then
+rebuilt once at the end.
+
+    python datagen.py ../artifacts/scale.db --organizations 100 --seed 7 --workers 8
+"""
+import argparse
+import math
+import os
+import random
+import sqlite3
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import sqlite as sqlite_dialect
+from sqlalchemy.schema import CreateIndex
+
+import analytics
+import search
+from validation_models.sql_models import Base
+
+TIMESTAMP = "%Y-%m-%d %H:%M:%S"
+
+# Tables in insert order, with the columns the generator fills
+COLUMNS = {
+    "organizations": ("id", "name", "created_at", "updated_at"),
+    "users": ("id", "organization_id", "full_name", "email", "password_hash", "timezone", "created_at", "updated_at"),
+    "user_integrations": ("user_id", "service_name", "auth_token_encrypted", "refresh_token_encrypted", "status", "created_at", "updated_at"),
+    "meetings": ("id", "organization_id", "title", "status", "scheduled_start_time", "actual_start_time", "actual_end_time", "created_at", "updated_at"),
+    "meeting_participants": ("id", "meeting_id", "user_id", "role", "joined_at"),
+    "meeting_agendas": ("id", "meeting_id", "created_at", "updated_at"),
+    "agenda_items": ("agenda_id", "topic", "description", "presenter_user_id", "display_order", "estimated_duration_minutes"),
+    "transcripts": ("id", "meeting_id", "word_error_rate", "processing_status", "created_at"),
+    "transcript_entries": ("id", "transcript_id", "participant_id", "text", "start_time_offset_seconds", "end_time_offset_seconds"),
+    "action_items": ("meeting_id", "description", "assignee_participant_id", "due_date", "status", "source_transcript_entry_id", "created_at", "updated_at"),
+    "decisions": ("meeting_id", "description", "source_transcript_entry_id", "created_at"),
+    "meeting_summaries": ("meeting_id", "summary_text", "generated_at"),
+    "meeting_analytics": ("id", "meeting_id", "participation_equity_score", "created_at", "updated_at"),
+    "participant_analytics": ("meeting_analytics_id", "participant_id", "speaking_time_seconds", "prompt_count", "turn_count"),
+}
+
+FIRST_NAMES = [
+    "Sarah", "James", "Maria", "Ahmed", "Priya", "Kenji", "Lena", "David", "Chloe", "Omar", "Wei", "Fatima",
+    "Lucas", "Aisha", "Mateo", "Yuki", "Noah", "Amara", "Ivan", "Sofia", "Kwame", "Elena", "Ravi", "Hannah",
+]
+LAST_NAMES = [
+    "Chen", "Franklin", "Rodriguez", "Al-Jamil", "Sharma", "Tanaka", "Muller", "Kim", "Dubois", "Haddad",
+    "Zhang", "Khan", "Silva", "Okafor", "Garcia", "Sato", "Cohen", "Mensah", "Petrov", "Rossi", "Nair", "Novak",
+]
+ORG_WORDS = ["Innovate", "Global", "Acme", "Blue", "Summit", "Northwind", "Vertex", "Harbor", "Pioneer", "Atlas", "Quantum", "Cedar"]
+ORG_SUFFIXES = ["Inc.", "Labs", "Research", "Group", "Systems", "Partners", "University", "Health", "Logistics"]
+TIMEZONES = ["America/Los_Angeles", "America/New_York", "America/Chicago", "Europe/Berlin", "Europe/London", "Asia/Tokyo", "Asia/Kolkata", "UTC"]
+SERVICES = ["Google Workspace", "Microsoft 365", "Slack", "Jira"]
+
+MEETING_KINDS = ["Weekly Sync", "Sprint Planning", "Design Review", "Retrospective", "1:1", "All Hands", "Customer Call", "Roadmap Review", "Incident Review", "Kick-off"]
+TOPICS = [
+    "onboarding flow", "billing service", "mobile release", "data pipeline", "Q3 budget", "hiring plan",
+    "API gateway", "search ranking", "security audit", "pricing page", "analytics dashboard", "partner integration",
+    "support backlog", "launch checklist", "infrastructure costs", "customer feedback", "research grant", "compliance review",
+]
+MINUTES = [15, 30, 45, 60, 90]
+MINUTE_WEIGHTS = [20, 35, 10, 30, 5]
+
+OPENERS = ["I think", "Honestly,", "So", "Okay,", "Right,", "Just to be clear,", "From my side,", "I'd suggest", "Looking at the numbers,", "Quick update:"]
+VERBS = ["review", "finalize", "ship", "refactor", "estimate", "document", "test", "migrate", "prioritize", "draft", "escalate", "benchmark"]
+OBJECTS = ["the proposal", "the timeline", "the rollout plan", "the test results", "the contract", "the architecture", "the metrics", "the spec", "the backlog", "the budget"]
+WHENS = ["before Friday", "by end of sprint", "next week", "this quarter", "after the demo", "before launch", "tomorrow", "once legal signs off"]
+QUESTIONS = [
+    "Can we {verb} {object} {when}?", "Who owns {topic} right now?", "What's blocking {topic}?",
+    "Do we have data on {topic}?", "Should we {verb} {object} first?", "Is {topic} still on track?",
+]
+STATEMENTS = [
+    "{opener} we should {verb} {object} {when}.", "{opener} {topic} is looking good overall.",
+    "{opener} the main risk with {topic} is {object}.", "We need to {verb} {object} for {topic}.",
+    "{opener} I can {verb} {object} {when}.", "Agreed, let's {verb} {object}.",
+    "{opener} customers keep asking about {topic}.", "The team already started to {verb} {object}.",
+    "{opener} {topic} slipped because of {object}.", "Let's park {topic} and come back to it {when}.",
+]
+BACKCHANNEL = ["Yeah.", "Makes sense.", "Sounds good.", "Got it, thanks.", "Right.", "Agreed.", "Okay."]
+DECISIONS = ["Go ahead with {object} for {topic}.", "Postpone {topic} until {when}.", "Adopt the new approach for {topic}.", "Move {topic} to the next phase."]
+SUMMARIES = [
+    "The team discussed {topic} and agreed to {verb} {object} {when}. {items} action items were assigned.",
+    "Review of {topic}: progress is on track, with open questions about {object}. Follow-ups were assigned to {names}.",
+    "This meeting covered {topic}. The group decided to {verb} {object}, and {names} will report back {when}.",
+]
+
+
+@dataclass(frozen=True)
+class Config:
+    organizations: int = 20
+    users_per_org: float = 40.0
+    meetings_per_user: float = 5.0
+    participants_per_meeting: float = 5.0
+    turns_per_minute: float = 6.0
+    action_items_per_meeting: float = 2.5
+    decisions_per_meeting: float = 1.2
+    start: date = date(2024, 1, 1)
+    days: int = 365
+    seed: int = 0
+
+    @property
+    def now(self) -> datetime:
+        """Meetings before this point have happened; most after it are still scheduled."""
+        return datetime.combine(self.start, datetime.min.time()) + timedelta(days=round(self.days * 0.9), hours=12)
+
+
+# --- Planning ---
+# Only row counts that fix id ranges are planned here; everything else is drawn per organization.
+
+@dataclass
+class MeetingPlan:
+    status: str
+    scheduled: datetime
+    minutes: int
+    attendees: int
+    note_taker: bool
+    facilitator: bool
+    transcript_status: str | None
+    entries: int
+
+    @property
+    def participants(self) -> int:
+        return self.attendees + self.note_taker + self.facilitator
+
+
+@dataclass
+class OrganizationPlan:
+    id: int
+    humans: int
+    meetings: list[MeetingPlan] = field(default_factory=list)
+
+    @property
+    def users(self) -> int:
+        # Each organization has a note-taker and a facilitator agent user
+        return self.humans + 2
+
+
+@dataclass
+class Bases:
+    """The last id used before this organization, per table with planned ids."""
+    users: int
+    meetings: int
+    participants: int
+    entries: int
+
+
+def poisson(rng: random.Random, mean: float) -> int:
+    limit, k, p = math.exp(-mean), 0, rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+def plan_organization(config: Config, org_id: int) -> OrganizationPlan:
+    rng = random.Random(f"{config.seed}:plan:{org_id}")
+    humans = max(2, round(rng.lognormvariate(math.log(config.users_per_org), 0.8)))
+    plan = OrganizationPlan(org_id, humans)
+    origin = datetime.combine(config.start, datetime.min.time())
+    now = config.now
+    for _ in range(max(1, round(humans * config.meetings_per_user * rng.uniform(0.5, 1.5)))):
+        day = origin + timedelta(days=rng.randrange(config.days))
+        if day.weekday() >= 5:
+            day -= timedelta(days=day.weekday() - 4)
+        scheduled = day.replace(hour=rng.randint(8, 16), minute=rng.choice((0, 30)))
+        minutes = rng.choices(MINUTES, MINUTE_WEIGHTS)[0]
+        if scheduled > now:
+            status = "cancelled" if rng.random() < 0.05 else "scheduled"
+        elif scheduled + timedelta(minutes=minutes) > now:
+            status = "in_progress"
+        else:
+            status = "cancelled" if rng.random() < 0.08 else "completed"
+        attendees = min(humans, 2 + poisson(rng, max(0.0, config.participants_per_meeting - 2)))
+        note_taker = rng.random() < 0.6
+        facilitator = rng.random() < 0.15
+        transcript_status, entries = None, 0
+        if status == "completed" and rng.random() < 0.95:
+            transcript_status = "failed" if rng.random() < 0.03 else "completed"
+            if transcript_status == "completed":
+                entries = max(1, round(minutes * config.turns_per_minute * rng.uniform(0.7, 1.3)))
+        elif status == "in_progress":
+            transcript_status = "processing"
+            elapsed = (now - scheduled).total_seconds() / 60
+            entries = max(1, round(elapsed * config.turns_per_minute))
+        plan.meetings.append(MeetingPlan(status, scheduled, minutes, attendees, note_taker, facilitator, transcript_status, entries))
+    plan.meetings.sort(key=lambda meeting: meeting.scheduled)
+    return plan
+
+
+def plan(config: Config) -> list[tuple[OrganizationPlan, Bases]]:
+    plans = []
+    bases = Bases(0, 0, 0, 0)
+    for org_id in range(1, config.organizations + 1):
+        org = plan_organization(config, org_id)
+        plans.append((org, bases))
+        bases = Bases(
+            users=bases.users + org.users,
+            meetings=bases.meetings + len(org.meetings),
+            participants=bases.participants + sum(m.participants for m in org.meetings),
+            entries=bases.entries + sum(m.entries for m in org.meetings),
+        )
+    return plans
+
+
+# --- Row generation ---
+
+def stamp(moment: datetime) -> str:
+    return moment.strftime(TIMESTAMP)
+
+
+def phrase(rng: random.Random, template: str, topic: str) -> str:
+    return template.format(
+        opener=rng.choice(OPENERS), verb=rng.choice(VERBS), object=rng.choice(OBJECTS),
+        when=rng.choice(WHENS), topic=topic,
+    )
+
+
+def utterance(rng: random.Random, topic: str) -> str:
+    roll = rng.random()
+    if roll < 0.15:
+        return rng.choice(BACKCHANNEL)
+    if roll < 0.35:
+        return phrase(rng, rng.choice(QUESTIONS), topic)
+    return phrase(rng, rng.choice(STATEMENTS), topic)
+
+
+def generate_organization(config: Config, org: OrganizationPlan, bases: Bases) -> dict[str, list[tuple]]:
+    """All rows of one organization, keyed by table, using the id ranges in `bases`."""
+    rng = random.Random(f"{config.seed}:rows:{org.id}")
+    rows: dict[str, list[tuple]] = {table: [] for table in COLUMNS}
+    origin = datetime.combine(config.start, datetime.min.time())
+    now = config.now
+    org_created = origin - timedelta(days=rng.randint(30, 720))
+    rows["organizations"].append((
+        org.id, f"{rng.choice(ORG_WORDS)} {rng.choice(ORG_WORDS)} {rng.choice(ORG_SUFFIXES)}", stamp(org_created), stamp(org_created),
+    ))
+
+    home_timezone = rng.choice(TIMEZONES)
+    user_ids = list(range(bases.users + 1, bases.users + org.users + 1))
+    humans, (note_taker_user, facilitator_user) = user_ids[:org.humans], user_ids[org.humans:]
+    names = {}
+    for user_id in humans:
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        names[user_id] = f"{first} {last}"
+        created = org_created + timedelta(days=rng.randint(0, 400), seconds=rng.randrange(86400))
+        timezone = home_timezone if rng.random() < 0.8 else rng.choice(TIMEZONES)
+        email = f"{first}.{last}.{user_id}@org{org.id}.example.com".lower().replace("-", "")
+        rows["users"].append((user_id, org.id, names[user_id], email, "synthetic", timezone, stamp(created), stamp(created)))
+        for service in SERVICES:
+            if rng.random() < 0.3:
+                status = rng.choices(("active", "expired", "revoked"), (85, 10, 5))[0]
+                refresh = f"enc_refresh_{rng.getrandbits(64):016x}" if rng.random() < 0.7 else None
+                rows["user_integrations"].append((
+                    user_id, service, f"enc_token_{rng.getrandbits(64):016x}", refresh, status, stamp(created), stamp(created),
+                ))
+    for user_id, name in ((note_taker_user, "Momentum Note Taker"), (facilitator_user, "Momentum Facilitator")):
+        rows["users"].append((
+            user_id, org.id, name, f"{name.split()[1].lower()}.{user_id}@agents.momentum.ai", "synthetic", "UTC",
+            stamp(org_created), stamp(org_created),
+        ))
+
+    participant_id, entry_id = bases.participants, bases.entries
+    for meeting_id, meeting in enumerate(org.meetings, bases.meetings + 1):
+        topic = rng.choice(TOPICS)
+        created = meeting.scheduled - timedelta(days=rng.randint(1, 14), seconds=rng.randrange(86400))
+        started = ended = None
+        if meeting.status in ("completed", "in_progress"):
+            started = meeting.scheduled + timedelta(seconds=rng.randint(0, 300))
+        if meeting.status == "completed":
+            ended = started + timedelta(minutes=meeting.minutes, seconds=rng.randint(-120, 300))
+        updated = ended or started or created
+        rows["meetings"].append((
+            meeting_id, org.id, f"{rng.choice(MEETING_KINDS)}: {topic}", meeting.status, stamp(meeting.scheduled),
+            started and stamp(started), ended and stamp(ended), stamp(created), stamp(updated),
+        ))
+
+        attendees = rng.sample(humans, meeting.attendees)
+        people = [(user_id, "host" if i == 0 else "attendee") for i, user_id in enumerate(attendees)]
+        if meeting.note_taker:
+            people.append((note_taker_user, "note_taker_agent"))
+        if meeting.facilitator:
+            people.append((facilitator_user, "facilitator_agent"))
+        speakers, roles = [], {}
+        for user_id, role in people:
+            participant_id += 1
+            joined = started and stamp(started + timedelta(seconds=rng.randint(-60, 240)))
+            rows["meeting_participants"].append((participant_id, meeting_id, user_id, role, joined))
+            roles[participant_id] = role
+            if role in ("host", "attendee"):
+                speakers.append((participant_id, user_id))
+
+        if meeting.status != "cancelled" and rng.random() < 0.6:
+            rows["meeting_agendas"].append((meeting_id, meeting_id, stamp(created), stamp(created)))
+            items = rng.randint(2, 6)
+            for order in range(1, items + 1):
+                rows["agenda_items"].append((
+                    meeting_id, f"{rng.choice(VERBS).capitalize()} {rng.choice(OBJECTS)}", phrase(rng, rng.choice(STATEMENTS), topic),
+                    rng.choice(speakers)[1], order, max(5, meeting.minutes // items),
+                ))
+
+        if meeting.transcript_status is None:
+            continue
+        transcript_created = ended or started
+        wer = round(min(0.3, max(0.01, rng.gauss(0.07, 0.03))), 3)
+        rows["transcripts"].append((meeting_id, meeting_id, wer, meeting.transcript_status, stamp(transcript_created)))
+        if not meeting.entries:
+            continue
+
+        # Share of talk falls off with rank; the host tends to talk most
+        weights = [1 / rank ** 1.1 for rank in range(1, len(speakers) + 1)]
+        slot = 60 / config.turns_per_minute
+        offset = rng.randint(0, 20)
+        entry_ids, entry_speakers, starts, ends = [], [], [], []
+        for speaker in rng.choices([s for s, _ in speakers], weights, k=meeting.entries):
+            entry_id += 1
+            length = max(1, round(rng.lognormvariate(math.log(slot * 0.7), 0.5)))
+            rows["transcript_entries"].append((entry_id, meeting_id, speaker, utterance(rng, topic), offset, offset + length))
+            entry_ids.append(entry_id)
+            entry_speakers.append(speaker)
+            starts.append(offset)
+            ends.append(offset + length)
+            offset += length + rng.randint(0, 3)
+
+        if meeting.status != "completed":
+            continue
+        assignees = {}
+        for _ in range(poisson(rng, config.action_items_per_meeting)):
+            assignee, user_id = rng.choice(speakers) if rng.random() < 0.9 else (None, None)
+            due = (meeting.scheduled + timedelta(days=rng.randint(1, 21))).date()
+            if datetime.combine(due, datetime.min.time()) < now:
+                status = rng.choices(("completed", "in_progress", "open"), (70, 15, 15))[0]
+            else:
+                status = rng.choices(("open", "in_progress", "completed"), (60, 30, 10))[0]
+            updated = ended if status == "open" else min(now, ended + timedelta(days=rng.randint(0, 21)))
+            if user_id is not None:
+                assignees[user_id] = names[user_id]
+            owner = names[user_id].split()[0] if user_id is not None else "Someone"
+            rows["action_items"].append((
+                meeting_id, f"{owner} to {rng.choice(VERBS)} {rng.choice(OBJECTS)} for {topic}", assignee, due.isoformat(),
+                status, rng.choice(entry_ids), stamp(ended), stamp(updated),
+            ))
+        for _ in range(poisson(rng, config.decisions_per_meeting)):
+            rows["decisions"].append((meeting_id, phrase(rng, rng.choice(DECISIONS), topic), rng.choice(entry_ids), stamp(ended)))
+        if meeting.transcript_status == "completed" and rng.random() < 0.9:
+            template = rng.choice(SUMMARIES)
+            summary = template.format(
+                topic=topic, verb=rng.choice(VERBS), object=rng.choice(OBJECTS), when=rng.choice(WHENS),
+                items=len(assignees) or "No", names=", ".join(sorted(assignees.values())) or "the team",
+            )
+            rows["meeting_summaries"].append((meeting_id, summary, stamp(ended + timedelta(minutes=rng.randint(1, 30)))))
+
+        # The same numbers the analytics job would compute from these entries
+        columns = analytics.TranscriptColumns(
+            participant_id=np.array(entry_speakers, dtype=np.int64), start=np.array(starts), end=np.array(ends),
+        )
+        stats = analytics.compute_participation(columns, roles)
+        analyzed = stamp(ended + timedelta(minutes=rng.randint(1, 10)))
+        rows["meeting_analytics"].append((meeting_id, meeting_id, stats.equity_score, analyzed, analyzed))
+        for pid, speaking_time, turns in zip(stats.participant_ids.tolist(), stats.speaking_time.tolist(), stats.turn_count.tolist()):
+            rows["participant_analytics"].append((meeting_id, pid, speaking_time, 0, turns))
+    return rows
+
+
+def _generate(args) -> dict[str, list[tuple]]:
+    return generate_organization(*args)
+
+
+# --- Writing ---
+
+def create_schema(path: str):
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        Base.metadata.create_all(bind=engine)
+    finally:
+        engine.dispose()
+
+
+def secondary_indexes() -> list:
+    return [index for table in Base.metadata.sorted_tables if table.name in COLUMNS for index in table.indexes]
+
+
+def insert_rows(conn: sqlite3.Connection, rows: dict[str, list[tuple]]):
+    for table, columns in COLUMNS.items():
+        if rows[table]:
+            placeholders = ", ".join("?" * len(columns))
+            conn.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows[table])
+
+
+def generate(
+    path: str,
+    config: Config,
+    workers: int = 1,
+    progress: Callable[[int, int], None] | None = None,
+) -> dict[str, int]:
+    """Write a synthetic dataset to a new SQLite database at `path`; returns rows per table."""
+    if Path(path).exists():
+        raise FileExistsError(path)
+    create_schema(path)
+    plans = plan(config)
+    conn = sqlite3.connect(path)
+    try:
+        # A fresh file that is thrown away on failure needs no journal
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        for index in secondary_indexes():
+            conn.execute(f"DROP INDEX {index.name}")
+        for index in search.SEARCH_INDEXES.values():
+            conn.execute(f"DROP TRIGGER {index.table}_ai")
+
+        jobs = [(config, org, bases) for org, bases in plans]
+        if workers > 1:
+            with ProcessPoolExecutor(workers) as pool:
+                # Keep a few organizations in flight, and write them in order
+                pending = deque()
+                for done, job in enumerate(jobs, 1):
+                    pending.append(pool.submit(_generate, job))
+                    if len(pending) >= workers * 2:
+                        insert_rows(conn, pending.popleft().result())
+                        conn.commit()
+                    if progress and done > len(pending):
+                        progress(done - len(pending), len(jobs))
+                while pending:
+                    insert_rows(conn, pending.popleft().result())
+                    conn.commit()
+                    if progress:
+                        progress(len(jobs) - len(pending), len(jobs))
+        else:
+            for done, job in enumerate(jobs, 1):
+                insert_rows(conn, _generate(job))
+                conn.commit()
+                if progress:
+                    progress(done, len(jobs))
+
+        for index in secondary_indexes():
+            conn.execute(str(CreateIndex(index).compile(dialect=sqlite_dialect.dialect())))
+        for index in search.SEARCH_INDEXES.values():
+            conn.execute(f"INSERT INTO {index.table}({index.table}) VALUES ('rebuild')")
+            for statement in index.ddl():
+                conn.execute(statement)
+        conn.commit()
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.execute("ANALYZE")
+        return {table: conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0] for table in COLUMNS}
+    finally:
+        conn.close()
+
+
+def check(path: str) -> list[str]:
+    """Foreign key violations and integrity problems in the database at `path`."""
+    conn = sqlite3.connect(path)
+    try:
+        problems = [f"{table} row {rowid} references a missing {parent}" for table, rowid, parent, _ in conn.execute("PRAGMA foreign_key_check")]
+        problems += [row[0] for row in conn.execute("PRAGMA integrity_check") if row[0] != "ok"]
+        return problems
+    finally:
+        conn.close()
+
+
+def main(argv: list[str] | None = None):
+    defaults = Config()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="SQLite database file to create.")
+    parser.add_argument("--organizations", type=int, default=defaults.organizations)
+    parser.add_argument("--users-per-org", type=float, default=defaults.users_per_org, help="Median people per organization.")
+    parser.add_argument("--meetings-per-user", type=float, default=defaults.meetings_per_user, help="Meetings per person over the whole period.")
+    parser.add_argument("--participants-per-meeting", type=float, default=defaults.participants_per_meeting, help="Mean people per meeting.")
+    parser.add_argument("--turns-per-minute", type=float, default=defaults.turns_per_minute, help="Transcript entries per minute of meeting.")
+    parser.add_argument("--action-items-per-meeting", type=float, default=defaults.action_items_per_meeting)
+    parser.add_argument("--decisions-per-meeting", type=float, default=defaults.decisions_per_meeting)
+    parser.add_argument("--start", type=date.fromisoformat, default=defaults.start, help="First day of the period (YYYY-MM-DD).")
+    parser.add_argument("--days", type=int, default=defaults.days, help="Length of the period; the last tenth is in the future.")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processes generating organizations in parallel.")
+    parser.add_argument("--force", action="store_true", help="Replace the database if it exists.")
+    parser.add_argument("--check", action="store_true", help="Run SQLite's foreign key and integrity checks afterwards.")
+    args = parser.parse_args(argv)
+
+    config = Config(
+        organizations=args.organizations, users_per_org=args.users_per_org, meetings_per_user=args.meetings_per_user,
+        participants_per_meeting=args.participants_per_meeting, turns_per_minute=args.turns_per_minute,
+        action_items_per_meeting=args.action_items_per_meeting, decisions_per_meeting=args.decisions_per_meeting,
+        start=args.start, days=args.days, seed=args.seed,
+    )
+    if args.force and Path(args.path).exists():
+        os.remove(args.path)
+
+    def report(done: int, total: int):
+        print(f"\r[{done}/{total}] organizations written", end="", file=sys.stderr)
+
+    started = time.perf_counter()
+    try:
+        counts = generate(args.path, config, workers=args.workers, progress=report)
+    except FileExistsError:
+        sys.exit(f"{args.path} already exists; pass --force to replace it")
+    elapsed = time.perf_counter() - started
+    print(file=sys.stderr)
+    for table, count in counts.items():
+        print(f"{table:>22}: {count:,}", file=sys.stderr)
+    entries = counts["transcript_entries"]
+    size = Path(args.path).stat().st_size / 2**20
+    print(f"Generated {size:,.0f} MiB in {elapsed:.1f}s ({entries / elapsed:,.0f} transcript entries/s)", file=sys.stderr)
+    if args.check:
+        problems = check(args.path)
+        for problem in problems[:20]:
+            print(problem, file=sys.stderr)
+        if problems:
+            sys.exit(1)
+        print("Foreign key and integrity checks passed", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""
+Extraction of action items and decisions from transcripts, with provenance.
+
+The transcript is streamed in spoken order through overlapping windows of
+entries, so memory is bounded by the window size however long the meeting
+was. Each window goes to the LLM, which is asked for the items it contains.
+Each item must quote the words it came from. The quote is looked up in an
+offset index of the window's text, which leads back to the entry IDs that
+spoke it. Those IDs become `source_transcript_entry_id`.
+
+Windows overlap, so the same item is often extracted twice. The model may
+also reword an item the note-taker already saved. Items are therefore
+matched against everything seen so far, including the meeting's existing
+rows. Matching uses the overlap of their significant words and their
+character similarity, looked up through an inverted word index. A match
+fills in missing fields, such as the provenance of a note-taker item,
+instead of adding a row. New rows and provenance updates are each written
+in a single bulk statement.
+"""
+import bisect
+import difflib
+import functools
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Iterable, Iterator
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+import summarization
+import validation_models.sql_models as sql_models
+from changefeed import change_feed
+from importer import ParticipantMap
+
+logger = logging.getLogger(__name__)
+
+EXTRACT_PROMPT = """Find the action items and decisions in this excerpt of a meeting transcript.
+An action item is a task someone agreed to do; a decision is something the group settled on.
+Respond with JSON only, in this form:
+{{"action_items": [{{"description": "...", "assignee": "speaker name or empty", "due_date": "YYYY-MM-DD or empty", "quote": "..."}}],
+  "decisions": [{{"description": "...", "quote": "..."}}]}}
+"quote" must copy, word for word, the part of the transcript the item comes from.
+Use empty lists if there are none.
+
+Transcript:
+{text}"""
+
+STOPWORDS = frozenset("a an and are be by for i in is it of on or the this to we will with".split())
+
+
+@dataclass
+class Window:
+    """Consecutive transcript lines, with an index from text offsets back to entry IDs."""
+    entry_ids: list[int]
+    offsets: list[int]
+    text: str
+    fresh: int
+
+    @classmethod
+    def from_lines(cls, lines: list[tuple[int, str]], fresh: int) -> "Window":
+        offsets, position = [], 0
+        for _, line in lines:
+            offsets.append(position)
+            position += len(line) + 1
+        return cls([entry_id for entry_id, _ in lines], offsets, "\n".join(line for _, line in lines), fresh)
+
+    def locate(self, quote: str) -> list[int]:
+        """IDs of the entries the quote spans, or [] if it is not in the window."""
+        quote = " ".join(quote.split()).lower()
+        if not quote:
+            return []
+        # Same length as the text, so offsets still line up; lines are already single-spaced
+        haystack = self.text.lower().replace("\n", " ")
+        start = haystack.find(quote)
+        length = len(quote)
+        if start < 0:
+            # Models often trim or slightly reword a quote; accept a long enough common run
+            match = difflib.SequenceMatcher(None, haystack, quote, autojunk=False).find_longest_match()
+            if match.size < min(len(quote), 20) or match.size < len(quote) // 2:
+                return []
+            start, length = match.a, match.size
+        first = bisect.bisect_right(self.offsets, start) - 1
+        last = bisect.bisect_right(self.offsets, start + length - 1) - 1
+        return self.entry_ids[first:last + 1]
+
+
+def windows(lines: Iterable[tuple[int, str]], size: int, overlap: int) -> Iterator[Window]:
+    """Windows of `size` lines, each sharing its first `overlap` lines with the previous one."""
+    buffer: list[tuple[int, str]] = []
+    fresh = 0
+    for line in lines:
+        buffer.append(line)
+        fresh += 1
+        if len(buffer) == size:
+            yield Window.from_lines(buffer, fresh)
+            buffer, fresh = buffer[size - overlap:], 0
+    if fresh:
+        yield Window.from_lines(buffer, fresh)
+
+
+def parse_response(text: str) -> dict | None:
+    """The JSON object in an LLM response, tolerating code fences and surrounding prose."""
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        return None
+    try:
+        parsed = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def significant_words(text: str) -> frozenset[str]:
+    return frozenset(word for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in STOPWORDS)
+
+
+@dataclass
+class ExtractedItem:
+    kind: str
+    description: str
+    entry_ids: list[int] = field(default_factory=list)
+    assignee: str = ""
+    due_date: str | None = None
+    existing_id: int | None = None
+    existing_source: int | None = None
+    words: frozenset[str] = frozenset()
+    key: str = ""
+
+    def __post_init__(self):
+        self.words = significant_words(self.description)
+        self.key = " ".join(sorted(self.words))
+
+    @property
+    def source_entry_id(self) -> int | None:
+        return self.entry_ids[0] if self.entry_ids else self.existing_source
+
+
+class Deduplicator:
+    """Fuzzy matching of items against those already seen, through an inverted word index."""
+
+    def __init__(self, word_overlap: float = 0.7, similarity: float = 0.85, candidates: int = 10):
+        self.word_overlap = word_overlap
+        self.similarity = similarity
+        self.candidates = candidates
+        self.items: list[ExtractedItem] = []
+        self._by_word: dict[tuple[str, str], list[int]] = defaultdict(list)
+
+    def _similar(self, a: ExtractedItem, b: ExtractedItem) -> bool:
+        # "Q3 report" and "Q4 report" are different items, however alike they read
+        if {w for w in a.words if not w.isalpha()} != {w for w in b.words if not w.isalpha()}:
+            return False
+        union = len(a.words | b.words)
+        if union and len(a.words & b.words) / union >= self.word_overlap:
+            return True
+        return difflib.SequenceMatcher(None, a.key, b.key).ratio() >= self.similarity
+
+    def find(self, item: ExtractedItem) -> ExtractedItem | None:
+        shared = Counter(i for word in item.words for i in self._by_word.get((item.kind, word), ()))
+        for i, _ in shared.most_common(self.candidates):
+            if self._similar(item, self.items[i]):
+                return self.items[i]
+        return None
+
+    def add(self, item: ExtractedItem) -> bool:
+        """Record `item`, merging it into a match if there is one. Returns whether it was new."""
+        match = self.find(item)
+        if match is not None:
+            if not match.entry_ids and item.entry_ids:
+                match.entry_ids = item.entry_ids
+            match.assignee = match.assignee or item.assignee
+            match.due_date = match.due_date or item.due_date
+            return False
+        for word in item.words:
+            self._by_word[(item.kind, word)].append(len(self.items))
+        self.items.append(item)
+        return True
+
+
+@dataclass
+class ExtractionResult:
+    meeting_id: int
+    entries: int = 0
+    windows: int = 0
+    parse_failures: int = 0
+    duplicates: int = 0
+    action_items_created: int = 0
+    decisions_created: int = 0
+    provenance_added: int = 0
+    seconds: float = 0.0
+
+    @property
+    def entries_per_second(self) -> float:
+        return self.entries / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict:
+        return {**self.__dict__, "entries_per_second": round(self.entries_per_second, 1)}
+
+
+def iso_date(value) -> str | None:
+    try:
+        return date.fromisoformat(str(value or "")).isoformat()
+    except ValueError:
+        return None
+
+
+class Extractor:
+    """Extracts a meeting's action items and decisions with `llm`.
+
+    Windows hold `window_entries` entries and overlap by `overlap`. At most
+    `concurrency` windows are sent to the LLM at once.
+    """
+
+    def __init__(self, llm, *, window_entries: int = 40, overlap: int = 10, concurrency: int = 4):
+        if not 0 <= overlap < window_entries:
+            raise ValueError("overlap must be at least 0 and smaller than window_entries")
+        self.llm = llm
+        self.window_entries = window_entries
+        self.overlap = overlap
+        self.concurrency = concurrency
+
+    def _complete(self, window: Window) -> str:
+        response = self.llm.invoke(EXTRACT_PROMPT.format(text=window.text))
+        return str(getattr(response, "content", response))
+
+    def _collect(self, window: Window, response: str, deduplicator: Deduplicator, result: ExtractionResult):
+        parsed = parse_response(response)
+        if parsed is None:
+            result.parse_failures += 1
+            return
+        for kind, key in (("action_item", "action_items"), ("decision", "decisions")):
+            for raw in parsed.get(key) or []:
+                if not isinstance(raw, dict) or not str(raw.get("description") or "").strip():
+                    continue
+                item = ExtractedItem(
+                    kind=kind,
+                    description=str(raw["description"]).strip(),
+                    entry_ids=window.locate(str(raw.get("quote") or "")),
+                    assignee=str(raw.get("assignee") or "").strip(),
+                    due_date=iso_date(raw.get("due_date")),
+                )
+                if not deduplicator.add(item):
+                    result.duplicates += 1
+
+    def load_existing(self, session: Session, meeting_id: int, deduplicator: Deduplicator):
+        for model, kind in ((sql_models.ActionItem, "action_item"), (sql_models.Decision, "decision")):
+            rows = session.execute(
+                select(model.id, model.description, model.source_transcript_entry_id).where(model.meeting_id == meeting_id)
+            )
+            for item_id, description, source in rows:
+                deduplicator.add(ExtractedItem(kind, description, existing_id=item_id, existing_source=source))
+
+    def extract(self, session: Session, meeting_id: int) -> ExtractionResult:
+        started = time.perf_counter()
+        result = ExtractionResult(meeting_id)
+        deduplicator = Deduplicator()
+        self.load_existing(session, meeting_id, deduplicator)
+        participants = ParticipantMap.load(session.connection(), meeting_id)
+
+        # Keep a bounded number of windows in flight, and collect them in order
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            lines = summarization.transcript_lines(session, meeting_id)
+            for window in windows(lines, self.window_entries, self.overlap):
+                result.entries += window.fresh
+                result.windows += 1
+                pending.append((window, pool.submit(self._complete, window)))
+                if len(pending) >= 2 * self.concurrency:
+                    window, future = pending.popleft()
+                    self._collect(window, future.result(), deduplicator, result)
+            while pending:
+                window, future = pending.popleft()
+                self._collect(window, future.result(), deduplicator, result)
+
+        self.write(session, meeting_id, deduplicator.items, participants, result)
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def write(self, session: Session, meeting_id: int, items: list[ExtractedItem], participants: ParticipantMap, result: ExtractionResult):
+        """Bulk-insert the new items and add provenance to existing ones, in one transaction."""
+        action_items, decisions, provenance = [], [], defaultdict(list)
+        for item in items:
+            if item.existing_id is not None:
+                if item.existing_source is None and item.entry_ids:
+                    provenance[item.kind].append({"id": item.existing_id, "source_transcript_entry_id": item.entry_ids[0]})
+            elif item.kind == "action_item":
+                action_items.append({
+                    "meeting_id": meeting_id,
+                    "description": item.description,
+                    "assignee_participant_id": participants.by_name.get(item.assignee.lower()),
+                    "due_date": item.due_date,
+                    "source_transcript_entry_id": item.source_entry_id,
+                })
+            else:
+                decisions.append({
+                    "meeting_id": meeting_id,
+                    "description": item.description,
+                    "source_transcript_entry_id": item.source_entry_id,
+                })
+        try:
+            # Bulk statements skip the flush, so the new rows are reported to the change feed here
+            for model, rows in ((sql_models.ActionItem, action_items), (sql_models.Decision, decisions)):
+                if rows:
+                    ids = session.scalars(insert(model).returning(model.id), rows).all()
+                    change_feed.track_rows(session, model, ids, "create", meeting_id)
+            for kind, model in (("action_item", sql_models.ActionItem), ("decision", sql_models.Decision)):
+                if provenance[kind]:
+                    session.execute(update(model), provenance[kind])
+                    ids = [row["id"] for row in provenance[kind]]
+                    change_feed.track_rows(session, model, ids, "update", meeting_id, ("source_transcript_entry_id",))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        result.action_items_created = len(action_items)
+        result.decisions_created = len(decisions)
+        result.provenance_added = sum(len(rows) for rows in provenance.values())
+
+
+def extract_meeting(session: Session, meeting_id: int, extractor: Extractor) -> ExtractionResult:
+    result = extractor.extract(session, meeting_id)
+    logger.info(
+        "Extracted %s action items and %s decisions from meeting %s (%s entries, %.0f entries/s)",
+        result.action_items_created, result.decisions_created, meeting_id, result.entries, result.entries_per_second,
+    )
+    return result
+
+
+@functools.lru_cache(maxsize=1)
+def default_extractor() -> Extractor:
+    """An Extractor around Gemini, configured from the environment."""
+    return Extractor(
+        summarization.default_llm(os.getenv("EXTRACTION_MODEL", "gemini-2.5-flash")),
+        window_entries=int(os.getenv("EXTRACTION_WINDOW_ENTRIES", "40")),
+        overlap=int(os.getenv("EXTRACTION_WINDOW_OVERLAP", "10")),
+        concurrency=int(os.getenv("EXTRACTION_CONCURRENCY", "4")),
+    )
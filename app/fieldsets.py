@@ -0,0 +1,131 @@
+"""
+Sparse fieldsets and embedded relations for the generic CRUD read routes.
+
+`?fields=id,status` returns only those fields of an entity's read schema,
+and only those columns are selected from the database, with `load_only`.
+`?include=assignee` embeds a related record, as declared by a richer schema
+such as `ActionItemWithDetails`. Included relations, and the nested
+relations of their schemas, are loaded with `selectinload`: one extra
+`IN` query per relation for the whole page, not one query per row.
+
+The response model for each combination of fields and includes is derived
+from the read and include schemas once and then cached.
+"""
+import typing
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, selectinload
+
+FIELDS_QUERY = Query(None, description="Comma-separated fields of the read schema to return, e.g. `id,status`.")
+INCLUDE_QUERY = Query(None, description="Comma-separated related records to embed, e.g. `assignee`.")
+
+
+def nested_schema(annotation) -> Optional[type[BaseModel]]:
+    """The model in an annotation like `Optional[User]` or `List[User]`, if any."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in typing.get_args(annotation):
+        schema = nested_schema(arg)
+        if schema is not None:
+            return schema
+    return None
+
+
+def eager_loads(db_model, schema: type[BaseModel], names, parent=None) -> list:
+    """`selectinload` options for the relationships among `names`, recursing into their schemas."""
+    relationships = inspect(db_model).relationships
+    options = []
+    for name in names:
+        if name not in relationships:
+            continue
+        attribute = getattr(db_model, name)
+        loader = parent.selectinload(attribute) if parent is not None else selectinload(attribute)
+        options.append(loader)
+        target = nested_schema(schema.model_fields[name].annotation)
+        if target is not None:
+            options += eager_loads(relationships[name].mapper.class_, target, target.model_fields, loader)
+    return options
+
+
+def parse_names(value: str, allowed: tuple[str, ...], param: str) -> tuple[str, ...]:
+    """The names in a comma-separated list, in `allowed` order so that permutations share a schema."""
+    names = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = sorted(names.difference(allowed))
+    if unknown or not names:
+        raise HTTPException(status_code=422, detail=f"Unknown {param} {unknown}; expected some of {list(allowed)}")
+    return tuple(name for name in allowed if name in names)
+
+
+@dataclass(frozen=True)
+class Selection:
+    """The fields and relations one request asked for."""
+    fields: Optional[tuple[str, ...]]
+    include: tuple[str, ...]
+
+
+@lru_cache(maxsize=256)
+def selection_schema(read_schema: type[BaseModel], include_schema: type[BaseModel], selection: Selection) -> type[BaseModel]:
+    """The read schema cut down to the selected fields, plus the included relations."""
+    definitions = {
+        name: (field.annotation, field)
+        for name, field in read_schema.model_fields.items()
+        if selection.fields is None or name in selection.fields
+    }
+    for name in selection.include:
+        field = include_schema.model_fields[name]
+        definitions[name] = (field.annotation, field)
+    return create_model(f"{read_schema.__name__}Selection", __config__=ConfigDict(from_attributes=True), **definitions)
+
+
+@lru_cache(maxsize=256)
+def selection_adapter(read_schema: type[BaseModel], include_schema: type[BaseModel], selection: Selection, container=None) -> TypeAdapter:
+    schema = selection_schema(read_schema, include_schema, selection)
+    return TypeAdapter(container[schema] if container is not None else schema)
+
+
+class Fieldset:
+    """What the read routes of one entity can select and embed."""
+
+    def __init__(self, db_model, read_schema: type[BaseModel], include_schema: Optional[type[BaseModel]] = None):
+        self.db_model = db_model
+        self.read_schema = read_schema
+        self.include_schema = include_schema or read_schema
+        relationships = inspect(db_model).relationships
+        self.fields = tuple(read_schema.model_fields)
+        self.includes = tuple(
+            name for name in self.include_schema.model_fields
+            if name not in read_schema.model_fields and name in relationships
+        )
+
+    def select(self, fields: Optional[str], include: Optional[str]) -> Optional[Selection]:
+        """None when neither was given, so the route answers with the read schema as before."""
+        if fields is None and include is None:
+            return None
+        return Selection(
+            fields=parse_names(fields, self.fields, "fields") if fields is not None else None,
+            include=parse_names(include, self.includes, "include") if include is not None else (),
+        )
+
+    def options(self, selection: Selection) -> list:
+        """Loader options selecting only what the selection's schema reads."""
+        mapper = inspect(self.db_model)
+        options = []
+        if selection.fields is not None:
+            # Primary and foreign keys are needed to identify rows and to load their relations
+            columns = {mapper.get_property_by_column(column).key for column in mapper.primary_key}
+            columns |= {name for name in selection.fields if name in mapper.columns}
+            for name in selection.include:
+                columns |= {mapper.get_property_by_column(column).key for column in mapper.relationships[name].local_columns}
+            options.append(load_only(*(getattr(self.db_model, name) for name in sorted(columns))))
+        schema = selection_schema(self.read_schema, self.include_schema, selection)
+        return options + eager_loads(self.db_model, schema, schema.model_fields)
+
+    def dump(self, selection: Selection, value, container=None) -> bytes:
+        """JSON for one item in the selection's schema, or for a generic `container` of them, like `list`."""
+        adapter = selection_adapter(self.read_schema, self.include_schema, selection, container)
+        return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
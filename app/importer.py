@@ -0,0 +1,402 @@
+"""
+Bulk import of transcripts from NDJSON, CSV and WebVTT files.
+
+Files are parsed as a stream and their entries are written with batched
+INSERTs, so memory stays flat regardless of file size. Speakers are resolved
+against a map of the meeting's participants loaded once per file. After each
+batch the number of source rows consumed is stored in `import_checkpoints`
+in the same transaction, so an interrupted import resumes where it stopped
+without duplicating entries.
+
+The accepted formats match what `/transcripts/{id}/export` produces:
+
+* NDJSON and CSV rows have `text`, `start_time_offset_seconds` and
+  `end_time_offset_seconds`, and name the speaker with `speaker` (a user's
+  full name or email) and/or `participant_id`.
+* WebVTT cues name the speaker with a `<v Name>` voice tag.
+
+Files may be gzip-compressed. Run it as a CLI to import a directory of
+files in parallel:
+
+    python importer.py archive/meeting-*.ndjson.gz --workers 4
+"""
+import argparse
+import csv
+import gzip
+import html
+import io
+import json
+import os
+import re
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Callable, Iterable, Iterator
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+import validation_models.sql_models as sql_models
+from changefeed import change_feed
+
+FORMATS = ("ndjson", "csv", "vtt")
+DEFAULT_BATCH_SIZE = 5000
+
+
+class TranscriptImportError(ValueError):
+    """Raised when an import source cannot be parsed or has no target meeting."""
+
+
+# --- Parsing ---
+
+def open_text(source: IO[bytes]) -> IO[str]:
+    """Wrap a binary stream as text, transparently decompressing gzip."""
+    if not hasattr(source, "peek"):
+        source = io.BufferedReader(source)
+    if source.peek(2)[:2] == b"\x1f\x8b":
+        source = gzip.GzipFile(fileobj=source, mode="rb")
+    return io.TextIOWrapper(source, encoding="utf-8", newline="")
+
+
+def detect_format(path: str) -> str:
+    name = Path(path).name.lower().removesuffix(".gz")
+    for fmt in FORMATS:
+        if name.endswith("." + fmt) or (fmt == "ndjson" and name.endswith(".jsonl")):
+            return fmt
+    raise TranscriptImportError(f"Cannot tell the format of {path}; expected .ndjson, .jsonl, .csv or .vtt")
+
+
+def parse_ndjson(lines: Iterable[str]) -> Iterator[dict]:
+    for number, line in enumerate(lines, 1):
+        if line.strip():
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise TranscriptImportError(f"Line {number}: {exc}") from exc
+            if not isinstance(row, dict):
+                raise TranscriptImportError(f"Line {number}: expected a JSON object, got {type(row).__name__}")
+            yield row
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[dict]:
+    yield from csv.DictReader(lines)
+
+
+VTT_TIMING = re.compile(r"^((?:\d+:)?\d{1,2}:\d{2}(?:\.\d+)?)\s+-->\s+((?:\d+:)?\d{1,2}:\d{2}(?:\.\d+)?)")
+VTT_VOICE = re.compile(r"<v(?:\.[^ >]*)?\s+([^>]*)>")
+VTT_TAG = re.compile(r"</?[^>]+>")
+
+
+def vtt_seconds(timestamp: str) -> float:
+    seconds = 0.0
+    for part in timestamp.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def parse_vtt(lines: Iterable[str]) -> Iterator[dict]:
+    """Yield one row per cue; the speaker comes from the cue's `<v Name>` tag."""
+    cue = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        timing = VTT_TIMING.match(line)
+        if timing:
+            cue = {
+                "start_time_offset_seconds": vtt_seconds(timing.group(1)),
+                "end_time_offset_seconds": vtt_seconds(timing.group(2)),
+                "payload": [],
+            }
+        elif cue is not None and line:
+            cue["payload"].append(line)
+        elif cue is not None:
+            yield vtt_row(cue)
+            cue = None
+    if cue is not None:
+        yield vtt_row(cue)
+
+
+def vtt_row(cue: dict) -> dict:
+    payload = " ".join(cue.pop("payload"))
+    voice = VTT_VOICE.search(payload)
+    cue["speaker"] = html.unescape(voice.group(1)).strip() if voice else None
+    cue["text"] = html.unescape(VTT_TAG.sub("", payload)).strip()
+    return cue
+
+
+def checked(rows: Iterator[dict]) -> Iterator[dict]:
+    """Pass rows through, turning a truncated or corrupt gzip body into an import error."""
+    number = 0
+    try:
+        for number, row in enumerate(rows, 1):
+            yield row
+    except (EOFError, gzip.BadGzipFile, zlib.error) as exc:
+        raise TranscriptImportError(f"Row {number + 1}: the gzip body is truncated or corrupt ({exc})") from exc
+
+
+PARSERS: dict[str, Callable[[Iterable[str]], Iterator[dict]]] = {
+    "ndjson": parse_ndjson,
+    "csv": parse_csv,
+    "vtt": parse_vtt,
+}
+
+
+# --- Writing ---
+
+@dataclass
+class ParticipantMap:
+    """A meeting's participants, keyed by id and by their user's name and email."""
+    ids: set[int]
+    by_name: dict[str, int]
+
+    @classmethod
+    def load(cls, conn, meeting_id: int) -> "ParticipantMap":
+        rows = conn.execute(
+            select(sql_models.MeetingParticipant.id, sql_models.User.full_name, sql_models.User.email)
+            .join(sql_models.User, sql_models.User.id == sql_models.MeetingParticipant.user_id)
+            .where(sql_models.MeetingParticipant.meeting_id == meeting_id)
+        ).all()
+        by_name = {}
+        for participant_id, full_name, email in rows:
+            by_name[full_name.strip().lower()] = participant_id
+            by_name[email.strip().lower()] = participant_id
+        return cls(ids={row[0] for row in rows}, by_name=by_name)
+
+    def resolve(self, row: dict) -> int | None:
+        # Names survive a move between databases; ids only within the same one
+        speaker = row.get("speaker")
+        if speaker:
+            participant_id = self.by_name.get(str(speaker).strip().lower())
+            if participant_id is not None:
+                return participant_id
+        participant_id = row.get("participant_id")
+        if participant_id not in (None, ""):
+            participant_id = int(participant_id)
+            if participant_id in self.ids:
+                return participant_id
+        return None
+
+
+@dataclass
+class ImportResult:
+    source: str
+    meeting_id: int
+    transcript_id: int
+    imported: int = 0
+    skipped: int = 0
+    resumed_from: int = 0
+    already_complete: bool = False
+    seconds: float = 0.0
+    unknown_speakers: set[str] = field(default_factory=set)
+
+    def as_dict(self) -> dict:
+        result = dict(self.__dict__)
+        result["unknown_speakers"] = sorted(self.unknown_speakers)
+        return result
+
+
+def ensure_transcript(conn, meeting_id: int) -> int:
+    """The meeting's transcript id, creating the transcript if needed."""
+    if conn.execute(select(sql_models.Meeting.id).where(sql_models.Meeting.id == meeting_id)).first() is None:
+        raise TranscriptImportError(f"Meeting {meeting_id} does not exist")
+    transcript_id = conn.execute(
+        select(sql_models.Transcript.id).where(sql_models.Transcript.meeting_id == meeting_id)
+    ).scalar()
+    if transcript_id is None:
+        transcript_id = conn.execute(
+            insert(sql_models.Transcript).values(meeting_id=meeting_id, processing_status="completed")
+        ).inserted_primary_key[0]
+    return transcript_id
+
+
+def entry_values(row: dict, number: int) -> tuple[str, int, int]:
+    try:
+        text = str(row["text"]).strip()
+        start = int(float(row["start_time_offset_seconds"]))
+        end = int(float(row["end_time_offset_seconds"]))
+    except (KeyError, TypeError, ValueError) as exc:
+        raise TranscriptImportError(f"Row {number}: missing or invalid {exc}") from exc
+    return text, start, max(start, end)
+
+
+def import_rows(
+    engine,
+    meeting_id: int,
+    rows: Iterable[dict],
+    *,
+    source: str | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Callable[[ImportResult], None] | None = None,
+) -> ImportResult:
+    """Insert parsed rows into the meeting's transcript in batches.
+
+    With a `source` key, progress is checkpointed after every batch and a
+    repeated import of the same source skips the rows already committed.
+    Rows whose speaker is not a participant of the meeting are skipped.
+    """
+    started = time.perf_counter()
+    checkpoints = sql_models.ImportCheckpoint.__table__
+    with engine.connect() as conn:
+        with conn.begin():
+            transcript_id = ensure_transcript(conn, meeting_id)
+            participants = ParticipantMap.load(conn, meeting_id)
+            checkpoint = conn.execute(select(checkpoints).where(checkpoints.c.source == source)).first() if source else None
+        result = ImportResult(source=source or "<stream>", meeting_id=meeting_id, transcript_id=transcript_id)
+        if checkpoint is not None:
+            if checkpoint.completed:
+                result.already_complete = True
+                return result
+            result.resumed_from = checkpoint.rows_done
+
+        def write(batch: list[dict], rows_done: int, completed: bool = False):
+            changes = []
+            with conn.begin():
+                if batch:
+                    entry = sql_models.TranscriptEntry
+                    ids = conn.execute(insert(entry).returning(entry.id), batch).scalars().all()
+                    changes = change_feed.rows(conn, entry, ids, "create", meeting_id)
+                if source:
+                    values = {"source": source, "transcript_id": transcript_id, "rows_done": rows_done, "completed": int(completed)}
+                    stmt = sqlite_insert(checkpoints).values(**values)
+                    conn.execute(stmt.on_conflict_do_update(
+                        index_elements=[checkpoints.c.source],
+                        set_={**values, "updated_at": stmt.excluded.updated_at},
+                    ))
+            # A bare connection has no session events, so the committed rows are published here
+            if changes:
+                change_feed.publish(changes)
+            if progress:
+                progress(result)
+
+        batch = []
+        number = 0
+        for number, row in enumerate(rows, 1):
+            if number <= result.resumed_from:
+                continue
+            try:
+                participant_id = participants.resolve(row)
+            except (TypeError, ValueError) as exc:
+                raise TranscriptImportError(f"Row {number}: invalid participant_id {row.get('participant_id')!r}") from exc
+            if participant_id is None:
+                result.skipped += 1
+                result.unknown_speakers.add(str(row.get("speaker") or row.get("participant_id")))
+                continue
+            text, start, end = entry_values(row, number)
+            batch.append({
+                "transcript_id": transcript_id,
+                "participant_id": participant_id,
+                "text": text,
+                "start_time_offset_seconds": start,
+                "end_time_offset_seconds": end,
+            })
+            if len(batch) >= batch_size:
+                result.imported += len(batch)
+                write(batch, number)
+                batch = []
+        result.imported += len(batch)
+        write(batch, max(number, result.resumed_from), completed=True)
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def import_stream(engine, meeting_id: int, stream: IO[bytes], fmt: str, **kwargs) -> ImportResult:
+    """Import a binary stream, optionally gzip-compressed, in format `fmt`."""
+    if fmt not in PARSERS:
+        raise TranscriptImportError(f"Unknown format {fmt}; expected one of {', '.join(FORMATS)}")
+    return import_rows(engine, meeting_id, checked(PARSERS[fmt](open_text(stream))), **kwargs)
+
+
+def meeting_id_from_path(path: str) -> int | None:
+    """The meeting id from the last number in a file name, e.g. meeting-42.ndjson.gz."""
+    numbers = re.findall(r"\d+", Path(path).name)
+    return int(numbers[-1]) if numbers else None
+
+
+def import_file(engine, path: str, meeting_id: int | None = None, **kwargs) -> ImportResult:
+    """Import one file, resumable under a checkpoint keyed by its absolute path."""
+    meeting_id = meeting_id or meeting_id_from_path(path)
+    if meeting_id is None:
+        raise TranscriptImportError(f"Cannot tell which meeting {path} belongs to; name it meeting-<id>.<format>")
+    with open(path, "rb") as f:
+        return import_stream(engine, meeting_id, f, detect_format(path), source=os.path.abspath(path), **kwargs)
+
+
+def _import_file_in_worker(database_url: str, path: str, meeting_id: int | None, batch_size: int) -> dict:
+    # Writers serialize on the SQLite lock, so wait for it rather than failing
+    engine = create_engine(database_url, connect_args={"timeout": 60})
+    try:
+        return import_file(engine, path, meeting_id, batch_size=batch_size).as_dict()
+    finally:
+        engine.dispose()
+
+
+def import_files(
+    database_url: str,
+    paths: list[str],
+    *,
+    meeting_id: int | None = None,
+    workers: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Callable[[dict, int, int], None] | None = None,
+) -> list[dict]:
+    """Import files in parallel across a process pool; returns one result per file."""
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_import_file_in_worker, database_url, path, meeting_id, batch_size): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as exc:
+                result = {"source": futures[future], "error": str(exc)}
+            results.append(result)
+            if progress:
+                progress(result, len(results), len(paths))
+    return results
+
+
+def main(argv: list[str] | None = None):
+    from database import SQLALCHEMY_DATABASE_URL
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="Files to import (.ndjson, .jsonl, .csv or .vtt, optionally .gz).")
+    parser.add_argument("--database-url", default=SQLALCHEMY_DATABASE_URL)
+    parser.add_argument("--meeting-id", type=int, help="Import every file into this meeting instead of the one in its name.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Files imported in parallel.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Entries per INSERT transaction.")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    totals = {"imported": 0, "skipped": 0}
+
+    def report(result: dict, done: int, total: int):
+        name = Path(result["source"]).name
+        if "error" in result:
+            print(f"[{done}/{total}] {name}: failed: {result['error']}", file=sys.stderr)
+            return
+        totals["imported"] += result["imported"]
+        totals["skipped"] += result["skipped"]
+        status = "already imported" if result["already_complete"] else f"{result['imported']} entries in {result['seconds']:.2f}s"
+        if result["resumed_from"]:
+            status += f", resumed after row {result['resumed_from']}"
+        if result["skipped"]:
+            status += f", {result['skipped']} skipped (unknown speakers: {', '.join(result['unknown_speakers'])})"
+        print(f"[{done}/{total}] {name}: {status}", file=sys.stderr)
+
+    results = import_files(
+        args.database_url, args.paths, meeting_id=args.meeting_id, workers=args.workers,
+        batch_size=args.batch_size, progress=report,
+    )
+    elapsed = time.perf_counter() - started
+    print(
+        f"Imported {totals['imported']} entries from {len(args.paths)} files in {elapsed:.1f}s "
+        f"({totals['imported'] / elapsed if elapsed else 0:.0f} entries/s); {totals['skipped']} skipped",
+        file=sys.stderr,
+    )
+    if any("error" in result for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
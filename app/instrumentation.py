@@ -0,0 +1,162 @@
+"""
+Request latency and database query instrumentation, recorded in `metrics`.
+
+`RequestMetrics` is plain ASGI middleware rather than a BaseHTTPMiddleware,
+so it adds no extra task or body buffering to a request. It records the
+request's latency, including the time spent streaming the body, under the
+route's path template rather than the raw path, so the number of series
+stays bounded.
+
+The SQLAlchemy cursor hooks time every query. While a request is being
+handled they also add to that request's query count and query time, through
+a context variable that follows the request into threadpool handlers and
+streaming iterators. Queries slower than `SLOW_QUERY_SECONDS` are logged
+with their SQLite query plan. Each distinct statement is explained once and
+its plan is kept, so a slow statement that keeps repeating costs only the
+log line.
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_SECONDS", "0.25"))
+PLAN_CACHE_SIZE = 256
+
+OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"})
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500, 1000)
+
+REQUESTS = metrics.counter("http_requests_total", "HTTP requests handled.", ("method", "route", "status"))
+REQUEST_SECONDS = metrics.histogram(
+    "http_request_duration_seconds", "Time to handle an HTTP request, including streaming its body.", ("method", "route")
+)
+REQUEST_QUERIES = metrics.histogram(
+    "http_request_db_queries", "Database queries run while handling an HTTP request.", ("method", "route"), buckets=COUNT_BUCKETS
+)
+REQUEST_QUERY_SECONDS = metrics.histogram(
+    "http_request_db_duration_seconds", "Time spent in database queries while handling an HTTP request.", ("method", "route")
+)
+QUERY_SECONDS = metrics.histogram("db_query_duration_seconds", "Database query execution time.", ("operation",), buckets=QUERY_BUCKETS)
+SLOW_QUERIES = metrics.counter("db_slow_queries_total", "Database queries slower than SLOW_QUERY_SECONDS.", ("operation",))
+
+# [query count, query seconds] of the request being handled, if any
+_request_queries: contextvars.ContextVar[list | None] = contextvars.ContextVar("request_queries", default=None)
+
+
+class RequestMetrics:
+    """ASGI middleware recording each HTTP request's latency, status and queries."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        queries = [0, 0.0]
+        token = _request_queries.set(queries)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_queries.reset(token)
+            method = scope["method"]
+            # The router records the matched route in the scope; 404s share one series
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUESTS.inc(method=method, route=route, status=status)
+            REQUEST_SECONDS.observe(time.perf_counter() - started, method=method, route=route)
+            REQUEST_QUERIES.observe(queries[0], method=method, route=route)
+            REQUEST_QUERY_SECONDS.observe(queries[1], method=method, route=route)
+
+
+def operation(statement: str) -> str:
+    word = statement.lstrip()[:6].upper()
+    return word if word in OPERATIONS else "WITH" if word.startswith("WITH") else "OTHER"
+
+
+class QueryPlans:
+    """Query plans of slow statements, explained once each and kept in a small LRU."""
+
+    def __init__(self, size: int = PLAN_CACHE_SIZE):
+        self.size = size
+        self._plans: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def explain(self, cursor, dialect: str, statement: str, parameters) -> str:
+        with self._lock:
+            if statement in self._plans:
+                self._plans.move_to_end(statement)
+                return self._plans[statement]
+        if dialect != "sqlite":
+            plan = f"(query plans are only collected on SQLite, not {dialect})"
+        else:
+            try:
+                rows = cursor.connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+                plan = "\n".join(row[-1] for row in rows)
+            except Exception as e:
+                plan = f"(could not explain: {e})"
+        with self._lock:
+            self._plans[statement] = plan
+            if len(self._plans) > self.size:
+                self._plans.popitem(last=False)
+        return plan
+
+
+query_plans = QueryPlans()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._instrumentation_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_instrumentation_started", None)
+    if started is None:
+        # The hooks were installed while this query was already running
+        return
+    elapsed = time.perf_counter() - started
+    kind = operation(statement)
+    QUERY_SECONDS.observe(elapsed, operation=kind)
+    queries = _request_queries.get()
+    if queries is not None:
+        queries[0] += 1
+        queries[1] += elapsed
+    if elapsed >= SLOW_QUERY_SECONDS:
+        SLOW_QUERIES.inc(operation=kind)
+        if kind in OPERATIONS:
+            sample = parameters[0] if executemany and parameters else parameters
+            plan = query_plans.explain(cursor, conn.dialect.name, statement, sample)
+        else:
+            plan = "(not explained)"
+        logger.warning("Slow query (%.0f ms): %s\nPlan:\n%s", elapsed * 1000, " ".join(statement.split()), plan)
+
+
+def install():
+    """Time the queries of every engine in this process."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def uninstall():
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,295 @@
+"""
+An in-process job queue backed by the `jobs` table.
+
+Jobs are rows, so they survive restarts and can be enqueued in the same
+transaction as the change that caused them. Worker threads claim the
+highest-priority ready job with a single UPDATE ... RETURNING, run its
+handler in a session of their own and record the outcome. A failed attempt
+is retried with exponential backoff until `max_attempts` is reached. A
+claimed job holds a lease; if its worker dies, the job becomes claimable
+again once the lease expires.
+
+Enqueueing with an idempotency key that belongs to a queued or running job
+is a no-op. Once that job has finished, the same key queues it again.
+
+Moving a meeting to `completed`, through `PUT /meetings/{id}` or any other
+ORM update, enqueues every handler registered with `on_meeting_completed`.
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import and_, event, func, inspect, or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+import validation_models.sql_models as sql_models
+
+logger = logging.getLogger(__name__)
+
+jobs = sql_models.Job.__table__
+
+
+@dataclass
+class JobHandler:
+    fn: Callable[[Session, dict], dict | None]
+    priority: int = 0
+    max_attempts: int = 3
+    on_meeting_completed: bool = False
+
+
+def percentiles(values: list[float]) -> dict:
+    """Nearest-rank p50, p95 and max of `values`, or nulls if there are none."""
+    if not values:
+        return {"p50": None, "p95": None, "max": None}
+    values = sorted(values)
+    rank = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+    return {"p50": rank(0.50), "p95": rank(0.95), "max": values[-1]}
+
+
+class JobQueue:
+    """Job handlers by kind, plus the worker threads that run them.
+
+    `retry_backoff` is the delay before the first retry; each further retry
+    waits twice as long. `lease_seconds` bounds how long a job may run before
+    another worker may assume its worker died and claim it.
+    """
+
+    def __init__(self, workers: int = 2, poll_interval: float = 1.0, lease_seconds: float = 600.0, retry_backoff: float = 5.0):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.retry_backoff = retry_backoff
+        self.handlers: dict[str, JobHandler] = {}
+        self.bind = None
+        self._threads: list[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def handler(self, kind: str, *, priority: int = 0, max_attempts: int = 3, on_meeting_completed: bool = False):
+        """Register the decorated function `fn(session, payload)` as the handler for `kind`."""
+        def register(fn):
+            self.handlers[kind] = JobHandler(fn, priority, max_attempts, on_meeting_completed)
+            return fn
+        return register
+
+    # --- Enqueueing ---
+
+    def enqueue(
+        self,
+        conn,
+        kind: str,
+        payload: dict,
+        *,
+        priority: int | None = None,
+        idempotency_key: str | None = None,
+        max_attempts: int | None = None,
+        now: float | None = None,
+    ) -> int:
+        """Queue a job on `conn` (a Connection or Session) and return its id.
+
+        The job is only visible to workers once the caller's transaction commits.
+        """
+        handler = self.handlers.get(kind)
+        if handler is None:
+            raise ValueError(f"No handler is registered for job kind {kind!r}")
+        now = time.time() if now is None else now
+        values = {
+            "kind": kind,
+            "payload": payload,
+            "priority": handler.priority if priority is None else priority,
+            "max_attempts": handler.max_attempts if max_attempts is None else max_attempts,
+            "idempotency_key": idempotency_key,
+            "status": "queued",
+            "attempts": 0,
+            "enqueued_at": now,
+            "run_after": now,
+        }
+        stmt = sqlite_insert(jobs).values(**values)
+        if idempotency_key is not None:
+            requeue = {key: stmt.excluded[key] for key in values if key != "idempotency_key"}
+            requeue.update(result=None, last_error=None, started_at=None, finished_at=None, lease_expires_at=None)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[jobs.c.idempotency_key],
+                set_=requeue,
+                where=jobs.c.status.in_(["succeeded", "failed"]),
+            )
+        job_id = conn.execute(stmt.returning(jobs.c.id)).scalar()
+        if job_id is None:
+            # The key belongs to a job that is still queued or running
+            job_id = conn.execute(select(jobs.c.id).where(jobs.c.idempotency_key == idempotency_key)).scalar()
+        return job_id
+
+    def wake(self):
+        self._wake.set()
+
+    # --- Session events ---
+
+    def install(self, session_class=Session):
+        event.listen(session_class, "after_flush", self._after_flush)
+        event.listen(session_class, "after_commit", self._after_commit)
+        event.listen(session_class, "after_rollback", self._after_rollback)
+
+    def uninstall(self, session_class=Session):
+        event.remove(session_class, "after_flush", self._after_flush)
+        event.remove(session_class, "after_commit", self._after_commit)
+        event.remove(session_class, "after_rollback", self._after_rollback)
+
+    def _after_flush(self, session, flush_context):
+        # Attribute history still describes the flushed changes at this point
+        completed = []
+        for obj in session.dirty:
+            if isinstance(obj, sql_models.Meeting):
+                history = inspect(obj).attrs.status.history
+                if "completed" in history.added and "completed" not in history.deleted:
+                    completed.append(obj.id)
+        kinds = [kind for kind, handler in self.handlers.items() if handler.on_meeting_completed]
+        for meeting_id in completed:
+            for kind in kinds:
+                self.enqueue(session.connection(), kind, {"meeting_id": meeting_id}, idempotency_key=f"{kind}:meeting:{meeting_id}")
+        if completed and kinds:
+            session.info["jobs_enqueued"] = True
+
+    def _after_commit(self, session):
+        if session.info.pop("jobs_enqueued", None):
+            self.wake()
+
+    def _after_rollback(self, session):
+        session.info.pop("jobs_enqueued", None)
+
+    # --- Running ---
+
+    def claim(self, conn, now: float | None = None):
+        """Atomically mark the next ready job as running and return it, or None."""
+        now = time.time() if now is None else now
+        ready = (
+            select(jobs.c.id)
+            .where(or_(
+                and_(jobs.c.status == "queued", jobs.c.run_after <= now),
+                and_(jobs.c.status == "running", jobs.c.lease_expires_at < now),
+            ))
+            .order_by(jobs.c.priority.desc(), jobs.c.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(jobs)
+            .where(jobs.c.id == ready)
+            .values(status="running", attempts=jobs.c.attempts + 1, started_at=now, lease_expires_at=now + self.lease_seconds)
+            .returning(*jobs.c)
+        )
+        return conn.execute(stmt).first()
+
+    def run_one(self, bind) -> bool:
+        """Claim and run one job. Returns False if no job was ready."""
+        with bind.begin() as conn:
+            job = self.claim(conn)
+        if job is None:
+            return False
+
+        handler = self.handlers.get(job.kind)
+        outcome = {}
+        if handler is None:
+            error, retry = f"No handler is registered for job kind {job.kind!r}", False
+        elif job.attempts > job.max_attempts:
+            error, retry = "The lease expired during the final attempt", False
+        else:
+            try:
+                with Session(bind=bind) as session:
+                    outcome = {"result": handler.fn(session, job.payload)}
+                    session.commit()
+                error, retry = None, False
+            except Exception as exc:
+                logger.exception("Job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+                error, retry = f"{type(exc).__name__}: {exc}", job.attempts < job.max_attempts
+
+        now = time.time()
+        if error is None:
+            values = {"status": "succeeded", "finished_at": now, "last_error": None, **outcome}
+        elif retry:
+            values = {"status": "queued", "run_after": now + self.retry_backoff * 2 ** (job.attempts - 1), "last_error": error}
+        else:
+            values = {"status": "failed", "finished_at": now, "last_error": error}
+        with bind.begin() as conn:
+            # Only record the outcome if the lease was not taken over meanwhile
+            conn.execute(
+                update(jobs)
+                .where(jobs.c.id == job.id, jobs.c.status == "running", jobs.c.attempts == job.attempts)
+                .values(lease_expires_at=None, **values)
+            )
+        return True
+
+    def drain(self, bind) -> int:
+        """Run ready jobs on the calling thread until none are left. Returns how many ran."""
+        ran = 0
+        while self.run_one(bind):
+            ran += 1
+        return ran
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                if self.run_one(self.bind):
+                    continue
+            except Exception:
+                logger.exception("Job worker failed to claim or record a job")
+            if self._wake.wait(self.poll_interval):
+                self._wake.clear()
+
+    def start(self, bind):
+        self.bind = bind
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True) for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the workers after the jobs they are running finish."""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    # --- Metrics ---
+
+    def metrics(self, conn, window: float = 3600.0, now: float | None = None) -> dict:
+        """Queue depth now, and latencies of the jobs that finished within the last `window` seconds."""
+        now = time.time() if now is None else now
+        depth = {"queued": {}, "running": {}}
+        for status, kind, count in conn.execute(
+            select(jobs.c.status, jobs.c.kind, func.count())
+            .where(jobs.c.status.in_(["queued", "running"]))
+            .group_by(jobs.c.status, jobs.c.kind)
+        ):
+            depth[status][kind] = count
+        oldest = conn.execute(select(func.min(jobs.c.enqueued_at)).where(jobs.c.status == "queued")).scalar()
+
+        finished = conn.execute(
+            select(jobs.c.status, jobs.c.enqueued_at, jobs.c.started_at, jobs.c.finished_at)
+            .where(jobs.c.finished_at >= now - window)
+        ).all()
+        return {
+            "queued": sum(depth["queued"].values()),
+            "running": sum(depth["running"].values()),
+            "queued_by_kind": depth["queued"],
+            "running_by_kind": depth["running"],
+            "oldest_queued_seconds": None if oldest is None else now - oldest,
+            "window_seconds": window,
+            "succeeded": sum(row.status == "succeeded" for row in finished),
+            "failed": sum(row.status == "failed" for row in finished),
+            "wait_seconds": percentiles([row.started_at - row.enqueued_at for row in finished]),
+            "run_seconds": percentiles([row.finished_at - row.started_at for row in finished]),
+        }
+
+
+job_queue = JobQueue(
+    workers=int(os.getenv("JOB_WORKERS", "2")),
+    lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", "600")),
+    retry_backoff=float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "5")),
+)
@@ -0,0 +1,312 @@
+"""
+Running participation aggregates, kept up to date as transcript entries arrive.
+
+Every committed `TranscriptEntry`, whether created one at a time or through
+the bulk endpoint, updates its meeting's speaking time and turn counts in
+O(1). Live dashboards read these tallies without touching the database.
+Changed meetings are written to `participant_analytics` on a debounce, and a
+periodic reconciliation recomputes them from the transcript to catch drift.
+Meetings that have gone quiet, or been completed, are dropped from memory.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+import analytics
+import validation_models.sql_models as sql_models
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MeetingTally:
+    """Running aggregates for one meeting."""
+    bind: object
+    speaking_time: dict[int, int] = field(default_factory=dict)
+    turn_count: dict[int, int] = field(default_factory=dict)
+    last_start: int = -1
+    last_participant: int | None = None
+    changed_at: float | None = None
+    dirty_since: float | None = None
+    # When the meeting last had an entry or a reader; idle tallies are evicted once flushed
+    seen_at: float = 0.0
+    # Bumped by every entry, so a write can tell whether the tally moved on while it ran
+    version: int = 0
+    # Set when an entry arrives out of order; the next flush recomputes in full
+    drifted: bool = False
+
+    def add(self, participant_id: int, start: int, end: int, now: float):
+        self.speaking_time[participant_id] = self.speaking_time.get(participant_id, 0) + max(0, end - start)
+        if start < self.last_start:
+            self.drifted = True
+        elif participant_id != self.last_participant:
+            self.turn_count[participant_id] = self.turn_count.get(participant_id, 0) + 1
+            self.last_start, self.last_participant = start, participant_id
+        else:
+            self.last_start = start
+        self.mark_changed(now)
+
+    def mark_changed(self, now: float):
+        self.changed_at = self.seen_at = now
+        self.dirty_since = self.dirty_since or now
+        self.version += 1
+
+    def stats(self, participants: dict[int, str], method: str = "gini") -> analytics.ParticipationStats:
+        participant_ids = np.array(sorted(set(participants) | set(self.speaking_time)), dtype=np.int64)
+        speaking_time = np.array([self.speaking_time.get(pid, 0) for pid in participant_ids.tolist()], dtype=np.int64)
+        turn_count = np.array([self.turn_count.get(pid, 0) for pid in participant_ids.tolist()], dtype=np.int64)
+        humans = np.array([participants.get(pid) not in analytics.AGENT_ROLES for pid in participant_ids.tolist()], dtype=bool)
+        return analytics.ParticipationStats(
+            participant_ids=participant_ids,
+            speaking_time=speaking_time,
+            turn_count=turn_count,
+            equity_score=analytics.equity_score(speaking_time[humans], method),
+        )
+
+
+class LiveAnalytics:
+    """Per-meeting running aggregates fed by SQLAlchemy session events.
+
+    `debounce` is how long a meeting must be quiet before its tallies are
+    written; `max_delay` bounds how stale the stored analytics can get while
+    entries keep arriving. A flushed tally is dropped once its meeting has
+    been idle for `idle_timeout`, and at most `max_transcripts` transcript to
+    meeting lookups are cached.
+
+    The lock only guards the in-memory state. Database reads and writes run
+    outside it, and their results are swapped in afterwards; a tally that
+    changed in the meantime is marked drifted and recomputed on its next flush.
+    """
+
+    def __init__(self, debounce: float = 2.0, max_delay: float = 10.0, idle_timeout: float = 600.0, max_transcripts: int = 10_000):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.idle_timeout = idle_timeout
+        self.max_transcripts = max_transcripts
+        self.tallies: dict[int, MeetingTally] = {}
+        self.transcript_meetings: OrderedDict[int, int] = OrderedDict()
+        self._lock = threading.RLock()
+
+    # --- Session events ---
+
+    def install(self, session_class=Session):
+        event.listen(session_class, "after_flush", self._after_flush)
+        event.listen(session_class, "after_commit", self._after_commit)
+        event.listen(session_class, "after_rollback", self._after_rollback)
+
+    def uninstall(self, session_class=Session):
+        event.remove(session_class, "after_flush", self._after_flush)
+        event.remove(session_class, "after_commit", self._after_commit)
+        event.remove(session_class, "after_rollback", self._after_rollback)
+
+    def _after_flush(self, session, flush_context):
+        entries = [
+            (obj.transcript_id, obj.participant_id, obj.start_time_offset_seconds, obj.end_time_offset_seconds)
+            for obj in session.new
+            if isinstance(obj, sql_models.TranscriptEntry)
+        ]
+        if entries:
+            session.info.setdefault("new_transcript_entries", []).extend(entries)
+
+    def _after_rollback(self, session):
+        session.info.pop("new_transcript_entries", None)
+
+    def _after_commit(self, session):
+        entries = session.info.pop("new_transcript_entries", None)
+        if entries:
+            self.record(session.get_bind(), entries)
+
+    def reset(self):
+        with self._lock:
+            self.tallies.clear()
+            self.transcript_meetings.clear()
+
+    def discard(self, meeting_id: int):
+        """Forget a meeting's tally so it is reseeded, e.g. after entries were written outside the ORM or once it is completed."""
+        with self._lock:
+            self.tallies.pop(meeting_id, None)
+            for transcript_id in [t for t, m in self.transcript_meetings.items() if m == meeting_id]:
+                del self.transcript_meetings[transcript_id]
+
+    # --- Aggregation ---
+
+    def _meetings_for(self, bind, transcript_ids: set[int]) -> dict[int, int]:
+        with self._lock:
+            found = {t: self.transcript_meetings[t] for t in transcript_ids if t in self.transcript_meetings}
+            for transcript_id in found:
+                self.transcript_meetings.move_to_end(transcript_id)
+        missing = transcript_ids - found.keys()
+        if missing:
+            with Session(bind=bind) as session:
+                loaded = dict(session.execute(
+                    select(sql_models.Transcript.id, sql_models.Transcript.meeting_id).where(sql_models.Transcript.id.in_(missing))
+                ).all())
+            with self._lock:
+                self.transcript_meetings.update(loaded)
+                while len(self.transcript_meetings) > self.max_transcripts:
+                    self.transcript_meetings.popitem(last=False)
+            found.update(loaded)
+        return found
+
+    @staticmethod
+    def _tally(bind, columns: analytics.TranscriptColumns) -> MeetingTally:
+        stats = analytics.compute_participation(columns)
+        tally = MeetingTally(
+            bind=bind,
+            speaking_time=dict(zip(stats.participant_ids.tolist(), stats.speaking_time.tolist())),
+            turn_count=dict(zip(stats.participant_ids.tolist(), stats.turn_count.tolist())),
+            seen_at=time.monotonic(),
+        )
+        if len(columns):
+            tally.last_start = int(columns.start[-1])
+            tally.last_participant = int(columns.participant_id[-1])
+        return tally
+
+    def _load(self, bind, meeting_id: int) -> MeetingTally:
+        """A tally of the entries already in the database. Called without the lock held."""
+        with Session(bind=bind) as session:
+            return self._tally(bind, analytics.load_transcript_columns(session, meeting_id))
+
+    def _install(self, meeting_id: int, tally: MeetingTally, replaces: MeetingTally | None = None, version: int = 0) -> MeetingTally | None:
+        """Swap in a tally read from the database, unless `replaces` (the tally it was read for) moved on meanwhile."""
+        with self._lock:
+            current = self.tallies.get(meeting_id)
+            if current is replaces and (replaces is None or replaces.version == version):
+                self.tallies[meeting_id] = tally
+                return tally
+            if current is not None:
+                # Entries were recorded while the database was being read, and the read may or may not include them
+                current.drifted = True
+                current.mark_changed(time.monotonic())
+            return current
+
+    def record(self, bind, entries: list[tuple[int, int, int, int]]):
+        """Fold committed (transcript_id, participant_id, start, end) entries into the tallies."""
+        now = time.monotonic()
+        meetings = self._meetings_for(bind, {transcript_id for transcript_id, *_ in entries})
+        with self._lock:
+            unseeded = set(meetings.values()) - self.tallies.keys()
+            for transcript_id, participant_id, start, end in entries:
+                meeting_id = meetings.get(transcript_id)
+                if meeting_id is None or meeting_id in unseeded:
+                    continue
+                self.tallies[meeting_id].add(participant_id, start, end, now)
+        for meeting_id in unseeded:
+            # The seed already includes the entries of this commit
+            tally = self._load(bind, meeting_id)
+            tally.mark_changed(now)
+            self._install(meeting_id, tally)
+
+    def snapshot(self, bind, meeting_id: int, method: str = "gini") -> analytics.ParticipationStats:
+        """Current aggregates for a meeting, seeded from the database on first use."""
+        with self._lock:
+            tally = self.tallies.get(meeting_id)
+        if tally is None:
+            tally = self._install(meeting_id, self._load(bind, meeting_id))
+        with Session(bind=tally.bind) as session:
+            participants = analytics.load_participant_roles(session, meeting_id)
+        with self._lock:
+            tally.seen_at = time.monotonic()
+            return tally.stats(participants, method)
+
+    # --- Persistence ---
+
+    def due(self, now: float | None = None) -> list[int]:
+        """Meetings whose pending changes should be written now."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return [
+                meeting_id
+                for meeting_id, tally in self.tallies.items()
+                if tally.dirty_since is not None
+                and (now - tally.changed_at >= self.debounce or now - tally.dirty_since >= self.max_delay)
+            ]
+
+    def flush(self, now: float | None = None, force: bool = False) -> int:
+        """Write the tallies of due (or, with `force`, all changed) meetings, then evict idle ones. Returns how many were written."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            meeting_ids = [m for m, t in self.tallies.items() if t.dirty_since is not None] if force else self.due(now)
+            pending = [(meeting_id, self.tallies[meeting_id]) for meeting_id in meeting_ids]
+        for meeting_id, tally in pending:
+            if tally.drifted:
+                self._reconcile_meeting(meeting_id, tally)
+                continue
+            with Session(bind=tally.bind) as session:
+                participants = analytics.load_participant_roles(session, meeting_id)
+                with self._lock:
+                    stats, version = tally.stats(participants), tally.version
+                analytics.write_meeting_analytics(session, meeting_id, stats)
+            with self._lock:
+                if tally.version == version:
+                    tally.changed_at = tally.dirty_since = None
+        self._evict(now)
+        return len(pending)
+
+    def _evict(self, now: float):
+        with self._lock:
+            idle = [
+                meeting_id
+                for meeting_id, tally in self.tallies.items()
+                if tally.dirty_since is None and now - tally.seen_at >= self.idle_timeout
+            ]
+            for meeting_id in idle:
+                self.discard(meeting_id)
+
+    def _reconcile_meeting(self, meeting_id: int, tally: MeetingTally) -> bool:
+        """Recompute a meeting from its transcript and reset its tally. Returns whether it had drifted."""
+        with self._lock:
+            version = tally.version
+        with Session(bind=tally.bind) as session:
+            participants = analytics.load_participant_roles(session, meeting_id)
+            columns = analytics.load_transcript_columns(session, meeting_id)
+            stats = analytics.compute_participation(columns, participants)
+            with self._lock:
+                live, drifted, moved_on = tally.stats(participants), tally.drifted, tally.version != version
+            # Entries recorded during the read would differ from it without any drift
+            drifted = drifted or not moved_on and not (
+                np.array_equal(live.speaking_time, stats.speaking_time) and np.array_equal(live.turn_count, stats.turn_count)
+            )
+            analytics.write_meeting_analytics(session, meeting_id, stats)
+        fresh = self._tally(tally.bind, columns)
+        fresh.seen_at = tally.seen_at
+        self._install(meeting_id, fresh, replaces=tally, version=version)
+        return drifted
+
+    def reconcile(self) -> list[int]:
+        """Recompute every tracked meeting in full. Returns the meetings whose tallies had drifted."""
+        with self._lock:
+            tracked = list(self.tallies.items())
+        drifted = [meeting_id for meeting_id, tally in tracked if self._reconcile_meeting(meeting_id, tally)]
+        if drifted:
+            logger.warning("Reconciled drifted participation analytics for meetings %s", drifted)
+        return drifted
+
+
+async def run_live_analytics(live: LiveAnalytics, reconcile_interval: float):
+    """Background loop flushing debounced tallies and periodically reconciling them."""
+    last_reconcile = time.monotonic()
+    while True:
+        await asyncio.sleep(live.debounce / 2)
+        try:
+            await asyncio.to_thread(live.flush)
+            if time.monotonic() - last_reconcile >= reconcile_interval:
+                last_reconcile = time.monotonic()
+                await asyncio.to_thread(live.reconcile)
+        except Exception:
+            logger.exception("Failed to persist live participation analytics")
+
+
+live_analytics = LiveAnalytics(
+    debounce=float(os.getenv("ANALYTICS_FLUSH_DEBOUNCE_SECONDS", "2")),
+    max_delay=float(os.getenv("ANALYTICS_FLUSH_MAX_DELAY_SECONDS", "10")),
+    idle_timeout=float(os.getenv("ANALYTICS_IDLE_EVICT_SECONDS", "600")),
+)
@@ -1,17 +1,43 @@
 
 from fastapi.concurrency import asynccontextmanager
-from database import get_db, engine
-from fastapi import FastAPI, Depends, HTTPException, status, APIRouter, WebSocket, WebSocketDisconnect
+from database import ScopedSession, RequestSession, engine, upgrade_schema
+from fastapi import FastAPI, Body, Depends, HTTPException, Query, Request, status, APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from sqlalchemy import select, union
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 import validation_models.pd_models as pd_models
 import validation_models.sql_models as sql_models
 from validation_models.sql_models import Base
-from typing import List
+from typing import List, Literal, Optional
 import json
 import asyncio
+import time
+import analytics
+import archive
+import search
+import transcripts
+import importer
+import org_stats
+import summarization
+import extraction
+import instrumentation
+import changefeed
+import fieldsets
+import profiling
+import metrics
+import logging
+from jobs import job_queue
+import tempfile
+import os
+from live_analytics import live_analytics, run_live_analytics
+from changefeed import change_feed
 
-#get db
-db: Session = next(get_db())
+logger = logging.getLogger(__name__)
+
+#get db: a session per request, see database.ScopedSession
+db: Session = ScopedSession
 
 # Functions to interact with the database.
 
@@ -28,11 +54,11 @@ def create_db_item(model, schema):
     db.refresh(db_item)
     return db_item
 
-def get_db_item(model, item_id: int):
-    return db.query(model).filter(model.id == item_id).first()
+def get_db_item(model, item_id: int, options=()):
+    return db.query(model).options(*options).filter(model.id == item_id).first()
 
-def get_all_db_items(model, skip: int = 0, limit: int = 100):
-    return db.query(model).offset(skip).limit(limit).all()
+def get_all_db_items(model, skip: int = 0, limit: int = 100, options=()):
+    return db.query(model).options(*options).offset(skip).limit(limit).all()
 
 def update_db_item(db_item, schema):
     update_data = schema.model_dump(exclude_unset=True)
@@ -46,6 +72,101 @@ def delete_db_item(db_item):
     db.delete(db_item)
     db.commit()
 
+def create_db_items(model, schemas):
+    # All items are inserted in a single transaction.
+    db_items = []
+    try:
+        for schema in schemas:
+            data = schema.model_dump()
+            if 'password' in data:
+                data['password_hash'] = data.pop('password')
+            db_items.append(model(**data))
+        db.add_all(db_items)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    for db_item in db_items:
+        db.refresh(db_item)
+    return db_items
+
+def upsert_db_items_on_conflict(model, rows: list[dict], conflict_keys: tuple[str, ...], create_schema):
+    # INSERT ... ON CONFLICT DO UPDATE, one statement per set of fields sent (usually one per batch).
+    # Nothing is read first, so a retry costs no more than the first attempt and holds the write lock briefly.
+    schemas = [create_schema.model_validate(row) for row in rows]
+    if any(getattr(schema, key) is None for schema in schemas for key in conflict_keys):
+        raise HTTPException(status_code=422, detail=f"Every item needs {', '.join(conflict_keys)}")
+    groups: dict[tuple[str, ...], list[dict]] = {}
+    for schema in schemas:
+        # Only the fields a row sets overwrite an existing row; defaults apply to inserts
+        updated = tuple(sorted(schema.model_fields_set.difference(conflict_keys)))
+        groups.setdefault(updated, []).append(schema.model_dump())
+    ids = {}
+    try:
+        for updated, values in groups.items():
+            stmt = sqlite_insert(model).values(values)
+            set_ = {name: stmt.excluded[name] for name in updated}
+            set_.update({column.name: column.onupdate.arg for column in model.__table__.columns if column.onupdate is not None})
+            # A no-op update rather than DO NOTHING, so RETURNING still gives the existing row
+            set_ = set_ or {conflict_keys[0]: stmt.excluded[conflict_keys[0]]}
+            stmt = stmt.on_conflict_do_update(index_elements=list(conflict_keys), set_=set_).returning(model)
+            db_items = db.scalars(stmt, execution_options={"populate_existing": True}).all()
+            for db_item in db_items:
+                ids[tuple(getattr(db_item, key) for key in conflict_keys)] = db_item.id
+            change_feed.track(db, db_items, "upsert", updated)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    # RETURNING order is not guaranteed; answer in request order, reloading in one query
+    ordered = [ids[tuple(getattr(schema, key) for key in conflict_keys)] for schema in schemas]
+    db_items = get_db_items_by_id(model, ordered)
+    return [db_items[item_id] for item_id in ordered]
+
+def get_db_items_by_id(model, ids: list[int], options=()) -> dict:
+    # One IN query for all the ids, however many items there are.
+    unique_ids = list(dict.fromkeys(ids))
+    return {db_item.id: db_item for db_item in db.query(model).options(*options).filter(model.id.in_(unique_ids)).all()}
+
+def update_db_items(model, rows: list[dict], update_schema):
+    # Every row is applied in a single transaction, or none is if an id is missing.
+    # Items are loaded and changed as ORM objects, so flush hooks see the updates.
+    if any(not isinstance(row.get("id"), int) for row in rows):
+        raise HTTPException(status_code=422, detail="Every item needs an integer id")
+    ids = [row["id"] for row in rows]
+    try:
+        db_items = get_db_items_by_id(model, ids)
+        missing = [item_id for item_id in dict.fromkeys(ids) if item_id not in db_items]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Items not found: {missing}")
+        for data in rows:
+            fields = {k: v for k, v in data.items() if k != "id"}
+            update_data = update_schema.model_validate(fields).model_dump(exclude_unset=True)
+            if 'password' in update_data:
+                update_data['password_hash'] = update_data.pop('password')
+            for key, value in update_data.items():
+                setattr(db_items[data["id"]], key, value)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    # The commit expired the items; reload them in one query rather than one each
+    db_items = get_db_items_by_id(model, ids)
+    return [db_items[item_id] for item_id in ids]
+
+def delete_db_items(model, ids: list[int]) -> tuple[list[int], list[int]]:
+    # Deleted through the session, like delete_db_item, so ORM cascades and flush hooks apply.
+    try:
+        db_items = get_db_items_by_id(model, ids)
+        for db_item in db_items.values():
+            db.delete(db_item)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    unique_ids = list(dict.fromkeys(ids))
+    return [i for i in unique_ids if i in db_items], [i for i in unique_ids if i not in db_items]
+
 
 # --- 5. API Routers ---
 # Grouping endpoints by entity for better organization.
@@ -59,25 +180,78 @@ def create_crud_router(
     create_schema,
     read_schema,
     update_schema = None,
+    include_schema = None,
+    conflict_keys: Optional[tuple[str, ...]] = None,
+    hydrate = None,
+    fallback = None,
+    fallback_ids = None,
     tags: list[str]
 ) -> APIRouter:
     router = APIRouter(prefix=prefix, tags=tags)
+    # ?fields= and ?include= on the read routes; include_schema declares the relations that can be embedded
+    fieldset = fieldsets.Fieldset(db_model, read_schema, include_schema)
+    # For data that has moved to the archive: hydrate(db, items) completes the items the read routes
+    # return, fallback(db, ids) reads the items that are no longer in the table, by id, and
+    # fallback_ids selects the ids of all of those, so listings include them
+    hydrate = hydrate or (lambda session, items: items)
+
+    def read_page(skip: int, limit: int, options=()) -> list:
+        if fallback_ids is None:
+            return hydrate(db, get_all_db_items(model=db_model, skip=skip, limit=limit, options=options))
+        ids = db.scalars(union(select(db_model.id), fallback_ids).order_by("id").offset(skip).limit(limit)).all()
+        return read_by_id(ids, options)[0]
+
+    def read_by_id(ids: list[int], options=()) -> tuple[list, list[int]]:
+        """The items with these ids in order, from the table or else the fallback, and the ids found in neither."""
+        db_items = get_db_items_by_id(model=db_model, ids=ids, options=options)
+        hydrated = dict(zip(db_items, hydrate(db, list(db_items.values()))))
+        missing = [item_id for item_id in dict.fromkeys(ids) if item_id not in hydrated]
+        if missing and fallback is not None:
+            hydrated.update(fallback(db, missing))
+        return [hydrated[item_id] for item_id in ids if item_id in hydrated], [item_id for item_id in ids if item_id not in hydrated]
 
     @router.post("/", response_model=read_schema, status_code=status.HTTP_201_CREATED)
     def create_item(item_in: dict):
         schema_obj = create_schema.model_validate(item_in)
         return create_db_item(model=db_model, schema=schema_obj)
 
+    @router.post("/bulk", response_model=List[read_schema], status_code=status.HTTP_201_CREATED)
+    def create_items(items_in: List[dict]):
+        schema_objs = [create_schema.model_validate(item_in) for item_in in items_in]
+        return create_db_items(model=db_model, schemas=schema_objs)
+
     @router.get("/", response_model=List[read_schema])
-    def read_items(skip: int = 0, limit: int = 100):
-        return get_all_db_items(model=db_model, skip=skip, limit=limit)
+    def read_items(skip: int = 0, limit: int = 100, fields: Optional[str] = fieldsets.FIELDS_QUERY, include: Optional[str] = fieldsets.INCLUDE_QUERY):
+        selection = fieldset.select(fields, include)
+        if selection is None:
+            return read_page(skip, limit)
+        db_items = read_page(skip, limit, fieldset.options(selection))
+        return Response(fieldset.dump(selection, db_items, container=List), media_type="application/json")
+
+    @router.post("/batch_get", response_model=pd_models.BatchGetResult[read_schema])
+    def batch_get_items(batch: pd_models.BatchIds, fields: Optional[str] = fieldsets.FIELDS_QUERY, include: Optional[str] = fieldsets.INCLUDE_QUERY):
+        selection = fieldset.select(fields, include)
+        options = fieldset.options(selection) if selection is not None else ()
+        found, missing = read_by_id(batch.ids, options)
+        result = {"items": found, "missing": missing}
+        if selection is None:
+            return result
+        return Response(fieldset.dump(selection, result, container=pd_models.BatchGetResult), media_type="application/json")
 
     @router.get("/{item_id}", response_model=read_schema)
-    def read_item(item_id: int):
-        db_item = get_db_item(model=db_model, item_id=item_id)
+    def read_item(item_id: int, fields: Optional[str] = fieldsets.FIELDS_QUERY, include: Optional[str] = fieldsets.INCLUDE_QUERY):
+        selection = fieldset.select(fields, include)
+        options = fieldset.options(selection) if selection is not None else ()
+        db_item = get_db_item(model=db_model, item_id=item_id, options=options)
+        if db_item is not None:
+            db_item = hydrate(db, [db_item])[0]
+        elif fallback is not None:
+            db_item = fallback(db, [item_id]).get(item_id)
         if db_item is None:
             raise HTTPException(status_code=404, detail=f"{router_name} not found")
-        return db_item
+        if selection is None:
+            return db_item
+        return Response(fieldset.dump(selection, db_item), media_type="application/json")
 
     if update_schema is not None:
         @router.put("/{item_id}", response_model=read_schema)
@@ -88,6 +262,20 @@ def create_crud_router(
             schema_obj = update_schema.model_validate(item_in)
             return update_db_item(db_item=db_item, schema=schema_obj)
 
+        @router.post("/batch_update", response_model=List[read_schema])
+        def batch_update_items(items_in: List[dict] = Body(..., max_length=pd_models.BATCH_LIMIT)):
+            return update_db_items(model=db_model, rows=items_in, update_schema=update_schema)
+
+    if conflict_keys is not None:
+        @router.post("/upsert", response_model=List[read_schema])
+        def upsert_items(items_in: List[dict] = Body(..., max_length=pd_models.BATCH_LIMIT)):
+            return upsert_db_items_on_conflict(model=db_model, rows=items_in, conflict_keys=conflict_keys, create_schema=create_schema)
+
+    @router.post("/batch_delete", response_model=pd_models.BatchDeleteResult)
+    def batch_delete_items(batch: pd_models.BatchIds):
+        deleted, missing = delete_db_items(model=db_model, ids=batch.ids)
+        return {"deleted": deleted, "missing": missing}
+
     @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
     def delete_item(item_id: int):
         db_item = get_db_item(model=db_model, item_id=item_id)
@@ -102,19 +290,31 @@ def create_crud_router(
 router_orgs = create_crud_router(router_name="Organization", prefix="/organizations", db_model=sql_models.Organization, create_schema=pd_models.OrganizationCreate, read_schema=pd_models.Organization, update_schema=pd_models.OrganizationUpdate, tags=["Organizations"])
 router_users = create_crud_router(router_name="User", prefix="/users", db_model=sql_models.User, create_schema=pd_models.UserCreate, read_schema=pd_models.User, update_schema=pd_models.UserUpdate, tags=["Users"])
 router_meetings = create_crud_router(router_name="Meeting", prefix="/meetings", db_model=sql_models.Meeting, create_schema=pd_models.MeetingCreate, read_schema=pd_models.Meeting, update_schema=pd_models.MeetingUpdate, tags=["Meetings"])
-router_participants = create_crud_router(router_name="Meeting Participant", prefix="/meeting_participants", db_model=sql_models.MeetingParticipant, create_schema=pd_models.MeetingParticipantCreate, read_schema=pd_models.MeetingParticipant, update_schema=pd_models.MeetingParticipantUpdate, tags=["Meeting Participants"])
+router_participants = create_crud_router(router_name="Meeting Participant", prefix="/meeting_participants", db_model=sql_models.MeetingParticipant, create_schema=pd_models.MeetingParticipantCreate, read_schema=pd_models.MeetingParticipant, update_schema=pd_models.MeetingParticipantUpdate, include_schema=pd_models.MeetingParticipantWithUser, tags=["Meeting Participants"])
 router_agendas = create_crud_router(router_name="Meeting Agenda", prefix="/meeting_agendas", db_model=sql_models.MeetingAgenda, create_schema=pd_models.MeetingAgendaCreate, read_schema=pd_models.MeetingAgenda, tags=["Meeting Agendas"])
-router_agenda_items = create_crud_router(router_name="Agenda Item", prefix="/agenda_items", db_model=sql_models.AgendaItem, create_schema=pd_models.AgendaItemCreate, read_schema=pd_models.AgendaItem, update_schema=pd_models.AgendaItemUpdate, tags=["Agenda Items"])
-router_transcripts = create_crud_router(router_name="Transcript", prefix="/transcripts", db_model=sql_models.Transcript, create_schema=pd_models.TranscriptCreate, read_schema=pd_models.Transcript, update_schema=pd_models.TranscriptUpdate, tags=["Transcripts"])
-router_transcript_entries = create_crud_router(router_name="Transcript Entry", prefix="/transcript_entries", db_model=sql_models.TranscriptEntry, create_schema=pd_models.TranscriptEntryCreate, read_schema=pd_models.TranscriptEntry, tags=["Transcript Entries"])
-router_action_items = create_crud_router(router_name="Action Item", prefix="/action_items", db_model=sql_models.ActionItem, create_schema=pd_models.ActionItemCreate, read_schema=pd_models.ActionItem, update_schema=pd_models.ActionItemUpdate, tags=["Action Items"])
-router_decisions = create_crud_router(router_name="Decision", prefix="/decisions", db_model=sql_models.Decision, create_schema=pd_models.DecisionCreate, read_schema=pd_models.Decision, update_schema=pd_models.DecisionUpdate, tags=["Decisions"])
-router_summaries = create_crud_router(router_name="Meeting Summary", prefix="/meeting_summaries", db_model=sql_models.MeetingSummary, create_schema=pd_models.MeetingSummaryCreate, read_schema=pd_models.MeetingSummary, update_schema=pd_models.MeetingSummaryUpdate, tags=["Meeting Summaries"])
+router_agenda_items = create_crud_router(router_name="Agenda Item", prefix="/agenda_items", db_model=sql_models.AgendaItem, create_schema=pd_models.AgendaItemCreate, read_schema=pd_models.AgendaItem, update_schema=pd_models.AgendaItemUpdate, include_schema=pd_models.AgendaItemWithPresenter, tags=["Agenda Items"])
+router_transcripts = create_crud_router(router_name="Transcript", prefix="/transcripts", db_model=sql_models.Transcript, create_schema=pd_models.TranscriptCreate, read_schema=pd_models.Transcript, update_schema=pd_models.TranscriptUpdate, hydrate=archive.hydrate_transcripts, tags=["Transcripts"])
+router_transcript_entries = create_crud_router(router_name="Transcript Entry", prefix="/transcript_entries", db_model=sql_models.TranscriptEntry, create_schema=pd_models.TranscriptEntryCreate, read_schema=pd_models.TranscriptEntry, fallback=archive.find_entries, fallback_ids=archive.archived_ids(), tags=["Transcript Entries"])
+router_action_items = create_crud_router(router_name="Action Item", prefix="/action_items", db_model=sql_models.ActionItem, create_schema=pd_models.ActionItemCreate, read_schema=pd_models.ActionItem, update_schema=pd_models.ActionItemUpdate, include_schema=pd_models.ActionItemWithDetails, conflict_keys=("idempotency_key",), tags=["Action Items"])
+router_decisions = create_crud_router(router_name="Decision", prefix="/decisions", db_model=sql_models.Decision, create_schema=pd_models.DecisionCreate, read_schema=pd_models.Decision, update_schema=pd_models.DecisionUpdate, include_schema=pd_models.DecisionWithSource, tags=["Decisions"])
+router_summaries = create_crud_router(router_name="Meeting Summary", prefix="/meeting_summaries", db_model=sql_models.MeetingSummary, create_schema=pd_models.MeetingSummaryCreate, read_schema=pd_models.MeetingSummary, update_schema=pd_models.MeetingSummaryUpdate, conflict_keys=("meeting_id",), tags=["Meeting Summaries"])
 router_integrations = create_crud_router(router_name="User Integration", prefix="/user_integrations", db_model=sql_models.UserIntegration, create_schema=pd_models.UserIntegrationCreate, read_schema=pd_models.UserIntegration, update_schema=pd_models.UserIntegrationUpdate, tags=["User Integrations"])
-router_meeting_analytics = create_crud_router(router_name="Meeting Analytics", prefix="/meeting_analytics", db_model=sql_models.MeetingAnalytics, create_schema=pd_models.MeetingAnalyticsCreate, read_schema=pd_models.MeetingAnalytics, tags=["Meeting Analytics"])
+router_meeting_analytics = create_crud_router(router_name="Meeting Analytics", prefix="/meeting_analytics", db_model=sql_models.MeetingAnalytics, create_schema=pd_models.MeetingAnalyticsCreate, read_schema=pd_models.MeetingAnalytics, conflict_keys=("meeting_id",), tags=["Meeting Analytics"])
 router_participant_analytics = create_crud_router(router_name="Participant Analytics", prefix="/participant_analytics", db_model=sql_models.ParticipantAnalytics, create_schema=pd_models.ParticipantAnalyticsCreate, read_schema=pd_models.ParticipantAnalytics, tags=["Participant Analytics"])
 
 # --- WebSocket Chat Manager ---
+chat_connections = metrics.gauge("chat_connections", "Open /chat WebSocket connections.")
+chat_messages = metrics.counter("chat_messages_received_total", "Frames received on /chat, by message type.", ("type",))
+chat_pending_sends = metrics.gauge("chat_pending_sends", "Frames handed to the connection manager and not yet written to a socket.")
+chat_dropped_frames = metrics.counter("chat_dropped_frames_total", "Frames that could not be delivered; their connection is dropped.")
+chat_broadcast_duration = metrics.histogram(
+    "chat_broadcast_duration_seconds", "Time to fan one broadcast out to every connection.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+chat_broadcast_fanout = metrics.histogram(
+    "chat_broadcast_recipients", "Connections a broadcast was sent to.", buckets=(1, 2, 5, 10, 25, 50, 100, 250, 1000)
+)
+
 class ConnectionManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
@@ -122,20 +322,37 @@ class ConnectionManager:
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        chat_connections.set(len(self.active_connections))
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        # A failed broadcast may already have dropped this connection
+        if websocket in self.active_connections:
+            self.active_connections.remove(websocket)
+        chat_connections.set(len(self.active_connections))
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
+        chat_pending_sends.inc()
+        try:
+            await websocket.send_text(message)
+        finally:
+            chat_pending_sends.dec()
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
+        started = time.perf_counter()
+        # Iterate over a copy, since failed connections are removed along the way
+        connections = list(self.active_connections)
+        chat_pending_sends.inc(len(connections))
+        for connection in connections:
             try:
                 await connection.send_text(message)
             except:
                 # Remove connection if sending fails
+                chat_dropped_frames.inc()
                 self.disconnect(connection)
+            finally:
+                chat_pending_sends.dec()
+        chat_broadcast_fanout.observe(len(connections))
+        chat_broadcast_duration.observe(time.perf_counter() - started)
 
 manager = ConnectionManager()
 
@@ -143,8 +360,34 @@ manager = ConnectionManager()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup logic
+    instrumentation.install()
+    profiled = profiling.enabled()
+    if profiled:
+        profiling.install()
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine, Base.metadata)
+    live_analytics.install()
+    change_feed.install()
+    job_queue.install()
+    job_queue.start(engine)
+    reconcile_interval = float(os.getenv("ANALYTICS_RECONCILE_SECONDS", "600"))
+    live_task = asyncio.create_task(run_live_analytics(live_analytics, reconcile_interval))
+    org_stats_task = asyncio.create_task(
+        org_stats.run_org_stats(engine, org_stats.REFRESH_SECONDS, org_stats.REBUILD_SECONDS)
+    )
     yield
+    org_stats_task.cancel()
+    job_queue.uninstall()
+    await asyncio.to_thread(job_queue.stop)
+    live_task.cancel()
+    live_analytics.uninstall()
+    await asyncio.to_thread(live_analytics.flush, force=True)
+    live_analytics.reset()
+    change_feed.uninstall()
+    change_feed.reset()
+    if profiled:
+        profiling.uninstall()
+    instrumentation.uninstall()
     # (Optional) Shutdown logic
 
 app = FastAPI(
@@ -153,6 +396,10 @@ app = FastAPI(
     version="1.0.0",
     lifespan=lifespan,
 )
+app.add_middleware(instrumentation.RequestMetrics)
+if profiling.enabled():
+    app.add_middleware(profiling.RequestProfiler)
+app.add_middleware(RequestSession)
 
 # Include all the routers in the main FastAPI app
 app.include_router(router_orgs)
@@ -170,6 +417,228 @@ app.include_router(router_integrations)
 app.include_router(router_meeting_analytics)
 app.include_router(router_participant_analytics)
 
+@app.post("/meetings/{meeting_id}/analytics", response_model=pd_models.MeetingAnalyticsWithParticipants, tags=["Meeting Analytics"])
+def compute_meeting_analytics(meeting_id: int, method: str = "gini"):
+    """Recompute speaking time, turn counts and the equity score from the meeting's transcript."""
+    if get_db_item(model=sql_models.Meeting, item_id=meeting_id) is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    if method not in ("gini", "entropy"):
+        raise HTTPException(status_code=422, detail="method must be 'gini' or 'entropy'")
+    return analytics.refresh_meeting_analytics(db, meeting_id, method=method)
+
+@app.get("/meetings/{meeting_id}/analytics/live", response_model=pd_models.LiveMeetingAnalytics, tags=["Meeting Analytics"])
+def read_live_meeting_analytics(meeting_id: int, method: str = "gini"):
+    """Participation so far, from the running aggregates rather than the transcript."""
+    if get_db_item(model=sql_models.Meeting, item_id=meeting_id) is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    if method not in ("gini", "entropy"):
+        raise HTTPException(status_code=422, detail="method must be 'gini' or 'entropy'")
+    stats = live_analytics.snapshot(db.get_bind(), meeting_id, method=method)
+    return {
+        "meeting_id": meeting_id,
+        "participation_equity_score": stats.equity_score,
+        "participants": [
+            {"participant_id": pid, "speaking_time_seconds": speaking_time, "turn_count": turn_count}
+            for pid, speaking_time, turn_count in zip(
+                stats.participant_ids.tolist(), stats.speaking_time.tolist(), stats.turn_count.tolist()
+            )
+        ],
+    }
+
+@app.get("/organizations/{organization_id}/stats", response_model=pd_models.OrganizationStats, tags=["Organizations"])
+def read_organization_stats(
+    organization_id: int,
+    period: Literal["week", "month"] = "week",
+    start: Optional[str] = Query(None, description="Only periods starting on or after this date (YYYY-MM-DD)."),
+    end: Optional[str] = Query(None, description="Only periods starting before this date (YYYY-MM-DD)."),
+):
+    """Dashboard totals for an organization, read from rollups refreshed in the background."""
+    if get_db_item(model=sql_models.Organization, item_id=organization_id) is None:
+        raise HTTPException(status_code=404, detail="Organization not found")
+    conn = db.connection()
+    stats = org_stats.read_stats(conn, organization_id, period, start, end)
+    if stats["refreshed_at"] is None:
+        # Nothing has been rolled up yet, e.g. right after the first start
+        db.commit()
+        org_stats.refresh(db.get_bind())
+        stats = org_stats.read_stats(db.connection(), organization_id, period, start, end)
+    return stats
+
+# --- Background Jobs ---
+# Handlers registered with on_meeting_completed run when a meeting's status moves to completed.
+
+@job_queue.handler("meeting_analytics", priority=10, on_meeting_completed=True)
+def meeting_analytics_job(session: Session, payload: dict) -> dict:
+    meeting_id = payload["meeting_id"]
+    if session.get(sql_models.Meeting, meeting_id) is None:
+        return {"skipped": "meeting deleted"}
+    stored = analytics.refresh_meeting_analytics(session, meeting_id)
+    # The stored analytics are now complete, so the running tally is no longer needed
+    live_analytics.discard(meeting_id)
+    return {"participation_equity_score": stored.participation_equity_score}
+
+@job_queue.handler("meeting_summary", on_meeting_completed=summarization.llm_configured())
+def meeting_summary_job(session: Session, payload: dict) -> dict:
+    meeting_id = payload["meeting_id"]
+    if session.get(sql_models.Meeting, meeting_id) is None:
+        return {"skipped": "meeting deleted"}
+    result = summarization.summarize_meeting(session, meeting_id, summarization.default_summarizer())
+    if result is None:
+        return {"skipped": "no transcript entries"}
+    return {"chunks": result.chunks, "levels": result.levels, "llm_calls": result.llm_calls, "cache_hits": result.cache_hits}
+
+@app.post("/meetings/{meeting_id}/summary", response_model=pd_models.Job, status_code=status.HTTP_202_ACCEPTED, tags=["Meeting Summaries"])
+def summarize_meeting(meeting_id: int):
+    """Queue (re)generation of the meeting's summary; poll the returned job for its outcome."""
+    if get_db_item(model=sql_models.Meeting, item_id=meeting_id) is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    job_id = job_queue.enqueue(db, "meeting_summary", {"meeting_id": meeting_id}, idempotency_key=f"meeting_summary:meeting:{meeting_id}")
+    db.commit()
+    job_queue.wake()
+    return get_db_item(model=sql_models.Job, item_id=job_id)
+
+@job_queue.handler("action_item_extraction", on_meeting_completed=summarization.llm_configured())
+def action_item_extraction_job(session: Session, payload: dict) -> dict:
+    meeting_id = payload["meeting_id"]
+    if session.get(sql_models.Meeting, meeting_id) is None:
+        return {"skipped": "meeting deleted"}
+    result = extraction.extract_meeting(session, meeting_id, extraction.default_extractor())
+    return result.as_dict()
+
+@app.post("/meetings/{meeting_id}/extraction", response_model=pd_models.Job, status_code=status.HTTP_202_ACCEPTED, tags=["Action Items"])
+def extract_meeting_items(meeting_id: int):
+    """Queue extraction of the meeting's action items and decisions from its transcript; poll the returned job for its outcome."""
+    if get_db_item(model=sql_models.Meeting, item_id=meeting_id) is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    job_id = job_queue.enqueue(db, "action_item_extraction", {"meeting_id": meeting_id}, idempotency_key=f"action_item_extraction:meeting:{meeting_id}")
+    db.commit()
+    job_queue.wake()
+    return get_db_item(model=sql_models.Job, item_id=job_id)
+
+@app.get("/jobs", response_model=List[pd_models.Job], tags=["Jobs"])
+def read_jobs(
+    status: Optional[pd_models.JobStatus] = None,
+    kind: Optional[str] = None,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """Background jobs, newest first."""
+    query = db.query(sql_models.Job)
+    if status is not None:
+        query = query.filter(sql_models.Job.status == status.value)
+    if kind is not None:
+        query = query.filter(sql_models.Job.kind == kind)
+    return query.order_by(sql_models.Job.id.desc()).offset(skip).limit(limit).all()
+
+@app.get("/jobs/metrics", response_model=pd_models.JobMetrics, tags=["Jobs"])
+def read_job_metrics(window: float = Query(3600, gt=0, description="Latencies cover jobs finished in the last `window` seconds.")):
+    """Queue depth, and wait and run latencies of recently finished jobs."""
+    return job_queue.metrics(db.connection(), window=window)
+
+@app.get("/jobs/{job_id}", response_model=pd_models.Job, tags=["Jobs"])
+def read_job(job_id: int):
+    db_item = get_db_item(model=sql_models.Job, item_id=job_id)
+    if db_item is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return db_item
+
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Metrics"])
+def read_metrics():
+    """Request latency, database query and other process metrics, in Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# --- Profiling ---
+# Off unless PROFILING_TOKEN is set, and then only with that token in X-Admin-Token.
+
+router_profiling = APIRouter(prefix="/admin/profiling", tags=["Profiling"], dependencies=[Depends(profiling.require_admin)])
+MemoryGrouping = Literal["lineno", "filename", "traceback"]
+
+@router_profiling.get("/sample", response_class=PlainTextResponse)
+async def sample_profile(
+    seconds: float = Query(10, gt=0, le=profiling.MAX_SAMPLE_SECONDS),
+    interval_ms: float = Query(10, ge=1, le=1000, description="Time between samples."),
+):
+    """Sample every thread's stack for `seconds`, as collapsed stacks for flamegraph.pl or speedscope."""
+    try:
+        counts = await asyncio.to_thread(profiling.sample_stacks, seconds, interval_ms / 1000)
+    except profiling.Busy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(profiling.collapsed(counts))
+
+@router_profiling.get("/requests", response_model=List[pd_models.ProfiledRequest])
+def read_request_profiles():
+    """Requests profiled with an X-Profile header, newest first."""
+    return [profile.as_dict() for profile in profiling.request_profiles.list()]
+
+@router_profiling.get("/requests/{profile_id}")
+def read_request_profile(
+    profile_id: int,
+    sort: Literal["cumulative", "tottime", "calls"] = "cumulative",
+    limit: int = Query(50, ge=1, le=1000),
+    format: Literal["text", "pstats"] = Query("text", description="pstats returns the binary profile for pstats or snakeviz."),
+):
+    profile = profiling.request_profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "pstats":
+        return Response(
+            profile.dump(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="request-{profile_id}.pstats"'},
+        )
+    return PlainTextResponse(profile.report(sort, limit))
+
+@router_profiling.post("/tracemalloc/start", status_code=status.HTTP_204_NO_CONTENT)
+def start_tracemalloc(frames: int = Query(10, ge=1, le=100, description="Frames kept per allocation traceback.")):
+    """Start tracing allocations. Tracing slows the process down, so stop it when done."""
+    profiling.snapshots.start(frames)
+
+@router_profiling.post("/tracemalloc/stop", status_code=status.HTTP_204_NO_CONTENT)
+def stop_tracemalloc():
+    """Stop tracing allocations and discard the snapshots."""
+    profiling.snapshots.stop()
+
+@router_profiling.post("/tracemalloc/snapshots", response_model=pd_models.MemorySnapshot, status_code=status.HTTP_201_CREATED)
+def take_memory_snapshot(
+    group_by: MemoryGrouping = "lineno",
+    limit: int = Query(25, ge=1, le=1000),
+    filename: Optional[str] = Query(None, description="Only allocations made in files whose path contains this."),
+):
+    """Snapshot the traced allocations, to diff against later; returns the largest ones now."""
+    try:
+        snapshot = profiling.snapshots.take()
+    except profiling.Busy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    traced, peak = profiling.tracemalloc.get_traced_memory()
+    return {
+        "id": profiling.snapshots.add(snapshot),
+        "traced_bytes": traced,
+        "peak_bytes": peak,
+        "top": profiling.top_allocations(snapshot, group_by, limit, filename),
+    }
+
+@router_profiling.get("/tracemalloc/diff", response_model=List[pd_models.MemoryAllocation])
+def diff_memory_snapshots(
+    base: int,
+    target: Optional[int] = Query(None, description="Snapshot to compare with the base; a fresh one if omitted."),
+    group_by: MemoryGrouping = "lineno",
+    limit: int = Query(25, ge=1, le=1000),
+    filename: Optional[str] = Query(None, description="Only allocations made in files whose path contains this."),
+):
+    """The allocations that grew the most between two snapshots."""
+    base_snapshot = profiling.snapshots.get(base)
+    target_snapshot = profiling.snapshots.get(target) if target is not None else None
+    if base_snapshot is None or (target is not None and target_snapshot is None):
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    if target_snapshot is None:
+        try:
+            target_snapshot = profiling.snapshots.take()
+        except profiling.Busy as e:
+            raise HTTPException(status_code=409, detail=str(e))
+    return profiling.diff(base_snapshot, target_snapshot, group_by, limit, filename)
+
+app.include_router(router_profiling)
+
 # --- WebSocket Chat Endpoint ---
 @app.websocket("/chat")
 async def chat_endpoint(websocket: WebSocket):
@@ -178,6 +647,8 @@ async def chat_endpoint(websocket: WebSocket):
         while True:
             data = await websocket.receive_text()
             message_data = json.loads(data)
+            message_type = message_data.get("type")
+            chat_messages.inc(type=message_type if message_type in ("broadcast", "private", "stream") else "other")
             
             # Handle different message types
             if message_data.get("type") == "broadcast":
@@ -197,6 +668,20 @@ async def chat_endpoint(websocket: WebSocket):
                     "timestamp": message_data.get("timestamp")
                 })
                 await manager.send_personal_message(response, websocket)
+            elif message_data.get("type") == "stream":
+                # Relay one chunk of a streamed agent response; clients append
+                # deltas sharing a stream_id to the same message
+                formatted_message = json.dumps({
+                    "type": "stream",
+                    "user": message_data.get("user", "Anonymous"),
+                    "stream_id": message_data.get("stream_id"),
+                    "seq": message_data.get("seq"),
+                    "delta": message_data.get("delta", ""),
+                    "done": bool(message_data.get("done", False)),
+                    "ttft_ms": message_data.get("ttft_ms"),
+                    "timestamp": message_data.get("timestamp")
+                })
+                await manager.broadcast(formatted_message)
             else:
                 # Default: broadcast the message
                 formatted_message = json.dumps({
@@ -208,10 +693,130 @@ async def chat_endpoint(websocket: WebSocket):
                 await manager.broadcast(formatted_message)
     except WebSocketDisconnect:
         manager.disconnect(websocket)
-    except Exception as e:
-        print(f"Chat error: {e}")
+    except Exception:
+        logger.exception("Chat error")
         manager.disconnect(websocket)
 
+@app.get(
+    "/transcripts/{transcript_id}/entries",
+    response_model=List[pd_models.TranscriptEntry],
+    response_class=StreamingResponse,
+    tags=["Transcripts"],
+)
+def read_transcript_entries(
+    transcript_id: int,
+    start: Optional[int] = Query(None, ge=0, description="Only entries starting at or after this offset, in seconds."),
+    end: Optional[int] = Query(None, ge=0, description="Only entries starting before this offset, in seconds."),
+    participant_id: List[int] = Query(None, description="Only entries spoken by these participants."),
+    limit: Optional[int] = Query(None, ge=1),
+):
+    """Stream a transcript's entries in spoken order, optionally filtered by time window and speaker."""
+    if get_db_item(model=sql_models.Transcript, item_id=transcript_id) is None:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    archived = archive.archived_entries(db, transcript_id)
+    stmt = transcripts.entries_query(transcript_id, start=start, end=end, participant_ids=participant_id, limit=limit)
+    rows = transcripts.iter_rows(db.get_bind(), stmt)
+    if archived is not None:
+        rows = transcripts.merge_rows(archived.rows(start, end, participant_id, limit), rows, limit=limit)
+    return StreamingResponse(transcripts.buffered(transcripts.stream_json_array(rows)), media_type="application/json")
+
+@app.get("/transcripts/{transcript_id}/export", response_class=StreamingResponse, tags=["Transcripts"])
+def export_transcript(
+    transcript_id: int,
+    format: Literal["ndjson", "csv", "vtt"] = "ndjson",
+    gzip: bool = False,
+):
+    """Download a whole transcript as NDJSON, CSV or WebVTT, streamed in constant memory."""
+    if get_db_item(model=sql_models.Transcript, item_id=transcript_id) is None:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    archived = archive.archived_entries(db, transcript_id)
+    archived_rows = archive.export_rows(db, archived) if archived is not None else None
+    filename = f"transcript-{transcript_id}.{format}"
+    media_type = transcripts.EXPORT_MEDIA_TYPES[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        transcripts.export_transcript(db.get_bind(), transcript_id, format, compress=gzip, archived=archived_rows),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@app.post("/meetings/{meeting_id}/transcript/import", response_model=pd_models.TranscriptImportResult, tags=["Transcripts"])
+async def import_transcript(
+    meeting_id: int,
+    request: Request,
+    format: Literal["ndjson", "csv", "vtt"] = "ndjson",
+    source: Optional[str] = Query(None, description="A key for the upload; re-sending it resumes after the rows already imported."),
+):
+    """Import transcript entries from an NDJSON, CSV or WebVTT request body, optionally gzip-compressed."""
+    if get_db_item(model=sql_models.Meeting, item_id=meeting_id) is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    # Spool the upload so a large body is parsed from disk rather than memory
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as body:
+        async for chunk in request.stream():
+            body.write(chunk)
+        body.seek(0)
+        try:
+            result = await run_in_threadpool(
+                importer.import_stream, db.get_bind(), meeting_id, body, format, source=source
+            )
+        except (importer.TranscriptImportError, UnicodeDecodeError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    live_analytics.discard(meeting_id)
+    return result.as_dict()
+
+@app.get("/search", response_model=pd_models.SearchResults, tags=["Search"])
+def search_records(
+    q: str,
+    types: List[pd_models.SearchResultType] = Query(None),
+    meeting_id: Optional[int] = None,
+    organization_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """Full-text search over transcript entries, decisions and action items, ranked by BM25."""
+    if not search.match_expression(q):
+        raise HTTPException(status_code=400, detail="Search query must contain at least one term")
+    results = search.search(
+        db,
+        q,
+        types=[t.value for t in types] if types else None,
+        meeting_id=meeting_id,
+        organization_id=organization_id,
+        limit=limit + 1,
+        offset=offset,
+    )
+    return {
+        "query": q,
+        "limit": limit,
+        "offset": offset,
+        "next_offset": offset + limit if len(results) > limit else None,
+        "results": results[:limit],
+    }
+
+@app.get("/changes", response_class=StreamingResponse, tags=["Change Feed"])
+def stream_changes(
+    request: Request,
+    organization_id: Optional[int] = None,
+    meeting_id: Optional[int] = None,
+    entities: List[str] = Query(None, description="Only changes to these entities, e.g. action_items."),
+    last_event_id: Optional[str] = Query(None, description="Resume after this event. EventSource sends it as the Last-Event-ID header instead."),
+):
+    """Server-Sent Events with the committed changes of an organization or a meeting."""
+    if organization_id is None and meeting_id is None:
+        raise HTTPException(status_code=422, detail="Either organization_id or meeting_id is required")
+    if organization_id is not None and get_db_item(model=sql_models.Organization, item_id=organization_id) is None:
+        raise HTTPException(status_code=404, detail="Organization not found")
+    if meeting_id is not None and get_db_item(model=sql_models.Meeting, item_id=meeting_id) is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    unknown = sorted(set(entities or ()) - changefeed.ENTITIES)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown entities {unknown}; expected some of {sorted(changefeed.ENTITIES)}")
+    change_filter = changefeed.ChangeFilter(organization_id, meeting_id, frozenset(entities) if entities else None)
+    events = change_feed.events(change_filter, request.headers.get("last-event-id") or last_event_id)
+    return StreamingResponse(events, media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.get("/", tags=["Root"])
 def read_root():
     return {"message": "Welcome to the Meeting Intelligence Platform API. See /docs for documentation."}
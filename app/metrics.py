@@ -0,0 +1,177 @@
+"""
+Lightweight in-process metrics for the backend, in Prometheus text format.
+
+The same Counter, Gauge, Histogram and renderer as `agents/agent_metrics.py`;
+the backend ships without the agents, so it keeps its own copy. Updates come from the
+event loop and from threadpool handlers and job workers, so every update is
+guarded by a lock. An update is a dict lookup and a few additions, cheap
+enough to make on every request and every query.
+"""
+import bisect
+import math
+import threading
+
+
+class Counter:
+    """A monotonically increasing value, optionally split by labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        """Value for the given labels, or the total over all labels if none are given."""
+        with self._lock:
+            if not labels:
+                return sum(self._values.values())
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> dict[tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Gauge(Counter):
+    """A value that goes up and down, optionally split by labels."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram:
+    """Bucketed distribution of observed values, optionally split by labels."""
+
+    kind = "histogram"
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            if not labels:
+                return sum(series[2] for series in self._series.values())
+            series = self._series.get(self._key(labels))
+            return series[2] if series else 0
+
+    def quantile(self, q: float, **labels) -> float | None:
+        """Upper bucket bound below which a fraction `q` of observations fall."""
+        with self._lock:
+            keys = [self._key(labels)] if labels else list(self._series)
+            counts = [0] * (len(self.buckets) + 1)
+            for key in keys:
+                for i, n in enumerate(self._series.get(key, [[0] * len(counts)])[0]):
+                    counts[i] += n
+        total = sum(counts)
+        if not total:
+            return None
+        seen = 0
+        for bound, n in zip(self.buckets + (float("inf"),), counts):
+            seen += n
+            if seen >= q * total:
+                return bound
+        return float("inf")
+
+    def samples(self) -> dict[tuple[str, ...], tuple[list[int], float, int]]:
+        with self._lock:
+            return {key: (list(s[0]), s[1], s[2]) for key, s in self._series.items()}
+
+
+REGISTRY: dict[str, Counter | Gauge | Histogram] = {}
+
+
+def counter(name: str, description: str, labelnames: tuple[str, ...] = ()) -> Counter:
+    """Return the counter registered under `name`, creating it on first use."""
+    if name not in REGISTRY:
+        REGISTRY[name] = Counter(name, description, labelnames)
+    return REGISTRY[name]
+
+
+def gauge(name: str, description: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+    """Return the gauge registered under `name`, creating it on first use."""
+    if name not in REGISTRY:
+        REGISTRY[name] = Gauge(name, description, labelnames)
+    return REGISTRY[name]
+
+
+def histogram(name: str, description: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = Histogram.DEFAULT_BUCKETS) -> Histogram:
+    """Return the histogram registered under `name`, creating it on first use."""
+    if name not in REGISTRY:
+        REGISTRY[name] = Histogram(name, description, labelnames, buckets)
+    return REGISTRY[name]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, (_escape(v) for v in values))]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render(registry: dict = REGISTRY) -> str:
+    """All metrics in `registry` in the Prometheus text exposition format."""
+    lines = []
+    for metric in list(registry.values()):
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if metric.kind == "histogram":
+            for key, (counts, total, count) in sorted(metric.samples().items()):
+                cumulative = 0
+                for bound, n in zip(metric.buckets + (float("inf"),), counts):
+                    cumulative += n
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{metric.name}_bucket{_format_labels(metric.labelnames, key, le)} {cumulative}")
+                lines.append(f"{metric.name}_sum{_format_labels(metric.labelnames, key)} {_format_value(total)}")
+                lines.append(f"{metric.name}_count{_format_labels(metric.labelnames, key)} {count}")
+        else:
+            for key, value in sorted(metric.samples().items()):
+                lines.append(f"{metric.name}{_format_labels(metric.labelnames, key)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
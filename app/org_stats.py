@@ -0,0 +1,176 @@
+"""
+Materialized per-organization rollups for dashboards.
+
+`org_meeting_stats` holds meeting counts and the average equity score of an
+organization per week and per month; `org_assignee_stats` holds its action
+item counts per assignee. Reading them is a primary-key range lookup, so the
+cost of `/organizations/{id}/stats` does not depend on how many meetings the
+organization has.
+
+`refresh` finds the organizations whose meetings, action items or meeting
+analytics have an `updated_at` at or after the stored watermark, recomputes
+only those organizations' rows and advances the watermark, all in one
+transaction. Deleted rows leave no `updated_at` behind, so `run_org_stats`
+also rebuilds every organization on a longer interval.
+"""
+import asyncio
+import logging
+import os
+import time
+
+from sqlalchemy import case, delete, func, insert, literal, select, union
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+import validation_models.sql_models as sql_models
+
+logger = logging.getLogger(__name__)
+
+PERIODS = ("week", "month")
+WATERMARK_NAME = "org_stats"
+# A row stamped just before the watermark is read can commit just after it,
+# so each refresh re-reads a few seconds of changes. Recomputing is idempotent.
+WATERMARK_OVERLAP = "-5 seconds"
+
+meetings = sql_models.Meeting.__table__
+action_items = sql_models.ActionItem.__table__
+meeting_analytics = sql_models.MeetingAnalytics.__table__
+participants = sql_models.MeetingParticipant.__table__
+meeting_stats = sql_models.OrgMeetingStats.__table__
+assignee_stats = sql_models.OrgAssigneeStats.__table__
+watermarks = sql_models.RollupWatermark.__table__
+
+
+def period_start(period: str, column):
+    """The first day of the ISO week (Monday) or month containing `column`."""
+    if period == "week":
+        return func.date(column, "weekday 0", "-6 days")
+    return func.date(column, "start of month")
+
+
+def count_where(condition):
+    return func.sum(case((condition, 1), else_=0))
+
+
+def changed_organizations(conn, since: str) -> set[int]:
+    """Organizations with a meeting, action item or meeting analytics row updated at or after `since`."""
+    stmt = union(
+        select(meetings.c.organization_id).where(meetings.c.updated_at >= since),
+        select(meetings.c.organization_id)
+        .join(action_items, action_items.c.meeting_id == meetings.c.id)
+        .where(action_items.c.updated_at >= since),
+        select(meetings.c.organization_id)
+        .join(meeting_analytics, meeting_analytics.c.meeting_id == meetings.c.id)
+        .where(meeting_analytics.c.updated_at >= since),
+    )
+    return set(conn.scalars(stmt))
+
+
+def recompute(conn, organization_ids: set[int] | None = None):
+    """Replace the rollup rows of the given organizations, or of all of them."""
+    def scoped(stmt, column):
+        return stmt if organization_ids is None else stmt.where(column.in_(organization_ids))
+
+    conn.execute(scoped(delete(meeting_stats), meeting_stats.c.organization_id))
+    for period in PERIODS:
+        start = period_start(period, meetings.c.scheduled_start_time)
+        rows = scoped(
+            select(
+                meetings.c.organization_id,
+                literal(period),
+                start,
+                func.count(),
+                count_where(meetings.c.status == "completed"),
+                count_where(meetings.c.status == "cancelled"),
+                func.count(meeting_analytics.c.participation_equity_score),
+                func.avg(meeting_analytics.c.participation_equity_score),
+            )
+            .select_from(meetings.outerjoin(meeting_analytics, meeting_analytics.c.meeting_id == meetings.c.id))
+            .group_by(meetings.c.organization_id, start),
+            meetings.c.organization_id,
+        )
+        conn.execute(insert(meeting_stats).from_select(
+            ["organization_id", "period", "period_start", "meeting_count", "completed_count",
+             "cancelled_count", "analyzed_count", "average_equity_score"],
+            rows,
+        ))
+
+    conn.execute(scoped(delete(assignee_stats), assignee_stats.c.organization_id))
+    rows = scoped(
+        select(
+            meetings.c.organization_id,
+            participants.c.user_id,
+            count_where(action_items.c.status == "open"),
+            count_where(action_items.c.status == "in_progress"),
+            count_where(action_items.c.status == "completed"),
+        )
+        .select_from(
+            action_items.join(meetings, meetings.c.id == action_items.c.meeting_id)
+            .outerjoin(participants, participants.c.id == action_items.c.assignee_participant_id)
+        )
+        .group_by(meetings.c.organization_id, participants.c.user_id),
+        meetings.c.organization_id,
+    )
+    conn.execute(insert(assignee_stats).from_select(
+        ["organization_id", "user_id", "open_count", "in_progress_count", "completed_count"], rows
+    ))
+
+
+def refresh(bind, full: bool = False) -> set[int] | None:
+    """Bring the rollups up to date. Returns the organizations refreshed, or None if all were."""
+    with bind.begin() as conn:
+        now = conn.scalar(select(func.datetime("now", WATERMARK_OVERLAP)))
+        since = conn.scalar(select(watermarks.c.watermark).where(watermarks.c.name == WATERMARK_NAME))
+        organization_ids = None if full or since is None else changed_organizations(conn, since)
+        if organization_ids != set():
+            recompute(conn, organization_ids)
+        stmt = sqlite_insert(watermarks).values(name=WATERMARK_NAME, watermark=now)
+        conn.execute(stmt.on_conflict_do_update(
+            index_elements=[watermarks.c.name],
+            set_={"watermark": stmt.excluded.watermark, "refreshed_at": func.current_timestamp()},
+        ))
+    return organization_ids
+
+
+def read_stats(conn, organization_id: int, period: str = "week", start: str | None = None, end: str | None = None) -> dict:
+    """An organization's rollups for periods starting within [start, end), oldest first."""
+    stmt = select(meeting_stats).where(
+        meeting_stats.c.organization_id == organization_id, meeting_stats.c.period == period
+    )
+    if start is not None:
+        stmt = stmt.where(meeting_stats.c.period_start >= start)
+    if end is not None:
+        stmt = stmt.where(meeting_stats.c.period_start < end)
+    periods = [dict(row._mapping) for row in conn.execute(stmt.order_by(meeting_stats.c.period_start))]
+
+    assignees = conn.execute(
+        select(assignee_stats, sql_models.User.full_name)
+        .outerjoin(sql_models.User, sql_models.User.id == assignee_stats.c.user_id)
+        .where(assignee_stats.c.organization_id == organization_id)
+        .order_by(assignee_stats.c.open_count.desc(), assignee_stats.c.user_id)
+    )
+    refreshed_at = conn.scalar(select(watermarks.c.refreshed_at).where(watermarks.c.name == WATERMARK_NAME))
+    return {
+        "organization_id": organization_id,
+        "period": period,
+        "refreshed_at": refreshed_at,
+        "periods": periods,
+        "assignees": [dict(row._mapping) for row in assignees],
+    }
+
+
+async def run_org_stats(bind, refresh_interval: float, rebuild_interval: float):
+    """Background loop refreshing the rollups incrementally and periodically rebuilding them."""
+    last_rebuild = time.monotonic()
+    while True:
+        await asyncio.sleep(refresh_interval)
+        try:
+            full = time.monotonic() - last_rebuild >= rebuild_interval
+            await asyncio.to_thread(refresh, bind, full)
+            if full:
+                last_rebuild = time.monotonic()
+        except Exception:
+            logger.exception("Failed to refresh organization rollups")
+
+
+REFRESH_SECONDS = float(os.getenv("ORG_STATS_REFRESH_SECONDS", "60"))
+REBUILD_SECONDS = float(os.getenv("ORG_STATS_REBUILD_SECONDS", "3600"))
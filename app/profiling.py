@@ -0,0 +1,329 @@
+"""
+Opt-in profiling of the running backend, for diagnosing slowdowns in place.
+
+Nothing here is reachable unless `PROFILING_TOKEN` is set. Every endpoint
+then requires the same token in an `X-Admin-Token` header. The request
+profiler and its threadpool hook are only installed when the token is set
+at startup, so an API that never profiles runs without them. Three tools are
+offered:
+
+- A sampling profiler. It reads every thread's stack from
+  `sys._current_frames()` at a fixed interval for a few seconds, and returns
+  the counts as collapsed stacks ("root;caller;callee count" lines). This is
+  the input format of flamegraph.pl and speedscope. The sampler runs on its
+  own thread and never traces calls, so its cost does not depend on the
+  traffic being profiled.
+- Per-request cProfile. Send `X-Profile: 1` with the admin token and that
+  request is profiled. The profile is kept in memory, and its id is returned
+  in an `X-Profile-Id` header. cProfile only sees the thread it is enabled
+  in, so sync handlers are profiled in their worker thread too, and the
+  parts are merged. The event loop part also includes whatever other
+  requests ran on the loop meanwhile. Only one request is profiled at a
+  time.
+- tracemalloc snapshots, and diffs between them, for chasing memory growth,
+  such as connections or state piling up in the `ConnectionManager`.
+"""
+import cProfile
+import contextvars
+import hmac
+import io
+import itertools
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from pathlib import Path
+
+import fastapi.routing
+from fastapi import Header, HTTPException
+from starlette.concurrency import run_in_threadpool
+
+MAX_SAMPLE_SECONDS = 60.0
+REQUEST_PROFILES_KEPT = 20
+SNAPSHOTS_KEPT = 10
+
+_APP_ROOT = str(Path(__file__).resolve().parent) + os.sep
+
+
+def enabled() -> bool:
+    return bool(os.getenv("PROFILING_TOKEN"))
+
+
+def token_matches(token: str | None) -> bool:
+    expected = os.getenv("PROFILING_TOKEN")
+    return bool(expected and token and hmac.compare_digest(token.encode(), expected.encode()))
+
+
+def require_admin(x_admin_token: str | None = Header(None)):
+    """Dependency guarding the profiling endpoints: 404 while profiling is off, 403 without the token."""
+    if not enabled():
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token_matches(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+# --- Sampling profiler ---
+
+class Busy(Exception):
+    """Raised when a profiling session is already running."""
+
+
+_sampling = threading.Lock()
+
+
+def frame_label(code, labels: dict) -> str:
+    label = labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        if filename.startswith(_APP_ROOT):
+            filename = filename[len(_APP_ROOT):]
+        else:
+            # site-packages/fastapi/routing.py reads better than the full path
+            filename = "/".join(Path(filename).parts[-2:])
+        label = labels[code] = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+    return label
+
+
+def sample_stacks(seconds: float, interval: float) -> Counter:
+    """Collapsed stacks of every other thread, sampled every `interval` for `seconds`."""
+    if not _sampling.acquire(blocking=False):
+        raise Busy("A sampling profile is already running")
+    try:
+        me = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        labels: dict = {}
+        counts: Counter = Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame.f_code, labels))
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names.update((thread.ident, thread.name) for thread in threading.enumerate())
+                stack.append(names.get(thread_id, f"thread-{thread_id}").replace(";", ":"))
+                counts[";".join(reversed(stack))] += 1
+            time.sleep(interval)
+        return counts
+    finally:
+        _sampling.release()
+
+
+def collapsed(counts: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(counts.items()))
+
+
+# --- Per-request cProfile ---
+
+class RequestProfile:
+    def __init__(self, profile_id: int, method: str, path: str):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.status: int | None = None
+        self.seconds = 0.0
+        self.created_at = time.time()
+        self.stats: pstats.Stats | None = None
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id, "method": self.method, "path": self.path, "status": self.status,
+            "seconds": round(self.seconds, 6), "created_at": self.created_at,
+        }
+
+    def report(self, sort: str, limit: int) -> str:
+        out = io.StringIO()
+        # A copy, so concurrent reports can sort differently
+        stats = pstats.Stats(stream=out)
+        stats.add(self.stats)
+        stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def dump(self) -> bytes:
+        """The profile in the binary format `pstats`, snakeviz and friends load."""
+        return marshal.dumps(self.stats.stats)
+
+
+class RequestProfiles:
+    """The most recent request profiles, by id."""
+
+    def __init__(self, kept: int = REQUEST_PROFILES_KEPT):
+        self.kept = kept
+        self._profiles: OrderedDict[int, RequestProfile] = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def new(self, method: str, path: str) -> RequestProfile:
+        with self._lock:
+            return RequestProfile(next(self._ids), method, path)
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.kept:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: int) -> RequestProfile | None:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> list[RequestProfile]:
+        with self._lock:
+            return list(reversed(self._profiles.values()))
+
+
+request_profiles = RequestProfiles()
+
+# Profilers started in worker threads on behalf of the request being profiled
+_thread_profiles: contextvars.ContextVar[list | None] = contextvars.ContextVar("thread_profiles", default=None)
+
+
+def _profiled_call(func, *args, **kwargs):
+    profiles = _thread_profiles.get()
+    profile = cProfile.Profile()
+    profiles.append(profile)
+    profile.enable()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profile.disable()
+
+
+async def _run_in_threadpool(func, *args, **kwargs):
+    if _thread_profiles.get() is None:
+        return await run_in_threadpool(func, *args, **kwargs)
+    return await run_in_threadpool(_profiled_call, func, *args, **kwargs)
+
+
+def install():
+    """Route FastAPI's threadpool calls through a wrapper that can profile them."""
+    fastapi.routing.run_in_threadpool = _run_in_threadpool
+
+
+def uninstall():
+    fastapi.routing.run_in_threadpool = run_in_threadpool
+
+
+class RequestProfiler:
+    """ASGI middleware profiling requests that carry `X-Profile` and the admin token."""
+
+    def __init__(self, app):
+        self.app = app
+        self._active = False
+
+    def wants_profile(self, scope) -> bool:
+        if scope["type"] != "http" or self._active or not enabled():
+            return False
+        headers = dict(scope["headers"])
+        return headers.get(b"x-profile") == b"1" and token_matches(headers.get(b"x-admin-token", b"").decode("latin-1"))
+
+    async def __call__(self, scope, receive, send):
+        if not self.wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        # The event loop thread can hold only one profiler at a time
+        self._active = True
+        record = request_profiles.new(scope["method"], scope["path"])
+        thread_profiles = []
+        token = _thread_profiles.set(thread_profiles)
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                record.status = message["status"]
+                message = dict(message, headers=list(message.get("headers", [])) + [(b"x-profile-id", str(record.id).encode())])
+            await send(message)
+
+        loop_profile = cProfile.Profile()
+        started = time.perf_counter()
+        loop_profile.enable()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            loop_profile.disable()
+            record.seconds = time.perf_counter() - started
+            _thread_profiles.reset(token)
+            self._active = False
+            stats = pstats.Stats(loop_profile)
+            for profile in thread_profiles:
+                stats.add(profile)
+            record.stats = stats
+            request_profiles.add(record)
+
+
+# --- tracemalloc ---
+
+class Snapshots:
+    """tracemalloc snapshots taken on request, the most recent ones by id."""
+
+    def __init__(self, kept: int = SNAPSHOTS_KEPT):
+        self.kept = kept
+        self._snapshots: OrderedDict[int, tracemalloc.Snapshot] = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start(self, frames: int):
+        if tracemalloc.is_tracing():
+            return
+        tracemalloc.start(frames)
+
+    def stop(self):
+        tracemalloc.stop()
+        with self._lock:
+            self._snapshots.clear()
+
+    @staticmethod
+    def take() -> tracemalloc.Snapshot:
+        if not tracemalloc.is_tracing():
+            raise Busy("tracemalloc is not running; start it first")
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+
+    def add(self, snapshot: tracemalloc.Snapshot) -> int:
+        with self._lock:
+            snapshot_id = next(self._ids)
+            self._snapshots[snapshot_id] = snapshot
+            while len(self._snapshots) > self.kept:
+                self._snapshots.popitem(last=False)
+            return snapshot_id
+
+    def get(self, snapshot_id: int) -> tracemalloc.Snapshot | None:
+        with self._lock:
+            return self._snapshots.get(snapshot_id)
+
+
+snapshots = Snapshots()
+
+
+def stat_dict(stat) -> dict:
+    frame = stat.traceback[0]
+    return {
+        "location": f"{frame.filename}:{frame.lineno}",
+        "traceback": [f"{f.filename}:{f.lineno}" for f in stat.traceback],
+        "size_bytes": stat.size,
+        "count": stat.count,
+        "size_diff_bytes": getattr(stat, "size_diff", None),
+        "count_diff": getattr(stat, "count_diff", None),
+    }
+
+
+def top_allocations(snapshot: tracemalloc.Snapshot, group_by: str, limit: int, filename: str | None = None) -> list[dict]:
+    if filename:
+        snapshot = snapshot.filter_traces((tracemalloc.Filter(True, f"*{filename}*"),))
+    return [stat_dict(stat) for stat in snapshot.statistics(group_by)[:limit]]
+
+
+def diff(base: tracemalloc.Snapshot, target: tracemalloc.Snapshot, group_by: str, limit: int, filename: str | None = None) -> list[dict]:
+    """The allocations that grew the most from `base` to `target`."""
+    if filename:
+        only = (tracemalloc.Filter(True, f"*{filename}*"),)
+        base, target = base.filter_traces(only), target.filter_traces(only)
+    return [stat_dict(stat) for stat in target.compare_to(base, group_by)[:limit]]
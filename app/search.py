@@ -0,0 +1,215 @@
+"""
+Full-text search over transcripts, decisions and action items.
+
+Each searchable column is mirrored into an SQLite FTS5 table that uses the
+source table as external content, so the text is stored only once. Triggers
+keep the index in sync on insert, update and delete. The tables are created
+with the rest of the schema by `Base.metadata.create_all`, and an index that
+is created on an existing database is rebuilt from its source table once.
+The same DDL is declared in artifacts/schema.sql.
+
+Transcript entries moved to the archive by app/archive.py leave their table,
+and with it `transcript_entries_fts`. The archiver indexes them in
+`archived_entries_fts` instead, a contentless table since their text then
+lives only in the archive chunks, and `search` queries both. Snippets of
+archived matches are cut from the chunk text with the same tokenizer.
+"""
+import html
+from dataclasses import dataclass
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from validation_models.sql_models import Base
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    """An FTS5 index over one text column of `source`."""
+    result_type: str
+    source: str
+    column: str
+    # Joins from the matched source row `src` to its meeting `m`
+    scope_joins: str
+
+    @property
+    def table(self) -> str:
+        return f"{self.source}_fts"
+
+    def ddl(self) -> list[str]:
+        t, s, c = self.table, self.source, self.column
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {t} USING fts5({c}, content='{s}', content_rowid='id', tokenize='{TOKENIZE}')",
+            f"CREATE TRIGGER IF NOT EXISTS {t}_ai AFTER INSERT ON {s} BEGIN "
+            f"INSERT INTO {t}(rowid, {c}) VALUES (new.id, new.{c}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {t}_ad AFTER DELETE ON {s} BEGIN "
+            f"INSERT INTO {t}({t}, rowid, {c}) VALUES ('delete', old.id, old.{c}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {t}_au AFTER UPDATE OF {c} ON {s} BEGIN "
+            f"INSERT INTO {t}({t}, rowid, {c}) VALUES ('delete', old.id, old.{c}); "
+            f"INSERT INTO {t}(rowid, {c}) VALUES (new.id, new.{c}); END",
+        ]
+
+
+SEARCH_INDEXES = {
+    index.result_type: index
+    for index in (
+        SearchIndex(
+            result_type="transcript_entry",
+            source="transcript_entries",
+            column="text",
+            scope_joins="JOIN transcripts t ON t.id = src.transcript_id JOIN meetings m ON m.id = t.meeting_id",
+        ),
+        SearchIndex(
+            result_type="decision",
+            source="decisions",
+            column="description",
+            scope_joins="JOIN meetings m ON m.id = src.meeting_id",
+        ),
+        SearchIndex(
+            result_type="action_item",
+            source="action_items",
+            column="description",
+            scope_joins="JOIN meetings m ON m.id = src.meeting_id",
+        ),
+    )
+}
+
+ARCHIVE_INDEX = "archived_entries_fts"
+TOKENIZE = "porter unicode61"
+
+
+def create_archive_index(connection):
+    connection.exec_driver_sql(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {ARCHIVE_INDEX} USING fts5(text, content='', tokenize='{TOKENIZE}')"
+    )
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_search_indexes(target, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    for index in SEARCH_INDEXES.values():
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (index.table,)
+        ).first()
+        for statement in index.ddl():
+            connection.exec_driver_sql(statement)
+        if not exists:
+            # Index rows that predate the triggers
+            connection.exec_driver_sql(f"INSERT INTO {index.table}({index.table}) VALUES ('rebuild')")
+    create_archive_index(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def drop_search_indexes(target, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    for index in SEARCH_INDEXES.values():
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {index.table}")
+    connection.exec_driver_sql(f"DROP TABLE IF EXISTS {ARCHIVE_INDEX}")
+
+
+# Private-use characters stand in for the highlight tags, so the text around them can be escaped
+MARK_OPEN, MARK_CLOSE = "\ue000", "\ue001"
+
+
+def match_expression(query: str) -> str:
+    """Turn free text into an FTS5 query matching every term.
+
+    Terms are quoted so punctuation and FTS operators in user input are taken
+    literally; a trailing `*` keeps its meaning as a prefix search.
+    """
+    terms = []
+    for term in query.split():
+        prefix = term.endswith("*")
+        term = term.rstrip("*")
+        if term:
+            terms.append('"' + term.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def search(
+    db: Session,
+    query: str,
+    *,
+    types: list[str] | None = None,
+    meeting_id: int | None = None,
+    organization_id: int | None = None,
+    limit: int = 20,
+    offset: int = 0,
+    store=None,
+) -> list[dict]:
+    """Rank matches across the search indexes by BM25, best first.
+
+    Returns up to `limit` results starting at `offset`, each with a
+    highlighted snippet of the matching text. The snippet is HTML: the
+    source text is escaped, and only the <mark> tags around matched terms
+    are markup. Ties in score are broken by type and id, so pages are stable.
+    Archived transcript entries are read from `store`, by default the
+    archive the API serves.
+    """
+    params = {"query": match_expression(query), "limit": limit, "offset": offset}
+    filters = ""
+    if meeting_id is not None:
+        filters += " AND m.id = :meeting_id"
+        params["meeting_id"] = meeting_id
+    if organization_id is not None:
+        filters += " AND m.organization_id = :organization_id"
+        params["organization_id"] = organization_id
+
+    selects = []
+    for result_type in types or SEARCH_INDEXES:
+        index = SEARCH_INDEXES[result_type]
+        selects.append(
+            f"SELECT '{index.result_type}' AS type, src.id AS id, m.id AS meeting_id, "
+            f"m.organization_id AS organization_id, "
+            f"snippet({index.table}, 0, '{MARK_OPEN}', '{MARK_CLOSE}', '…', 16) AS snippet, "
+            f"bm25({index.table}) AS score "
+            f"FROM {index.table} JOIN {index.source} src ON src.id = {index.table}.rowid {index.scope_joins} "
+            f"WHERE {index.table} MATCH :query{filters}"
+        )
+        if result_type == "transcript_entry":
+            # Archived entries have no source row to cut a snippet from; it is filled in below
+            selects.append(
+                f"SELECT 'transcript_entry' AS type, a.id AS id, m.id AS meeting_id, "
+                f"m.organization_id AS organization_id, NULL AS snippet, bm25({ARCHIVE_INDEX}) AS score "
+                f"FROM {ARCHIVE_INDEX} JOIN archived_entries a ON a.id = {ARCHIVE_INDEX}.rowid "
+                f"JOIN transcripts t ON t.id = a.transcript_id JOIN meetings m ON m.id = t.meeting_id "
+                f"WHERE {ARCHIVE_INDEX} MATCH :query{filters}"
+            )
+    sql = " UNION ALL ".join(selects) + " ORDER BY score, type, id LIMIT :limit OFFSET :offset"
+    results = [dict(row) for row in db.execute(text(sql), params).mappings()]
+    archived = [result["id"] for result in results if result["snippet"] is None]
+    if archived:
+        snippets = archived_snippets(db, params["query"], archived, store)
+        for result in results:
+            if result["snippet"] is None:
+                result["snippet"] = snippets.get(result["id"], "")
+    return [dict(result, snippet=highlight(result["snippet"])) for result in results]
+
+
+def archived_snippets(db: Session, query: str, entry_ids: list[int], store=None) -> dict[int, str]:
+    """Snippets of archived entries, cut from their chunk text in a scratch FTS5 table on the connection."""
+    # archive imports this module
+    import archive
+
+    entries = archive.find_entries(db, entry_ids, store)
+    db.execute(text(f"CREATE VIRTUAL TABLE IF NOT EXISTS temp.archived_snippets USING fts5(text, tokenize='{TOKENIZE}')"))
+    db.execute(text("DELETE FROM temp.archived_snippets"))
+    db.execute(
+        text("INSERT INTO temp.archived_snippets(rowid, text) VALUES (:id, :text)"),
+        [{"id": entry_id, "text": entry["text"]} for entry_id, entry in entries.items()],
+    )
+    rows = db.execute(
+        text(
+            f"SELECT rowid, snippet(archived_snippets, 0, '{MARK_OPEN}', '{MARK_CLOSE}', '…', 16) "
+            f"FROM temp.archived_snippets WHERE archived_snippets MATCH :query"
+        ),
+        {"query": query},
+    )
+    return dict(rows.tuples().all())
+
+
+def highlight(snippet: str) -> str:
+    """Escape a snippet's source text for HTML and turn its match markers into <mark> tags."""
+    return html.escape(snippet).replace(MARK_OPEN, "<mark>").replace(MARK_CLOSE, "</mark>")
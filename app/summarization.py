@@ -0,0 +1,253 @@
+"""
+Map-reduce summarization of meeting transcripts into `meeting_summaries`.
+
+A transcript is split into chunks within a token budget. Each chunk is
+summarized on its own, several at a time. The partial summaries are then
+combined in groups that fit the same budget, level by level, until one
+summary is left. No single call sees more than one chunk's worth of text,
+however long the meeting was.
+
+Chunk boundaries are content-defined: after the first half of the budget, a
+chunk ends at a line whose hash matches a fixed pattern, and it always ends
+once the budget is full. An edit therefore only changes the chunks around
+it, and boundaries further on stay where they were. Every LLM call is cached
+under a hash of the model and prompt. A re-run after a small edit only
+summarizes the changed chunks, plus the reduce steps above them.
+
+Any object with an `invoke(prompt)` method that returns a string or a
+message with `content` will do as the LLM, so tests can pass a fake.
+"""
+import functools
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+import archive
+import transcripts
+import validation_models.sql_models as sql_models
+
+logger = logging.getLogger(__name__)
+
+# Bump when the prompts change, so cached summaries from the old ones are not reused
+PROMPT_VERSION = "1"
+
+# The prompt holds nothing but the chunk, so an unchanged chunk keeps its cache key
+MAP_PROMPT = """You are summarizing an excerpt of a meeting transcript.
+Write concise notes on what was discussed, decided and assigned in this part.
+Keep names, numbers and dates. Do not add anything that is not in the transcript.
+
+Transcript:
+{text}"""
+
+REDUCE_PROMPT = """Below are notes on consecutive parts of one meeting, in order.
+Combine them into a single summary of the meeting: the main topics, the decisions
+made and the action items with their owners. Remove repetition and keep it concise.
+
+{text}"""
+
+# Lines whose hash is a multiple of this can end a chunk once it is half full
+BOUNDARY_DIVISOR = 8
+
+
+def estimate_tokens(text: str) -> int:
+    # Rough rule of thumb for English text, as in agents/fake_llm.py
+    return max(1, len(text) // 4)
+
+
+@dataclass
+class Chunk:
+    text: str
+    tokens: int
+    first_entry_id: int
+    last_entry_id: int
+
+
+@dataclass
+class SummaryResult:
+    meeting_id: int
+    summary_text: str
+    chunks: int
+    levels: int
+    llm_calls: int
+    cache_hits: int
+
+
+def transcript_lines(session: Session, meeting_id: int) -> Iterator[tuple[int, str]]:
+    """(entry id, "[hh:mm:ss] Speaker: text") for a meeting's transcript, in spoken order."""
+    transcript_id = session.scalar(
+        select(sql_models.Transcript.id).where(sql_models.Transcript.meeting_id == meeting_id)
+    )
+    if transcript_id is None:
+        return
+    # Archived entries are merged back in, as the export route does
+    archived = archive.archived_entries(session, transcript_id)
+    archived_rows = archive.export_rows(session, archived) if archived is not None else None
+    stmt = transcripts.export_query(transcript_id).execution_options(yield_per=1000)
+    rows = session.execute(stmt).mappings()
+    if archived_rows is not None:
+        rows = transcripts.merge_rows(archived_rows, rows)
+    for row in rows:
+        timestamp = transcripts.vtt_timestamp(row["start_time_offset_seconds"])[:-4]
+        yield row["id"], f"[{timestamp}] {row['speaker']}: {' '.join(row['text'].split())}"
+
+
+def is_boundary(line: str) -> bool:
+    digest = hashlib.blake2b(line.encode(), digest_size=4).digest()
+    return int.from_bytes(digest, "big") % BOUNDARY_DIVISOR == 0
+
+
+def chunk_lines(lines: Iterable[tuple[int, str]], budget: int) -> list[Chunk]:
+    """Group lines into content-defined chunks of at most `budget` tokens.
+
+    A single line longer than the budget becomes a chunk of its own.
+    """
+    chunks, parts, tokens, first_id = [], [], 0, None
+    for entry_id, line in lines:
+        line_tokens = estimate_tokens(line) + 1
+        if parts and tokens + line_tokens > budget:
+            chunks.append(Chunk("\n".join(parts), tokens, first_id, last_id))
+            parts, tokens = [], 0
+        if not parts:
+            first_id = entry_id
+        parts.append(line)
+        tokens += line_tokens
+        last_id = entry_id
+        if tokens >= budget // 2 and is_boundary(line):
+            chunks.append(Chunk("\n".join(parts), tokens, first_id, last_id))
+            parts, tokens = [], 0
+    if parts:
+        chunks.append(Chunk("\n".join(parts), tokens, first_id, last_id))
+    return chunks
+
+
+def group_by_budget(texts: list[str], budget: int) -> list[list[str]]:
+    """Consecutive runs of `texts` that each fit in `budget` tokens, at least two per run."""
+    groups, group, tokens = [], [], 0
+    for text in texts:
+        text_tokens = estimate_tokens(text)
+        if len(group) >= 2 and tokens + text_tokens > budget:
+            groups.append(group)
+            group, tokens = [], 0
+        group.append(text)
+        tokens += text_tokens
+    if len(group) == 1 and groups:
+        groups[-1].append(group[0])
+    elif group:
+        groups.append(group)
+    return groups
+
+
+class Summarizer:
+    """Summarizes transcripts with `llm`, caching every call in `summary_cache`.
+
+    `model_name` is part of the cache key, so summaries from another model
+    are never reused. At most `concurrency` LLM calls run at once.
+    """
+
+    def __init__(self, llm, *, model_name: str = "default", chunk_tokens: int = 2000, concurrency: int = 4):
+        self.llm = llm
+        self.model_name = model_name
+        self.chunk_tokens = chunk_tokens
+        self.concurrency = concurrency
+
+    def _complete(self, prompt: str) -> str:
+        response = self.llm.invoke(prompt)
+        return str(getattr(response, "content", response)).strip()
+
+    def content_hash(self, prompt: str) -> str:
+        return hashlib.sha256(f"{PROMPT_VERSION}\0{self.model_name}\0{prompt}".encode()).hexdigest()
+
+    def complete_all(self, session: Session, prompts: list[str], result: SummaryResult) -> list[str]:
+        """Answer every prompt, from the cache where possible and concurrently otherwise."""
+        hashes = [self.content_hash(prompt) for prompt in prompts]
+        cache = sql_models.SummaryCache.__table__
+        cached = dict(session.execute(select(cache.c.content_hash, cache.c.summary).where(cache.c.content_hash.in_(set(hashes)))).all())
+        missing = {h: p for h, p in zip(hashes, prompts) if h not in cached}
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                answers = dict(zip(missing, pool.map(self._complete, missing.values())))
+            session.execute(
+                sqlite_insert(cache).on_conflict_do_nothing(),
+                [{"content_hash": h, "summary": summary} for h, summary in answers.items()],
+            )
+            session.commit()
+            cached.update(answers)
+        result.llm_calls += len(missing)
+        result.cache_hits += len(hashes) - len(missing)
+        return [cached[h] for h in hashes]
+
+    def summarize(self, session: Session, meeting_id: int) -> SummaryResult | None:
+        """The meeting's summary, or None if it has no transcript entries."""
+        chunks = chunk_lines(transcript_lines(session, meeting_id), self.chunk_tokens)
+        if not chunks:
+            return None
+        result = SummaryResult(meeting_id, "", chunks=len(chunks), levels=0, llm_calls=0, cache_hits=0)
+        prompts = [MAP_PROMPT.format(text=chunk.text) for chunk in chunks]
+        summaries = self.complete_all(session, prompts, result)
+        # Always reduce at least once, so a short meeting gets the same kind of summary as a long one
+        while len(summaries) > 1 or result.levels == 0:
+            groups = group_by_budget(summaries, self.chunk_tokens)
+            prompts = [REDUCE_PROMPT.format(text="\n\n---\n\n".join(group)) for group in groups]
+            summaries = self.complete_all(session, prompts, result)
+            result.levels += 1
+        result.summary_text = summaries[0]
+        return result
+
+
+def write_summary(session: Session, meeting_id: int, summary_text: str) -> sql_models.MeetingSummary:
+    """Upsert the meeting's summary, leaving the note-taker's notes on the same row alone."""
+    summary = session.scalars(
+        select(sql_models.MeetingSummary).where(sql_models.MeetingSummary.meeting_id == meeting_id)
+    ).first()
+    if summary is None:
+        summary = sql_models.MeetingSummary(meeting_id=meeting_id, summary_text=summary_text)
+        session.add(summary)
+    else:
+        summary.summary_text = summary_text
+        summary.generated_at = func.current_timestamp()
+    session.commit()
+    return summary
+
+
+def summarize_meeting(session: Session, meeting_id: int, summarizer: Summarizer) -> SummaryResult | None:
+    result = summarizer.summarize(session, meeting_id)
+    if result is not None:
+        write_summary(session, meeting_id, result.summary_text)
+        logger.info(
+            "Summarized meeting %s: %s chunks, %s levels, %s LLM calls, %s cached",
+            meeting_id, result.chunks, result.levels, result.llm_calls, result.cache_hits,
+        )
+    return result
+
+
+def llm_configured() -> bool:
+    return bool(os.getenv("GOOGLE_API_KEY"))
+
+
+@functools.lru_cache(maxsize=None)
+def default_llm(model: str):
+    """Gemini through LangChain, for the backend's own LLM jobs."""
+    if not llm_configured():
+        raise RuntimeError("GOOGLE_API_KEY environment variable not set; it is needed for LLM jobs.")
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(model=model, api_key=os.environ["GOOGLE_API_KEY"], max_tokens=2048)
+
+
+@functools.lru_cache(maxsize=1)
+def default_summarizer() -> Summarizer:
+    """A Summarizer around Gemini, configured from the environment."""
+    model = os.getenv("SUMMARY_MODEL", "gemini-2.5-flash")
+    return Summarizer(
+        default_llm(model),
+        model_name=model,
+        chunk_tokens=int(os.getenv("SUMMARY_CHUNK_TOKENS", "2000")),
+        concurrency=int(os.getenv("SUMMARY_CONCURRENCY", "4")),
+    )
@@ -0,0 +1,190 @@
+"""
+Queries over the entries of a single transcript.
+
+Entries are read in spoken order through the (transcript_id,
+start_time_offset_seconds) index, so a time-window lookup costs a B-tree
+seek plus the rows it returns, however long the transcript is. Results are
+streamed from a server-side cursor rather than loaded into memory, which
+also lets whole transcripts be exported in constant memory.
+
+Transcripts moved to the archive by app/archive.py yield their archived
+entries separately; `merge_rows` interleaves them with the rows still in the
+table.
+"""
+import csv
+import heapq
+import io
+import json
+import zlib
+from itertools import islice
+from typing import Iterable, Iterator
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+import validation_models.sql_models as sql_models
+
+ENTRY_COLUMNS = (
+    sql_models.TranscriptEntry.id,
+    sql_models.TranscriptEntry.transcript_id,
+    sql_models.TranscriptEntry.participant_id,
+    sql_models.TranscriptEntry.text,
+    sql_models.TranscriptEntry.start_time_offset_seconds,
+    sql_models.TranscriptEntry.end_time_offset_seconds,
+)
+
+
+def entries_query(
+    transcript_id: int,
+    start: int | None = None,
+    end: int | None = None,
+    participant_ids: Iterable[int] | None = None,
+    limit: int | None = None,
+) -> Select:
+    """Entries of a transcript that start within [start, end), in spoken order."""
+    entry = sql_models.TranscriptEntry
+    stmt = select(*ENTRY_COLUMNS).where(entry.transcript_id == transcript_id)
+    if start is not None:
+        stmt = stmt.where(entry.start_time_offset_seconds >= start)
+    if end is not None:
+        stmt = stmt.where(entry.start_time_offset_seconds < end)
+    if participant_ids:
+        stmt = stmt.where(entry.participant_id.in_(list(participant_ids)))
+    stmt = stmt.order_by(entry.start_time_offset_seconds, entry.id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def iter_rows(bind, stmt: Select, batch_size: int = 1000) -> Iterator[dict]:
+    """Yield result rows as dicts, fetching `batch_size` rows at a time.
+
+    Uses its own session on `bind` so the stream can outlive the request
+    handler that started it.
+    """
+    with Session(bind=bind) as session:
+        result = session.execute(stmt.execution_options(yield_per=batch_size))
+        keys = list(result.keys())
+        for row in result:
+            yield dict(zip(keys, row))
+
+
+def spoken_order(row) -> tuple[int, int]:
+    return row["start_time_offset_seconds"], row["id"]
+
+
+def merge_rows(*streams: Iterable, limit: int | None = None) -> Iterator:
+    """Merge row streams that are each in spoken order, such as archived entries and those still in the table."""
+    rows = heapq.merge(*streams, key=spoken_order)
+    return islice(rows, limit) if limit is not None else rows
+
+
+def stream_json_array(rows: Iterator[dict]) -> Iterator[str]:
+    """Encode rows as a JSON array, one element at a time."""
+    yield "["
+    for i, row in enumerate(rows):
+        yield ("," if i else "") + json.dumps(row)
+    yield "]"
+
+
+# --- Export ---
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "vtt": "text/vtt",
+}
+EXPORT_FIELDS = ["id", "participant_id", "speaker", "start_time_offset_seconds", "end_time_offset_seconds", "text"]
+
+
+def export_query(transcript_id: int) -> Select:
+    """Every entry of a transcript with its speaker's name, in spoken order."""
+    entry = sql_models.TranscriptEntry
+    return (
+        select(
+            entry.id,
+            entry.participant_id,
+            sql_models.User.full_name.label("speaker"),
+            entry.start_time_offset_seconds,
+            entry.end_time_offset_seconds,
+            entry.text,
+        )
+        .join(sql_models.MeetingParticipant, sql_models.MeetingParticipant.id == entry.participant_id)
+        .join(sql_models.User, sql_models.User.id == sql_models.MeetingParticipant.user_id)
+        .where(entry.transcript_id == transcript_id)
+        .order_by(entry.start_time_offset_seconds, entry.id)
+    )
+
+
+def vtt_timestamp(seconds: int) -> str:
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.000"
+
+
+def vtt_escape(value: str) -> str:
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def format_rows(rows: Iterator[dict], fmt: str) -> Iterator[str]:
+    """Encode export rows as NDJSON, CSV or WebVTT text, one entry at a time."""
+    if fmt == "ndjson":
+        for row in rows:
+            yield json.dumps(row) + "\n"
+    elif fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+    elif fmt == "vtt":
+        yield "WEBVTT\n"
+        for cue, row in enumerate(rows, 1):
+            yield (
+                f"\n{cue}\n"
+                f"{vtt_timestamp(row['start_time_offset_seconds'])} --> {vtt_timestamp(row['end_time_offset_seconds'])}\n"
+                f"<v {vtt_escape(row['speaker'])}>{vtt_escape(' '.join(row['text'].splitlines()))}\n"
+            )
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+
+def buffered(chunks: Iterator[str], size: int = 64 * 1024) -> Iterator[bytes]:
+    """Join small text chunks into blocks of about `size` bytes."""
+    parts, length = [], 0
+    for chunk in chunks:
+        parts.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield "".join(parts).encode()
+            parts, length = [], 0
+    if parts:
+        yield "".join(parts).encode()
+
+
+def gzipped(blocks: Iterator[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream into a gzip member on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for block in blocks:
+        data = compressor.compress(block)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_transcript(
+    bind, transcript_id: int, fmt: str, compress: bool = False, archived: Iterator[dict] | None = None
+) -> Iterator[bytes]:
+    """Stream a transcript export in constant memory, optionally gzip-compressed.
+
+    `archived` are the transcript's archived entries, in the shape of `export_query` rows.
+    """
+    rows = iter_rows(bind, export_query(transcript_id))
+    if archived is not None:
+        rows = merge_rows(archived, rows)
+    blocks = buffered(format_rows(rows, fmt))
+    return gzipped(blocks) if compress else blocks
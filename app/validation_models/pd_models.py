@@ -9,7 +9,7 @@ from __future__ import annotations
 
 from datetime import date, datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Generic, List, Literal, Optional, TypeVar
 
 from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
@@ -54,6 +54,13 @@ class UserIntegrationService(str, Enum):
     JIRA = 'Jira'
 
 
+class SearchResultType(str, Enum):
+    """Enumeration for the kinds of records returned by search."""
+    TRANSCRIPT_ENTRY = 'transcript_entry'
+    DECISION = 'decision'
+    ACTION_ITEM = 'action_item'
+
+
 class UserIntegrationStatus(str, Enum):
     """Enumeration for the status of a user's integration."""
     ACTIVE = 'active'
@@ -247,6 +254,7 @@ class ActionItemBase(BaseModel):
     due_date: Optional[date] = Field(None, description="The due date for the action item.")
     status: ActionItemStatus = Field(default='open', description="The current status of the action item.")
     source_transcript_entry_id: Optional[int] = Field(None, description="The transcript entry that originated this item.")
+    idempotency_key: Optional[str] = Field(None, description="A client-chosen key; upserting with the same key updates the same item.")
 
 
 class ActionItemCreate(ActionItemBase):
@@ -302,7 +310,8 @@ class DecisionWithSource(Decision):
 
 class MeetingSummaryBase(BaseModel):
     meeting_id: int = Field(..., description="The ID of the meeting being summarized.")
-    summary_text: str = Field(..., description="The generated summary of the meeting.")
+    summary_text: str = Field("", description="The generated summary of the meeting.")
+    notes: Optional[str] = Field(None, description="The note-taker agent's live notes, in Markdown.")
 
 
 class MeetingSummaryCreate(MeetingSummaryBase):
@@ -311,6 +320,7 @@ class MeetingSummaryCreate(MeetingSummaryBase):
 
 class MeetingSummaryUpdate(BaseModel):
     summary_text: Optional[str] = Field(None, description="The updated summary text.")
+    notes: Optional[str] = Field(None, description="The updated notes.")
 
 
 class MeetingSummary(MeetingSummaryBase):
@@ -353,6 +363,7 @@ class ParticipantAnalyticsBase(BaseModel):
     participant_id: int = Field(..., description="The ID of the participant being analyzed.")
     speaking_time_seconds: int = Field(default=0, description="Total speaking time for the participant in seconds.")
     prompt_count: int = Field(default=0, description="The number of times the participant was prompted by an agent.")
+    turn_count: int = Field(default=0, description="The number of separate turns the participant spoke.")
 
 
 class ParticipantAnalyticsCreate(ParticipantAnalyticsBase):
@@ -385,6 +396,19 @@ class MeetingAnalytics(MeetingAnalyticsBase):
     model_config = orm_config
 
 
+class MeetingAnalyticsWithParticipants(MeetingAnalyticsBase):
+    """Meeting analytics together with the per-participant breakdown."""
+    id: int
+    created_at: datetime
+    participant_analytics: List[ParticipantAnalytics] = []
+    model_config = orm_config
+
+
+class LiveMeetingAnalytics(MeetingAnalyticsBase):
+    """Participation so far, computed from the running per-meeting aggregates."""
+    participants: List[ParticipantAnalyticsBase] = []
+
+
 # --- Meeting Models (including comprehensive response model) ---
 
 class MeetingBase(BaseModel):
@@ -425,4 +449,157 @@ class MeetingDetails(Meeting):
     action_items: List[ActionItemWithDetails] = []
     decisions: List[DecisionWithSource] = []
     summary: Optional[MeetingSummary] = None
-    analytics: Optional[MeetingAnalytics] = None
\ No newline at end of file
+    analytics: Optional[MeetingAnalytics] = None
+
+
+class OrganizationPeriodStats(BaseModel):
+    period_start: str = Field(..., description="The first day of the week (a Monday) or month.")
+    meeting_count: int
+    completed_count: int
+    cancelled_count: int
+    analyzed_count: int = Field(..., description="Meetings with a participation equity score.")
+    average_equity_score: Optional[float] = None
+
+
+class OrganizationAssigneeStats(BaseModel):
+    user_id: Optional[int] = Field(None, description="The assignee, or null for unassigned action items.")
+    full_name: Optional[str] = None
+    open_count: int
+    in_progress_count: int
+    completed_count: int
+
+
+class OrganizationStats(BaseModel):
+    organization_id: int
+    period: Literal["week", "month"]
+    refreshed_at: Optional[str] = Field(None, description="When the rollups were last refreshed (UTC).")
+    periods: List[OrganizationPeriodStats] = []
+    assignees: List[OrganizationAssigneeStats] = []
+
+
+# --- Search Models ---
+
+class SearchResult(BaseModel):
+    type: SearchResultType = Field(..., description="The kind of record that matched.")
+    id: int = Field(..., description="The ID of the matching record.")
+    meeting_id: int = Field(..., description="The ID of the meeting the record belongs to.")
+    organization_id: int = Field(..., description="The ID of the organization the meeting belongs to.")
+    snippet: str = Field(..., description="The matching text as escaped HTML, with matched terms wrapped in <mark> tags.")
+    score: float = Field(..., description="BM25 relevance; lower is more relevant.")
+
+
+class SearchResults(BaseModel):
+    query: str
+    limit: int
+    offset: int
+    next_offset: Optional[int] = Field(None, description="The offset of the next page, if there are more results.")
+    results: List[SearchResult] = []
+
+
+# --- Job Models ---
+
+class JobStatus(str, Enum):
+    """Enumeration for the status of a background job."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+
+class Job(BaseModel):
+    id: int
+    kind: str = Field(..., description="Which handler runs the job, e.g. meeting_analytics.")
+    payload: dict
+    priority: int = Field(..., description="Jobs with a higher priority run first.")
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    idempotency_key: Optional[str] = None
+    result: Optional[dict] = None
+    last_error: Optional[str] = None
+    enqueued_at: float = Field(..., description="Unix time the job was queued.")
+    run_after: float = Field(..., description="Unix time before which the job will not run, e.g. while backing off.")
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    model_config = orm_config
+
+
+class LatencyPercentiles(BaseModel):
+    p50: Optional[float] = None
+    p95: Optional[float] = None
+    max: Optional[float] = None
+
+
+class JobMetrics(BaseModel):
+    queued: int
+    running: int
+    queued_by_kind: dict[str, int] = {}
+    running_by_kind: dict[str, int] = {}
+    oldest_queued_seconds: Optional[float] = Field(None, description="How long the oldest queued job has waited.")
+    window_seconds: float
+    succeeded: int = Field(..., description="Jobs that succeeded within the window.")
+    failed: int = Field(..., description="Jobs that failed for good within the window.")
+    wait_seconds: LatencyPercentiles = Field(..., description="From enqueue until the last attempt started.")
+    run_seconds: LatencyPercentiles = Field(..., description="Duration of the last attempt.")
+
+
+# --- Import Models ---
+
+class TranscriptImportResult(BaseModel):
+    source: str = Field(..., description="The checkpoint key of the import, or <stream> when it has none.")
+    meeting_id: int
+    transcript_id: int
+    imported: int = Field(..., description="Entries inserted by this request.")
+    skipped: int = Field(..., description="Rows whose speaker is not a participant of the meeting.")
+    resumed_from: int = Field(..., description="Source rows already committed by an earlier, interrupted import.")
+    already_complete: bool = Field(..., description="True if the source had already been fully imported.")
+    seconds: float
+    unknown_speakers: List[str] = []
+
+
+# --- Batch Models ---
+
+BATCH_LIMIT = 1000
+
+ItemT = TypeVar("ItemT")
+
+
+class BatchIds(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BATCH_LIMIT, description="Item ids; repeats are allowed.")
+
+
+class BatchGetResult(BaseModel, Generic[ItemT]):
+    items: List[ItemT] = Field(..., description="The items found, in the order their ids were requested.")
+    missing: List[int] = Field(..., description="Requested ids with no item, in request order.")
+
+
+class BatchDeleteResult(BaseModel):
+    deleted: List[int] = Field(..., description="Ids of the items deleted, in request order.")
+    missing: List[int] = Field(..., description="Requested ids with no item, in request order.")
+
+
+# --- Profiling Models ---
+
+class ProfiledRequest(BaseModel):
+    id: int
+    method: str
+    path: str
+    status: Optional[int] = None
+    seconds: float
+    created_at: float = Field(..., description="Unix time the request arrived.")
+
+
+class MemoryAllocation(BaseModel):
+    location: str = Field(..., description="file:line of the allocation, or of its innermost frame.")
+    traceback: List[str] = Field(..., description="file:line frames, innermost first, when grouped by traceback.")
+    size_bytes: int
+    count: int
+    size_diff_bytes: Optional[int] = Field(None, description="Growth since the base snapshot, in diffs only.")
+    count_diff: Optional[int] = None
+
+
+class MemorySnapshot(BaseModel):
+    id: int
+    traced_bytes: int = Field(..., description="Memory traced by tracemalloc when the snapshot was taken.")
+    peak_bytes: int
+    top: List[MemoryAllocation]
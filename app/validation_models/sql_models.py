@@ -11,7 +11,9 @@ from sqlalchemy import (
     CheckConstraint,
     Float,
     ForeignKey,
+    Index,
     Integer,
+    JSON,
     Text,
     UniqueConstraint,
     text,
@@ -36,7 +38,7 @@ class Organization(Base):
         Text, nullable=False, server_default=text("CURRENT_TIMESTAMP")
     )
     updated_at: Mapped[str] = mapped_column(
-        Text, nullable=False, server_default=text("CURRENT_TIMESTAMP")
+        Text, nullable=False, server_default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP")
     )
 
     # Relationships
@@ -62,7 +64,7 @@ class User(Base):
         Text, nullable=False, server_default=text("CURRENT_TIMESTAMP")
     )
     updated_at: Mapped[str] = mapped_column(
-        Text, nullable=False, server_default=text("CURRENT_TIMESTAMP")
+        Text, nullable=False, server_default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP")
     )
 
     # Relationships
@@ -95,7 +97,7 @@ class Meeting(Base):
         Text, nullable=False, server_default=text("CURRENT_TIMESTAMP")
     )
     updated_at: Mapped[str] = mapped_column(
-        Text, nullable=False, server_default=text("CURRENT_TIMESTAMP")
+        Text, nullable=False, server_default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP")
     )
 
     __table_args__ = (
@@ -103,6 +105,8 @@ class Meeting(Base):
             status.in_(["scheduled", "in_progress", "completed", "cancelled"]),
             name="ck_meeting_status",
         ),
+        Index("ix_meetings_organization_start", "organization_id", "scheduled_start_time"),
+        Index("ix_meetings_updated_at", "updated_at"),
     )
 
     # Relationships
@@ -178,7 +182,7 @@ class MeetingAgenda(Base):
         Text, nullable=False, server_default=text("CURRENT_TIMESTAMP")
     )
     updated_at: Mapped[str] = mapped_column(
-        Text, nullable=False, server_default=text("CURRENT_TIMESTAMP")
+        Text, nullable=False, server_default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP")
     )
 
     # Relationships
@@ -256,6 +260,14 @@ class TranscriptEntry(Base):
     start_time_offset_seconds: Mapped[int] = mapped_column(Integer, nullable=False)
     end_time_offset_seconds: Mapped[int] = mapped_column(Integer, nullable=False)
 
+    __table_args__ = (
+        # Time-window lookups within a transcript, in spoken order
+        Index("ix_transcript_entries_transcript_start", "transcript_id", "start_time_offset_seconds"),
+        Index("ix_transcript_entries_participant", "participant_id"),
+        # Ids of entries moved to the archive (app/archive.py) must never be handed out again
+        {"sqlite_autoincrement": True},
+    )
+
     # Relationships
     transcript: Mapped["Transcript"] = relationship(back_populates="entries")
     participant: Mapped["MeetingParticipant"] = relationship(
@@ -290,14 +302,19 @@ class ActionItem(Base):
         Text, nullable=False, server_default=text("CURRENT_TIMESTAMP")
     )
     updated_at: Mapped[str] = mapped_column(
-        Text, nullable=False, server_default=text("CURRENT_TIMESTAMP")
+        Text, nullable=False, server_default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP")
     )
+    # Set by clients that retry writes; a unique index rather than a constraint so it can be added to existing databases
+    idempotency_key: Mapped[Optional[str]] = mapped_column(Text)
 
     __table_args__ = (
         CheckConstraint(
             status.in_(["open", "in_progress", "completed"]),
             name="ck_action_item_status",
         ),
+        Index("ix_action_items_meeting", "meeting_id"),
+        Index("ix_action_items_updated_at", "updated_at"),
+        Index("uq_action_items_idempotency_key", "idempotency_key", unique=True),
     )
 
     # Relationships
@@ -334,14 +351,17 @@ class Decision(Base):
 
 
 class MeetingSummary(Base):
-    """Stores the AI-generated summary of a meeting."""
+    """Stores the AI-generated summary of a meeting, and the note-taker agent's live notes."""
     __tablename__ = "meeting_summaries"
 
     id: Mapped[int] = mapped_column(primary_key=True)
     meeting_id: Mapped[int] = mapped_column(
         ForeignKey("meetings.id", ondelete="CASCADE"), nullable=False, unique=True
     )
+    # Written by the summary job; empty until it first runs
     summary_text: Mapped[str] = mapped_column(Text, nullable=False)
+    # Written by the note-taker agent while the meeting runs
+    notes: Mapped[Optional[str]] = mapped_column(Text)
     generated_at: Mapped[str] = mapped_column(
         Text, nullable=False, server_default=text("CURRENT_TIMESTAMP")
     )
@@ -366,7 +386,7 @@ class UserIntegration(Base):
         Text, nullable=False, server_default=text("CURRENT_TIMESTAMP")
     )
     updated_at: Mapped[str] = mapped_column(
-        Text, nullable=False, server_default=text("CURRENT_TIMESTAMP")
+        Text, nullable=False, server_default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP")
     )
 
     __table_args__ = (
@@ -396,6 +416,12 @@ class MeetingAnalytics(Base):
     created_at: Mapped[str] = mapped_column(
         Text, nullable=False, server_default=text("CURRENT_TIMESTAMP")
     )
+    # Nullable so it can be added to existing databases
+    updated_at: Mapped[Optional[str]] = mapped_column(
+        Text, default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP")
+    )
+
+    __table_args__ = (Index("ix_meeting_analytics_updated_at", "updated_at"),)
 
     # Relationships
     meeting: Mapped["Meeting"] = relationship(back_populates="analytics")
@@ -421,6 +447,9 @@ class ParticipantAnalytics(Base):
     prompt_count: Mapped[int] = mapped_column(
         Integer, nullable=False, server_default=text("0")
     )
+    turn_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default=text("0")
+    )
 
     __table_args__ = (
         UniqueConstraint(
@@ -432,4 +461,152 @@ class ParticipantAnalytics(Base):
     meeting_analytics: Mapped["MeetingAnalytics"] = relationship(
         back_populates="participant_analytics"
     )
-    participant: Mapped["MeetingParticipant"] = relationship(back_populates="analytics")
\ No newline at end of file
+    participant: Mapped["MeetingParticipant"] = relationship(back_populates="analytics")
+
+class ImportCheckpoint(Base):
+    """Records how many rows of an import source have been committed, so it can resume."""
+    __tablename__ = "import_checkpoints"
+
+    source: Mapped[str] = mapped_column(Text, primary_key=True)
+    transcript_id: Mapped[int] = mapped_column(
+        ForeignKey("transcripts.id", ondelete="CASCADE"), nullable=False
+    )
+    rows_done: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default=text("0")
+    )
+    completed: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default=text("0")
+    )
+    updated_at: Mapped[str] = mapped_column(
+        Text, nullable=False, server_default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP")
+    )
+
+
+class OrgMeetingStats(Base):
+    """Meeting totals of an organization per week or month, maintained by app/org_stats.py."""
+    __tablename__ = "org_meeting_stats"
+
+    organization_id: Mapped[int] = mapped_column(
+        ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True
+    )
+    period: Mapped[str] = mapped_column(Text, primary_key=True)
+    period_start: Mapped[str] = mapped_column(Text, primary_key=True)
+    meeting_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    completed_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    cancelled_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    analyzed_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    average_equity_score: Mapped[Optional[float]] = mapped_column(Float)
+
+    __table_args__ = (
+        CheckConstraint(period.in_(["week", "month"]), name="ck_org_meeting_stats_period"),
+    )
+
+
+class OrgAssigneeStats(Base):
+    """Action item counts of an organization per assignee, maintained by app/org_stats.py."""
+    __tablename__ = "org_assignee_stats"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    organization_id: Mapped[int] = mapped_column(
+        ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False
+    )
+    # NULL collects the action items nobody is assigned to
+    user_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    open_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    in_progress_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    completed_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+
+    __table_args__ = (
+        Index("ix_org_assignee_stats_organization", "organization_id"),
+    )
+
+
+class RollupWatermark(Base):
+    """How far each rollup has consumed changes, as an `updated_at` timestamp."""
+    __tablename__ = "rollup_watermarks"
+
+    name: Mapped[str] = mapped_column(Text, primary_key=True)
+    watermark: Mapped[str] = mapped_column(Text, nullable=False)
+    refreshed_at: Mapped[str] = mapped_column(
+        Text, nullable=False, server_default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP")
+    )
+
+
+class Job(Base):
+    """A unit of background work run by the in-process queue in app/jobs.py."""
+    __tablename__ = "jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(Text, nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    # Higher runs first
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    status: Mapped[str] = mapped_column(Text, nullable=False, server_default="queued")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("3"))
+    idempotency_key: Mapped[Optional[str]] = mapped_column(Text, unique=True)
+    result: Mapped[Optional[dict]] = mapped_column(JSON)
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+    # Unix timestamps, since queue latency is measured in milliseconds
+    enqueued_at: Mapped[float] = mapped_column(Float, nullable=False)
+    run_after: Mapped[float] = mapped_column(Float, nullable=False)
+    started_at: Mapped[Optional[float]] = mapped_column(Float)
+    finished_at: Mapped[Optional[float]] = mapped_column(Float)
+    lease_expires_at: Mapped[Optional[float]] = mapped_column(Float)
+
+    __table_args__ = (
+        CheckConstraint(
+            status.in_(["queued", "running", "succeeded", "failed"]),
+            name="ck_job_status",
+        ),
+        Index("ix_jobs_claim", "status", "priority", "run_after"),
+        Index("ix_jobs_finished_at", "finished_at"),
+    )
+
+
+class SummaryCache(Base):
+    """LLM summaries keyed by a hash of the model and prompt that produced them."""
+    __tablename__ = "summary_cache"
+
+    content_hash: Mapped[str] = mapped_column(Text, primary_key=True)
+    summary: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[str] = mapped_column(
+        Text, nullable=False, server_default=text("CURRENT_TIMESTAMP")
+    )
+
+
+class TranscriptArchive(Base):
+    """A transcript whose entries were moved to its organization's archive file by app/archive.py."""
+    __tablename__ = "transcript_archives"
+
+    transcript_id: Mapped[int] = mapped_column(
+        ForeignKey("transcripts.id", ondelete="CASCADE"), primary_key=True
+    )
+    organization_id: Mapped[int] = mapped_column(
+        ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False
+    )
+    meeting_id: Mapped[int] = mapped_column(
+        ForeignKey("meetings.id", ondelete="CASCADE"), nullable=False
+    )
+    entry_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    # The id range of the archived entries, to find the chunk holding a given entry
+    first_entry_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_entry_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    compressed_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    archived_at: Mapped[str] = mapped_column(
+        Text, nullable=False, server_default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP")
+    )
+
+    __table_args__ = (
+        Index("ix_transcript_archives_entry_range", "first_entry_id", "last_entry_id"),
+    )
+
+
+class ArchivedEntry(Base):
+    """The transcript of an entry held in an archive chunk, so archived entries can be found by id and by search."""
+    __tablename__ = "archived_entries"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    transcript_id: Mapped[int] = mapped_column(
+        ForeignKey("transcripts.id", ondelete="CASCADE"), nullable=False, index=True
+    )
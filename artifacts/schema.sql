@@ -30,6 +30,9 @@ CREATE TABLE meetings (
     FOREIGN KEY (organization_id) REFERENCES organizations(id) ON DELETE CASCADE
 );
 
+CREATE INDEX ix_meetings_organization_start ON meetings (organization_id, scheduled_start_time);
+CREATE INDEX ix_meetings_updated_at ON meetings (updated_at);
+
 CREATE TABLE meeting_participants (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     meeting_id INTEGER NOT NULL,
@@ -81,6 +84,9 @@ CREATE TABLE transcript_entries (
     FOREIGN KEY (participant_id) REFERENCES meeting_participants(id) ON DELETE CASCADE
 );
 
+CREATE INDEX ix_transcript_entries_transcript_start ON transcript_entries (transcript_id, start_time_offset_seconds);
+CREATE INDEX ix_transcript_entries_participant ON transcript_entries (participant_id);
+
 CREATE TABLE action_items (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     meeting_id INTEGER NOT NULL,
@@ -91,11 +97,16 @@ CREATE TABLE action_items (
     source_transcript_entry_id INTEGER,
     created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    idempotency_key TEXT,
     FOREIGN KEY (meeting_id) REFERENCES meetings(id) ON DELETE CASCADE,
     FOREIGN KEY (assignee_participant_id) REFERENCES meeting_participants(id) ON DELETE SET NULL,
     FOREIGN KEY (source_transcript_entry_id) REFERENCES transcript_entries(id) ON DELETE SET NULL
 );
 
+CREATE INDEX ix_action_items_meeting ON action_items (meeting_id);
+CREATE INDEX ix_action_items_updated_at ON action_items (updated_at);
+CREATE UNIQUE INDEX uq_action_items_idempotency_key ON action_items (idempotency_key);
+
 CREATE TABLE decisions (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     meeting_id INTEGER NOT NULL,
@@ -110,6 +121,7 @@ CREATE TABLE meeting_summaries (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     meeting_id INTEGER NOT NULL UNIQUE,
     summary_text TEXT NOT NULL,
+    notes TEXT,
     generated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (meeting_id) REFERENCES meetings(id) ON DELETE CASCADE
 );
@@ -132,16 +144,157 @@ CREATE TABLE meeting_analytics (
     meeting_id INTEGER NOT NULL UNIQUE,
     participation_equity_score REAL,
     created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT,
     FOREIGN KEY (meeting_id) REFERENCES meetings(id) ON DELETE CASCADE
 );
 
+CREATE INDEX ix_meeting_analytics_updated_at ON meeting_analytics (updated_at);
+
 CREATE TABLE participant_analytics (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     meeting_analytics_id INTEGER NOT NULL,
     participant_id INTEGER NOT NULL,
     speaking_time_seconds INTEGER NOT NULL DEFAULT 0,
     prompt_count INTEGER NOT NULL DEFAULT 0,
+    turn_count INTEGER NOT NULL DEFAULT 0,
     FOREIGN KEY (meeting_analytics_id) REFERENCES meeting_analytics(id) ON DELETE CASCADE,
     FOREIGN KEY (participant_id) REFERENCES meeting_participants(id) ON DELETE CASCADE,
     UNIQUE(meeting_analytics_id, participant_id)
-);
\ No newline at end of file
+);
+
+CREATE TABLE import_checkpoints (
+    source TEXT PRIMARY KEY,
+    transcript_id INTEGER NOT NULL,
+    rows_done INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (transcript_id) REFERENCES transcripts(id) ON DELETE CASCADE
+);
+
+-- Organization rollups, refreshed incrementally by app/org_stats.py.
+
+CREATE TABLE org_meeting_stats (
+    organization_id INTEGER NOT NULL,
+    period TEXT NOT NULL CHECK(period IN ('week', 'month')),
+    period_start TEXT NOT NULL,
+    meeting_count INTEGER NOT NULL DEFAULT 0,
+    completed_count INTEGER NOT NULL DEFAULT 0,
+    cancelled_count INTEGER NOT NULL DEFAULT 0,
+    analyzed_count INTEGER NOT NULL DEFAULT 0,
+    average_equity_score REAL,
+    PRIMARY KEY (organization_id, period, period_start),
+    FOREIGN KEY (organization_id) REFERENCES organizations(id) ON DELETE CASCADE
+);
+
+CREATE TABLE org_assignee_stats (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    organization_id INTEGER NOT NULL,
+    user_id INTEGER,
+    open_count INTEGER NOT NULL DEFAULT 0,
+    in_progress_count INTEGER NOT NULL DEFAULT 0,
+    completed_count INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (organization_id) REFERENCES organizations(id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE INDEX ix_org_assignee_stats_organization ON org_assignee_stats (organization_id);
+
+CREATE TABLE rollup_watermarks (
+    name TEXT PRIMARY KEY,
+    watermark TEXT NOT NULL,
+    refreshed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload JSON NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued' CHECK(status IN ('queued', 'running', 'succeeded', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    idempotency_key TEXT UNIQUE,
+    result JSON,
+    last_error TEXT,
+    enqueued_at REAL NOT NULL,
+    run_after REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    lease_expires_at REAL
+);
+
+CREATE INDEX ix_jobs_claim ON jobs (status, priority, run_after);
+CREATE INDEX ix_jobs_finished_at ON jobs (finished_at);
+
+CREATE TABLE summary_cache (
+    content_hash TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Transcripts whose entries were moved to per-organization archive files by app/archive.py.
+CREATE TABLE transcript_archives (
+    transcript_id INTEGER PRIMARY KEY,
+    organization_id INTEGER NOT NULL,
+    meeting_id INTEGER NOT NULL,
+    entry_count INTEGER NOT NULL,
+    first_entry_id INTEGER NOT NULL,
+    last_entry_id INTEGER NOT NULL,
+    compressed_bytes INTEGER NOT NULL,
+    archived_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (transcript_id) REFERENCES transcripts(id) ON DELETE CASCADE,
+    FOREIGN KEY (organization_id) REFERENCES organizations(id) ON DELETE CASCADE,
+    FOREIGN KEY (meeting_id) REFERENCES meetings(id) ON DELETE CASCADE
+);
+
+CREATE INDEX ix_transcript_archives_entry_range ON transcript_archives (first_entry_id, last_entry_id);
+
+CREATE TABLE archived_entries (
+    id INTEGER PRIMARY KEY,
+    transcript_id INTEGER NOT NULL,
+    FOREIGN KEY (transcript_id) REFERENCES transcripts(id) ON DELETE CASCADE
+);
+
+CREATE INDEX ix_archived_entries_transcript_id ON archived_entries (transcript_id);
+
+-- Full-text search indexes (FTS5, external content) kept in sync by triggers.
+-- Mirrors app/search.py.
+
+CREATE VIRTUAL TABLE transcript_entries_fts USING fts5(text, content='transcript_entries', content_rowid='id', tokenize='porter unicode61');
+CREATE TRIGGER transcript_entries_fts_ai AFTER INSERT ON transcript_entries BEGIN
+    INSERT INTO transcript_entries_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER transcript_entries_fts_ad AFTER DELETE ON transcript_entries BEGIN
+    INSERT INTO transcript_entries_fts(transcript_entries_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+CREATE TRIGGER transcript_entries_fts_au AFTER UPDATE OF text ON transcript_entries BEGIN
+    INSERT INTO transcript_entries_fts(transcript_entries_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    INSERT INTO transcript_entries_fts(rowid, text) VALUES (new.id, new.text);
+END;
+
+CREATE VIRTUAL TABLE decisions_fts USING fts5(description, content='decisions', content_rowid='id', tokenize='porter unicode61');
+CREATE TRIGGER decisions_fts_ai AFTER INSERT ON decisions BEGIN
+    INSERT INTO decisions_fts(rowid, description) VALUES (new.id, new.description);
+END;
+CREATE TRIGGER decisions_fts_ad AFTER DELETE ON decisions BEGIN
+    INSERT INTO decisions_fts(decisions_fts, rowid, description) VALUES ('delete', old.id, old.description);
+END;
+CREATE TRIGGER decisions_fts_au AFTER UPDATE OF description ON decisions BEGIN
+    INSERT INTO decisions_fts(decisions_fts, rowid, description) VALUES ('delete', old.id, old.description);
+    INSERT INTO decisions_fts(rowid, description) VALUES (new.id, new.description);
+END;
+
+CREATE VIRTUAL TABLE action_items_fts USING fts5(description, content='action_items', content_rowid='id', tokenize='porter unicode61');
+CREATE TRIGGER action_items_fts_ai AFTER INSERT ON action_items BEGIN
+    INSERT INTO action_items_fts(rowid, description) VALUES (new.id, new.description);
+END;
+CREATE TRIGGER action_items_fts_ad AFTER DELETE ON action_items BEGIN
+    INSERT INTO action_items_fts(action_items_fts, rowid, description) VALUES ('delete', old.id, old.description);
+END;
+CREATE TRIGGER action_items_fts_au AFTER UPDATE OF description ON action_items BEGIN
+    INSERT INTO action_items_fts(action_items_fts, rowid, description) VALUES ('delete', old.id, old.description);
+    INSERT INTO action_items_fts(rowid, description) VALUES (new.id, new.description);
+END;
+
+-- Archived transcript entries (app/archive.py): contentless, since their text lives in the archive chunks.
+CREATE VIRTUAL TABLE archived_entries_fts USING fts5(text, content='', tokenize='porter unicode61');
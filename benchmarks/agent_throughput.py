@@ -0,0 +1,211 @@
+"""
+Offline throughput benchmark for the chat agents.
+
+Serves the backend's /chat endpoint in-process, connects the note-taking and
+topic agents to it with a scripted FakeChatModel in place of Gemini, and
+replays synthetic meetings generated from the seed transcripts. No network
+access or API key is needed, so it can run in CI.
+
+    python benchmarks/agent_throughput.py --meetings 5 --messages 50 --latency 0.02
+
+Reports messages processed per second, end-to-end lag from the moment a
+message is sent until an agent has finished processing it, and the memory
+each meeting leaves behind in the agents. It also reports the p95 bucket
+bounds that the agents' and backend's metrics endpoints would show.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import websockets
+
+from harness import AGENTS_DIR, BackendServer, percentile, seed_transcripts
+
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "1000000")
+sys.path.insert(0, str(AGENTS_DIR))
+
+import agent_metrics  # noqa: E402
+import notetaker_agent  # noqa: E402
+import topic_agent  # noqa: E402
+from fake_llm import FakeChatModel  # noqa: E402
+
+
+def generate_traffic(meetings: int, messages_per_meeting: int, seed: int = 0) -> list[list[tuple[str, str]]]:
+    """Synthetic chat traffic: per meeting, a list of (speaker, message) pairs.
+
+    Utterances are sampled from the seed transcripts; every message gets a
+    unique suffix so the harness can match it up when an agent processes it.
+    """
+    rng = random.Random(seed)
+    transcripts = list(seed_transcripts().values())
+    traffic = []
+    for m in range(meetings):
+        source = transcripts[m % len(transcripts)]
+        traffic.append([
+            (speaker, f"{text} (#{m}.{i})")
+            for i, (speaker, text) in enumerate(rng.choice(source) for _ in range(messages_per_meeting))
+        ])
+    return traffic
+
+
+def notetaker_script():
+    """Scripted note-taker responses that grow the notes and action items over time."""
+    calls = 0
+
+    def respond(prompt: str) -> str:
+        nonlocal calls
+        calls += 1
+        items = [
+            {"content": f"Follow up on point {i}", "assignee": "Sarah Chen", "due_date": "2025-01-31", "priority": "medium"}
+            for i in range(1, calls // 5 + 1)
+        ]
+        return json.dumps({"notes": f"- {calls} updates so far", "action_items": items})
+
+    return respond
+
+
+def build_agents(names: list[str], latency: float):
+    """Fresh agent instances, each with its own scripted fake model."""
+    agents = []
+    if "notetaker" in names:
+        notetaker_agent.llm.model = FakeChatModel(notetaker_script(), latency=latency)
+        agents.append(notetaker_agent.NoteTakingAgent(meeting_id=None))
+    if "topic" in names:
+        topic_agent.llm.model = FakeChatModel(["0.8"], latency=latency)
+        agents.append(topic_agent.ChatAgent("Project planning"))
+    return agents
+
+
+async def _drain(websocket):
+    async for _ in websocket:
+        pass
+
+
+async def run_meeting(server: BackendServer, messages: list[tuple[str, str]], agent_names: list[str], latency: float, rate: float) -> dict:
+    sent_at: dict[str, float] = {}
+    lags: list[float] = []
+    expected = len(messages) * len(agent_names)
+    done = asyncio.Event()
+
+    tracemalloc.reset_peak()
+    memory_before = tracemalloc.get_traced_memory()[0]
+    agents = build_agents(agent_names, latency)
+
+    for agent in agents:
+        process_message = agent.process_message
+
+        async def tracked(message_content, sender, process_message=process_message):
+            await process_message(message_content, sender)
+            if message_content in sent_at:
+                lags.append(time.time() - sent_at[message_content])
+                if len(lags) == expected:
+                    done.set()
+
+        agent.process_message = tracked
+        await agent.connect_to_chat(server.ws_url)
+    listeners = [asyncio.create_task(agent.listen_to_chat()) for agent in agents]
+
+    started = time.perf_counter()
+    async with websockets.connect(server.ws_url) as client:
+        # Keep reading the broadcasts so the server never blocks on this client
+        drain = asyncio.create_task(_drain(client))
+        for speaker, text in messages:
+            sent_at[text] = time.time()
+            await client.send(json.dumps({"type": "broadcast", "user": speaker, "message": text, "timestamp": sent_at[text]}))
+            if rate:
+                await asyncio.sleep(1 / rate)
+        await asyncio.wait_for(done.wait(), timeout=60 + len(messages) * latency * 4)
+        elapsed = time.perf_counter() - started
+        drain.cancel()
+
+    memory_after, memory_peak = tracemalloc.get_traced_memory()
+    for agent in agents:
+        await agent.websocket.close()
+    await asyncio.gather(*listeners, return_exceptions=True)
+    return {
+        "messages": len(messages),
+        "processed": len(lags),
+        "seconds": elapsed,
+        "lags": lags,
+        "retained_bytes": memory_after - memory_before,
+        "peak_bytes": memory_peak - memory_before,
+    }
+
+
+async def run(args) -> dict:
+    traffic = generate_traffic(args.meetings, args.messages, args.seed)
+    agent_names = args.agents.split(",")
+    with tempfile.TemporaryDirectory() as tmp, BackendServer(f"sqlite:///{tmp}/bench.db") as server:
+        tracemalloc.start()
+        results = []
+        # Agents print every message they handle; keep the report readable
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for messages in traffic:
+                results.append(await run_meeting(server, messages, agent_names, args.latency, args.rate))
+        tracemalloc.stop()
+
+    lags = [lag for r in results for lag in r["lags"]]
+    processed = sum(r["processed"] for r in results)
+    seconds = sum(r["seconds"] for r in results)
+    return {
+        "agents": agent_names,
+        "meetings": args.meetings,
+        "messages_per_meeting": args.messages,
+        "llm_latency_seconds": args.latency,
+        "messages_processed": processed,
+        "messages_per_second": processed / seconds if seconds else None,
+        "lag_seconds": {
+            "p50": percentile(lags, 0.50),
+            "p95": percentile(lags, 0.95),
+            "max": max(lags) if lags else None,
+        },
+        "memory_per_meeting_kib": {
+            "retained": sum(r["retained_bytes"] for r in results) / len(results) / 1024,
+            "peak": max(r["peak_bytes"] for r in results) / 1024,
+        },
+        "scraped_p95_upper_bounds_seconds": scraped_p95(),
+    }
+
+
+def scraped_p95() -> dict:
+    """p95 bucket bounds from the agents' and backend's metrics, as a scrape would see them."""
+    import metrics
+
+    bounds = {
+        "broadcast": metrics.REGISTRY["chat_broadcast_duration_seconds"].quantile(0.95),
+    }
+    for agent in ("NoteTaker", "TopicAgent"):
+        if agent_metrics.agent_graph_duration.count(agent=agent):
+            bounds[f"{agent}_graph_invoke"] = agent_metrics.agent_graph_duration.quantile(0.95, agent=agent)
+            bounds[f"{agent}_lag"] = agent_metrics.agent_lag.quantile(0.95, agent=agent)
+    return bounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meetings", type=int, default=3, help="Number of synthetic meetings to replay.")
+    parser.add_argument("--messages", type=int, default=30, help="Chat messages per meeting.")
+    parser.add_argument("--agents", default="notetaker,topic", help="Comma separated agents to run: notetaker, topic.")
+    parser.add_argument("--latency", type=float, default=0.01, help="Simulated LLM latency in seconds.")
+    parser.add_argument("--rate", type=float, default=0, help="Messages sent per second (0 sends as fast as possible).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Benchmark for the participation analytics engine.
+
+Builds a throwaway SQLite database holding one meeting with a large synthetic
+transcript and times `analytics.refresh_meeting_analytics` against a naive
+baseline that loads every entry as an ORM object and aggregates it in Python.
+
+    python benchmarks/analytics_bench.py --entries 100000 --participants 12
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+
+from sqlalchemy import insert
+
+from harness import import_backend
+
+
+def seed_meeting(main, entries: int, participants: int, seed: int = 0) -> int:
+    """Insert one meeting with `participants` speakers and `entries` transcript entries."""
+    sql_models = main.sql_models
+    rng = random.Random(seed)
+    with main.engine.begin() as conn:
+        org_id = conn.execute(insert(sql_models.Organization).values(name="Bench Org")).inserted_primary_key[0]
+        meeting_id = conn.execute(insert(sql_models.Meeting).values(
+            organization_id=org_id, title="Bench", status="completed", scheduled_start_time="2025-01-01T10:00:00",
+        )).inserted_primary_key[0]
+        participant_ids = []
+        for i in range(participants):
+            user_id = conn.execute(insert(sql_models.User).values(
+                full_name=f"User {i}", email=f"bench{i}@example.com", password_hash="x", organization_id=org_id,
+            )).inserted_primary_key[0]
+            participant_ids.append(conn.execute(insert(sql_models.MeetingParticipant).values(
+                meeting_id=meeting_id, user_id=user_id, role="host" if i == 0 else "attendee",
+            )).inserted_primary_key[0])
+        transcript_id = conn.execute(insert(sql_models.Transcript).values(
+            meeting_id=meeting_id, processing_status="completed",
+        )).inserted_primary_key[0]
+
+        # Skewed speakers, as in real meetings
+        weights = [1 / (i + 1) for i in range(participants)]
+        offset = 0
+        rows = []
+        for _ in range(entries):
+            length = rng.randint(1, 30)
+            rows.append({
+                "transcript_id": transcript_id,
+                "participant_id": rng.choices(participant_ids, weights)[0],
+                "text": "lorem ipsum",
+                "start_time_offset_seconds": offset,
+                "end_time_offset_seconds": offset + length,
+            })
+            offset += length
+        conn.execute(insert(sql_models.TranscriptEntry), rows)
+    return meeting_id
+
+
+def naive_refresh(main, meeting_id: int) -> float | None:
+    """Row-at-a-time baseline: ORM objects and Python dictionaries."""
+    from database import SessionLocal
+
+    sql_models = main.sql_models
+    with SessionLocal() as session:
+        entries = (
+            session.query(sql_models.TranscriptEntry)
+            .join(sql_models.Transcript)
+            .filter(sql_models.Transcript.meeting_id == meeting_id)
+            .order_by(sql_models.TranscriptEntry.start_time_offset_seconds)
+            .all()
+        )
+        speaking: dict[int, int] = {}
+        turns: dict[int, int] = {}
+        previous = None
+        for entry in entries:
+            pid = entry.participant_id
+            speaking[pid] = speaking.get(pid, 0) + max(0, entry.end_time_offset_seconds - entry.start_time_offset_seconds)
+            if pid != previous:
+                turns[pid] = turns.get(pid, 0) + 1
+            previous = pid
+        values = sorted(speaking.values())
+        n, total = len(values), sum(values)
+        if not total:
+            return None
+        return 1 - (2 * sum(i * v for i, v in enumerate(values, 1)) / (n * total) - (n + 1) / n)
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        main = import_backend(f"sqlite:///{tmp}/bench.db")
+        import analytics
+        from database import SessionLocal
+
+        main.Base.metadata.create_all(bind=main.engine)
+        meeting_id = seed_meeting(main, args.entries, args.participants, args.seed)
+
+        def vectorized():
+            with SessionLocal() as session:
+                analytics.refresh_meeting_analytics(session, meeting_id)
+
+        def load_only():
+            with SessionLocal() as session:
+                analytics.load_transcript_columns(session, meeting_id)
+
+        with SessionLocal() as session:
+            equity = analytics.refresh_meeting_analytics(session, meeting_id).participation_equity_score
+        report = {
+            "entries": args.entries,
+            "participants": args.participants,
+            "equity_score": equity,
+            "naive_equity_score": naive_refresh(main, meeting_id),
+            "seconds": {
+                "load_columns": timed(load_only, args.repeat),
+                "refresh": timed(vectorized, args.repeat),
+                "naive_orm": timed(lambda: naive_refresh(main, meeting_id), args.repeat),
+            },
+        }
+        main.engine.dispose()
+    report["speedup"] = report["seconds"]["naive_orm"] / report["seconds"]["refresh"]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=100_000, help="Transcript entries in the meeting.")
+    parser.add_argument("--participants", type=int, default=12, help="Speakers in the meeting.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best is reported.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
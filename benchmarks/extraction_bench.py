@@ -0,0 +1,119 @@
+"""
+Benchmark for action item and decision extraction.
+
+Extracts items from long synthetic meetings with `app/extraction.py` against
+the FakeChatModel from the agents. The model reports every marked line of a
+window, quoting it, after a fixed latency. Throughput is reported in
+transcript entries per second, with peak traced memory, at several meeting
+lengths to show that memory stays flat as meetings grow.
+
+    python benchmarks/extraction_bench.py --entries 2000,10000,50000 --latency 0.05
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from harness import AGENTS_DIR, import_backend
+
+sys.path.insert(0, str(AGENTS_DIR))
+from fake_llm import FakeChatModel  # noqa: E402
+
+WORDS = "launch budget roadmap hiring pricing migration customer deadline review metrics design".split()
+
+
+def seed(main, meeting_id: int, entries: int, rng: random.Random):
+    raw = main.engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.execute("INSERT OR IGNORE INTO organizations (id, name) VALUES (1, 'Bench Org')")
+        cur.execute("INSERT OR IGNORE INTO users (id, organization_id, full_name, email, password_hash) VALUES (1, 1, 'Speaker 1', 's1@example.com', 'x')")
+        cur.execute("INSERT INTO meetings (id, organization_id, title, status, scheduled_start_time) VALUES (?, 1, 'Bench', 'completed', '2025-01-01T10:00:00')", (meeting_id,))
+        cur.execute("INSERT INTO meeting_participants (id, meeting_id, user_id, role) VALUES (?, ?, 1, 'attendee')", (meeting_id, meeting_id))
+        cur.execute("INSERT INTO transcripts (id, meeting_id, processing_status) VALUES (?, ?, 'completed')", (meeting_id, meeting_id))
+
+        def text(i):
+            # About one line in 25 carries an item; a third of those repeat an earlier one
+            if rng.random() < 0.04:
+                topic = rng.choice(WORDS) if rng.random() < 0.3 else f"{rng.choice(WORDS)} {i}"
+                return f"ACTION: follow up on the {topic}"
+            return " ".join(rng.choices(WORDS, k=rng.randint(6, 25)))
+
+        cur.executemany(
+            "INSERT INTO transcript_entries (transcript_id, participant_id, text, start_time_offset_seconds, end_time_offset_seconds) VALUES (?, ?, ?, ?, ?)",
+            [(meeting_id, meeting_id, text(i), i * 6, i * 6 + 5) for i in range(entries)],
+        )
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def respond(prompt: str) -> str:
+    items = []
+    for line in prompt.split("Transcript:\n", 1)[1].splitlines():
+        text = line.split(": ", 1)[1]
+        if text.startswith("ACTION:"):
+            items.append({"description": text[len("ACTION:"):].strip(), "assignee": "Speaker 1", "quote": text})
+    return json.dumps({"action_items": items, "decisions": []})
+
+
+def run(args) -> dict:
+    rng = random.Random(args.seed)
+    report = {"llm_latency_s": args.latency, "window_entries": args.window, "overlap": args.overlap,
+              "concurrency": args.concurrency, "runs": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        main = import_backend(f"sqlite:///{tmp}/bench.db")
+        import extraction
+        from database import SessionLocal
+
+        main.Base.metadata.create_all(bind=main.engine)
+        # FakeChatModel keeps every prompt; forget them so only the extractor's memory is measured
+        llm = FakeChatModel(lambda prompt: (llm.prompts.clear(), respond(prompt))[1], latency=args.latency)
+        extractor = extraction.Extractor(
+            llm,
+            window_entries=args.window, overlap=args.overlap, concurrency=args.concurrency,
+        )
+        for meeting_id, entries in enumerate((int(n) for n in args.entries.split(",")), start=1):
+            seed(main, meeting_id, entries, rng)
+            with SessionLocal() as session:
+                tracemalloc.start()
+                started = time.perf_counter()
+                result = extraction.extract_meeting(session, meeting_id, extractor)
+                seconds = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            report["runs"][f"entries_{entries}"] = {
+                "seconds": round(seconds, 2),
+                "entries_per_second": round(entries / seconds, 1),
+                "windows": result.windows,
+                "action_items_created": result.action_items_created,
+                "duplicates": result.duplicates,
+                "peak_traced_mb": round(peak / 2**20, 1),
+            }
+        main.engine.dispose()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", default="2000,10000,50000", help="Comma separated meeting lengths, in transcript entries.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds the fake LLM takes per call.")
+    parser.add_argument("--window", type=int, default=40, help="Entries per window.")
+    parser.add_argument("--overlap", type=int, default=10, help="Entries shared by consecutive windows.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
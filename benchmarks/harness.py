@@ -0,0 +1,150 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run entirely in-process: the backend is served by uvicorn on a
+background thread against a throwaway SQLite database, and seed data is read
+from artifacts/schema.sql and artifacts/seed_data.sql. Load tests, whose
+client would otherwise compete with the server for the GIL, serve it from a
+subprocess with `BackendProcess` instead.
+"""
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+APP_DIR = ROOT / "app"
+AGENTS_DIR = ROOT / "agents"
+ARTIFACTS_DIR = ROOT / "artifacts"
+
+
+def load_seed_database() -> sqlite3.Connection:
+    """In-memory SQLite database built from the schema and seed data artifacts."""
+    conn = sqlite3.connect(":memory:")
+    conn.executescript((ARTIFACTS_DIR / "schema.sql").read_text())
+    conn.executescript((ARTIFACTS_DIR / "seed_data.sql").read_text())
+    return conn
+
+
+def seed_transcripts() -> dict[int, list[tuple[str, str]]]:
+    """Seed transcripts as {meeting_id: [(speaker name, text), ...]} in spoken order."""
+    conn = load_seed_database()
+    rows = conn.execute(
+        """
+        SELECT t.meeting_id, u.full_name, e.text
+        FROM transcript_entries e
+        JOIN transcripts t ON t.id = e.transcript_id
+        JOIN meeting_participants p ON p.id = e.participant_id
+        JOIN users u ON u.id = p.user_id
+        ORDER BY t.meeting_id, e.start_time_offset_seconds
+        """
+    ).fetchall()
+    transcripts: dict[int, list[tuple[str, str]]] = {}
+    for meeting_id, speaker, text in rows:
+        transcripts.setdefault(meeting_id, []).append((speaker, text))
+    return transcripts
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def import_backend(database_url: str):
+    """Import the backend's `main` module bound to `database_url`."""
+    os.environ["DATABASE_URL"] = database_url
+    if str(APP_DIR) not in sys.path:
+        sys.path.insert(0, str(APP_DIR))
+    import main
+    return main
+
+
+class BackendServer:
+    """Runs the FastAPI backend with uvicorn on a background thread."""
+
+    def __init__(self, database_url: str, port: int | None = None):
+        import uvicorn
+
+        self.main = import_backend(database_url)
+        self.port = port or free_port()
+        config = uvicorn.Config(self.main.app, host="127.0.0.1", port=self.port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def http_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}/chat"
+
+    def __enter__(self) -> "BackendServer":
+        self.thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if time.monotonic() > deadline or not self.thread.is_alive():
+                raise RuntimeError("Backend failed to start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+class BackendProcess:
+    """Runs the FastAPI backend with uvicorn in a subprocess."""
+
+    def __init__(self, database_url: str, port: int | None = None, env: dict | None = None):
+        self.database_url = database_url
+        self.port = port or free_port()
+        self.env = env or {}
+        self.process: subprocess.Popen | None = None
+
+    @property
+    def http_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}/chat"
+
+    def __enter__(self) -> "BackendProcess":
+        env = {**os.environ, **self.env, "DATABASE_URL": self.database_url}
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(self.port), "--log-level", "warning"],
+            cwd=APP_DIR,
+            env=env,
+        )
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=0.1):
+                    return self
+            except OSError:
+                if time.monotonic() > deadline or self.process.poll() is not None:
+                    self.__exit__()
+                    raise RuntimeError("Backend failed to start")
+                time.sleep(0.05)
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile of `values` for `q` in [0, 1]."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
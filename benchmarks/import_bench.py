@@ -0,0 +1,179 @@
+"""
+Benchmark for bulk transcript import.
+
+Writes an archive of one gzipped file per meeting, in a mix of NDJSON, CSV
+and WebVTT, then imports it with `importer.import_files` at increasing
+worker counts. As a baseline it also imports a few files the naive way:
+one ORM object and one participant lookup per row, committed per file, and
+extrapolates to the whole archive.
+
+    python benchmarks/import_bench.py --meetings 100 --entries 1000 --workers 1,4
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import select
+
+from harness import import_backend
+
+SPEAKERS = ["Sarah Chen", "Marcus Johnson", "Priya Patel", "Tom Becker"]
+FORMATS = ["ndjson", "csv", "vtt"]
+
+
+def write_archive(directory: str, meetings: int, entries: int, rng: random.Random) -> list[str]:
+    paths = []
+    for meeting_id in range(1, meetings + 1):
+        fmt = FORMATS[meeting_id % len(FORMATS)]
+        rows = [
+            {
+                "speaker": rng.choice(SPEAKERS),
+                "start_time_offset_seconds": i * 4,
+                "end_time_offset_seconds": i * 4 + 3,
+                "text": f"Point {i} about the roadmap, the budget and next steps",
+            }
+            for i in range(entries)
+        ]
+        text = io.StringIO()
+        if fmt == "ndjson":
+            text.writelines(json.dumps(row) + "\n" for row in rows)
+        elif fmt == "csv":
+            writer = csv.DictWriter(text, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            import transcripts
+
+            text.write("WEBVTT\n")
+            for row in rows:
+                text.write(
+                    f"\n{transcripts.vtt_timestamp(row['start_time_offset_seconds'])} --> "
+                    f"{transcripts.vtt_timestamp(row['end_time_offset_seconds'])}\n<v {row['speaker']}>{row['text']}\n"
+                )
+        path = os.path.join(directory, f"meeting-{meeting_id}.{fmt}.gz")
+        with gzip.open(path, "wt") as f:
+            f.write(text.getvalue())
+        paths.append(path)
+    return paths
+
+
+def seed(main, meetings: int):
+    """Meetings with no transcript yet, each with the four speakers as participants."""
+    raw = main.engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.execute("INSERT INTO organizations (id, name) VALUES (1, 'Bench Org')")
+        cur.executemany(
+            "INSERT INTO users (id, organization_id, full_name, email, password_hash) VALUES (?, 1, ?, ?, 'x')",
+            [(i + 1, name, f"user{i}@example.com") for i, name in enumerate(SPEAKERS)],
+        )
+        cur.executemany(
+            "INSERT INTO meetings (id, organization_id, title, status, scheduled_start_time) VALUES (?, 1, 'Bench', 'completed', '2025-01-01T10:00:00')",
+            [(m,) for m in range(1, meetings + 1)],
+        )
+        cur.executemany(
+            "INSERT INTO meeting_participants (meeting_id, user_id, role) VALUES (?, ?, 'attendee')",
+            [(m, u + 1) for m in range(1, meetings + 1) for u in range(len(SPEAKERS))],
+        )
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def naive_import(main, importer, path: str) -> int:
+    """The per-row approach: one participant query and one ORM object per entry."""
+    from database import SessionLocal
+
+    sql_models = main.sql_models
+    meeting_id = importer.meeting_id_from_path(path)
+    with open(path, "rb") as f, SessionLocal() as session:
+        transcript = sql_models.Transcript(meeting_id=meeting_id, processing_status="completed")
+        session.add(transcript)
+        session.flush()
+        count = 0
+        for row in importer.PARSERS[importer.detect_format(path)](importer.open_text(f)):
+            participant_id = session.scalar(
+                select(sql_models.MeetingParticipant.id)
+                .join(sql_models.User, sql_models.User.id == sql_models.MeetingParticipant.user_id)
+                .where(sql_models.MeetingParticipant.meeting_id == meeting_id, sql_models.User.full_name == row["speaker"])
+            )
+            session.add(sql_models.TranscriptEntry(
+                transcript_id=transcript.id,
+                participant_id=participant_id,
+                text=row["text"],
+                start_time_offset_seconds=int(float(row["start_time_offset_seconds"])),
+                end_time_offset_seconds=int(float(row["end_time_offset_seconds"])),
+            ))
+            count += 1
+        session.commit()
+    return count
+
+
+def reset(main, meetings: int):
+    main.Base.metadata.drop_all(bind=main.engine)
+    main.Base.metadata.create_all(bind=main.engine)
+    seed(main, meetings)
+
+
+def run(args) -> dict:
+    rng = random.Random(args.seed)
+    report = {"meetings": args.meetings, "entries_per_meeting": args.entries, "runs": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{tmp}/bench.db"
+        main = import_backend(database_url)
+        import importer
+
+        os.mkdir(f"{tmp}/archive")
+        paths = write_archive(f"{tmp}/archive", args.meetings, args.entries, rng)
+        report["archive_mb"] = round(sum(os.path.getsize(p) for p in paths) / 1e6, 2)
+        total = args.meetings * args.entries
+
+        for workers in [int(w) for w in args.workers.split(",")]:
+            reset(main, args.meetings)
+            main.engine.dispose()
+            started = time.perf_counter()
+            results = importer.import_files(database_url, paths, workers=workers)
+            seconds = time.perf_counter() - started
+            assert sum(r["imported"] for r in results) == total, results[:3]
+            report["runs"][f"workers_{workers}"] = {"seconds": round(seconds, 2), "entries_per_s": round(total / seconds)}
+
+        reset(main, args.meetings)
+        sample = paths[: args.baseline_files]
+        started = time.perf_counter()
+        for path in sample:
+            naive_import(main, importer, path)
+        seconds = time.perf_counter() - started
+        report["runs"]["per_row_orm"] = {
+            "files_timed": len(sample),
+            "extrapolated_seconds": round(seconds * len(paths) / len(sample), 2),
+            "entries_per_s": round(len(sample) * args.entries / seconds),
+        }
+        main.engine.dispose()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meetings", type=int, default=100, help="Files in the archive, one per meeting.")
+    parser.add_argument("--entries", type=int, default=1000, help="Transcript entries per meeting.")
+    parser.add_argument("--workers", default="1,4", help="Comma separated process pool sizes to time.")
+    parser.add_argument("--baseline-files", type=int, default=5, help="Files imported with the per-row baseline.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark for the request and query instrumentation overhead.
+
+Serves the same backend routes in-process through httpx's ASGI transport,
+once bare and once wrapped in `instrumentation.RequestMetrics` with the
+query hooks installed. Rounds alternate between the two so drift affects
+both equally. It reports p50, p95 and p99 latency for each, and the time to
+render `/metrics` once every route has its series.
+
+    python benchmarks/instrumentation_bench.py --requests 2000 --rounds 5
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+import httpx
+
+from harness import import_backend, percentile
+
+ROUTES = ["/organizations/1", "/meetings/1", "/meetings/?limit=50", "/action_items/?limit=50"]
+
+
+def seed(main):
+    raw = main.engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.execute("INSERT INTO organizations (id, name) VALUES (1, 'Bench Org')")
+        cur.executemany(
+            "INSERT INTO meetings (id, organization_id, title, status, scheduled_start_time) VALUES (?, 1, 'Bench', 'completed', '2025-01-01T10:00:00')",
+            [(i,) for i in range(1, 201)],
+        )
+        cur.executemany("INSERT INTO action_items (meeting_id, description) VALUES (?, 'Do it')", [(i,) for i in range(1, 201)])
+        raw.commit()
+    finally:
+        raw.close()
+
+
+async def timed_requests(app, requests: int) -> list[float]:
+    latencies = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for i in range(requests):
+            started = time.perf_counter()
+            response = await client.get(ROUTES[i % len(ROUTES)])
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+    return latencies
+
+
+def summary(latencies: list[float]) -> dict:
+    return {f"p{int(q * 100)}_ms": round(percentile(latencies, q) * 1000, 3) for q in (0.5, 0.95, 0.99)}
+
+
+def run(args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        main = import_backend(f"sqlite:///{tmp}/bench.db")
+        import instrumentation
+        import metrics
+
+        main.Base.metadata.create_all(bind=main.engine)
+        seed(main)
+        bare, instrumented = main.app.router, instrumentation.RequestMetrics(main.app.router)
+        results = {"bare": [], "instrumented": []}
+        for _ in range(args.rounds):
+            instrumentation.uninstall()
+            results["bare"] += asyncio.run(timed_requests(bare, args.requests))
+            instrumentation.install()
+            results["instrumented"] += asyncio.run(timed_requests(instrumented, args.requests))
+        started = time.perf_counter()
+        rendered = metrics.render()
+        render_ms = (time.perf_counter() - started) * 1000
+        instrumentation.uninstall()
+        main.engine.dispose()
+    return {
+        "requests": args.requests * args.rounds,
+        "routes": ROUTES,
+        "bare": summary(results["bare"]),
+        "instrumented": summary(results["instrumented"]),
+        "metrics_render_ms": round(render_ms, 2),
+        "metrics_lines": rendered.count("\n"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per mode in each round.")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Reproducible HTTP load test of the backend, with a regression check.
+
+Generates a SQLite database with app/datagen.py at one of the `SCALES`
+below. Rows are generated from a fixed seed, so every run at the same scale
+and seed starts from the same data. The backend is served by uvicorn in a
+subprocess, and a local asyncio load generator drives it over HTTP and
+WebSocket. Each scenario runs `--concurrency` closed-loop clients for
+`--duration` seconds, after `--warmup` seconds that are not recorded:
+
+- crud: reads by id and lists, plus creating, updating and deleting action
+  items (only ones it created);
+- details: the per-record read routes: a meeting, a window of its transcript
+  and its organization's stats;
+- search: full-text searches for words that occur in the generated text, scoped to
+  an organization or not;
+- chat: broadcasts on /chat, timed from sending until the sender receives
+  its own message back.
+
+The report gives each scenario's requests, errors, requests per second and
+p50, p95 and p99 latency:
+
+    python benchmarks/load_suite.py --scale small --output load.json
+
+With `--baseline`, the run is compared with a stored report and the script
+exits with status 1 if any scenario's throughput fell, or its latency or
+error rate rose, by more than `--threshold`. `--save-baseline` stores the
+run as the new baseline instead:
+
+    python benchmarks/load_suite.py --scale small --baseline benchmarks/baselines/load_small.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+
+import httpx
+import websockets
+
+from harness import APP_DIR, BackendProcess, percentile
+
+sys.path.insert(0, str(APP_DIR))
+
+import datagen  # noqa: E402
+
+SCENARIOS = ("crud", "details", "search", "chat")
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+ITEM_STATUSES = ("open", "in_progress", "completed")
+
+SCALES = {
+    "small": datagen.Config(organizations=2, users_per_org=15, meetings_per_user=2),
+    "medium": datagen.Config(organizations=10, users_per_org=30, meetings_per_user=3),
+    "large": datagen.Config(organizations=50, users_per_org=40, meetings_per_user=5),
+}
+
+
+@dataclass
+class Targets:
+    """Ids and search terms that the scenarios pick from."""
+
+    organizations: list[int]
+    meetings: list[int]
+    transcripts: list[int]
+    action_items: list[int]
+    words: list[str]
+
+
+def load_targets(path: str) -> Targets:
+    conn = sqlite3.connect(path)
+    try:
+        column = lambda sql: [row[0] for row in conn.execute(sql)]  # noqa: E731
+        return Targets(
+            organizations=column("SELECT id FROM organizations ORDER BY id"),
+            meetings=column("SELECT id FROM meetings ORDER BY id"),
+            transcripts=column("SELECT id FROM transcripts ORDER BY id"),
+            action_items=column("SELECT id FROM action_items ORDER BY id"),
+            words=sorted({
+                word.lower()
+                for phrase in datagen.TOPICS + datagen.VERBS + datagen.OBJECTS + datagen.WHENS
+                for word in re.findall(r"[A-Za-z]{5,}", phrase)
+            }),
+        )
+    finally:
+        conn.close()
+
+
+# --- Scenarios ---
+# Each returns an async function making one request, returning whether it succeeded.
+
+def crud_scenario(client: httpx.AsyncClient, targets: Targets, rng: random.Random):
+    created: list[int] = []
+
+    async def step() -> bool:
+        roll = rng.random()
+        if roll < 0.45:
+            response = await client.get(f"/meetings/{rng.choice(targets.meetings)}")
+        elif roll < 0.6:
+            response = await client.get("/action_items/", params={"skip": rng.randrange(len(targets.action_items)), "limit": 50})
+        elif roll < 0.75:
+            response = await client.post("/action_items/", json={"meeting_id": rng.choice(targets.meetings), "description": "Load test item"})
+            if response.status_code == 201:
+                created.append(response.json()["id"])
+        elif roll < 0.9 or not created:
+            item_id = rng.choice(created or targets.action_items)
+            response = await client.put(f"/action_items/{item_id}", json={"status": rng.choice(ITEM_STATUSES)})
+        else:
+            response = await client.delete(f"/action_items/{created.pop(rng.randrange(len(created)))}")
+        return response.is_success
+
+    return step
+
+
+def details_scenario(client: httpx.AsyncClient, targets: Targets, rng: random.Random):
+    async def step() -> bool:
+        roll = rng.random()
+        if roll < 0.4:
+            response = await client.get(f"/meetings/{rng.choice(targets.meetings)}")
+        elif roll < 0.8:
+            start = rng.randrange(0, 600, 60)
+            response = await client.get(f"/transcripts/{rng.choice(targets.transcripts)}/entries", params={"start": start, "end": start + 300})
+        else:
+            response = await client.get(f"/organizations/{rng.choice(targets.organizations)}/stats")
+        return response.is_success
+
+    return step
+
+
+def search_scenario(client: httpx.AsyncClient, targets: Targets, rng: random.Random):
+    async def step() -> bool:
+        params = {"q": rng.choice(targets.words), "limit": 20}
+        if rng.random() < 0.5:
+            params["organization_id"] = rng.choice(targets.organizations)
+        response = await client.get("/search", params=params)
+        return response.is_success
+
+    return step
+
+
+async def run_http(name: str, base_url: str, targets: Targets, args) -> tuple[list[float], int]:
+    make_step = {"crud": crud_scenario, "details": details_scenario, "search": search_scenario}[name]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        steps = [make_step(client, targets, random.Random(f"{args.seed}:{name}:{i}")) for i in range(args.concurrency)]
+        return await closed_loop(steps, args.warmup, args.duration)
+
+
+async def closed_loop(steps, warmup: float, duration: float) -> tuple[list[float], int]:
+    """Run each client's `step` back to back; latencies and errors after the warmup."""
+    latencies: list[float] = []
+    errors = 0
+    recording = time.perf_counter() + warmup
+    deadline = recording + duration
+
+    async def client(step):
+        nonlocal errors
+        while (started := time.perf_counter()) < deadline:
+            try:
+                ok = await step()
+            except (httpx.HTTPError, websockets.WebSocketException, OSError, asyncio.TimeoutError):
+                ok = False
+            if started >= recording:
+                latencies.append(time.perf_counter() - started)
+                errors += not ok
+
+    await asyncio.gather(*(client(step) for step in steps))
+    return latencies, errors
+
+
+async def run_chat(ws_url: str, args) -> tuple[list[float], int]:
+    """Each client broadcasts and waits for its own message to come back."""
+    sockets = [await websockets.connect(ws_url, max_queue=None) for _ in range(args.concurrency)]
+
+    def chat_step(socket):
+        async def step() -> bool:
+            marker = uuid.uuid4().hex
+            await socket.send(json.dumps({"type": "broadcast", "user": "load", "message": marker, "timestamp": time.time()}))
+            async with asyncio.timeout(10):
+                while json.loads(await socket.recv()).get("message") != marker:
+                    pass
+            return True
+
+        return step
+
+    try:
+        return await closed_loop([chat_step(socket) for socket in sockets], args.warmup, args.duration)
+    finally:
+        for socket in sockets:
+            await socket.close()
+
+
+def summary(latencies: list[float], errors: int, duration: float) -> dict:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "error_rate": round(errors / len(latencies), 4) if latencies else 0.0,
+        "rps": round(len(latencies) / duration, 1),
+        **{key: round((percentile(latencies, q) or 0) * 1000, 3) for key, q in zip(LATENCY_KEYS, (0.5, 0.95, 0.99))},
+    }
+
+
+# --- Regression check ---
+
+def compare(report: dict, baseline: dict, threshold: float, min_delta_ms: float) -> list[str]:
+    """Ways in which `report` is worse than `baseline` by more than `threshold`."""
+    regressions = []
+    for name, before in baseline["scenarios"].items():
+        after = report["scenarios"].get(name)
+        if after is None:
+            continue
+        if after["rps"] < before["rps"] * (1 - threshold):
+            regressions.append(f"{name}: rps {after['rps']} < {before['rps']} - {threshold:.0%}")
+        for key in LATENCY_KEYS:
+            # Sub-millisecond differences are noise, whatever the ratio
+            if after[key] > before[key] * (1 + threshold) and after[key] - before[key] > min_delta_ms:
+                regressions.append(f"{name}: {key} {after[key]} > {before[key]} + {threshold:.0%}")
+        if after["error_rate"] > before["error_rate"] + 0.01:
+            regressions.append(f"{name}: error_rate {after['error_rate']} > {before['error_rate']}")
+    return regressions
+
+
+def comparable(report: dict, baseline: dict) -> list[str]:
+    keys = ("scale", "seed", "concurrency", "duration_s")
+    return [f"{key}: {report[key]} != baseline {baseline.get(key)}" for key in keys if report[key] != baseline.get(key)]
+
+
+def run(args) -> dict:
+    config = replace(SCALES[args.scale], seed=args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.database or f"{tmp}/load.db"
+        started = time.perf_counter()
+        if args.database and Path(path).exists():
+            rows, seed_seconds = None, 0.0
+        else:
+            rows = datagen.generate(path, config, workers=os.cpu_count())
+            seed_seconds = time.perf_counter() - started
+        targets = load_targets(path)
+        scenarios = {}
+        with BackendProcess(f"sqlite:///{path}", env={"JOB_WORKERS": "1"}) as backend:
+            for name in args.scenarios:
+                if name == "chat":
+                    latencies, errors = asyncio.run(run_chat(backend.ws_url, args))
+                else:
+                    latencies, errors = asyncio.run(run_http(name, backend.http_url, targets, args))
+                scenarios[name] = summary(latencies, errors, args.duration)
+    return {
+        "scale": args.scale,
+        "scale_config": {key: str(value) if key == "start" else value for key, value in asdict(config).items()},
+        "seed": args.seed,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "rows": rows,
+        "seed_seconds": round(seed_seconds, 2),
+        "scenarios": scenarios,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients per scenario.")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds recorded per scenario.")
+    parser.add_argument("--warmup", type=float, default=2, help="Seconds run before recording, per scenario.")
+    parser.add_argument("--database", help="Seed this file, or reuse it if it exists, instead of a throwaway database.")
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    parser.add_argument("--baseline", help="Compare with the report stored in this file.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline instead of comparing.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative regression, e.g. 0.25 for 25%%.")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore latency increases smaller than this.")
+    args = parser.parse_args()
+    if args.save_baseline and not args.baseline:
+        parser.error("--save-baseline needs --baseline")
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if not args.baseline:
+        return
+    if args.save_baseline:
+        Path(args.baseline).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    mismatched = comparable(report, baseline)
+    if mismatched:
+        sys.exit("Run is not comparable with the baseline: " + "; ".join(mismatched))
+    regressions = compare(report, baseline, args.threshold, args.min_delta_ms)
+    if regressions:
+        print("Regressions against the baseline:", *regressions, sep="\n  ", file=sys.stderr)
+        sys.exit(1)
+    print("No regressions against the baseline.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
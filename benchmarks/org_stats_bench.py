@@ -0,0 +1,131 @@
+"""
+Benchmark for the organization rollups.
+
+Seeds organizations with a year of meetings, analytics and action items,
+then times `org_stats.read_stats` against computing the same weekly totals
+on the fly from `meetings`, `meeting_analytics` and `action_items`. It also
+times a full rebuild against an incremental refresh after one organization
+changed.
+
+    python benchmarks/org_stats_bench.py --organizations 100 --meetings 1000
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+
+from sqlalchemy import text
+
+from harness import import_backend, percentile
+
+ON_THE_FLY = """
+SELECT date(m.scheduled_start_time, 'weekday 0', '-6 days') AS week, count(*), avg(ma.participation_equity_score)
+FROM meetings m LEFT JOIN meeting_analytics ma ON ma.meeting_id = m.id
+WHERE m.organization_id = :org GROUP BY week ORDER BY week
+"""
+ON_THE_FLY_ASSIGNEES = """
+SELECT p.user_id, sum(ai.status = 'open') FROM action_items ai
+JOIN meetings m ON m.id = ai.meeting_id LEFT JOIN meeting_participants p ON p.id = ai.assignee_participant_id
+WHERE m.organization_id = :org GROUP BY p.user_id
+"""
+
+
+def seed(main, organizations: int, meetings: int, rng: random.Random):
+    raw = main.engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.executemany("INSERT INTO organizations (id, name) VALUES (?, 'Org')", [(o,) for o in range(1, organizations + 1)])
+        cur.executemany(
+            "INSERT INTO users (id, organization_id, full_name, email, password_hash) VALUES (?, ?, 'User', ?, 'x')",
+            [(o * 10 + u, o, f"user{o}-{u}@example.com") for o in range(1, organizations + 1) for u in range(10)],
+        )
+        meeting_id = 0
+        for org in range(1, organizations + 1):
+            rows, analytics, participants, items = [], [], [], []
+            for _ in range(meetings):
+                meeting_id += 1
+                day = rng.randrange(365)
+                rows.append((meeting_id, org, "2025-01-01 10:00:00", f"+{day} days"))
+                analytics.append((meeting_id, rng.random()))
+                participants.append((meeting_id, meeting_id, org * 10 + rng.randrange(10)))
+                items.extend((meeting_id, meeting_id, rng.choice(["open", "in_progress", "completed"])) for _ in range(2))
+            cur.executemany(
+                "INSERT INTO meetings (id, organization_id, title, status, scheduled_start_time) VALUES (?, ?, 'M', 'completed', datetime(?, ?))",
+                rows,
+            )
+            cur.executemany("INSERT INTO meeting_analytics (meeting_id, participation_equity_score) VALUES (?, ?)", analytics)
+            cur.executemany("INSERT INTO meeting_participants (id, meeting_id, user_id, role) VALUES (?, ?, ?, 'host')", participants)
+            cur.executemany(
+                "INSERT INTO action_items (meeting_id, assignee_participant_id, description, status) VALUES (?, ?, 'Do it', ?)", items
+            )
+        # Everything seeded predates the first watermark
+        for table in ["meetings", "action_items", "meeting_analytics"]:
+            cur.execute(f"UPDATE {table} SET updated_at = datetime('now', '-1 day')")
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def time_reads(fn, repeat: int) -> dict:
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - started)
+    return {"p50_ms": percentile(latencies, 0.50) * 1000, "p95_ms": percentile(latencies, 0.95) * 1000}
+
+
+def run(args) -> dict:
+    rng = random.Random(args.seed)
+    report = {"organizations": args.organizations, "meetings_per_organization": args.meetings}
+    with tempfile.TemporaryDirectory() as tmp:
+        main = import_backend(f"sqlite:///{tmp}/bench.db")
+        import org_stats
+
+        main.Base.metadata.create_all(bind=main.engine)
+        seed(main, args.organizations, args.meetings, rng)
+
+        started = time.perf_counter()
+        org_stats.refresh(main.engine, full=True)
+        report["full_rebuild_s"] = time.perf_counter() - started
+
+        with main.engine.connect() as conn:
+            org = args.organizations // 2
+            report["rollup_read"] = time_reads(lambda: org_stats.read_stats(conn, org), args.repeat)
+            report["on_the_fly"] = time_reads(
+                lambda: (conn.execute(text(ON_THE_FLY), {"org": org}).all(),
+                         conn.execute(text(ON_THE_FLY_ASSIGNEES), {"org": org}).all()),
+                args.repeat,
+            )
+
+        # Wait out the watermark overlap so only the touched organization is stale
+        time.sleep(6)
+        with main.engine.begin() as conn:
+            conn.execute(text("UPDATE meetings SET status = 'cancelled', updated_at = CURRENT_TIMESTAMP WHERE id = 1"))
+        started = time.perf_counter()
+        refreshed = org_stats.refresh(main.engine)
+        report["incremental_refresh_s"] = time.perf_counter() - started
+        report["incremental_refreshed_organizations"] = sorted(refreshed)
+        main.engine.dispose()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--organizations", type=int, default=100)
+    parser.add_argument("--meetings", type=int, default=1000, help="Meetings per organization.")
+    parser.add_argument("--repeat", type=int, default=200, help="Reads timed per approach.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark for the cost of the profiling tools in `app/profiling.py`.
+
+Serves backend read routes in-process through httpx's ASGI transport, with
+the `RequestProfiler` middleware and threadpool wrapper installed. Rounds
+alternate between three modes, so drift affects each mode equally:
+
+- idle: profiling is enabled, but no profiling is in use;
+- sampling: the stack sampler runs on its own thread at `--interval-ms`;
+- profiled: every request carries `X-Profile` and runs under cProfile.
+
+It reports p50, p95 and p99 latency for each mode.
+
+    python benchmarks/profiling_bench.py --requests 1000 --rounds 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import httpx
+
+from harness import import_backend
+from instrumentation_bench import ROUTES, seed, summary
+
+TOKEN = "bench"
+
+
+async def timed_requests(app, requests: int, headers: dict) -> list[float]:
+    latencies = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for i in range(requests):
+            started = time.perf_counter()
+            response = await client.get(ROUTES[i % len(ROUTES)], headers=headers)
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+    return latencies
+
+
+def run(args) -> dict:
+    os.environ["PROFILING_TOKEN"] = TOKEN
+    with tempfile.TemporaryDirectory() as tmp:
+        main = import_backend(f"sqlite:///{tmp}/bench.db")
+        import profiling
+
+        main.Base.metadata.create_all(bind=main.engine)
+        seed(main)
+        profiling.install()
+        app = profiling.RequestProfiler(main.app.router)
+        results = {"idle": [], "sampling": [], "profiled": []}
+        samples = 0
+        for _ in range(args.rounds):
+            results["idle"] += asyncio.run(timed_requests(app, args.requests, {}))
+
+            counts = Counter()
+            stop = threading.Event()
+
+            def sample():
+                while not stop.is_set():
+                    counts.update(profiling.sample_stacks(0.5, args.interval_ms / 1000))
+
+            sampler = threading.Thread(target=sample)
+            sampler.start()
+            try:
+                results["sampling"] += asyncio.run(timed_requests(app, args.requests, {}))
+            finally:
+                stop.set()
+                sampler.join()
+            samples += sum(counts.values())
+
+            headers = {"X-Profile": "1", "X-Admin-Token": TOKEN}
+            results["profiled"] += asyncio.run(timed_requests(app, args.requests, headers))
+        profiling.uninstall()
+        main.engine.dispose()
+    return {
+        "requests": args.requests * args.rounds,
+        "routes": ROUTES,
+        "interval_ms": args.interval_ms,
+        "stacks_sampled": samples,
+        **{mode: summary(latencies) for mode, latencies in results.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per mode in each round.")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--interval-ms", type=float, default=10, help="Time between stack samples.")
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Benchmark for full-text search.
+
+Builds a throwaway SQLite database with a synthetic corpus of transcript
+entries (sampled from the seed transcripts' vocabulary), decisions and action
+items, indexed by the FTS5 triggers from app/search.py as rows are inserted.
+It then times `search.search` for frequent and rare terms, scoped to a
+meeting, an organization or nothing, against a `LIKE '%term%'` scan.
+
+    python benchmarks/search_bench.py --entries 1000000
+"""
+import argparse
+import itertools
+import json
+import random
+import re
+import tempfile
+import time
+
+from harness import import_backend, percentile, seed_transcripts
+
+
+def build_corpus(main, entries: int, organizations: int, meetings: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    vocabulary = sorted({
+        word.lower()
+        for utterances in seed_transcripts().values()
+        for _, text in utterances
+        for word in re.findall(r"[A-Za-z']+", text)
+    })
+    raw = main.engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.executemany("INSERT INTO organizations (id, name) VALUES (?, ?)", [(o, f"Org {o}") for o in range(1, organizations + 1)])
+        cur.executemany(
+            "INSERT INTO meetings (id, organization_id, title, status, scheduled_start_time) VALUES (?, ?, ?, 'completed', '2025-01-01T10:00:00')",
+            [(m, m % organizations + 1, f"Meeting {m}") for m in range(1, meetings + 1)],
+        )
+        cur.executemany(
+            "INSERT INTO users (id, organization_id, full_name, email, password_hash) VALUES (?, ?, ?, ?, 'x')",
+            [(m, m % organizations + 1, f"User {m}", f"user{m}@example.com") for m in range(1, meetings + 1)],
+        )
+        cur.executemany(
+            "INSERT INTO meeting_participants (id, meeting_id, user_id, role) VALUES (?, ?, ?, 'host')",
+            [(m, m, m) for m in range(1, meetings + 1)],
+        )
+        cur.executemany(
+            "INSERT INTO transcripts (id, meeting_id, processing_status) VALUES (?, ?, 'completed')",
+            [(m, m, ) for m in range(1, meetings + 1)],
+        )
+
+        # Word frequencies follow Zipf's law, as in natural language
+        rng.shuffle(vocabulary)
+        cumulative = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+
+        def sentence() -> str:
+            return " ".join(rng.choices(vocabulary, cum_weights=cumulative, k=rng.randint(6, 24)))
+
+        batch = 50_000
+        for start in range(0, entries, batch):
+            rows = []
+            for i in range(start, min(entries, start + batch)):
+                meeting = i % meetings + 1
+                rows.append((meeting, meeting, sentence(), i, i + 5))
+            cur.executemany(
+                "INSERT INTO transcript_entries (transcript_id, participant_id, text, start_time_offset_seconds, end_time_offset_seconds) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        per_meeting = max(1, entries // meetings // 100)
+        for table in ("decisions", "action_items"):
+            cur.executemany(
+                f"INSERT INTO {table} (meeting_id, description) VALUES (?, ?)",
+                [(m, sentence()) for m in range(1, meetings + 1) for _ in range(per_meeting)],
+            )
+        raw.commit()
+    finally:
+        raw.close()
+
+    # Pick a frequent and a rare term from the actual distribution
+    with main.engine.connect() as conn:
+        counts = {
+            word: conn.exec_driver_sql(
+                "SELECT count(*) FROM transcript_entries_fts WHERE transcript_entries_fts MATCH ?", (f'"{word}"',)
+            ).scalar()
+            for word in (vocabulary[0], vocabulary[len(vocabulary) // 2], vocabulary[-1])
+        }
+    ranked = sorted((count, word) for word, count in counts.items() if count)
+    return {"frequent": ranked[-1][1], "rare": ranked[0][1], "matches": counts}
+
+
+def time_queries(fn, repeat: int) -> dict:
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - started)
+    return {"p50_ms": percentile(latencies, 0.50) * 1000, "p95_ms": percentile(latencies, 0.95) * 1000}
+
+
+def run(args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        main = import_backend(f"sqlite:///{tmp}/bench.db")
+        import search
+        from database import SessionLocal
+        from sqlalchemy import text
+
+        main.Base.metadata.create_all(bind=main.engine)
+        started = time.perf_counter()
+        terms = build_corpus(main, args.entries, args.organizations, args.meetings, args.seed)
+        build_seconds = time.perf_counter() - started
+
+        scopes = {
+            "global": {},
+            "organization": {"organization_id": 1},
+            "meeting": {"meeting_id": 1},
+        }
+        report = {
+            "entries": args.entries,
+            "meetings": args.meetings,
+            "organizations": args.organizations,
+            "build_seconds": build_seconds,
+            "terms": terms,
+            "fts": {},
+            "like_scan": {},
+        }
+        with SessionLocal() as session:
+            for label in ("frequent", "rare"):
+                term = terms[label]
+                for scope, filters in scopes.items():
+                    report["fts"][f"{label}/{scope}"] = time_queries(
+                        lambda: search.search(session, term, limit=20, **filters), args.repeat
+                    )
+                # What clients do today, minus the transfer: scan every row for the term, unranked
+                report["like_scan"][label] = time_queries(
+                    lambda: session.execute(
+                        text("SELECT id, text FROM transcript_entries WHERE text LIKE :pattern"),
+                        {"pattern": f"%{term}%"},
+                    ).all(),
+                    max(1, args.repeat // 10),
+                )
+        main.engine.dispose()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=1_000_000, help="Transcript entries in the corpus.")
+    parser.add_argument("--meetings", type=int, default=2_000)
+    parser.add_argument("--organizations", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
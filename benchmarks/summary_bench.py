@@ -0,0 +1,111 @@
+"""
+Benchmark for map-reduce meeting summarization.
+
+Summarizes one long synthetic meeting with `app/summarization.py` against
+the FakeChatModel from the agents, which answers after a fixed latency. It
+runs at several concurrency limits, then edits one entry and summarizes
+again to show how much of the work the chunk cache saves.
+
+    python benchmarks/summary_bench.py --entries 3000 --latency 0.2 --concurrency 1,4,8
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+
+from harness import AGENTS_DIR, import_backend
+
+sys.path.insert(0, str(AGENTS_DIR))
+from fake_llm import FakeChatModel  # noqa: E402
+
+WORDS = "launch budget roadmap hiring pricing migration customer deadline review metrics design".split()
+
+
+def seed(main, entries: int, rng: random.Random):
+    raw = main.engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.execute("INSERT INTO organizations (id, name) VALUES (1, 'Bench Org')")
+        cur.execute("INSERT INTO meetings (id, organization_id, title, status, scheduled_start_time) VALUES (1, 1, 'Bench', 'completed', '2025-01-01T10:00:00')")
+        cur.executemany(
+            "INSERT INTO users (id, organization_id, full_name, email, password_hash) VALUES (?, 1, ?, ?, 'x')",
+            [(i, f"Speaker {i}", f"s{i}@example.com") for i in range(1, 6)],
+        )
+        cur.executemany("INSERT INTO meeting_participants (id, meeting_id, user_id, role) VALUES (?, 1, ?, 'attendee')", [(i, i) for i in range(1, 6)])
+        cur.execute("INSERT INTO transcripts (id, meeting_id, processing_status) VALUES (1, 1, 'completed')")
+        cur.executemany(
+            "INSERT INTO transcript_entries (transcript_id, participant_id, text, start_time_offset_seconds, end_time_offset_seconds) VALUES (1, ?, ?, ?, ?)",
+            [
+                (rng.randint(1, 5), " ".join(rng.choices(WORDS, k=rng.randint(6, 25))), i * 6, i * 6 + 5)
+                for i in range(entries)
+            ],
+        )
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def run(args) -> dict:
+    rng = random.Random(args.seed)
+    report = {"entries": args.entries, "llm_latency_s": args.latency, "chunk_tokens": args.chunk_tokens, "runs": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        main = import_backend(f"sqlite:///{tmp}/bench.db")
+        import summarization
+        from database import SessionLocal
+
+        main.Base.metadata.create_all(bind=main.engine)
+        seed(main, args.entries, rng)
+        respond = lambda prompt: "Notes: " + " ".join(rng.choices(WORDS, k=80))
+
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            with SessionLocal() as session:
+                session.execute(main.sql_models.SummaryCache.__table__.delete())
+                session.commit()
+                summarizer = summarization.Summarizer(
+                    FakeChatModel(respond, latency=args.latency), chunk_tokens=args.chunk_tokens, concurrency=concurrency
+                )
+                started = time.perf_counter()
+                result = summarization.summarize_meeting(session, 1, summarizer)
+                report["runs"][f"concurrency_{concurrency}"] = {
+                    "seconds": round(time.perf_counter() - started, 2),
+                    "chunks": result.chunks,
+                    "levels": result.levels,
+                    "llm_calls": result.llm_calls,
+                }
+
+        with SessionLocal() as session:
+            entry = session.get(main.sql_models.TranscriptEntry, args.entries // 2)
+            entry.text = "We agreed to move the launch to May"
+            session.commit()
+            started = time.perf_counter()
+            result = summarization.summarize_meeting(session, 1, summarizer)
+            report["runs"]["after_one_edit"] = {
+                "seconds": round(time.perf_counter() - started, 2),
+                "llm_calls": result.llm_calls,
+                "cache_hits": result.cache_hits,
+            }
+        main.engine.dispose()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=3000, help="Transcript entries in the meeting.")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds the fake LLM takes per call.")
+    parser.add_argument("--chunk-tokens", type=int, default=2000)
+    parser.add_argument("--concurrency", default="1,4,8", help="Comma separated concurrency limits.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark for time-window lookups on transcript entries.
+
+For transcripts of growing length, times `transcripts.entries_query` for
+windows that each return the same number of entries, with the
+(transcript_id, start_time_offset_seconds) index and again after dropping
+it. With the index the cost stays flat as the transcript grows (a B-tree seek
+plus k rows, O(log n + k)); without it every lookup scans the table, O(n).
+
+    python benchmarks/transcript_range_bench.py --sizes 10000,100000,1000000 --window 100
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+
+from sqlalchemy import text
+
+from harness import import_backend, percentile
+
+
+def seed(main, entries: int):
+    """One meeting whose transcript has `entries` entries, one every 5 seconds."""
+    raw = main.engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.execute("INSERT INTO organizations (id, name) VALUES (1, 'Bench Org')")
+        cur.execute("INSERT INTO meetings (id, organization_id, title, status, scheduled_start_time) VALUES (1, 1, 'Bench', 'completed', '2025-01-01T10:00:00')")
+        cur.execute("INSERT INTO users (id, organization_id, full_name, email, password_hash) VALUES (1, 1, 'User', 'user@example.com', 'x')")
+        cur.executemany(
+            "INSERT INTO meeting_participants (id, meeting_id, user_id, role) VALUES (?, 1, 1, 'attendee')", [(1,)]
+        )
+        cur.execute("INSERT INTO transcripts (id, meeting_id, processing_status) VALUES (1, 1, 'completed')")
+        cur.executemany(
+            "INSERT INTO transcript_entries (transcript_id, participant_id, text, start_time_offset_seconds, end_time_offset_seconds) VALUES (1, 1, 'lorem ipsum', ?, ?)",
+            ((i * 5, i * 5 + 5) for i in range(entries)),
+        )
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def time_windows(session, transcripts, entries: int, window: int, repeat: int, rng: random.Random) -> dict:
+    latencies = []
+    for _ in range(repeat):
+        start = rng.randrange(max(1, entries - window)) * 5
+        stmt = transcripts.entries_query(1, start=start, end=start + window * 5)
+        started = time.perf_counter()
+        rows = session.execute(stmt).all()
+        latencies.append(time.perf_counter() - started)
+        assert len(rows) == min(window, entries)
+    return {"p50_ms": percentile(latencies, 0.50) * 1000, "p95_ms": percentile(latencies, 0.95) * 1000}
+
+
+def run(args) -> dict:
+    rng = random.Random(args.seed)
+    report = {"window_entries": args.window, "sizes": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        main = import_backend(f"sqlite:///{tmp}/bench.db")
+        import transcripts
+        from database import SessionLocal
+
+        for size in [int(s) for s in args.sizes.split(",")]:
+            main.Base.metadata.drop_all(bind=main.engine)
+            main.Base.metadata.create_all(bind=main.engine)
+            seed(main, size)
+            with SessionLocal() as session:
+                stmt = transcripts.entries_query(1, start=0, end=args.window * 5)
+                compiled = stmt.compile(main.engine, compile_kwargs={"literal_binds": True})
+                plan = [row[-1] for row in session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))]
+                indexed = time_windows(session, transcripts, size, args.window, args.repeat, rng)
+                session.execute(text("DROP INDEX ix_transcript_entries_transcript_start"))
+                session.execute(text("DROP INDEX ix_transcript_entries_participant"))
+                scanned = time_windows(session, transcripts, size, args.window, max(3, args.repeat // 10), rng)
+                session.rollback()
+            report["sizes"][size] = {"plan": plan, "indexed": indexed, "full_scan": scanned}
+        main.engine.dispose()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma separated transcript lengths.")
+    parser.add_argument("--window", type=int, default=100, help="Entries returned by each lookup.")
+    parser.add_argument("--repeat", type=int, default=200, help="Lookups per size.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -75,6 +75,23 @@ const Chat = () => {
               } else {
                 console.log('Ignoring own message from WebSocket');
               }
+            } else if (messageData.type === 'stream') {
+              // Incremental chunks of an agent response, appended by stream id
+              if (messageData.user === username) return;
+              setMessages(prev => {
+                const idx = prev.findIndex(msg => msg.streamId === messageData.stream_id);
+                if (idx === -1) {
+                  return [...prev, {
+                    sender: 'other',
+                    streamId: messageData.stream_id,
+                    text: `${messageData.user}: ${messageData.delta}`,
+                    timestamp: messageData.timestamp
+                  }];
+                }
+                const updated = [...prev];
+                updated[idx] = { ...updated[idx], text: updated[idx].text + messageData.delta };
+                return updated;
+              });
             } else if (messageData.type === 'response') {
               console.log('Adding response message');
               // Received echo response
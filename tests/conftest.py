@@ -55,4 +55,14 @@ def client(db_session):
 @pytest.fixture(scope="function")
 def session(db_session):
     # Alias for clarity - use this in your tests for direct DB access
-    yield db_session
\ No newline at end of file
+    yield db_session
+
+# --- 6. Fixture pointing the app's module-level session at the test database ---
+@pytest.fixture(scope="function")
+def api_client(db_session, monkeypatch):
+    # main.py talks to the database through a module-level session rather than
+    # the get_db dependency, so swap that session for the in-memory one.
+    import main
+    monkeypatch.setattr(main, "db", db_session)
+    with TestClient(app) as c:
+        yield c
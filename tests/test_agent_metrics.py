@@ -0,0 +1,35 @@
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "agents"))
+
+import agent_metrics  # noqa: E402
+
+
+def test_agent_scrape_endpoint_serves_the_registry():
+    agent_metrics.record_message("TestAgent", "processed", time.time() - 2.0)
+    agent_metrics.record_message("TestAgent", "skipped")
+    server = agent_metrics.serve(0, host="127.0.0.1")
+    try:
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        response = httpx.get(f"{base_url}/metrics")
+        assert httpx.get(f"{base_url}/other").status_code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    assert "# TYPE agent_message_lag_seconds histogram" in lines
+    assert 'agent_messages_total{agent="TestAgent",outcome="skipped"} 1' in lines
+    # The lag is measured from the sender's timestamp, so it lands in the 2.5s bucket
+    assert 'agent_message_lag_seconds_bucket{agent="TestAgent",le="1"} 0' in lines
+    assert 'agent_message_lag_seconds_bucket{agent="TestAgent",le="2.5"} 1' in lines
+
+
+def test_serve_from_env_can_be_turned_off(monkeypatch):
+    monkeypatch.setenv("METRICS_PORT", "0")
+    assert agent_metrics.serve_from_env(default_port=9101) is None
@@ -0,0 +1,174 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import analytics
+import main
+from analytics import TranscriptColumns, compute_participation, equity_score
+from live_analytics import LiveAnalytics, live_analytics
+
+ORG_DATA = {"name": "Test Org"}
+MEETING_DATA = {
+    "title": "Test Meeting",
+    "scheduled_start_time": "2025-07-31T10:00:00"
+}
+
+
+def columns(*entries):
+    data = np.array(entries, dtype=np.int64).reshape(-1, 3)
+    return TranscriptColumns(participant_id=data[:, 0], start=data[:, 1], end=data[:, 2])
+
+
+def test_compute_participation_counts_time_and_turns():
+    stats = compute_participation(
+        columns((1, 0, 10), (1, 10, 15), (2, 15, 20), (1, 20, 30), (3, 30, 31)),
+        participants={1: "host", 2: "attendee", 3: "note_taker_agent", 4: "attendee"},
+    )
+    assert stats.participant_ids.tolist() == [1, 2, 3, 4]
+    assert stats.speaking_time.tolist() == [25, 5, 1, 0]
+    assert stats.turn_count.tolist() == [2, 1, 1, 0]
+    # The agent is excluded; the silent attendee still counts
+    assert stats.equity_score == pytest.approx(equity_score(np.array([25, 5, 0])))
+
+
+def test_equity_score_bounds():
+    assert equity_score(np.array([10, 10, 10])) == pytest.approx(1.0)
+    assert equity_score(np.array([10, 10, 10]), method="entropy") == pytest.approx(1.0)
+    assert equity_score(np.array([0, 0, 30]), method="entropy") == pytest.approx(0.0)
+    assert equity_score(np.array([], dtype=np.int64)) is None
+
+
+def create_meeting_with_speakers(client, speakers=2):
+    org_id = client.post("/organizations/", json=ORG_DATA).json()["id"]
+    meeting_id = client.post("/meetings/", json=dict(MEETING_DATA, organization_id=org_id)).json()["id"]
+    participant_ids = []
+    for i in range(speakers):
+        user = {"full_name": f"User {i}", "email": f"user{i}@example.com", "password": "password123"}
+        user_id = client.post("/users/", json=user).json()["id"]
+        participant = {"meeting_id": meeting_id, "user_id": user_id, "role": "attendee"}
+        participant_ids.append(client.post("/meeting_participants/", json=participant).json()["id"])
+    transcript_id = client.post("/transcripts/", json={"meeting_id": meeting_id}).json()["id"]
+    return meeting_id, transcript_id, participant_ids
+
+
+def entry(transcript_id, participant_id, start, length=10):
+    return {
+        "transcript_id": transcript_id,
+        "participant_id": participant_id,
+        "text": "Hello",
+        "start_time_offset_seconds": start,
+        "end_time_offset_seconds": start + length,
+    }
+
+
+def test_meeting_analytics_endpoint_upserts(api_client):
+    meeting_id, transcript_id, speakers = create_meeting_with_speakers(api_client)
+    for start, speaker in enumerate([0, 0, 1]):
+        api_client.post("/transcript_entries/", json=entry(transcript_id, speakers[speaker], start * 10))
+
+    first = api_client.post(f"/meetings/{meeting_id}/analytics")
+    assert first.status_code == 200
+    second = api_client.post(f"/meetings/{meeting_id}/analytics").json()
+    assert second["id"] == first.json()["id"]
+    rows = {row["participant_id"]: row for row in second["participant_analytics"]}
+    assert rows[speakers[0]]["speaking_time_seconds"] == 20
+    assert rows[speakers[0]]["turn_count"] == 1
+    assert rows[speakers[1]]["turn_count"] == 1
+    assert len(api_client.get("/participant_analytics/").json()) == 2
+
+    assert api_client.post("/meetings/999/analytics").status_code == 404
+
+
+def test_live_analytics_track_single_and_bulk_inserts(api_client):
+    meeting_id, transcript_id, speakers = create_meeting_with_speakers(api_client)
+    api_client.post("/transcript_entries/", json=entry(transcript_id, speakers[0], 0))
+    response = api_client.post("/transcript_entries/bulk", json=[
+        entry(transcript_id, speakers[0], 10),
+        entry(transcript_id, speakers[1], 20, length=5),
+        entry(transcript_id, speakers[0], 25),
+    ])
+    assert response.status_code == 201
+    assert len(response.json()) == 3
+
+    live = api_client.get(f"/meetings/{meeting_id}/analytics/live").json()
+    rows = {row["participant_id"]: row for row in live["participants"]}
+    assert rows[speakers[0]]["speaking_time_seconds"] == 30
+    assert rows[speakers[0]]["turn_count"] == 2
+    assert rows[speakers[1]]["turn_count"] == 1
+
+    assert live_analytics.flush(force=True) == 1
+    stored = api_client.get("/participant_analytics/").json()
+    assert {row["participant_id"]: row["turn_count"] for row in stored} == {speakers[0]: 2, speakers[1]: 1}
+    recomputed = api_client.post(f"/meetings/{meeting_id}/analytics").json()
+    assert recomputed["participation_equity_score"] == pytest.approx(live["participation_equity_score"])
+
+
+def test_live_analytics_reconciles_out_of_order_entries(api_client):
+    meeting_id, transcript_id, speakers = create_meeting_with_speakers(api_client)
+    for start, speaker in [(0, 0), (10, 1), (20, 0)]:
+        api_client.post("/transcript_entries/", json=entry(transcript_id, speakers[speaker], start))
+    # Arrives late and joins the following entry into a single turn
+    api_client.post("/transcript_entries/", json=entry(transcript_id, speakers[1], 5, length=1))
+    assert live_analytics.tallies[meeting_id].drifted
+
+    live_analytics.flush(force=True)
+    stored = {row["participant_id"]: row for row in api_client.get("/participant_analytics/").json()}
+    assert stored[speakers[1]]["speaking_time_seconds"] == 11
+    assert stored[speakers[1]]["turn_count"] == 1
+    assert not live_analytics.tallies[meeting_id].drifted
+
+
+def test_live_analytics_reads_the_database_outside_the_lock(api_client, monkeypatch):
+    meeting_id, transcript_id, speakers = create_meeting_with_speakers(api_client)
+    load = analytics.load_transcript_columns
+    lock_free = []
+
+    def try_lock():
+        acquired = live_analytics._lock.acquire(timeout=1)
+        if acquired:
+            live_analytics._lock.release()
+        lock_free.append(acquired)
+
+    def load_transcript_columns(session, meeting_id):
+        # Another thread must be able to take the lock while the seed is read
+        thread = threading.Thread(target=try_lock)
+        thread.start()
+        thread.join()
+        return load(session, meeting_id)
+
+    monkeypatch.setattr(analytics, "load_transcript_columns", load_transcript_columns)
+    api_client.post("/transcript_entries/", json=entry(transcript_id, speakers[0], 0))
+    api_client.post("/transcript_entries/", json=entry(transcript_id, speakers[1], 5, length=1))
+    live_analytics.flush(force=True)
+    assert lock_free and all(lock_free)
+    assert not live_analytics.tallies[meeting_id].drifted
+
+
+def test_live_analytics_evicts_idle_and_completed_meetings(api_client, db_session):
+    meeting_id, transcript_id, speakers = create_meeting_with_speakers(api_client)
+    api_client.post("/transcript_entries/", json=entry(transcript_id, speakers[0], 0))
+    assert live_analytics.flush(force=True) == 1
+    assert meeting_id in live_analytics.tallies
+
+    # Flushed and idle: dropped, along with its transcript lookup
+    live_analytics.flush(now=time.monotonic() + live_analytics.idle_timeout)
+    assert meeting_id not in live_analytics.tallies
+    assert transcript_id not in live_analytics.transcript_meetings
+
+    # Reseeded from the database on the next entry
+    api_client.post("/transcript_entries/", json=entry(transcript_id, speakers[1], 10))
+    live = api_client.get(f"/meetings/{meeting_id}/analytics/live").json()
+    assert sorted(row["turn_count"] for row in live["participants"]) == [1, 1]
+
+    main.meeting_analytics_job(db_session, {"meeting_id": meeting_id})
+    assert meeting_id not in live_analytics.tallies
+
+    org_id = api_client.post("/organizations/", json=ORG_DATA).json()["id"]
+    other_meeting = api_client.post("/meetings/", json=dict(MEETING_DATA, organization_id=org_id)).json()["id"]
+    other_transcript = api_client.post("/transcripts/", json={"meeting_id": other_meeting}).json()["id"]
+    live = LiveAnalytics(max_transcripts=1)
+    live.record(db_session.get_bind(), [(transcript_id, speakers[0], 0, 1), (other_transcript, speakers[0], 0, 1)])
+    assert len(live.transcript_meetings) == 1
+    assert set(live.tallies) == {meeting_id, other_meeting}
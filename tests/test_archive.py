@@ -0,0 +1,234 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+
+import analytics
+import archive
+import datagen
+import summarization
+import validation_models.sql_models as sql_models
+
+NOW = datetime(2025, 9, 1)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = archive.ArchiveStore(tmp_path / "archive")
+    monkeypatch.setattr(archive, "archive_store", store)
+    return store
+
+
+def create_meeting(client, org_id, users, ended_at, entries=6):
+    meeting_id = client.post("/meetings/", json={
+        "organization_id": org_id, "title": "Review", "scheduled_start_time": ended_at, "status": "completed",
+    }).json()["id"]
+    client.put(f"/meetings/{meeting_id}", json={"actual_end_time": ended_at})
+    participants = client.post("/meeting_participants/bulk", json=[
+        {"meeting_id": meeting_id, "user_id": user["id"], "role": "attendee"} for user in users
+    ]).json()
+    transcript_id = client.post("/transcripts/", json={"meeting_id": meeting_id}).json()["id"]
+    # Out of spoken order, with a tie, so reads have to merge by (start, id)
+    starts = [50, 0, 30, 30, 90, 10][:entries]
+    client.post("/transcript_entries/bulk", json=[
+        {
+            "transcript_id": transcript_id, "participant_id": participants[i % len(participants)]["id"], "text": f"Entry {i} – naïve ✓",
+            "start_time_offset_seconds": start, "end_time_offset_seconds": start + 5,
+        }
+        for i, start in enumerate(starts)
+    ])
+    return meeting_id, transcript_id, participants
+
+
+def reads(client, transcript_id, participant_id):
+    transcript = client.get(f"/transcripts/{transcript_id}").json()
+    transcript["entries"].sort(key=lambda entry: (entry["start_time_offset_seconds"], entry["id"]))
+    return [
+        client.get(f"/transcripts/{transcript_id}/entries").json(),
+        client.get(f"/transcripts/{transcript_id}/entries", params={"start": 10, "end": 60, "limit": 2}).json(),
+        client.get(f"/transcripts/{transcript_id}/entries", params={"participant_id": participant_id}).json(),
+        client.get(f"/transcripts/{transcript_id}/export", params={"format": "csv"}).text,
+        transcript,
+    ]
+
+
+def test_archived_transcripts_read_through(api_client, db_session, store):
+    org_id = api_client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    users = api_client.post("/users/bulk", json=[
+        {"organization_id": org_id, "email": f"user{i}@example.com", "full_name": f"User {i}", "password": "secret-password"}
+        for i in range(2)
+    ]).json()
+    old_meeting, old_transcript, participants = create_meeting(api_client, org_id, users, "2025-01-10T10:00:00")
+    recent_meeting, recent_transcript, _ = create_meeting(api_client, org_id, users, "2025-08-25T10:00:00")
+    entries = api_client.get(f"/transcripts/{old_transcript}/entries").json()
+    pinned = entries[2]["id"]
+    api_client.post("/action_items/", json={"meeting_id": old_meeting, "description": "Follow up", "source_transcript_entry_id": pinned})
+    before = reads(api_client, old_transcript, participants[0]["id"])
+    columns_before = analytics.load_transcript_columns(db_session, old_meeting)
+
+    result = archive.archive_transcripts(db_session.get_bind(), 90, now=NOW)
+    assert (result.transcripts, result.entries, result.kept) == (1, 5, 1)
+    db_session.expire_all()
+    hot = db_session.query(sql_models.TranscriptEntry.id).filter_by(transcript_id=old_transcript).all()
+    assert [entry_id for entry_id, in hot] == [pinned]
+    assert db_session.query(sql_models.TranscriptEntry).filter_by(transcript_id=recent_transcript).count() == 6
+    assert store.path(org_id).exists()
+
+    assert reads(api_client, old_transcript, participants[0]["id"]) == before
+    columns_after = analytics.load_transcript_columns(db_session, old_meeting)
+    assert columns_after.participant_id.tolist() == columns_before.participant_id.tolist()
+    assert columns_after.start.tolist() == columns_before.start.tolist()
+    assert api_client.get(f"/transcript_entries/{entries[0]['id']}").json() == entries[0]
+    assert api_client.get(f"/transcript_entries/{entries[0]['id']}", params={"fields": "text"}).json() == {"text": entries[0]["text"]}
+    assert api_client.get("/transcript_entries/999999").status_code == 404
+
+    # Running again has nothing left to do
+    assert archive.archive_transcripts(db_session.get_bind(), 90, now=NOW).transcripts == 0
+
+
+def test_archived_entries_stay_searchable(api_client, db_session, store):
+    org_id = api_client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    users = api_client.post("/users/bulk", json=[
+        {"organization_id": org_id, "email": "user@example.com", "full_name": "User", "password": "secret-password"}
+    ]).json()
+    meeting_id, _, _ = create_meeting(api_client, org_id, users, "2025-01-10T10:00:00")
+
+    def found(q, **params):
+        results = api_client.get("/search", params={"q": q, **params}).json()["results"]
+        return sorted((r["id"], r["meeting_id"], r["organization_id"], r["snippet"]) for r in results)
+
+    before = found("naive entry")
+    assert len(before) == 6 and "<mark>naïve</mark>" in before[0][3]
+    assert archive.archive_transcripts(db_session.get_bind(), 90, now=NOW).entries == 6
+    assert found("naive entry") == before
+    assert found("naive entry", meeting_id=meeting_id, types="transcript_entry") == before
+    assert found("naive entry", organization_id=org_id + 1) == []
+    assert found("missing") == []
+
+
+def test_archived_entries_are_listed_and_batch_read(api_client, db_session, store):
+    org_id = api_client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    users = api_client.post("/users/bulk", json=[
+        {"organization_id": org_id, "email": "user@example.com", "full_name": "User", "password": "secret-password"}
+    ]).json()
+    create_meeting(api_client, org_id, users, "2025-01-10T10:00:00")
+    create_meeting(api_client, org_id, users, "2025-08-25T10:00:00", entries=2)
+    entries = api_client.get("/transcript_entries/").json()
+    assert archive.archive_transcripts(db_session.get_bind(), 90, now=NOW).entries == 6
+
+    assert api_client.get("/transcript_entries/").json() == entries
+    assert api_client.get("/transcript_entries/", params={"skip": 4, "limit": 3}).json() == entries[4:7]
+    assert api_client.get("/transcript_entries/", params={"fields": "id"}).json() == [{"id": entry["id"]} for entry in entries]
+
+    ids = [entries[6]["id"], entries[0]["id"], 999999, entries[3]["id"]]
+    result = api_client.post("/transcript_entries/batch_get", json={"ids": ids}).json()
+    assert result == {"items": [entries[6], entries[0], entries[3]], "missing": [999999]}
+    result = api_client.post("/transcript_entries/batch_get", params={"fields": "text"}, json={"ids": ids}).json()
+    assert result["items"] == [{"text": entries[i]["text"]} for i in (6, 0, 3)]
+
+
+def test_entries_added_after_archiving_are_merged(api_client, db_session, store):
+    org_id = api_client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    users = api_client.post("/users/bulk", json=[
+        {"organization_id": org_id, "email": "user@example.com", "full_name": "User", "password": "secret-password"}
+    ]).json()
+    _, transcript_id, participants = create_meeting(api_client, org_id, users, "2025-01-10T10:00:00", entries=4)
+    archived_ids = [entry["id"] for entry in api_client.get(f"/transcripts/{transcript_id}/entries").json()]
+    assert archive.archive_transcripts(db_session.get_bind(), 90, now=NOW).entries == 4
+    late = api_client.post("/transcript_entries/", json={
+        "transcript_id": transcript_id, "participant_id": participants[0]["id"], "text": "Late",
+        "start_time_offset_seconds": 20, "end_time_offset_seconds": 25,
+    }).json()
+    # AUTOINCREMENT: the table is empty, but archived ids are not handed out again
+    assert late["id"] > max(archived_ids)
+    starts = [entry["start_time_offset_seconds"] for entry in api_client.get(f"/transcripts/{transcript_id}/entries").json()]
+    assert starts == [0, 20, 30, 30, 50]
+
+    result = archive.archive_transcripts(db_session.get_bind(), 90, now=NOW)
+    assert (result.transcripts, result.entries) == (1, 1)
+    db_session.expire_all()
+    record = db_session.get(sql_models.TranscriptArchive, transcript_id)
+    assert record.entry_count == 5 and record.last_entry_id == late["id"]
+    assert [entry["start_time_offset_seconds"] for entry in api_client.get(f"/transcripts/{transcript_id}/entries").json()] == starts
+
+
+def test_archives_of_deleted_transcripts_are_swept(api_client, db_session, store):
+    org_id = api_client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    users = api_client.post("/users/bulk", json=[
+        {"organization_id": org_id, "email": "user@example.com", "full_name": "User", "password": "secret-password"}
+    ]).json()
+    _, deleted, _ = create_meeting(api_client, org_id, users, "2025-01-10T10:00:00")
+    _, kept, _ = create_meeting(api_client, org_id, users, "2025-01-11T10:00:00")
+    deleted_ids = [entry["id"] for entry in api_client.get(f"/transcripts/{deleted}/entries").json()]
+    archive.archive_transcripts(db_session.get_bind(), 90, now=NOW)
+    # A chunk written by a run that failed before recording it
+    store.write(org_id, [(999, 999, 1, archive.encode_chunk([(999, 1, "Lost", 0, 5)]))])
+    assert store.transcript_ids(org_id) == [deleted, kept, 999]
+
+    api_client.delete(f"/transcripts/{deleted}")
+    # Until the sweep, the deleted transcript's entries are not read from its chunk
+    assert api_client.get(f"/transcript_entries/{deleted_ids[0]}").status_code == 404
+    assert {r["id"] for r in api_client.get("/search", params={"q": "entry"}).json()["results"]}.isdisjoint(deleted_ids)
+
+    result = archive.archive_transcripts(db_session.get_bind(), 90, now=NOW)
+    assert (result.swept, result.transcripts) == (2, 0)
+    assert store.transcript_ids(org_id) == [kept]
+    db_session.expire_all()
+    assert [record.transcript_id for record in db_session.query(sql_models.TranscriptArchive)] == [kept]
+    assert db_session.query(sql_models.ArchivedEntry).filter_by(transcript_id=deleted).count() == 0
+    assert len(api_client.get("/search", params={"q": "entry"}).json()["results"]) == 6
+
+
+def test_archiving_needs_ids_that_are_never_reused(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE transcript_entries (id INTEGER PRIMARY KEY, text TEXT)")
+    with pytest.raises(RuntimeError, match="AUTOINCREMENT"):
+        archive.archive_transcripts(engine, 90, store=archive.ArchiveStore(tmp_path / "archive"), now=NOW)
+
+
+class EchoLLM:
+    def invoke(self, prompt):
+        return prompt.splitlines()[-1] if prompt.startswith("You are summarizing") else prompt
+
+
+def test_summaries_of_archived_meetings_use_every_entry(api_client, db_session, store):
+    org_id = api_client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    users = api_client.post("/users/bulk", json=[
+        {"organization_id": org_id, "email": f"user{i}@example.com", "full_name": f"User {i}", "password": "secret-password"}
+        for i in range(2)
+    ]).json()
+    meeting_id, _, _ = create_meeting(api_client, org_id, users, "2025-01-10T10:00:00")
+    create_meeting(api_client, org_id, users, "2025-08-25T10:00:00")
+    # Extraction reads the same lines
+    lines = list(summarization.transcript_lines(db_session, meeting_id))
+    summarizer = summarization.Summarizer(EchoLLM())
+    before = summarization.summarize_meeting(db_session, meeting_id, summarizer).summary_text
+
+    archive.archive_transcripts(db_session.get_bind(), 90, now=NOW)
+    db_session.expire_all()
+    assert len(lines) == 6
+    assert list(summarization.transcript_lines(db_session, meeting_id)) == lines
+    assert summarization.summarize_meeting(db_session, meeting_id, summarizer).summary_text == before
+
+
+def test_chunks_round_trip():
+    rows = [(3, 7, "héllo", 0, 4), (4, 2, "", 4, 4), (9, 7, "wörld ✓\nline", 4, 11)]
+    archived = archive.decode_chunk(archive.encode_chunk(rows), transcript_id=1, meeting_id=2)
+    assert archived.tuples() == rows
+    assert [row["id"] for row in archived.rows(start=4, end=5)] == [4, 9]
+    assert [row["id"] for row in archived.rows(participant_ids=[7], limit=1)] == [3]
+    assert archived.row(9)["text"] == "wörld ✓\nline"
+    assert archived.row(5) is None
+
+
+def test_compact_shrinks_the_database(tmp_path):
+    path = tmp_path / "scale.db"
+    config = datagen.Config(organizations=2, users_per_org=8, meetings_per_user=3, seed=11)
+    counts = datagen.generate(str(path), config, workers=1)
+    store = archive.ArchiveStore(tmp_path / "archive")
+    summary = archive.compact(path, 30, store=store, now=config.now, samples=5)
+    assert 0 < summary["archived"]["entries"] < counts["transcript_entries"]
+    assert summary["after"]["database_bytes"] < summary["before"]["database_bytes"]
+    assert summary["after"]["archive_bytes"] == store.size() > 0
+    assert set(summary["after"]["latency"]) == {"entry_window", "search", "entry_insert", "archived_entry_window"}
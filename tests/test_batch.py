@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import event
+
+ORG_DATA = {"name": "Test Org"}
+
+
+def create_users(client, count):
+    org_id = client.post("/organizations/", json=ORG_DATA).json()["id"]
+    users = [
+        {"organization_id": org_id, "email": f"user{i}@example.com", "full_name": f"User {i}", "password": "secret-password"}
+        for i in range(count)
+    ]
+    return [user["id"] for user in client.post("/users/bulk", json=users).json()]
+
+
+@pytest.fixture
+def selects(db_session):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_batch_get_preserves_order_and_reports_missing(api_client, selects):
+    first, second, third = create_users(api_client, 3)
+    selects.clear()
+    response = api_client.post("/users/batch_get", json={"ids": [third, 999, first, third]})
+    assert response.status_code == 200
+    body = response.json()
+    assert [user["id"] for user in body["items"]] == [third, first, third]
+    assert body["missing"] == [999]
+    assert len(selects) == 1
+
+    assert api_client.post("/users/batch_get", json={"ids": []}).status_code == 422
+
+
+def test_batch_update_is_all_or_nothing(api_client):
+    first, second = create_users(api_client, 2)
+    response = api_client.post("/users/batch_update", json=[
+        {"id": second, "full_name": "Second"},
+        {"id": first, "timezone": "Europe/Paris"},
+    ])
+    assert response.status_code == 200
+    updated = response.json()
+    assert [user["id"] for user in updated] == [second, first]
+    assert updated[0]["full_name"] == "Second"
+    assert updated[1]["timezone"] == "Europe/Paris"
+
+    response = api_client.post("/users/batch_update", json=[
+        {"id": first, "full_name": "Renamed"},
+        {"id": 999, "full_name": "Nobody"},
+    ])
+    assert response.status_code == 404
+    assert "999" in response.json()["detail"]
+    assert api_client.get(f"/users/{first}").json()["full_name"] == "User 0"
+
+    assert api_client.post("/users/batch_update", json=[{"full_name": "No id"}]).status_code == 422
+
+
+def test_batch_delete_reports_deleted_and_missing(api_client):
+    first, second, third = create_users(api_client, 3)
+    response = api_client.post("/users/batch_delete", json={"ids": [first, 999, third]})
+    assert response.status_code == 200
+    assert response.json() == {"deleted": [first, third], "missing": [999]}
+    assert [user["id"] for user in api_client.get("/users/").json()] == [second]
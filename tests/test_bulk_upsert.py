@@ -0,0 +1,90 @@
+from sqlalchemy import event
+
+import validation_models.pd_models as pd_models
+
+
+ORG_DATA = {"name": "Test Org"}
+MEETING_DATA = {
+    "title": "Test Meeting",
+    "scheduled_start_time": "2025-07-31T10:00:00"
+}
+
+
+def create_meeting(client):
+    org_id = client.post("/organizations/", json=ORG_DATA).json()["id"]
+    meeting = dict(MEETING_DATA, organization_id=org_id)
+    return client.post("/meetings/", json=meeting).json()["id"]
+
+
+def test_upsert_replaces_summaries_matched_on_meeting(api_client):
+    meeting_id = create_meeting(api_client)
+    api_client.post("/meeting_summaries/upsert", json=[{"meeting_id": meeting_id, "summary_text": "v1"}])
+    response = api_client.post("/meeting_summaries/upsert", json=[{"meeting_id": meeting_id, "summary_text": "v2"}])
+    assert response.status_code == 200
+    summaries = api_client.get("/meeting_summaries/").json()
+    assert [s["summary_text"] for s in summaries] == ["v2"]
+    # There is one upsert path
+    assert api_client.post("/meeting_summaries/bulk_upsert", json=[]).status_code == 405
+
+
+def test_upsert_batches_are_capped(api_client):
+    meeting_id = create_meeting(api_client)
+    rows = [{"meeting_id": meeting_id, "description": "Item", "idempotency_key": f"k{i}"} for i in range(pd_models.BATCH_LIMIT + 1)]
+    assert api_client.post("/action_items/upsert", json=rows).status_code == 422
+
+
+def test_upsert_with_idempotency_keys_makes_retries_safe(api_client):
+    meeting_id = create_meeting(api_client)
+    rows = [
+        {"meeting_id": meeting_id, "description": "Write the spec", "idempotency_key": "agent:1:spec"},
+        {"meeting_id": meeting_id, "description": "Book a room", "idempotency_key": "agent:1:room"},
+    ]
+    first = api_client.post("/action_items/upsert", json=rows)
+    assert first.status_code == 200
+    retried = api_client.post("/action_items/upsert", json=rows)
+    assert [item["id"] for item in retried.json()] == [item["id"] for item in first.json()]
+    assert len(api_client.get("/action_items/").json()) == 2
+
+    # Fields a row does not send are left as they are
+    spec_id = first.json()[0]["id"]
+    api_client.put(f"/action_items/{spec_id}", json={"status": "completed"})
+    response = api_client.post("/action_items/upsert", json=[
+        {"meeting_id": meeting_id, "description": "Book a bigger room", "idempotency_key": "agent:1:room"},
+        {"meeting_id": meeting_id, "description": "Write the spec v2", "idempotency_key": "agent:1:spec"},
+    ])
+    room, spec = response.json()
+    assert room["description"] == "Book a bigger room"
+    assert spec["id"] == spec_id and spec["description"] == "Write the spec v2" and spec["status"] == "completed"
+
+    response = api_client.post("/action_items/upsert", json=[{"meeting_id": meeting_id, "description": "No key"}])
+    assert response.status_code == 422
+
+
+def test_upsert_writes_a_batch_in_one_statement(api_client, db_session):
+    meeting_ids = [create_meeting(api_client) for _ in range(3)]
+    api_client.post("/meeting_summaries/upsert", json=[{"meeting_id": meeting_ids[0], "summary_text": "old"}])
+
+    statements = []
+    engine = db_session.get_bind()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = api_client.post("/meeting_summaries/upsert", json=[
+            {"meeting_id": meeting_id, "summary_text": f"v{i}"} for i, meeting_id in enumerate(meeting_ids)
+        ])
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert response.status_code == 200
+    assert [s["meeting_id"] for s in response.json()] == meeting_ids
+    assert [s["summary_text"] for s in api_client.get("/meeting_summaries/").json()] == ["v0", "v1", "v2"]
+    writes = [s for s in statements if not s.lstrip().upper().startswith("SELECT")]
+    assert len(writes) == 1 and "ON CONFLICT" in writes[0]
+
+    response = api_client.post("/meeting_analytics/upsert", json=[{"meeting_id": meeting_ids[0], "participation_equity_score": 0.5}])
+    analytics_id = response.json()[0]["id"]
+    response = api_client.post("/meeting_analytics/upsert", json=[{"meeting_id": meeting_ids[0], "participation_equity_score": 0.75}])
+    assert response.json()[0]["id"] == analytics_id
+    assert response.json()[0]["participation_equity_score"] == 0.75
@@ -0,0 +1,130 @@
+import asyncio
+import json
+
+import extraction
+import importer
+import validation_models.sql_models as sql_models
+from changefeed import Change, ChangeFeed, ChangeFilter, change_feed, coalesce
+
+
+def parse(message: str) -> dict:
+    fields = dict(line.split(": ", 1) for line in message.strip().splitlines())
+    fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+def test_commits_publish_scoped_changes(api_client):
+    org_id = api_client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    meeting_id = api_client.post("/meetings/", json={
+        "organization_id": org_id, "title": "Planning", "scheduled_start_time": "2025-07-31T10:00:00",
+    }).json()["id"]
+    start = change_feed.seq
+    item_id = api_client.post("/action_items/", json={"meeting_id": meeting_id, "description": "Draft"}).json()["id"]
+    api_client.put(f"/action_items/{item_id}", json={"status": "completed"})
+    api_client.delete(f"/action_items/{item_id}")
+    # A failed transaction publishes nothing
+    api_client.post("/action_items/batch_update", json=[{"id": item_id, "status": "open"}])
+
+    changes, lost = change_feed.since(start)
+    assert not lost
+    assert [(c.entity, c.id, c.op, c.organization_id, c.meeting_id) for c in changes] == [
+        ("action_items", item_id, "create", org_id, meeting_id),
+        ("action_items", item_id, "update", org_id, meeting_id),
+        ("action_items", item_id, "delete", org_id, meeting_id),
+    ]
+    assert "status" in changes[1].fields and "description" not in changes[1].fields
+
+
+def test_coalesce_merges_changes_per_row():
+    def change(seq, entity, item_id, op, fields=()):
+        return Change(seq, entity, item_id, op, fields, 1, 1)
+
+    assert coalesce([
+        change(1, "action_items", 1, "create"),
+        change(2, "action_items", 1, "update", ("status",)),
+        change(3, "decisions", 7, "update", ("description",)),
+        change(4, "action_items", 2, "update", ("status",)),
+        change(5, "action_items", 2, "update", ("due_date", "status")),
+        change(6, "action_items", 3, "create"),
+        change(7, "action_items", 3, "delete"),
+        change(8, "decisions", 7, "delete"),
+    ]) == [
+        {"entity": "action_items", "id": 1, "op": "create"},
+        {"entity": "decisions", "id": 7, "op": "delete"},
+        {"entity": "action_items", "id": 2, "op": "update", "fields": ["status", "due_date"]},
+    ]
+
+
+def test_events_stream_coalesced_bursts_and_resume():
+    feed = ChangeFeed(buffer_size=4, coalesce_window=0.05, heartbeat=0.05)
+    meeting_filter = ChangeFilter(meeting_id=1)
+
+    async def scenario():
+        events = feed.events(meeting_filter)
+        ready = parse(await anext(events))
+        assert ready["event"] == "ready"
+
+        # Nothing happens yet
+        assert await anext(events) == ": keepalive\n\n"
+        # A burst, only partly in this meeting, arrives as one message
+        feed.publish([("action_items", 1, "create", (), 1, 1), ("action_items", 2, "create", (), 1, 2)])
+        feed.publish([("action_items", 1, "update", ("status",), 1, 1)])
+        message = parse(await anext(events))
+        assert message["event"] == "changes"
+        assert message["id"] == feed.event_id(3)
+        assert message["data"] == [{"entity": "action_items", "id": 1, "op": "create"}]
+        await events.aclose()
+
+        # Resuming from the ready event replays what came after it
+        resumed = feed.events(meeting_filter, ready["id"])
+        assert parse(await anext(resumed))["data"] == message["data"]
+        await resumed.aclose()
+
+        # Ids from another stream, or older than the buffer, get a reset
+        stale = feed.events(meeting_filter, "elsewhere-1")
+        assert parse(await anext(stale))["event"] == "reset"
+        await stale.aclose()
+        feed.publish([("decisions", i, "create", (), 1, 1) for i in range(5)])
+        overrun = feed.events(meeting_filter, ready["id"])
+        assert parse(await anext(overrun))["event"] == "reset"
+        await overrun.aclose()
+        assert not feed._waiters
+
+    asyncio.run(scenario())
+
+
+def test_changes_endpoint_requires_a_known_scope(api_client):
+    org_id = api_client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    assert api_client.get("/changes").status_code == 422
+    assert api_client.get("/changes", params={"organization_id": org_id + 1}).status_code == 404
+    assert api_client.get("/changes", params={"organization_id": org_id, "entities": "jobs"}).status_code == 422
+
+
+def test_bulk_writes_of_extraction_and_import_are_published(api_client, db_session):
+    org_id = api_client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    meeting_id = api_client.post("/meetings/", json={
+        "organization_id": org_id, "title": "Planning", "scheduled_start_time": "2025-07-31T10:00:00",
+    }).json()["id"]
+    user_id = api_client.post("/users/", json={"full_name": "Sarah Chen", "email": "sarah@example.com", "password": "password123"}).json()["id"]
+    api_client.post("/meeting_participants/", json={"meeting_id": meeting_id, "user_id": user_id, "role": "host"})
+    start = change_feed.seq
+    body = b'{"speaker": "Sarah Chen", "text": "Hello", "start_time_offset_seconds": 0, "end_time_offset_seconds": 5}\n'
+    api_client.post(f"/meetings/{meeting_id}/transcript/import", content=body)
+    changes, _ = change_feed.since(start)
+    assert [(c.entity, c.op, c.organization_id, c.meeting_id) for c in changes if c.entity == "transcript_entries"] == [
+        ("transcript_entries", "create", org_id, meeting_id),
+    ]
+
+    start = change_feed.seq
+    items = [
+        extraction.ExtractedItem("action_item", "Send the report"),
+        extraction.ExtractedItem("decision", "Ship in May"),
+    ]
+    participants = importer.ParticipantMap.load(db_session.connection(), meeting_id)
+    extraction.Extractor(llm=None).write(db_session, meeting_id, items, participants, extraction.ExtractionResult(meeting_id))
+    changes, _ = change_feed.since(start)
+    assert sorted((c.entity, c.op, c.organization_id, c.meeting_id) for c in changes) == [
+        ("action_items", "create", org_id, meeting_id),
+        ("decisions", "create", org_id, meeting_id),
+    ]
+    assert {c.id for c in changes if c.entity == "decisions"} == {db_session.query(sql_models.Decision).one().id}
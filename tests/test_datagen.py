@@ -0,0 +1,91 @@
+import hashlib
+import sqlite3
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+import datagen
+
+SCHEMA = Path(__file__).resolve().parents[1] / "artifacts" / "schema.sql"
+CONFIG = datagen.Config(organizations=3, users_per_org=8, meetings_per_user=3, seed=11)
+
+
+def digest(path) -> str:
+    conn = sqlite3.connect(path)
+    h = hashlib.sha256()
+    for table in datagen.COLUMNS:
+        for row in conn.execute(f"SELECT * FROM {table} ORDER BY id"):
+            h.update(repr(row).encode())
+    conn.close()
+    return h.hexdigest()
+
+
+@pytest.fixture(scope="module")
+def generated(tmp_path_factory):
+    path = tmp_path_factory.mktemp("datagen") / "generated.db"
+    counts = datagen.generate(str(path), CONFIG, workers=1)
+    return path, counts
+
+
+def test_generation_is_deterministic_across_workers(generated, tmp_path):
+    path, counts = generated
+    parallel = tmp_path / "parallel.db"
+    assert datagen.generate(str(parallel), CONFIG, workers=2) == counts
+    assert digest(parallel) == digest(path)
+
+    other_seed = tmp_path / "other.db"
+    datagen.generate(str(other_seed), datagen.Config(organizations=3, users_per_org=8, meetings_per_user=3, seed=12))
+    assert digest(other_seed) != digest(path)
+
+    with pytest.raises(FileExistsError):
+        datagen.generate(str(path), CONFIG)
+
+
+def test_rows_satisfy_schema_sql_constraints(generated):
+    path, counts = generated
+    assert all(counts[table] > 0 for table in datagen.COLUMNS)
+    assert datagen.check(str(path)) == []
+
+    # Copy every row into a database built from schema.sql, enforcing its FKs and CHECKs
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA.read_text())
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("ATTACH DATABASE ? AS generated", (str(path),))
+    for table, columns in datagen.COLUMNS.items():
+        names = ", ".join(columns)
+        conn.execute(f"INSERT INTO main.{table} ({names}) SELECT {names} FROM generated.{table} ORDER BY id")
+    conn.commit()
+    assert conn.execute("SELECT count(*) FROM main.transcript_entries").fetchone()[0] == counts["transcript_entries"]
+
+
+def test_data_follows_realistic_shapes(generated):
+    path, _ = generated
+    conn = sqlite3.connect(path)
+    statuses = Counter(status for (status,) in conn.execute("SELECT status FROM meetings"))
+    assert statuses["completed"] > statuses["scheduled"] > 0
+    assert conn.execute(
+        "SELECT count(*) FROM meetings WHERE status = 'completed' AND (actual_end_time IS NULL OR actual_end_time <= actual_start_time)"
+    ).fetchone()[0] == 0
+    # Only meetings that happened have transcripts, and entries run in order
+    assert conn.execute(
+        "SELECT count(*) FROM transcripts t JOIN meetings m ON m.id = t.meeting_id WHERE m.status NOT IN ('completed', 'in_progress')"
+    ).fetchone()[0] == 0
+    assert conn.execute("SELECT count(*) FROM transcript_entries WHERE end_time_offset_seconds <= start_time_offset_seconds").fetchone()[0] == 0
+    # Speakers are participants of the meeting being transcribed
+    assert conn.execute(
+        "SELECT count(*) FROM transcript_entries e JOIN meeting_participants p ON p.id = e.participant_id WHERE p.meeting_id != e.transcript_id"
+    ).fetchone()[0] == 0
+    # Analytics match the transcript
+    speaking, analyzed = conn.execute(
+        """
+        SELECT (SELECT sum(end_time_offset_seconds - start_time_offset_seconds) FROM transcript_entries WHERE transcript_id = ma.meeting_id),
+               (SELECT sum(speaking_time_seconds) FROM participant_analytics WHERE meeting_analytics_id = ma.id)
+        FROM meeting_analytics ma ORDER BY ma.id LIMIT 1
+        """
+    ).fetchone()
+    assert speaking == analyzed
+    assert conn.execute("SELECT min(participation_equity_score) >= 0 AND max(participation_equity_score) <= 1 FROM meeting_analytics").fetchone()[0]
+    # The generated text is indexed for full-text search
+    assert conn.execute("SELECT count(*) FROM transcript_entries_fts WHERE transcript_entries_fts MATCH 'budget'").fetchone()[0] > 0
+    conn.close()
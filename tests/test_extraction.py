@@ -0,0 +1,115 @@
+import json
+import threading
+
+import extraction
+import validation_models.sql_models as sql_models
+from jobs import job_queue
+
+MEETING_DATA = {
+    "title": "Test Meeting",
+    "scheduled_start_time": "2025-07-31T10:00:00"
+}
+
+
+class FakeLLM:
+    """Reports every "ACTION:" and "DECIDED:" line of the prompt's transcript, quoting it."""
+
+    def __init__(self, reword=None):
+        self.reword = reword or {}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt):
+        with self._lock:
+            self.calls += 1
+        found = {"action_items": [], "decisions": []}
+        for line in prompt.split("Transcript:\n", 1)[1].splitlines():
+            text = line.split(": ", 1)[1]
+            for marker, key in (("ACTION:", "action_items"), ("DECIDED:", "decisions")):
+                if text.startswith(marker):
+                    description = text[len(marker):].strip()
+                    item = {"description": self.reword.get(description, description), "quote": text}
+                    if key == "action_items":
+                        item.update(assignee="Sarah Chen", due_date="2025-08-15")
+                    found[key].append(item)
+        return "```json\n" + json.dumps(found) + "\n```"
+
+
+def test_windows_overlap_and_locate_quotes():
+    lines = [(i, f"[00:00:{i:02d}] Speaker: line {i}") for i in range(10, 20)]
+    windows = list(extraction.windows(lines, size=4, overlap=1))
+    assert [w.entry_ids for w in windows] == [[10, 11, 12, 13], [13, 14, 15, 16], [16, 17, 18, 19]]
+    assert sum(w.fresh for w in windows) == len(lines)
+    assert windows[1].locate("line 15") == [15]
+    assert windows[1].locate("line 14\n[00:00:15] Speaker: line") == [14, 15]
+    assert windows[1].locate("nowhere to be found") == []
+
+
+def test_fuzzy_deduplication():
+    deduplicator = extraction.Deduplicator()
+    assert deduplicator.add(extraction.ExtractedItem("action_item", "Send the Q3 report to finance"))
+    assert not deduplicator.add(extraction.ExtractedItem("action_item", "send Q3 report to Finance.", entry_ids=[7]))
+    assert deduplicator.add(extraction.ExtractedItem("decision", "Send the Q3 report to finance"))
+    assert deduplicator.add(extraction.ExtractedItem("action_item", "Book the offsite venue"))
+    assert deduplicator.items[0].entry_ids == [7]
+
+
+def create_transcript(client, texts):
+    org_id = client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    meeting_id = client.post("/meetings/", json=dict(MEETING_DATA, organization_id=org_id)).json()["id"]
+    user = {"full_name": "Sarah Chen", "email": "sarah@example.com", "password": "password123"}
+    user_id = client.post("/users/", json=user).json()["id"]
+    participant = {"meeting_id": meeting_id, "user_id": user_id, "role": "host"}
+    participant_id = client.post("/meeting_participants/", json=participant).json()["id"]
+    transcript_id = client.post("/transcripts/", json={"meeting_id": meeting_id}).json()["id"]
+    created = client.post("/transcript_entries/bulk", json=[
+        {"transcript_id": transcript_id, "participant_id": participant_id, "text": text,
+         "start_time_offset_seconds": i * 10, "end_time_offset_seconds": i * 10 + 9}
+        for i, text in enumerate(texts)
+    ]).json()
+    return meeting_id, participant_id, [entry["id"] for entry in created]
+
+
+def test_extraction_adds_provenance_and_skips_duplicates(api_client, session):
+    texts = [f"Point {i} about the launch plan" for i in range(100)]
+    texts[8] = "ACTION: Send the Q3 report to finance"
+    texts[9] = "DECIDED: Launch moves to May"
+    texts[50] = "ACTION: send the Q3 report to Finance"
+    texts[70] = "ACTION: Book the offsite venue"
+    meeting_id, participant_id, entry_ids = create_transcript(api_client, texts)
+    # The note-taker already saved this one, without provenance
+    existing = api_client.post("/action_items/", json={"meeting_id": meeting_id, "description": "Book offsite venue"}).json()
+
+    llm = FakeLLM()
+    extractor = extraction.Extractor(llm, window_entries=10, overlap=3, concurrency=2)
+    result = extraction.extract_meeting(session, meeting_id, extractor)
+    assert (result.entries, result.windows, llm.calls) == (100, 14, 14)
+    assert (result.action_items_created, result.decisions_created, result.provenance_added) == (1, 1, 1)
+    # Every marked entry falls in two overlapping windows; entry 50 rewords entry 8 and entry 70 the saved item
+    assert result.duplicates == 6 and result.parse_failures == 0
+
+    items = {item["description"]: item for item in api_client.get("/action_items/").json()}
+    assert items["Send the Q3 report to finance"]["source_transcript_entry_id"] == entry_ids[8]
+    assert items["Send the Q3 report to finance"]["assignee_participant_id"] == participant_id
+    assert items["Send the Q3 report to finance"]["due_date"] == "2025-08-15"
+    assert items["Book offsite venue"]["id"] == existing["id"]
+    assert items["Book offsite venue"]["source_transcript_entry_id"] == entry_ids[70]
+    decision = session.query(sql_models.Decision).one()
+    assert (decision.description, decision.source_transcript_entry_id) == ("Launch moves to May", entry_ids[9])
+
+    rerun = extraction.extract_meeting(session, meeting_id, extractor)
+    assert (rerun.action_items_created, rerun.decisions_created, rerun.provenance_added) == (0, 0, 0)
+
+
+def test_extraction_endpoint_queues_a_job(api_client, session, monkeypatch):
+    meeting_id, _, entry_ids = create_transcript(api_client, ["Hello", "DECIDED: Ship it"])
+    monkeypatch.setattr(extraction, "default_extractor", lambda: extraction.Extractor(FakeLLM()))
+
+    response = api_client.post(f"/meetings/{meeting_id}/extraction")
+    assert response.status_code == 202 and response.json()["status"] == "queued"
+    job_queue.drain(session.get_bind())
+    job = api_client.get(f"/jobs/{response.json()['id']}").json()
+    assert job["status"] == "succeeded"
+    assert (job["result"]["entries"], job["result"]["decisions_created"]) == (2, 1)
+    assert session.query(sql_models.Decision).one().source_transcript_entry_id == entry_ids[1]
+    assert api_client.post("/meetings/999/extraction").status_code == 404
@@ -0,0 +1,74 @@
+import pytest
+from sqlalchemy import event
+
+
+@pytest.fixture
+def selects(db_session):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def create_action_items(client, count):
+    org_id = client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    meeting_id = client.post("/meetings/", json={
+        "organization_id": org_id, "title": "Planning", "scheduled_start_time": "2025-07-31T10:00:00",
+    }).json()["id"]
+    users = client.post("/users/bulk", json=[
+        {"organization_id": org_id, "email": f"user{i}@example.com", "full_name": f"User {i}", "password": "secret-password"}
+        for i in range(count)
+    ]).json()
+    participants = client.post("/meeting_participants/bulk", json=[
+        {"meeting_id": meeting_id, "user_id": user["id"], "role": "attendee"} for user in users
+    ]).json()
+    return client.post("/action_items/bulk", json=[
+        {"meeting_id": meeting_id, "description": f"Task {i}", "assignee_participant_id": participant["id"]}
+        for i, participant in enumerate(participants)
+    ]).json()
+
+
+def test_fields_select_only_the_requested_columns(api_client, db_session, selects):
+    items = create_action_items(api_client, 2)
+    db_session.expunge_all()
+    selects.clear()
+    response = api_client.get("/action_items/", params={"fields": "status,id"})
+    assert response.status_code == 200
+    assert response.json() == [{"id": item["id"], "status": "open"} for item in items]
+    assert len(selects) == 1
+    assert "description" not in selects[0]
+
+    response = api_client.get(f"/action_items/{items[0]['id']}", params={"fields": "description"})
+    assert response.json() == {"description": "Task 0"}
+
+
+def test_include_embeds_relations_with_one_query_each(api_client, db_session, selects):
+    items = create_action_items(api_client, 5)
+    db_session.expunge_all()
+    selects.clear()
+    response = api_client.get("/action_items/", params={"fields": "id", "include": "assignee"})
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["assignee"]["user"]["full_name"] for item in body] == [f"User {i}" for i in range(5)]
+    assert set(body[0]) == {"id", "assignee"}
+    # action items, then their participants, then those participants' users
+    assert len(selects) == 3
+
+    response = api_client.post("/meeting_participants/batch_get", params={"include": "user"}, json={"ids": [items[1]["assignee_participant_id"], 999]})
+    assert response.status_code == 200
+    assert response.json()["items"][0]["user"]["email"] == "user1@example.com"
+    assert response.json()["missing"] == [999]
+
+
+def test_unknown_fields_and_includes_are_rejected(api_client):
+    create_action_items(api_client, 1)
+    assert api_client.get("/action_items/", params={"fields": "id,password"}).status_code == 422
+    assert api_client.get("/action_items/", params={"include": "meeting"}).status_code == 422
+    assert api_client.get("/organizations/", params={"include": "users"}).status_code == 422
+    assert api_client.get("/action_items/", params={"fields": ""}).status_code == 422
@@ -0,0 +1,126 @@
+import gzip
+import json
+
+import pytest
+
+import importer
+import validation_models.sql_models as sql_models
+
+MEETING_DATA = {
+    "title": "Test Meeting",
+    "scheduled_start_time": "2025-07-31T10:00:00"
+}
+
+
+def create_meeting(client, speakers=("Sarah Chen", "Marcus Johnson")):
+    org_id = client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    meeting_id = client.post("/meetings/", json=dict(MEETING_DATA, organization_id=org_id)).json()["id"]
+    participant_ids = []
+    for i, name in enumerate(speakers):
+        user = {"full_name": name, "email": f"user{i}@example.com", "password": "password123"}
+        user_id = client.post("/users/", json=user).json()["id"]
+        participant = {"meeting_id": meeting_id, "user_id": user_id, "role": "attendee"}
+        participant_ids.append(client.post("/meeting_participants/", json=participant).json()["id"])
+    return meeting_id, participant_ids
+
+
+def ndjson(rows):
+    return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+
+def test_parsers_read_the_export_formats():
+    csv_rows = list(importer.parse_csv([
+        "id,participant_id,speaker,start_time_offset_seconds,end_time_offset_seconds,text\n",
+        '1,4,Sarah Chen,0,5,"Hello, all"\n',
+    ]))
+    assert csv_rows[0]["speaker"] == "Sarah Chen"
+    assert csv_rows[0]["text"] == "Hello, all"
+
+    vtt_rows = list(importer.parse_vtt([
+        "WEBVTT\n", "\n", "1\n", "01:02:05.000 --> 01:02:10.500\n",
+        "<v Sarah Chen>Ship it, &lt;everyone&gt;\n", "agrees\n", "\n", "2\n",
+        "00:01.000 --> 00:02.000\n", "<v.loud Marcus Johnson>Done\n",
+    ]))
+    assert vtt_rows == [
+        {"start_time_offset_seconds": 3725.0, "end_time_offset_seconds": 3730.5,
+         "speaker": "Sarah Chen", "text": "Ship it, <everyone> agrees"},
+        {"start_time_offset_seconds": 1.0, "end_time_offset_seconds": 2.0,
+         "speaker": "Marcus Johnson", "text": "Done"},
+    ]
+
+    with pytest.raises(importer.TranscriptImportError):
+        list(importer.parse_ndjson(['{"text": "ok"}\n', "{not json\n"]))
+    assert importer.detect_format("archive/meeting-12.jsonl.gz") == "ndjson"
+    assert importer.meeting_id_from_path("archive/2025/meeting-12.vtt") == 12
+
+
+def test_import_endpoint_resolves_speakers_and_round_trips_an_export(api_client):
+    meeting_id, (sarah, marcus) = create_meeting(api_client)
+    body = ndjson([
+        {"speaker": "sarah chen", "text": "Welcome", "start_time_offset_seconds": 0, "end_time_offset_seconds": 5},
+        {"participant_id": marcus, "text": "Thanks", "start_time_offset_seconds": 5, "end_time_offset_seconds": 9},
+        {"speaker": "Nobody", "text": "Who am I", "start_time_offset_seconds": 9, "end_time_offset_seconds": 10},
+    ])
+    response = api_client.post(f"/meetings/{meeting_id}/transcript/import", content=gzip.compress(body))
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["imported"], result["skipped"], result["unknown_speakers"]) == (2, 1, ["Nobody"])
+
+    export = api_client.get(f"/transcripts/{result['transcript_id']}/export", params={"format": "vtt"})
+    response = api_client.post(
+        f"/meetings/{meeting_id}/transcript/import", params={"format": "vtt"}, content=export.content
+    )
+    assert response.json()["imported"] == 2
+    entries = api_client.get(f"/transcripts/{result['transcript_id']}/entries").json()
+    assert [(e["participant_id"], e["text"]) for e in entries] == [
+        (sarah, "Welcome"), (sarah, "Welcome"), (marcus, "Thanks"), (marcus, "Thanks"),
+    ]
+
+    bad = api_client.post(f"/meetings/{meeting_id}/transcript/import", content=b'{"speaker": "Sarah Chen"}\n')
+    assert bad.status_code == 400
+    assert api_client.post("/meetings/999/transcript/import", content=body).status_code == 404
+
+
+def test_interrupted_import_resumes_from_its_checkpoint(api_client, session):
+    meeting_id, (sarah, _) = create_meeting(api_client)
+    rows = [
+        {"speaker": "Sarah Chen", "text": f"Entry {i}", "start_time_offset_seconds": i, "end_time_offset_seconds": i + 1}
+        for i in range(10)
+    ]
+
+    def failing_after(n):
+        for i, row in enumerate(rows):
+            if i == n:
+                raise RuntimeError("connection lost")
+            yield row
+
+    engine = session.get_bind()
+    with pytest.raises(RuntimeError):
+        importer.import_rows(engine, meeting_id, failing_after(7), source="upload-1", batch_size=3)
+    # Two full batches were committed before the failure, the partial third was not
+    checkpoint = session.get(sql_models.ImportCheckpoint, "upload-1")
+    assert (checkpoint.rows_done, checkpoint.completed) == (6, 0)
+
+    result = importer.import_rows(engine, meeting_id, iter(rows), source="upload-1", batch_size=3)
+    assert (result.resumed_from, result.imported) == (6, 4)
+    again = importer.import_rows(engine, meeting_id, iter(rows), source="upload-1", batch_size=3)
+    assert again.already_complete and again.imported == 0
+
+    texts = session.query(sql_models.TranscriptEntry.text).order_by(sql_models.TranscriptEntry.start_time_offset_seconds)
+    assert [text for (text,) in texts] == [row["text"] for row in rows]
+
+
+@pytest.mark.parametrize("content, detail", [
+    (ndjson([{"participant_id": "abc", "text": "Hi", "start_time_offset_seconds": 0, "end_time_offset_seconds": 1}]),
+     "Row 1: invalid participant_id 'abc'"),
+    (b'{"speaker": "Sarah Chen", "text": "Hi", "start_time_offset_seconds": 0, "end_time_offset_seconds": 1}\n[1, 2]\n',
+     "Line 2: expected a JSON object, got list"),
+    (gzip.compress(ndjson([
+        {"speaker": "Sarah Chen", "text": "Hi", "start_time_offset_seconds": 0, "end_time_offset_seconds": 1},
+    ]))[:-10], "Row 1: the gzip body is truncated or corrupt"),
+])
+def test_malformed_imports_are_rejected_with_the_line(api_client, content, detail):
+    meeting_id, _ = create_meeting(api_client)
+    response = api_client.post(f"/meetings/{meeting_id}/transcript/import", content=content)
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith(detail)
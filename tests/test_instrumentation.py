@@ -0,0 +1,83 @@
+import logging
+import re
+
+import instrumentation
+import metrics
+
+
+def test_render_prometheus_text():
+    registry = {}
+    requests = registry["requests_total"] = metrics.Counter("requests_total", "Requests.", ("route",))
+    latency = registry["latency_seconds"] = metrics.Histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+    requests.inc(route='/a"b')
+    requests.inc(2, route='/a"b')
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    assert metrics.render(registry).splitlines() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{route="/a\\"b"} 3',
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 2',
+        'latency_seconds_bucket{le="+Inf"} 3',
+        "latency_seconds_sum 5.55",
+        "latency_seconds_count 3",
+    ]
+
+
+def sample(text, name, **labels):
+    pattern = re.escape(name + "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}") + r" (\S+)"
+    match = re.search(pattern, text)
+    return float(match.group(1)) if match else None
+
+
+def test_requests_are_timed_by_route_with_their_queries(api_client):
+    org_id = api_client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    before = metrics.render()
+    route = "/organizations/{item_id}"
+    count_before = sample(before, "http_request_duration_seconds_count", method="GET", route=route) or 0
+    queries_before = sample(before, "http_request_db_queries_sum", method="GET", route=route) or 0
+
+    for _ in range(3):
+        assert api_client.get(f"/organizations/{org_id}").status_code == 200
+    assert api_client.get("/no/such/path").status_code == 404
+
+    response = api_client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert sample(text, "http_request_duration_seconds_count", method="GET", route=route) == count_before + 3
+    assert sample(text, "http_requests_total", method="GET", route=route, status=200) >= 3
+    assert sample(text, "http_requests_total", method="GET", route="unmatched", status=404) >= 1
+    # Each read runs at least one query, counted against the request that ran it
+    assert sample(text, "http_request_db_queries_sum", method="GET", route=route) >= queries_before + 3
+    assert sample(text, "db_query_duration_seconds_count", operation="SELECT") > 0
+
+
+def test_slow_queries_are_logged_with_their_plan(api_client, session, monkeypatch, caplog):
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_SECONDS", 0.0)
+    monkeypatch.setattr(instrumentation, "query_plans", instrumentation.QueryPlans())
+    with caplog.at_level(logging.WARNING, logger="instrumentation"):
+        api_client.get("/meetings/", params={"limit": 5})
+    slow = [r.getMessage() for r in caplog.records if r.getMessage().startswith("Slow query")]
+    selects = [message for message in slow if "FROM meetings" in message]
+    assert selects and "Plan:\n" in selects[0]
+    assert re.search(r"Plan:\n(SCAN|SEARCH) meetings", selects[0])
+
+
+def test_chat_broadcasts_are_measured(api_client):
+    broadcasts = re.compile(r"^chat_broadcast_recipients_count (\d+)$", re.M)
+    match = broadcasts.search(api_client.get("/metrics").text)
+    sent_before = int(match.group(1)) if match else 0
+    with api_client.websocket_connect("/chat") as first, api_client.websocket_connect("/chat") as second:
+        first.send_json({"type": "broadcast", "user": "Sarah", "message": "hi", "timestamp": 1.0})
+        assert first.receive_json()["message"] == second.receive_json()["message"] == "hi"
+        text = api_client.get("/metrics").text
+        assert re.search(r"^chat_connections 2$", text, re.M)
+    assert re.search(r"^chat_pending_sends 0$", text, re.M)
+    assert int(broadcasts.search(text).group(1)) == sent_before + 1
+    assert sample(text, "chat_broadcast_recipients_bucket", le="2") >= 1
+    assert sample(text, "chat_messages_received_total", type="broadcast") >= 1
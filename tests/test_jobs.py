@@ -0,0 +1,89 @@
+import pytest
+from sqlalchemy import select
+
+from jobs import JobQueue, job_queue, jobs
+
+MEETING_DATA = {
+    "title": "Test Meeting",
+    "scheduled_start_time": "2025-07-31T10:00:00"
+}
+
+
+def test_completing_a_meeting_enqueues_its_jobs_once(api_client, session):
+    org_id = api_client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    meeting_id = api_client.post("/meetings/", json=dict(MEETING_DATA, organization_id=org_id)).json()["id"]
+    assert api_client.get("/jobs").json() == []
+
+    api_client.put(f"/meetings/{meeting_id}", json={"status": "completed"})
+    api_client.put(f"/meetings/{meeting_id}", json={"status": "completed", "title": "Renamed"})
+    queued = api_client.get("/jobs", params={"status": "queued"}).json()
+    assert [(job["kind"], job["payload"]) for job in queued] == [("meeting_analytics", {"meeting_id": meeting_id})]
+    assert api_client.get("/jobs/metrics").json()["queued_by_kind"] == {"meeting_analytics": 1}
+
+    # Nothing ran inline in the request; the workers run against the app's own engine
+    assert job_queue.drain(session.get_bind()) == 1
+    job = api_client.get(f"/jobs/{queued[0]['id']}").json()
+    assert (job["status"], job["attempts"]) == ("succeeded", 1)
+    assert "participation_equity_score" in job["result"]
+    assert api_client.get(f"/meetings/{meeting_id}").json()["id"] == meeting_id
+
+    metrics = api_client.get("/jobs/metrics").json()
+    assert (metrics["queued"], metrics["succeeded"]) == (0, 1)
+    assert metrics["wait_seconds"]["p50"] >= 0
+    assert api_client.get("/jobs/999").status_code == 404
+
+
+@pytest.fixture
+def queue(session):
+    return JobQueue(workers=0, retry_backoff=0, lease_seconds=60)
+
+
+def test_jobs_run_by_priority_and_are_retried(queue, session):
+    calls = []
+
+    @queue.handler("flaky", max_attempts=3)
+    def flaky(_, payload):
+        calls.append(payload["n"])
+        if calls.count(payload["n"]) < 2:
+            raise RuntimeError("transient")
+        return {"n": payload["n"]}
+
+    @queue.handler("broken", max_attempts=2)
+    def broken(_, payload):
+        raise ValueError("always")
+
+    conn = session.connection()
+    low = queue.enqueue(conn, "flaky", {"n": 1}, priority=0)
+    high = queue.enqueue(conn, "flaky", {"n": 2}, priority=5, idempotency_key="two")
+    assert queue.enqueue(conn, "flaky", {"n": 2}, idempotency_key="two") == high
+    failing = queue.enqueue(conn, "broken", {"n": 3})
+    session.commit()
+
+    queue.drain(session.get_bind())
+    # The high-priority job ran first, then each job was retried after its failure
+    assert calls[:2] == [2, 2]
+    rows = {row.id: row for row in session.execute(queue_rows()).all()}
+    assert (rows[high].status, rows[high].attempts, rows[high].result) == ("succeeded", 2, {"n": 2})
+    assert (rows[low].status, rows[low].attempts) == ("succeeded", 2)
+    assert (rows[failing].status, rows[failing].attempts) == ("failed", 2)
+    assert rows[failing].last_error == "ValueError: always"
+
+    # A finished job's idempotency key queues it again
+    assert queue.enqueue(session.connection(), "flaky", {"n": 2}, idempotency_key="two") == high
+    session.commit()
+    assert session.execute(queue_rows()).all()[1].status == "queued"
+
+
+def test_expired_lease_makes_a_running_job_claimable(queue, session):
+    queue.handler("slow")(lambda *_: None)
+    job_id = queue.enqueue(session.connection(), "slow", {}, now=100.0)
+    session.commit()
+    with session.get_bind().begin() as conn:
+        assert queue.claim(conn, now=100.0).id == job_id
+        assert queue.claim(conn, now=130.0) is None
+        reclaimed = queue.claim(conn, now=161.0)
+    assert (reclaimed.id, reclaimed.attempts) == (job_id, 2)
+
+
+def queue_rows():
+    return select(jobs).order_by(jobs.c.id)
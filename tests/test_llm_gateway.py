@@ -0,0 +1,119 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "agents"))
+
+from fake_llm import FakeChatModel, FakeProviderError  # noqa: E402
+from llm_gateway import LLMGateway, RetryBudget, TokenBucket  # noqa: E402
+
+
+def make_gateway(model, **kwargs):
+    kwargs.setdefault("requests_per_minute", 60_000)
+    kwargs.setdefault("backoff_base", 0.001)
+    return LLMGateway(model, name="fake", **kwargs)
+
+
+def test_gateway_retries_retryable_errors():
+    model = FakeChatModel(responses=["ok"], fail_first=2)
+    gateway = make_gateway(model)
+    assert gateway.invoke("hello").content == "ok"
+    assert model.calls == 3
+
+
+def test_gateway_gives_up_when_retry_budget_is_spent():
+    model = FakeChatModel(responses=["ok"], fail_first=10)
+    gateway = make_gateway(model, max_retries=5, retry_budget=RetryBudget(ratio=0, min_retries=1))
+    with pytest.raises(FakeProviderError):
+        gateway.invoke("hello")
+    assert model.calls == 2
+
+
+def test_gateway_does_not_retry_non_retryable_errors():
+    def reject(prompt):
+        raise FakeProviderError("bad request", retryable=False)
+
+    model = FakeChatModel(responses=reject)
+    gateway = make_gateway(model)
+    with pytest.raises(FakeProviderError):
+        gateway.invoke("hello")
+    assert model.calls == 1
+
+
+def test_gateway_coalesces_identical_in_flight_prompts():
+    model = FakeChatModel(responses=["shared"], latency=0.2)
+    gateway = make_gateway(model)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(gateway.invoke("same prompt"))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [r.content for r in results] == ["shared"] * 5
+    assert model.calls == 1
+
+
+def test_token_bucket_delays_requests_over_the_rate():
+    bucket = TokenBucket(rate=10, capacity=1)
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == pytest.approx(0.1, abs=0.02)
+
+
+def test_gateway_streams_chunks():
+    gateway = make_gateway(FakeChatModel(responses=["abcdefgh"], chunk_size=3))
+
+    async def collect():
+        return [chunk.content async for chunk in gateway.astream("hi")]
+
+    assert asyncio.run(collect()) == ["abc", "def", "gh"]
+
+
+def test_stream_throttling_does_not_block_the_event_loop():
+    gateway = make_gateway(FakeChatModel(responses=["ok"]))
+    gateway.request_bucket = TokenBucket(rate=5, capacity=1)
+    gateway.request_bucket.reserve(1)
+
+    async def run():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        chunks = [chunk.content async for chunk in gateway.astream("hi")]
+        ticker.cancel()
+        return chunks, ticks
+
+    chunks, ticks = asyncio.run(run())
+    assert chunks == ["ok"]
+    # The 0.2 s wait for the rate limiter let the loop keep running
+    assert ticks >= 5
+
+
+def test_cancelled_stream_waiting_for_a_slot_gives_it_back():
+    gateway = make_gateway(FakeChatModel(responses=["ok"]), max_in_flight=1)
+
+    async def collect():
+        return [chunk.content async for chunk in gateway.astream("hi")]
+
+    async def run():
+        gateway._slots.acquire()
+        waiting = asyncio.create_task(collect())
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        gateway._slots.release()
+        await asyncio.sleep(0.1)
+        # The worker thread took the slot once it was free, and handed it back
+        assert gateway._slots.acquire(blocking=False)
+        gateway._slots.release()
+        return await collect()
+
+    assert asyncio.run(run()) == ["ok"]
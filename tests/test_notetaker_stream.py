@@ -0,0 +1,57 @@
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "agents"))
+# The agent builds its gateway on import; run it without a provider key
+os.environ.setdefault("LLM_PROVIDER", "fake")
+
+import notetaker_agent  # noqa: E402
+from fake_llm import FakeChatModel  # noqa: E402
+from llm_gateway import LLMGateway  # noqa: E402
+
+SUMMARY = "The team agreed to ship in March. Sarah owns the launch plan."
+
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.frames = []
+
+    async def send(self, data: str):
+        self.frames.append(json.loads(data))
+
+
+def summary_frames(monkeypatch) -> tuple[list[dict], FakeChatModel]:
+    model = FakeChatModel(responses=[SUMMARY], chunk_size=8)
+    monkeypatch.setattr(notetaker_agent, "llm", LLMGateway(model, name="fake", requests_per_minute=60_000))
+    agent = notetaker_agent.NoteTakingAgent(meeting_id=None)
+    agent.state["notes"] = "- Ship in March"
+    agent.websocket = RecordingWebSocket()
+    asyncio.run(agent.process_message("/summary please", "Sarah"))
+    return agent.websocket.frames, model
+
+
+def test_summary_is_streamed_as_deltas_then_a_final_frame(monkeypatch):
+    frames, model = summary_frames(monkeypatch)
+    assert "- Ship in March" in model.prompts[0]
+
+    *deltas, final = frames
+    assert len(deltas) == -(-len(SUMMARY) // 8)
+    assert all(frame["type"] == "stream" and frame["user"] == "NoteTaker" for frame in frames)
+    assert len({frame["stream_id"] for frame in frames}) == 1
+    assert [frame["seq"] for frame in frames] == list(range(len(frames)))
+    assert not any(frame["done"] for frame in deltas)
+    assert "".join(frame["delta"] for frame in deltas) == SUMMARY
+    assert final["done"] and final["delta"] == "" and final["ttft_ms"] >= 0
+
+
+def test_backend_relays_stream_frames(api_client, monkeypatch):
+    frames, _ = summary_frames(monkeypatch)
+    with api_client.websocket_connect("/chat") as agent, api_client.websocket_connect("/chat") as dashboard:
+        for frame in frames:
+            agent.send_json(frame)
+        relayed = [dashboard.receive_json() for _ in frames]
+    keys = ("type", "user", "stream_id", "seq", "delta", "done", "ttft_ms", "timestamp")
+    assert relayed == [{key: frame.get(key) for key in keys} for frame in frames]
@@ -0,0 +1,104 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+import main
+import summarization
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "agents"))
+# The agent builds its gateway on import; run it without a provider key
+os.environ.setdefault("LLM_PROVIDER", "fake")
+
+import notetaker_agent  # noqa: E402
+
+MEETING_DATA = {
+    "title": "Test Meeting",
+    "scheduled_start_time": "2025-07-31T10:00:00"
+}
+
+
+def item(content, due_date=""):
+    return {"content": content, "assignee": "Sarah", "due_date": due_date, "priority": "high"}
+
+
+def backend_sync(meeting_id):
+    sync = notetaker_agent.BackendSync(meeting_id)
+    sync.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test")
+    return sync
+
+
+def test_reworded_items_update_their_row_and_removed_items_are_deleted(api_client):
+    org_id = api_client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    meeting_id = api_client.post("/meetings/", json=dict(MEETING_DATA, organization_id=org_id)).json()["id"]
+    sync = backend_sync(meeting_id)
+
+    def stored():
+        return {row["id"]: row["description"] for row in api_client.get("/action_items/").json()}
+
+    async def push(items):
+        await sync.push({"notes": "", "action_items": items, "messages": []})
+
+    asyncio.run(push([item("Draft the launch plan"), item("Book the review room"), item("Email the vendor")]))
+    first = stored()
+    assert sorted(first.values()) == ["Book the review room", "Draft the launch plan", "Email the vendor"]
+    plan_id = next(i for i, description in first.items() if description == "Draft the launch plan")
+
+    # The LLM rewrites the list: one item reworded, one dropped, one unchanged
+    changed, removed = sync.diff_action_items([item("Draft the launch plan for March"), item("Email the vendor")])
+    assert [row["description"] for _, row in changed] == ["Draft the launch plan for March"]
+    assert len(removed) == 1
+    asyncio.run(push([item("Draft the launch plan for March"), item("Email the vendor")]))
+    assert stored() == {
+        plan_id: "Draft the launch plan for March",
+        next(i for i, description in first.items() if description == "Email the vendor"): "Email the vendor",
+    }
+
+    # Nothing changed: nothing is sent
+    assert sync.diff_action_items([item("Email the vendor"), item("Draft the launch plan for March")]) == ([], [])
+    asyncio.run(sync.aclose())
+
+
+def test_failed_connects_are_retried_only_by_the_backoff_loop(monkeypatch):
+    attempts = []
+
+    async def handle_async_request(self, request):
+        attempts.append(request.url.path)
+        raise httpx.ConnectError("connection refused", request=request)
+
+    monkeypatch.setattr(httpx.AsyncHTTPTransport, "handle_async_request", handle_async_request)
+    monkeypatch.setattr(notetaker_agent.random, "random", lambda: 0.0)
+    sync = notetaker_agent.BackendSync(1, base_url="http://backend.invalid", max_retries=2)
+    # The connection pool itself does not retry
+    assert sync.client._transport._pool._retries == 0
+
+    async def push():
+        try:
+            await sync.push({"notes": "", "action_items": [item("Email the vendor")], "messages": []})
+        finally:
+            await sync.aclose()
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(push())
+    assert attempts == ["/action_items/upsert"] * 3
+
+
+def test_agent_notes_and_the_summary_job_do_not_overwrite_each_other(api_client, db_session):
+    org_id = api_client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    meeting_id = api_client.post("/meetings/", json=dict(MEETING_DATA, organization_id=org_id)).json()["id"]
+    sync = backend_sync(meeting_id)
+
+    async def push(notes):
+        await sync.push({"notes": notes, "action_items": [], "messages": []})
+
+    asyncio.run(push("- Ship in March"))
+    summarization.write_summary(db_session, meeting_id, "The team agreed to ship in March.")
+    asyncio.run(push("- Ship in March\n- Sarah owns the plan"))
+    asyncio.run(sync.aclose())
+
+    [summary] = api_client.get("/meeting_summaries/").json()
+    assert summary["summary_text"] == "The team agreed to ship in March."
+    assert summary["notes"] == "- Ship in March\n- Sarah owns the plan"
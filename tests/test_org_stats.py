@@ -0,0 +1,64 @@
+from sqlalchemy import text
+
+import org_stats
+
+
+def create_org_with_meetings(client, name, starts):
+    org_id = client.post("/organizations/", json={"name": name}).json()["id"]
+    meeting_ids = [
+        client.post("/meetings/", json={
+            "organization_id": org_id, "title": f"Meeting {i}", "scheduled_start_time": start, "status": "completed",
+        }).json()["id"]
+        for i, start in enumerate(starts)
+    ]
+    return org_id, meeting_ids
+
+
+def test_organization_stats_roll_up_meetings_and_action_items(api_client, session):
+    # Monday and Thursday of one week, then the Tuesday of the next
+    org_id, meetings = create_org_with_meetings(
+        api_client, "Acme", ["2025-07-28T10:00:00", "2025-07-31T10:00:00", "2025-08-05T10:00:00"]
+    )
+    other_org, _ = create_org_with_meetings(api_client, "Globex", ["2025-07-28T10:00:00"])
+    user = {"full_name": "Sarah Chen", "email": "sarah@example.com", "password": "password123"}
+    user_id = api_client.post("/users/", json=user).json()["id"]
+    participant = api_client.post(
+        "/meeting_participants/", json={"meeting_id": meetings[0], "user_id": user_id, "role": "host"}
+    ).json()["id"]
+    for score, meeting_id in [(0.8, meetings[0]), (0.4, meetings[1])]:
+        api_client.post("/meeting_analytics/", json={"meeting_id": meeting_id, "participation_equity_score": score})
+    for status in ["open", "open", "completed"]:
+        api_client.post("/action_items/", json={
+            "meeting_id": meetings[0], "description": "Follow up", "assignee_participant_id": participant, "status": status,
+        })
+    api_client.post("/action_items/", json={"meeting_id": meetings[1], "description": "Unowned"})
+
+    stats = api_client.get(f"/organizations/{org_id}/stats").json()
+    assert stats["refreshed_at"] is not None
+    assert [(p["period_start"], p["meeting_count"], p["analyzed_count"]) for p in stats["periods"]] == [
+        ("2025-07-28", 2, 2), ("2025-08-04", 1, 0),
+    ]
+    assert abs(stats["periods"][0]["average_equity_score"] - 0.6) < 1e-9
+    assert [(a["full_name"], a["open_count"], a["completed_count"]) for a in stats["assignees"]] == [
+        ("Sarah Chen", 2, 1), (None, 1, 0),
+    ]
+    months = api_client.get(f"/organizations/{org_id}/stats", params={"period": "month", "start": "2025-08-01"}).json()
+    assert [(p["period_start"], p["meeting_count"]) for p in months["periods"]] == [("2025-08-01", 1)]
+
+    # Age what was already rolled up past the overlap each refresh re-reads
+    for table in ["meetings", "action_items", "meeting_analytics"]:
+        session.execute(text(f"UPDATE {table} SET updated_at = datetime('now', '-1 minute')"))
+    session.commit()
+    # Changes are only visible after a refresh, which recomputes just the changed organization
+    api_client.put(f"/meetings/{meetings[2]}", json={"status": "cancelled"})
+    assert api_client.get(f"/organizations/{org_id}/stats").json()["periods"][1]["cancelled_count"] == 0
+    assert org_stats.refresh(session.get_bind()) == {org_id}
+    assert api_client.get(f"/organizations/{org_id}/stats").json()["periods"][1]["cancelled_count"] == 1
+
+    # Deletions leave no updated_at behind and are picked up by the full rebuild
+    api_client.delete(f"/meetings/{meetings[2]}")
+    assert org_stats.refresh(session.get_bind(), full=True) is None
+    assert len(api_client.get(f"/organizations/{org_id}/stats").json()["periods"]) == 1
+    assert [p["meeting_count"] for p in api_client.get(f"/organizations/{other_org}/stats").json()["periods"]] == [1]
+
+    assert api_client.get("/organizations/999/stats").status_code == 404
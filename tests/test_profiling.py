@@ -0,0 +1,122 @@
+import threading
+import time
+
+import fastapi.routing
+import pytest
+from fastapi.testclient import TestClient
+from starlette.concurrency import run_in_threadpool
+
+import main
+import profiling
+
+TOKEN = "s3cret"
+ADMIN = {"X-Admin-Token": TOKEN}
+
+
+@pytest.fixture
+def admin(monkeypatch):
+    monkeypatch.setenv("PROFILING_TOKEN", TOKEN)
+
+
+@pytest.fixture
+def profiled_client(admin, db_session, monkeypatch):
+    """The app as main.py sets it up when PROFILING_TOKEN is set at startup."""
+    monkeypatch.setattr(main, "db", db_session)
+    with TestClient(profiling.RequestProfiler(main.app)) as client:
+        yield client
+
+
+def test_threadpool_is_only_patched_when_enabled(db_session, monkeypatch):
+    monkeypatch.setattr(main, "db", db_session)
+    monkeypatch.delenv("PROFILING_TOKEN", raising=False)
+    with TestClient(main.app):
+        assert fastapi.routing.run_in_threadpool is run_in_threadpool
+    monkeypatch.setenv("PROFILING_TOKEN", TOKEN)
+    with TestClient(main.app):
+        assert fastapi.routing.run_in_threadpool is profiling._run_in_threadpool
+    assert fastapi.routing.run_in_threadpool is run_in_threadpool
+
+
+def test_profiling_is_hidden_unless_enabled_and_authorized(api_client, monkeypatch):
+    monkeypatch.delenv("PROFILING_TOKEN", raising=False)
+    assert api_client.get("/admin/profiling/requests", headers=ADMIN).status_code == 404
+    monkeypatch.setenv("PROFILING_TOKEN", TOKEN)
+    assert api_client.get("/admin/profiling/requests").status_code == 403
+    assert api_client.get("/admin/profiling/requests", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert api_client.get("/admin/profiling/requests", headers=ADMIN).status_code == 200
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampling_returns_collapsed_stacks(api_client, admin):
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,), name="busy-worker")
+    worker.start()
+    try:
+        response = api_client.get("/admin/profiling/sample", params={"seconds": 0.2, "interval_ms": 5}, headers=ADMIN)
+    finally:
+        stop.set()
+        worker.join()
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    busy = [line for line in lines if line.startswith("busy-worker;")]
+    assert busy and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("busy_loop (" in line for line in busy)
+
+
+def test_sampling_one_at_a_time():
+    assert profiling._sampling.acquire(blocking=False)
+    try:
+        with pytest.raises(profiling.Busy):
+            profiling.sample_stacks(0.01, 0.01)
+    finally:
+        profiling._sampling.release()
+
+
+def test_request_profiled_on_header(profiled_client):
+    org_id = profiled_client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    assert "x-profile-id" not in profiled_client.get(f"/organizations/{org_id}", headers={"X-Profile": "1"}).headers
+    assert "x-profile-id" not in profiled_client.get(f"/organizations/{org_id}", headers={"X-Profile": "0", **ADMIN}).headers
+
+    response = profiled_client.get(f"/organizations/{org_id}", headers={"X-Profile": "1", **ADMIN})
+    assert response.status_code == 200
+    profile_id = int(response.headers["x-profile-id"])
+
+    listed = profiled_client.get("/admin/profiling/requests", headers=ADMIN).json()
+    assert listed[0]["id"] == profile_id and listed[0]["status"] == 200
+    assert listed[0]["path"] == f"/organizations/{org_id}"
+
+    # The handler is sync and runs in a worker thread; its profile is merged in
+    report = profiled_client.get(f"/admin/profiling/requests/{profile_id}", params={"limit": 1000}, headers=ADMIN).text
+    assert "read_item" in report and "get_db_item" in report
+    dump = profiled_client.get(f"/admin/profiling/requests/{profile_id}", params={"format": "pstats"}, headers=ADMIN)
+    assert dump.headers["content-type"] == "application/octet-stream"
+    assert profiled_client.get("/admin/profiling/requests/999999", headers=ADMIN).status_code == 404
+
+
+def test_tracemalloc_snapshots_and_diff(api_client, admin):
+    assert api_client.post("/admin/profiling/tracemalloc/snapshots", headers=ADMIN).status_code == 409
+    assert api_client.post("/admin/profiling/tracemalloc/start", params={"frames": 5}, headers=ADMIN).status_code == 204
+    try:
+        base = api_client.post("/admin/profiling/tracemalloc/snapshots", headers=ADMIN)
+        assert base.status_code == 201 and base.json()["traced_bytes"] > 0
+        hoard = [bytearray(1024) for _ in range(2000)]
+
+        grown = api_client.get(
+            "/admin/profiling/tracemalloc/diff", params={"base": base.json()["id"], "filename": "test_profiling"}, headers=ADMIN
+        ).json()
+        assert grown[0]["location"].endswith(f"test_profiling.py:{hoard_line()}")
+        assert grown[0]["size_diff_bytes"] >= 2000 * 1024
+        assert grown[0]["count_diff"] >= 2000
+        assert len(hoard) == 2000
+        assert api_client.get("/admin/profiling/tracemalloc/diff", params={"base": 999}, headers=ADMIN).status_code == 404
+    finally:
+        assert api_client.post("/admin/profiling/tracemalloc/stop", headers=ADMIN).status_code == 204
+
+
+def hoard_line() -> int:
+    with open(__file__) as f:
+        return next(i for i, line in enumerate(f, 1) if "hoard = [bytearray" in line)
@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+import database
+import main
+from validation_models.sql_models import Base
+
+
+@pytest.fixture
+def scoped_db(tmp_path, monkeypatch):
+    """Point the real request-scoped session at a file database, so requests on different threads get connections of their own."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    database.ScopedSession.remove()
+    database.ScopedSession.configure(bind=engine)
+    monkeypatch.setattr(main, "db", database.ScopedSession)
+    yield engine
+    database.ScopedSession.remove()
+    database.ScopedSession.configure(bind=database.engine)
+    engine.dispose()
+
+
+def test_concurrent_requests_get_their_own_sessions(scoped_db):
+    with Session(scoped_db) as session:
+        session.add_all([main.sql_models.Organization(name=f"Org {i}") for i in range(8)])
+        session.commit()
+
+    sessions = []
+
+    def after_begin(session, transaction, connection):
+        sessions.append(session)
+        # Hold the transaction open so the requests overlap
+        time.sleep(0.05)
+
+    async def fetch_all():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get(f"/organizations/{i}") for i in range(1, 9)))
+
+    event.listen(Session, "after_begin", after_begin)
+    try:
+        responses = asyncio.run(fetch_all())
+    finally:
+        event.remove(Session, "after_begin", after_begin)
+
+    assert [response.json()["name"] for response in responses] == [f"Org {i}" for i in range(8)]
+    assert len({id(session) for session in sessions}) == 8
+    # The middleware closed every request's session and dropped it from the registry
+    assert all(session.get_transaction() is None for session in sessions)
+    assert not [key for key in database.ScopedSession.registry.registry if not isinstance(key, int)]
+
@@ -0,0 +1,98 @@
+from search import match_expression
+
+MEETING_DATA = {
+    "title": "Test Meeting",
+    "scheduled_start_time": "2025-07-31T10:00:00"
+}
+
+
+def create_meeting(client, org_name="Test Org"):
+    org_id = client.post("/organizations/", json={"name": org_name}).json()["id"]
+    return org_id, client.post("/meetings/", json=dict(MEETING_DATA, organization_id=org_id)).json()["id"]
+
+
+def add_transcript(client, meeting_id, texts):
+    user = {"full_name": "Speaker", "email": f"speaker{meeting_id}@example.com", "password": "password123"}
+    user_id = client.post("/users/", json=user).json()["id"]
+    participant = {"meeting_id": meeting_id, "user_id": user_id, "role": "host"}
+    participant_id = client.post("/meeting_participants/", json=participant).json()["id"]
+    transcript_id = client.post("/transcripts/", json={"meeting_id": meeting_id}).json()["id"]
+    return [
+        client.post("/transcript_entries/", json={
+            "transcript_id": transcript_id,
+            "participant_id": participant_id,
+            "text": text,
+            "start_time_offset_seconds": i * 10,
+            "end_time_offset_seconds": i * 10 + 10,
+        }).json()["id"]
+        for i, text in enumerate(texts)
+    ]
+
+
+def test_match_expression_quotes_terms():
+    assert match_expression('budget "Q4" OR') == '"budget" """Q4""" "OR"'
+    assert match_expression("launch*  ") == '"launch"*'
+    assert match_expression(" * ") == ""
+
+
+def test_search_ranks_and_scopes_results(api_client):
+    org_id, meeting_id = create_meeting(api_client)
+    other_org_id, other_meeting_id = create_meeting(api_client, "Other Org")
+    entry_ids = add_transcript(api_client, meeting_id, [
+        "We decided to move the launch to March.",
+        "The launch budget needs another review, the launch is close.",
+        "Lunch is at noon.",
+    ])
+    add_transcript(api_client, other_meeting_id, ["The launch date is confidential."])
+    decision_id = api_client.post("/decisions/", json={"meeting_id": meeting_id, "description": "Launch in March"}).json()["id"]
+    api_client.post("/action_items/", json={"meeting_id": meeting_id, "description": "Draft the launch announcement"})
+
+    response = api_client.get("/search", params={"q": "launch", "organization_id": org_id})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert {r["type"] for r in results} == {"transcript_entry", "decision", "action_item"}
+    assert all(r["meeting_id"] == meeting_id for r in results)
+    assert [r["score"] for r in results] == sorted(r["score"] for r in results)
+    assert "<mark>launch</mark>" in results[0]["snippet"].lower()
+
+    results = api_client.get("/search", params={"q": "launch march", "types": "decision"}).json()["results"]
+    assert [(r["type"], r["id"]) for r in results] == [("decision", decision_id)]
+
+    results = api_client.get("/search", params={"q": "launch", "meeting_id": other_meeting_id}).json()["results"]
+    assert [r["organization_id"] for r in results] == [other_org_id]
+
+    # Triggers keep the index in sync with deletes
+    api_client.delete(f"/transcript_entries/{entry_ids[1]}")
+    results = api_client.get("/search", params={"q": "budget"}).json()["results"]
+    assert results == []
+
+
+def test_search_paginates(api_client):
+    _, meeting_id = create_meeting(api_client)
+    add_transcript(api_client, meeting_id, [f"Roadmap item {i}" for i in range(5)])
+
+    page = api_client.get("/search", params={"q": "roadmap", "limit": 2}).json()
+    assert len(page["results"]) == 2
+    assert page["next_offset"] == 2
+    seen = [r["id"] for r in page["results"]]
+    while page["next_offset"] is not None:
+        page = api_client.get("/search", params={"q": "roadmap", "limit": 2, "offset": page["next_offset"]}).json()
+        seen += [r["id"] for r in page["results"]]
+    assert len(set(seen)) == 5
+
+    assert api_client.get("/search", params={"q": "**"}).status_code == 400
+
+
+def test_search_snippets_escape_source_text_and_ties_are_ordered(api_client):
+    _, meeting_id = create_meeting(api_client)
+    entry_ids = add_transcript(api_client, meeting_id, ['<img src=x onerror="alert(1)"> budget & plans'] + ["Budget review"] * 4)[1:]
+
+    results = api_client.get("/search", params={"q": "budget"}).json()["results"]
+    snippet = next(r["snippet"] for r in results if r["id"] not in entry_ids)
+    assert snippet == "&lt;img src=x onerror=&quot;alert(1)&quot;&gt; <mark>budget</mark> &amp; plans"
+
+    # Equal scores come back in id order on every page
+    ties = [r["id"] for r in results if r["id"] in entry_ids]
+    assert ties == sorted(entry_ids)
+    pages = [api_client.get("/search", params={"q": "budget", "limit": 1, "offset": i}).json()["results"][0]["id"] for i in range(5)]
+    assert pages == [r["id"] for r in results]
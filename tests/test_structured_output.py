@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "agents"))
+
+from structured_output import NoteUpdatePipeline, repair_json  # noqa: E402
+
+
+CURRENT_ITEMS = [{"content": "Existing item", "assignee": "", "due_date": "", "priority": ""}]
+
+
+def test_repair_json_strips_fences_prose_and_trailing_commas():
+    text = 'Here you go:\n{"notes": "a", "action_items": [{"content": "x"},],}'
+    assert repair_json(text) == ({"notes": "a", "action_items": [{"content": "x"}]}, False)
+
+
+def test_repair_json_closes_truncated_output():
+    value, truncated = repair_json('{"notes": "a", "action_items": [{"content": "x"}, {"content": "y", "assig')
+    assert truncated
+    assert value == {"notes": "a", "action_items": [{"content": "x"}, {"content": "y"}]}
+
+
+def test_repair_json_rejects_text_without_json():
+    with pytest.raises(ValueError):
+        repair_json("I could not find any action items.")
+
+
+def test_pipeline_drops_invalid_items_but_keeps_the_update():
+    pipeline = NoteUpdatePipeline(llm=None)
+    update = pipeline.parse('{"notes": "n", "action_items": [{"content": "ok"}, {"assignee": "Bob"}, 3]}', CURRENT_ITEMS)
+    assert update.notes == "n"
+    assert [item.content for item in update.action_items] == ["ok"]
+
+
+def test_pipeline_merges_truncated_items_over_current_ones():
+    pipeline = NoteUpdatePipeline(llm=None)
+    update = pipeline.parse('{"notes": "n", "action_items": [{"content": "New item", "priority": "high"}', CURRENT_ITEMS)
+    assert [item.content for item in update.action_items] == ["Existing item", "New item"]
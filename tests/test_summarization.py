@@ -0,0 +1,113 @@
+import hashlib
+import threading
+import time
+
+import summarization
+import validation_models.sql_models as sql_models
+from jobs import job_queue
+
+MEETING_DATA = {
+    "title": "Test Meeting",
+    "scheduled_start_time": "2025-07-31T10:00:00"
+}
+
+
+class FakeLLM:
+    """Answers every prompt with a short digest of it, tracking how many calls overlap."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.prompts = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt):
+        with self._lock:
+            self.prompts.append(prompt)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+        kind = "notes" if prompt.startswith("You are summarizing") else "summary"
+        # Long enough that the partial summaries need more than one reduce level
+        return f"{kind} {hashlib.sha1(prompt.encode()).hexdigest()[:8]}" + " detail" * 30
+
+
+def lines(n):
+    return [(i, f"[00:00:{i:02d}] Speaker {i % 3}: point number {i} about the launch plan") for i in range(n)]
+
+
+def test_chunks_fit_the_budget_and_survive_an_insert():
+    original = summarization.chunk_lines(lines(400), budget=200)
+    assert all(chunk.tokens <= 200 for chunk in original)
+    assert [c.first_entry_id for c in original] == [0] + [c.last_entry_id + 1 for c in original[:-1]]
+
+    edited = lines(400)
+    edited.insert(200, (1000, "[00:10:00] Speaker 9: an interjection"))
+    rechunked = summarization.chunk_lines(edited, budget=200)
+    unchanged = {c.text for c in original} & {c.text for c in rechunked}
+    # Content-defined boundaries resynchronize right after the edit
+    assert len(unchanged) >= len(original) - 2
+
+
+def create_transcript(client, entries):
+    org_id = client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    meeting_id = client.post("/meetings/", json=dict(MEETING_DATA, organization_id=org_id)).json()["id"]
+    user = {"full_name": "Sarah Chen", "email": "sarah@example.com", "password": "password123"}
+    user_id = client.post("/users/", json=user).json()["id"]
+    participant = {"meeting_id": meeting_id, "user_id": user_id, "role": "host"}
+    participant_id = client.post("/meeting_participants/", json=participant).json()["id"]
+    transcript_id = client.post("/transcripts/", json={"meeting_id": meeting_id}).json()["id"]
+    created = client.post("/transcript_entries/bulk", json=[
+        {"transcript_id": transcript_id, "participant_id": participant_id, "text": f"Point {i} about the launch plan",
+         "start_time_offset_seconds": i * 10, "end_time_offset_seconds": i * 10 + 9}
+        for i in range(entries)
+    ]).json()
+    return meeting_id, [entry["id"] for entry in created]
+
+
+def test_map_reduce_summary_is_cached_by_chunk(api_client, session):
+    meeting_id, entry_ids = create_transcript(api_client, 300)
+    llm = FakeLLM(latency=0.01)
+    summarizer = summarization.Summarizer(llm, chunk_tokens=200, concurrency=3)
+
+    result = summarization.summarize_meeting(session, meeting_id, summarizer)
+    assert result.chunks > 10 and result.levels >= 2
+    assert result.llm_calls == len(llm.prompts) and result.cache_hits == 0
+    assert 1 < llm.max_in_flight <= 3
+    assert all(summarization.estimate_tokens(p) <= 200 + 100 for p in llm.prompts)
+    summary = api_client.get("/meeting_summaries/").json()
+    assert [(s["meeting_id"], s["summary_text"]) for s in summary] == [(meeting_id, result.summary_text)]
+
+    rerun = summarization.summarize_meeting(session, meeting_id, summarizer)
+    assert (rerun.llm_calls, rerun.summary_text) == (0, result.summary_text)
+
+    session.get(sql_models.TranscriptEntry, entry_ids[150]).text = "We moved the launch to May"
+    session.commit()
+    calls_before = len(llm.prompts)
+    edited = summarization.summarize_meeting(session, meeting_id, summarizer)
+    map_calls = [p for p in llm.prompts[calls_before:] if p.startswith("You are summarizing")]
+    assert len(map_calls) == 1 and "moved the launch to May" in map_calls[0]
+    assert edited.llm_calls < result.llm_calls / 3
+    assert edited.summary_text != result.summary_text
+
+
+def test_summary_endpoint_queues_a_job(api_client, session, monkeypatch):
+    meeting_id, _ = create_transcript(api_client, 5)
+    llm = FakeLLM()
+    monkeypatch.setattr(summarization, "default_summarizer", lambda: summarization.Summarizer(llm))
+
+    response = api_client.post(f"/meetings/{meeting_id}/summary")
+    assert response.status_code == 202
+    assert response.json()["status"] == "queued"
+    assert api_client.post(f"/meetings/{meeting_id}/summary").json()["id"] == response.json()["id"]
+    assert llm.prompts == []
+
+    job_queue.drain(session.get_bind())
+    job = api_client.get(f"/jobs/{response.json()['id']}").json()
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"chunks": 1, "levels": 1, "llm_calls": 2, "cache_hits": 0}
+    assert api_client.get("/meeting_summaries/").json()[0]["summary_text"].startswith("summary ")
+    assert api_client.post("/meetings/999/summary").status_code == 404
@@ -0,0 +1,61 @@
+from sqlalchemy import text
+
+MEETING_DATA = {
+    "title": "Test Meeting",
+    "scheduled_start_time": "2025-07-31T10:00:00"
+}
+
+
+def create_transcript(client, speakers=2):
+    org_id = client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    meeting_id = client.post("/meetings/", json=dict(MEETING_DATA, organization_id=org_id)).json()["id"]
+    participant_ids = []
+    for i in range(speakers):
+        user = {"full_name": f"User {i}", "email": f"user{i}@example.com", "password": "password123"}
+        user_id = client.post("/users/", json=user).json()["id"]
+        participant = {"meeting_id": meeting_id, "user_id": user_id, "role": "attendee"}
+        participant_ids.append(client.post("/meeting_participants/", json=participant).json()["id"])
+    transcript_id = client.post("/transcripts/", json={"meeting_id": meeting_id}).json()["id"]
+    return transcript_id, participant_ids
+
+
+def test_transcript_entries_filter_by_window_and_participant(api_client):
+    transcript_id, speakers = create_transcript(api_client)
+    # Inserted out of order to check the response is sorted by start time
+    starts = [600, 0, 720, 1080, 700, 1200]
+    api_client.post("/transcript_entries/bulk", json=[
+        {
+            "transcript_id": transcript_id,
+            "participant_id": speakers[i % 2],
+            "text": f"Entry at {start}",
+            "start_time_offset_seconds": start,
+            "end_time_offset_seconds": start + 30,
+        }
+        for i, start in enumerate(starts)
+    ])
+
+    response = api_client.get(f"/transcripts/{transcript_id}/entries")
+    assert response.status_code == 200
+    assert [e["start_time_offset_seconds"] for e in response.json()] == sorted(starts)
+
+    window = api_client.get(f"/transcripts/{transcript_id}/entries", params={"start": 720, "end": 1080}).json()
+    assert [e["start_time_offset_seconds"] for e in window] == [720]
+
+    spoken = api_client.get(f"/transcripts/{transcript_id}/entries", params={"participant_id": speakers[1]}).json()
+    assert [e["start_time_offset_seconds"] for e in spoken] == [0, 1080, 1200]
+    assert {e["participant_id"] for e in spoken} == {speakers[1]}
+
+    limited = api_client.get(f"/transcripts/{transcript_id}/entries", params={"start": 650, "limit": 2}).json()
+    assert [e["start_time_offset_seconds"] for e in limited] == [700, 720]
+
+    assert api_client.get("/transcripts/999/entries").status_code == 404
+
+
+def test_transcript_window_query_uses_index(session):
+    import transcripts
+
+    stmt = transcripts.entries_query(1, start=720, end=1080)
+    compiled = stmt.compile(compile_kwargs={"literal_binds": True})
+    plan = " ".join(row[-1] for row in session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+    assert "ix_transcript_entries_transcript_start" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,91 @@
+import csv
+import gzip
+import io
+import json
+import os
+
+import pytest
+
+import transcripts
+
+MEETING_DATA = {
+    "title": "Test Meeting",
+    "scheduled_start_time": "2025-07-31T10:00:00"
+}
+
+
+def create_transcript(client):
+    org_id = client.post("/organizations/", json={"name": "Test Org"}).json()["id"]
+    meeting_id = client.post("/meetings/", json=dict(MEETING_DATA, organization_id=org_id)).json()["id"]
+    user = {"full_name": "Sarah Chen", "email": "sarah@example.com", "password": "password123"}
+    user_id = client.post("/users/", json=user).json()["id"]
+    participant = {"meeting_id": meeting_id, "user_id": user_id, "role": "host"}
+    participant_id = client.post("/meeting_participants/", json=participant).json()["id"]
+    transcript_id = client.post("/transcripts/", json={"meeting_id": meeting_id}).json()["id"]
+    return transcript_id, participant_id
+
+
+def test_export_formats(api_client):
+    transcript_id, participant_id = create_transcript(api_client)
+    api_client.post("/transcript_entries/bulk", json=[
+        {"transcript_id": transcript_id, "participant_id": participant_id, "text": text,
+         "start_time_offset_seconds": start, "end_time_offset_seconds": start + 5}
+        for start, text in [(3725, "Ship it, <everyone> agrees"), (0, "Welcome, all")]
+    ])
+    url = f"/transcripts/{transcript_id}/export"
+
+    response = api_client.get(url)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["text"] for line in lines] == ["Welcome, all", "Ship it, <everyone> agrees"]
+    assert lines[0]["speaker"] == "Sarah Chen"
+
+    rows = list(csv.DictReader(io.StringIO(api_client.get(url, params={"format": "csv"}).text)))
+    assert [row["start_time_offset_seconds"] for row in rows] == ["0", "3725"]
+
+    vtt = api_client.get(url, params={"format": "vtt"}).text
+    assert vtt.startswith("WEBVTT\n")
+    assert "01:02:05.000 --> 01:02:10.000\n<v Sarah Chen>Ship it, &lt;everyone&gt; agrees" in vtt
+
+    response = api_client.get(url, params={"format": "csv", "gzip": True})
+    assert response.headers["content-type"] == "application/gzip"
+    assert 'filename="transcript-1.csv.gz"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.content).decode())))
+    assert rows[0]["text"] == "Welcome, all"
+
+    assert api_client.get("/transcripts/999/export").status_code == 404
+    assert api_client.get(url, params={"format": "pdf"}).status_code == 422
+
+
+def resident_memory() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="needs /proc to read the resident set size")
+def test_export_of_a_million_entries_runs_in_bounded_memory(session):
+    entries = 1_000_000
+    raw = session.connection().connection
+    raw.execute("INSERT INTO organizations (id, name) VALUES (1, 'Org')")
+    raw.execute("INSERT INTO meetings (id, organization_id, title, status, scheduled_start_time) VALUES (1, 1, 'Long', 'completed', '2025-01-01')")
+    raw.execute("INSERT INTO users (id, full_name, email, password_hash) VALUES (1, 'Speaker', 's@example.com', 'x')")
+    raw.execute("INSERT INTO meeting_participants (id, meeting_id, user_id, role) VALUES (1, 1, 1, 'host')")
+    raw.execute("INSERT INTO transcripts (id, meeting_id, processing_status) VALUES (1, 1, 'completed')")
+    # Full-text indexing would dominate the setup time and is not what is under test
+    raw.execute("DROP TRIGGER transcript_entries_fts_ai")
+    raw.executemany(
+        "INSERT INTO transcript_entries (transcript_id, participant_id, text, start_time_offset_seconds, end_time_offset_seconds) VALUES (1, 1, ?, ?, ?)",
+        ((f"Utterance number {i} of a very long meeting", i, i + 1) for i in range(entries)),
+    )
+    session.commit()
+
+    rss_before = resident_memory()
+    peak, lines, exported = rss_before, 0, 0
+    for block in transcripts.export_transcript(session.get_bind(), 1, "ndjson"):
+        lines += block.count(b"\n")
+        exported += len(block)
+        peak = max(peak, resident_memory())
+    assert lines == entries
+    # The export is ~170 MB; the stream never holds more than a few batches of it
+    assert exported > 150 * 1024 * 1024
+    assert peak - rss_before < 20 * 1024 * 1024